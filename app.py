@@ -12,9 +12,15 @@ FAS 2: VILLKORSSTYRD NETATMO-FUNKTIONALITET för oberoende drift
 + AMCHARTS: SVG-ikoner för väderikoner med minimal kodförändring
 """
 
-from flask import Flask, render_template, jsonify, request
+# Uppstartstidslinjen räknar från första importen (även Flask och klienterna)
+from core.startup import mark_startup, finish_startup, get_startup_timeline
+
+from flask import Flask, Response, abort, g, render_template, jsonify, request, send_file
 from datetime import datetime, timezone
+import json
+import logging
 import os
+import time
 import sys
 from typing import Dict, List, Optional
 
@@ -34,25 +40,99 @@ from core.config_manager import (
 )
 from core.weather_updater import (
     init_api_clients, update_weather_data, 
-    start_background_tasks, format_api_response_with_pressure_trend,
-    create_smhi_pressure_trend_fallback
+    start_background_tasks, create_smhi_pressure_trend_fallback
+)
+from core.leader_election import (
+    start_worker_coordination, get_coordination_status, ROLE_FOLLOWER,
+    restore_warm_start, get_warm_start_info
+)
+from core.logging_setup import setup_logging, rate_limited
+from core.metrics import init_metrics, observe_http_request, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.tracing import init_tracing, get_recent_traces, get_tracing_status
+from core.profiling import (
+    get_profiling_config, run_sampling_profile, format_folded, format_top,
+    start_tracemalloc, stop_tracemalloc, get_tracemalloc_diff, get_tracemalloc_status
+)
+from core.scheduler import get_jobs_status, get_scheduler_config, trigger_job, set_job_paused
+from core.data_sources import get_data_sources_status
+from core.demand import init_demand, record_client_activity, get_demand_status
+from core.config_reload import init_config_reload, check_config_file, get_config_reload_status
+from core.assets import (
+    build_assets, get_template_assets, resolve_asset, get_assets_status,
+    ASSET_URL_PREFIX, IMMUTABLE_CACHE_CONTROL
 )
+from core.api_cache import get_payload_json, get_embedded_snapshot, get_first_paint, get_api_cache_status
+from core.pwa import build_manifest, render_service_worker, get_template_pwa, get_pwa_status, MANIFEST_URL, SERVICE_WORKER_URL
+from core.telemetry import (
+    get_telemetry_config, get_template_telemetry, record_telemetry, reject_telemetry, get_telemetry_status,
+    TELEMETRY_MAX_BYTES
+)
+from upstream import get_transport_status
+from circuit_breaker import get_breakers_status
+
+# Loggning sätts upp direkt så att även uppstartsfel hamnar i loggen
+setup_logging()
+logger = logging.getLogger('app')
 
 try:
     from utils import get_weather_icon_unicode_char, get_weather_description_short
 except ImportError as e:
-    print(f"❌ Import fel: {e}")
-    print("🔧 Kontrollera att reference/data/ finns och innehåller utils.py")
+    logger.error(f"❌ Import fel: {e}")
+    logger.info("🔧 Kontrollera att reference/data/ finns och innehåller utils.py")
     sys.exit(1)
 
+mark_startup('imports')
+
 # Flask app setup
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'weather_dashboard_secret_key'
 
 # SSOT-FIX: Inga globala variabler - allt i core/weather_state.py
 
+# === METRICS: TIDTAGNING PER ROUTE ===
+
+@app.before_request
+def start_request_timer():
+    """Starta tidtagning för /metrics och registrera skärmaktivitet."""
+    g.request_start = time.perf_counter()
+    if request.url_rule is not None:
+        record_client_activity(request.url_rule.rule)
+
+@app.after_request
+def record_request_metrics(response):
+    """Registrera svarstid och storlek per route-mönster."""
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe_http_request(
+            route, request.method, response.status_code,
+            time.perf_counter() - start, response.content_length
+        )
+    return response
+
+@app.context_processor
+def inject_assets():
+    """Hashade bunt-URL:er till index.html (tomt = enskilda filer från /static)."""
+    return {'assets': get_template_assets()}
+
 # === FLASK ROUTES ===
 
+@app.route(f'{ASSET_URL_PREFIX}/<filename>')
+def serve_asset(filename):
+    """Byggda buntar och typsnitt - hashat namn, cachas för alltid av webbläsaren."""
+    accept_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    resolved = resolve_asset(filename, accept_gzip)
+    if resolved is None:
+        abort(404)
+    
+    path, mimetype, encoding = resolved
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
 @app.route('/')
 def index():
     """Huvud-route för väder-dashboard."""
@@ -67,118 +147,80 @@ def index():
     current_theme = get_current_theme()
     
     # FAS 2: Tillhandahåll WeatherEffects-status till template
+    # Första renderingen: samma serialiserade data som API:t, inbäddad + förrenderade huvudvärden
     template_vars = {
         'location_name': location_name,
         'theme': current_theme,
-        'weather_effects_enabled': weather_state['weather_effects_enabled']
+        'weather_effects_enabled': weather_state['weather_effects_enabled'],
+        'initial_data': get_embedded_snapshot(),
+        'first_paint': get_first_paint(),
+        'pwa': get_template_pwa(weather_state['config']),
+        'telemetry': get_template_telemetry(weather_state['config'])
     }
     
     return render_template('index.html', **template_vars)
 
+@app.route(MANIFEST_URL)
+def web_app_manifest():
+    """Webbapp-manifest (installation på kiosk/mobil)."""
+    weather_state = get_weather_state()
+    location_name = (weather_state['config'] or {}).get('display', {}).get('location_name', 'Stockholm')
+    
+    response = jsonify(build_manifest(weather_state['config'], location_name, get_current_theme()))
+    response.mimetype = 'application/manifest+json'
+    return response
+
+@app.route(SERVICE_WORKER_URL)
+def service_worker():
+    """Service worker för offline-skalet - från roten så att den gäller hela sidan."""
+    script = render_service_worker(get_weather_state()['config'])
+    if script is None:
+        abort(404)
+    
+    response = Response(script, mimetype='application/javascript')
+    # Webbläsaren ska alltid kontrollera om workern (och därmed skalet) ändrats
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def _cached_json_response(name: str) -> Response:
+    """Svar från serialiseringscachen med ETag (304 om klienten redan har versionen)."""
+    body, etag = get_payload_json(name)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @app.route('/api/current')
 def api_current_weather():
     """FAS 2: API endpoint för aktuell väderdata med intelligent Netatmo-hantering."""
-    # SSOT-FIX: Använd core/weather_state.py
-    weather_state = get_weather_state()
-    
-    # FAS 2: Villkorsstyrd Netatmo-formatering
-    formatted_netatmo = None
-    if weather_state['netatmo_data'] and weather_state['netatmo_available']:
-        # SSOT-FIX: Använd core/weather_updater.py
-        formatted_netatmo = format_api_response_with_pressure_trend(
-            weather_state['netatmo_data'], 
-            weather_state['smhi_data']
-        )
-    
-    # FAS 2: Utökad config för frontend-intelligens
-    ui_config = None
-    if weather_state['config']:
-        ui_config = {
-            'wind_unit': weather_state['config'].get('ui', {}).get('wind_unit', 'land'),
-            'use_netatmo': weather_state['use_netatmo'],
-            'netatmo_available': weather_state['netatmo_available'],
-            'weather_effects_enabled': weather_state['weather_effects_enabled'],
-            'weather_icon_type': weather_state['config'].get('ui', {}).get('weather_icon_type', 'font'),  # AMCHARTS: Ikon-typ
-            'warnings_enabled': weather_state['warnings_enabled']  # SSOT-FIX: Använd state
-        }
-    
-    response_data = {
-        'smhi': weather_state['smhi_data'],
-        'netatmo': formatted_netatmo,
-        'sun': weather_state['sun_data'],
-        'last_update': weather_state['last_update'],
-        'theme': get_current_theme(),
-        'status': weather_state['status'],
-        'config': ui_config
-    }
+    # Byggs och serialiseras en gång per state-version (core/api_cache.py)
+    response = _cached_json_response('current')
     
     # FAS 2: Debug-logging för API-respons
-    mode = "SMHI + Netatmo" if formatted_netatmo else "SMHI-only"
+    weather_state = get_weather_state()
+    mode = "SMHI + Netatmo" if weather_state['netatmo_data'] and weather_state['netatmo_available'] else "SMHI-only"
     effects = " + WeatherEffects" if weather_state['weather_effects_enabled'] else ""
     warnings = " + Warnings" if weather_state['warnings_enabled'] else ""
     smhi_humidity = weather_state['smhi_data'].get('humidity') if weather_state['smhi_data'] else None
     humidity_info = f" (humidity: {smhi_humidity}%)" if smhi_humidity is not None else " (no humidity)"
-    print(f"🌐 FAS 2: API Response - {mode}{effects}{warnings}{humidity_info}")
+    logger.info(f"🌐 FAS 2: API Response - {mode}{effects}{warnings}{humidity_info}", extra=rate_limited(300))
     
-    return jsonify(response_data)
+    return response
 
 @app.route('/api/forecast')
 def api_forecast():
     """API endpoint för väderprognos."""
-    # SSOT-FIX: Använd core/weather_state.py
-    weather_state = get_weather_state()
-    
-    return jsonify({
-        'forecast': weather_state['forecast_data'],
-        'last_update': weather_state['last_update']
-    })
+    return _cached_json_response('forecast')
 
 @app.route('/api/daily')
 def api_daily_forecast():
     """API endpoint för daglig väderprognos."""
-    # SSOT-FIX: Använd core/weather_state.py
-    weather_state = get_weather_state()
-    
-    return jsonify({
-        'daily_forecast': weather_state['daily_forecast_data'],
-        'last_update': weather_state['last_update']
-    })
+    return _cached_json_response('daily')
 
 @app.route('/api/warnings')
 def api_warnings():
     """API endpoint för SMHI vädervarningar."""
-    # SSOT-FIX: Använd core/weather_state.py
-    if not is_warnings_enabled():
-        return jsonify({
-            'error': 'SMHI Warnings ej aktiverat',
-            'enabled': False,
-            'heavy_rain_warnings': [],
-            'active_heavy_rain_warnings': [],
-            'summary': {'total_warnings': 0}
-        })
-    
-    warnings_data = get_warnings_data()
-    if not warnings_data:
-        return jsonify({
-            'error': 'Inga varningsdata tillgängliga',
-            'enabled': True,
-            'api_available': False,
-            'heavy_rain_warnings': [],
-            'active_heavy_rain_warnings': [],
-            'summary': {'total_warnings': 0}
-        })
-    
-    # Lägg till metadata
-    response = {
-        **warnings_data,
-        'enabled': True,
-        'cache_info': {
-            'cache_duration_minutes': 10,
-            'last_api_update': get_warnings_last_update()
-        }
-    }
-    
-    return jsonify(response)
+    return _cached_json_response('warnings')
 
 @app.route('/api/warnings/heavy-rain')
 def api_warnings_heavy_rain():
@@ -246,7 +288,17 @@ def api_status():
         'weather_effects_config_loaded': weather_state['weather_effects_config'] is not None,
         'warnings_enabled': weather_state['warnings_enabled'],  # SSOT-FIX: Använd state
         'warnings_active': get_api_client('smhi_warnings_client') is not None,  # SSOT-FIX: Använd core
-        'warnings_last_update': get_warnings_last_update()  # SSOT-FIX: Använd core
+        'warnings_last_update': get_warnings_last_update(),  # SSOT-FIX: Använd core
+        'worker': get_coordination_status(),
+        'warm_start': get_warm_start_info(),
+        'upstream_breakers': get_breakers_status(),
+        'demand': get_demand_status(),
+        'config_reload': get_config_reload_status(),
+        'startup': get_startup_timeline(),
+        'assets': get_assets_status(),
+        'api_cache': get_api_cache_status(),
+        'pwa': get_pwa_status(weather_state['config']),
+        'telemetry': get_telemetry_status(weather_state['config'])
     })
 
 @app.route('/api/theme')
@@ -300,14 +352,14 @@ def api_weather_effects_config():
         JSON: Validerad WeatherEffects-konfiguration för frontend
     """
     try:
-        print("🌦️ FAS 2: WeatherEffects config API anropat")
+        logger.debug("🌦️ FAS 2: WeatherEffects config API anropat")
         
         # SSOT-FIX: Använd core/weather_state.py
         weather_state = get_weather_state()
         
         # Kontrollera att config är laddad
         if not weather_state['config']:
-            print("❌ FAS 2: Ingen huvudkonfiguration laddad")
+            logger.error("❌ FAS 2: Ingen huvudkonfiguration laddad")
             return jsonify({
                 'error': 'Konfiguration ej tillgänglig',
                 'enabled': False,
@@ -349,18 +401,18 @@ def api_weather_effects_config():
         
         # Debug-logging om aktiverat
         if validated_config.get('debug_logging'):
-            print(f"🌦️ FAS 2: WeatherEffects config returnerad:")
-            print(f"   Enabled: {validated_config['enabled']}")
-            print(f"   Intensitet: {validated_config['intensity']}")
-            print(f"   Regn droppar: {validated_config['rain_config']['droplet_count']}")
-            print(f"   Snö flingor: {validated_config['snow_config']['flake_count']}")
+            logger.info(f"🌦️ FAS 2: WeatherEffects config returnerad:")
+            logger.info(f"   Enabled: {validated_config['enabled']}")
+            logger.info(f"   Intensitet: {validated_config['intensity']}")
+            logger.info(f"   Regn droppar: {validated_config['rain_config']['droplet_count']}")
+            logger.info(f"   Snö flingor: {validated_config['snow_config']['flake_count']}")
             if smhi_integration:
-                print(f"   SMHI Symbol: {smhi_integration.get('current_weather_symbol')} → {smhi_integration.get('current_effect_type')}")
+                logger.info(f"   SMHI Symbol: {smhi_integration.get('current_weather_symbol')} → {smhi_integration.get('current_effect_type')}")
         
         return jsonify(api_response)
         
     except Exception as e:
-        print(f"❌ FAS 2: Fel vid WeatherEffects config API: {e}")
+        logger.error(f"❌ FAS 2: Fel vid WeatherEffects config API: {e}")
         
         # Returnera minimal fallback-config vid fel
         fallback_config = {
@@ -426,75 +478,305 @@ def api_weather_effects_debug():
     
     return jsonify(debug_info)
 
+@app.route('/api/debug/timings')
+def api_debug_timings():
+    """
+    Span-träd för de senaste uppdateringscyklerna (senaste först).
+    Query: ?limit=N begränsar antalet cykler.
+    """
+    limit = request.args.get('limit', type=int)
+    
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'worker': get_coordination_status(),
+        'tracing': get_tracing_status(),
+        'upstream': get_transport_status(),
+        'cycles': get_recent_traces(limit)
+    })
+
+# === BAKGRUNDSJOBB ===
+
+@app.route('/api/jobs')
+def api_jobs():
+    """Schemalagda bakgrundsjobb: intervall, nästa körning, senaste utfall."""
+    status = get_jobs_status()
+    status['timestamp'] = datetime.now().isoformat()
+    status['worker'] = get_coordination_status()
+    status['demand'] = get_demand_status()
+    return jsonify(status)
+
+@app.route('/api/jobs/<name>/<action>', methods=['POST'])
+def api_job_action(name, action):
+    """
+    Styr ett jobb: run (kör nu), pause eller resume.
+    Endast från localhost om inte scheduler.allow_remote_trigger är satt.
+    """
+    settings = get_scheduler_config(get_weather_state()['config'])
+    if not settings['allow_remote_trigger'] and request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'error': 'Jobbstyrning endast tillåten från localhost'}), 403
+    
+    if action == 'run':
+        found = trigger_job(name)
+    elif action in ('pause', 'resume'):
+        found = set_job_paused(name, action == 'pause')
+    else:
+        return jsonify({'error': f"Okänd åtgärd: {action} (run, pause, resume)"}), 400
+    
+    if not found:
+        return jsonify({'error': f"Okänt jobb: {name}"}), 404
+    return jsonify({'job': name, 'action': action, 'ok': True})
+
+@app.route('/api/config/reload', methods=['GET', 'POST'])
+def api_config_reload():
+    """
+    Status för config-omladdning (GET) eller läs om config direkt (POST).
+    POST endast från localhost om inte scheduler.allow_remote_trigger är satt.
+    """
+    if request.method == 'POST':
+        settings = get_scheduler_config(get_weather_state()['config'])
+        if not settings['allow_remote_trigger'] and request.remote_addr not in ('127.0.0.1', '::1'):
+            return jsonify({'error': 'Omladdning endast tillåten från localhost'}), 403
+        check_config_file(force=True)
+    
+    status = get_config_reload_status()
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status)
+
+@app.route('/api/data-sources')
+def api_data_sources():
+    """Datakällor: TTL, beroenden, senaste hämtning och när datan går ut."""
+    status = get_data_sources_status()
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status)
+
+@app.route('/api/telemetry', methods=['POST'])
+def api_telemetry():
+    """Renderingstelemetri från kioskerna (client-telemetry.js) - visas på /metrics och /api/status."""
+    settings = get_telemetry_config(get_weather_state()['config'])
+    if not settings['enabled']:
+        return jsonify({'error': 'Telemetri ej aktiverad (telemetry.enabled)'}), 403
+    
+    # Läs högst gränsen + 1 byte - chunkade anrop saknar Content-Length
+    body = request.stream.read(TELEMETRY_MAX_BYTES + 1)
+    if len(body) > TELEMETRY_MAX_BYTES:
+        reject_telemetry()
+        return jsonify({'error': f"Telemetrirapporten är större än {TELEMETRY_MAX_BYTES} bytes"}), 413
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    
+    kiosk, error = record_telemetry(payload, request.remote_addr, settings)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify({'kiosk': kiosk, 'ok': True})
+
+# === PROFILERING (AKTIVERAS I CONFIG) ===
+
+def _profiling_guard():
+    """
+    Kontrollera att profilering är aktiverad och att anropet är tillåtet.
+
+    Returns:
+        tuple: (settings, None) eller (None, felrespons)
+    """
+    settings = get_profiling_config(get_weather_state()['config'])
+    
+    if not settings['profiling_enabled']:
+        return None, (jsonify({'error': 'Profilering ej aktiverad (diagnostics.profiling_enabled)'}), 403)
+    
+    if not settings['profiling_allow_remote'] and request.remote_addr not in ('127.0.0.1', '::1'):
+        return None, (jsonify({'error': 'Profilering endast tillåten från localhost'}), 403)
+    
+    return settings, None
+
+@app.route('/api/debug/profile')
+def api_debug_profile():
+    """
+    Sampling-profil av hela processen i N sekunder.
+    Query: seconds, interval_ms, format=folded|top, limit (för top).
+    """
+    settings, error = _profiling_guard()
+    if error:
+        return error
+    
+    seconds = request.args.get('seconds', 10, type=float)
+    seconds = min(max(1.0, seconds), settings['max_profile_seconds'])
+    interval_ms = request.args.get('interval_ms', settings['sample_interval_ms'], type=float)
+    output_format = request.args.get('format', 'folded')
+    
+    profile = run_sampling_profile(seconds, interval_ms)
+    if profile is None:
+        return jsonify({'error': 'En profilering pågår redan'}), 409
+    
+    if output_format == 'top':
+        body = format_top(profile, request.args.get('limit', 40, type=int))
+    else:
+        body = format_folded(profile)
+    
+    response = Response(body, content_type='text/plain; charset=utf-8')
+    response.headers['X-Profile-Pid'] = str(os.getpid())
+    return response
+
+@app.route('/api/debug/tracemalloc')
+def api_debug_tracemalloc():
+    """
+    Största allokeringsförändringarna sedan baslinjen.
+    Query: limit, group_by=lineno|filename|traceback, reset=1 (ny baslinje).
+    """
+    settings, error = _profiling_guard()
+    if error:
+        return error
+    
+    diff = get_tracemalloc_diff(
+        limit=request.args.get('limit', 25, type=int),
+        group_by=request.args.get('group_by', 'lineno'),
+        reset_baseline=request.args.get('reset', '0') == '1'
+    )
+    if diff is None:
+        return jsonify({'error': 'tracemalloc ej startad', 'status': get_tracemalloc_status()}), 409
+    
+    return jsonify(diff)
+
+@app.route('/api/debug/tracemalloc/start', methods=['POST'])
+def api_debug_tracemalloc_start():
+    """Starta tracemalloc (eller ta ny baslinje). Query: frames (1-25)."""
+    settings, error = _profiling_guard()
+    if error:
+        return error
+    
+    frames = request.args.get('frames', 10, type=int)
+    return jsonify(start_tracemalloc(frames, settings['tracemalloc_max_minutes']))
+
+@app.route('/api/debug/tracemalloc/stop', methods=['POST'])
+def api_debug_tracemalloc_stop():
+    """Stoppa tracemalloc och släpp snapshots."""
+    settings, error = _profiling_guard()
+    if error:
+        return error
+    
+    return jsonify(stop_tracemalloc())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus-metrics (upstream, cache, cykler, routes, dataålder)."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 # === APP INITIALIZATION ===
 
 def initialize_app():
     """
     SSOT-FIX: Ren initialisering som använder endast core/ moduler.
     """
-    print("🚀 FAS 2: Startar Flask Weather Dashboard med ren SSOT...")
-    print("=" * 80)
+    logger.info("🚀 FAS 2: Startar Flask Weather Dashboard med ren SSOT...")
+    logger.info("=" * 80)
     
     # SSOT-FIX: Använd core/config_manager.py
     config = load_config()
     if not config:
-        print("❌ Kan inte starta utan giltig konfiguration")
+        logger.error("❌ Kan inte starta utan giltig konfiguration")
         return False
     
+    # Loggnivåer, JSON-format och loggfil från config
+    setup_logging(config)
+    mark_startup('config')
+    
+    # Koppla klienternas upstream- och cache-rapporter till /metrics
+    init_metrics()
+    
+    # Tidsspann per fas i uppdateringscyklerna (/api/debug/timings)
+    init_tracing(config)
+    
     # SSOT-FIX: Sätt config i core/weather_state.py
     update_weather_state('config', config)
     
-    # SSOT-FIX: Använd core/weather_updater.py
-    api_clients_ok = init_api_clients(config)
-    if not api_clients_ok:
-        print("⚠️ FAS 2: Vissa API-klienter misslyckades - fortsätter ändå")
+    # Viloläge när ingen skärm tittar (aktivitet spåras i alla workers)
+    init_demand(config)
+    mark_startup('diagnostics')
     
-    # SSOT-FIX: Använd core/weather_updater.py
-    start_background_tasks(config)
+    # Hashade JS/CSS-buntar (återanvänds om källorna är oförändrade)
+    build_assets(config)
+    mark_startup('assets')
     
-    print("=" * 80)
-    print("🌤️ FAS 2: Flask Weather Dashboard redo med ren SSOT!")
-    print("📱 Öppna: http://localhost:8036")
-    print("🖥️ Chrome Kiosk: chromium-browser --kiosk --disable-infobars http://localhost:8036")
+    # Warm start: senast kända data visas direkt, första hämtningen körs i bakgrunden
+    restore_warm_start(config)
+    mark_startup('warm_start')
+    
+    def start_data_ingestion():
+        # Aktuell config - kan ha laddats om innan en följare tar över som ledare
+        current_config = get_weather_state()['config']
+        
+        # SSOT-FIX: Använd core/weather_updater.py
+        # Ingen nätverkstrafik här - Netatmo-autentisering och första hämtningen körs som jobb
+        api_clients_ok = init_api_clients(current_config)
+        if not api_clients_ok:
+            logger.warning("⚠️ FAS 2: Vissa API-klienter misslyckades - fortsätter ändå")
+        mark_startup('clients')
+        
+        # SSOT-FIX: Använd core/weather_updater.py
+        start_background_tasks(current_config)
+        mark_startup('scheduler')
+    
+    # Multi-worker: endast ledar-workern startar datainsamling
+    worker_role = start_worker_coordination(config, start_data_ingestion)
+    if worker_role == ROLE_FOLLOWER:
+        logger.info("👥 Följar-worker - väderdata läses från ledarens snapshot")
+    
+    # Ändringar i config.py tillämpas utan omstart (alla workers bevakar filen)
+    init_config_reload(config)
+    mark_startup('config_reload')
+    
+    logger.info("=" * 80)
+    logger.info("🌤️ FAS 2: Flask Weather Dashboard redo med ren SSOT!")
+    logger.info("📱 Öppna: http://localhost:8036")
+    logger.info("🖥️ Chrome Kiosk: chromium-browser --kiosk --disable-infobars http://localhost:8036")
     
     # SSOT-FIX: Använd core/weather_state.py
     weather_state = get_weather_state()
     mode = get_system_mode()
-    print(f"🎯 Systemläge: {mode}")
+    logger.info(f"🎯 Systemläge: {mode}")
     
     # FAS 2: Visa WeatherEffects API endpoints
     if weather_state['weather_effects_enabled']:
-        print(f"🌦️ WeatherEffects API: http://localhost:8036/api/weather-effects-config")
+        logger.info(f"🌦️ WeatherEffects API: http://localhost:8036/api/weather-effects-config")
         effect_config = weather_state['weather_effects_config']
         rain_count = effect_config.get('rain_config', {}).get('droplet_count', 50)
         snow_count = effect_config.get('snow_config', {}).get('flake_count', 25)
         intensity = effect_config.get('intensity', 'auto')
-        print(f"   🌧️ Regn: {rain_count} droppar | ❄️ Snö: {snow_count} flingor | 🎚️ Intensitet: {intensity}")
+        logger.info(f"   🌧️ Regn: {rain_count} droppar | ❄️ Snö: {snow_count} flingor | 🎚️ Intensitet: {intensity}")
         
         # Debug endpoint om aktiverat
         if effect_config.get('debug_logging'):
-            print(f"🔧 WeatherEffects Debug: http://localhost:8036/api/weather-effects-debug")
+            logger.info(f"🔧 WeatherEffects Debug: http://localhost:8036/api/weather-effects-debug")
     else:
-        print(f"📊 WeatherEffects: INAKTIVERAT (weather_effects.enabled=False)")
+        logger.info(f"📊 WeatherEffects: INAKTIVERAT (weather_effects.enabled=False)")
     
     # SMHI Warnings API endpoints
     if weather_state['warnings_enabled']:
-        print(f"⚠️ SMHI Warnings API: http://localhost:8036/api/warnings")
-        print(f"🌧️ Skyfall-varningar: http://localhost:8036/api/warnings/heavy-rain")
+        logger.info(f"⚠️ SMHI Warnings API: http://localhost:8036/api/warnings")
+        logger.info(f"🌧️ Skyfall-varningar: http://localhost:8036/api/warnings/heavy-rain")
     else:
-        print(f"📊 SMHI Warnings: INAKTIVERAT")
-    
-    print(f"📊 Trycktrend API: http://localhost:8036/api/pressure_trend")
-    print(f"🌬️ Vindenheter: {config['ui']['wind_unit']} (redigerbart i reference/config.py)")
-    print(f"🎨 Tema: {config['ui']['theme']} (mörkt tema rekommenderat)")
+        logger.info(f"📊 SMHI Warnings: INAKTIVERAT")
+    
+    logger.info(f"📊 Trycktrend API: http://localhost:8036/api/pressure_trend")
+    logger.info(f"📈 Metrics: http://localhost:8036/metrics")
+    logger.info(f"⏱️ Cykel-timings: http://localhost:8036/api/debug/timings")
+    logger.info(f"🗓️ Bakgrundsjobb: http://localhost:8036/api/jobs")
+    logger.info(f"📦 Datakällor: http://localhost:8036/api/data-sources")
+    if get_profiling_config(config)['profiling_enabled']:
+        logger.info(f"🔬 Profilering: http://localhost:8036/api/debug/profile (endast diagnos - stäng av i normal drift)")
+    logger.info(f"🌬️ Vindenheter: {config['ui']['wind_unit']} (redigerbart i reference/config.py)")
+    logger.info(f"🎨 Tema: {config['ui']['theme']} (mörkt tema rekommenderat)")
     
     # AMCHARTS: Visa ikon-typ status
     icon_type = config.get('ui', {}).get('weather_icon_type', 'font')
-    print(f"🎨 Väder-ikoner: {icon_type} ({'SVG amCharts' if icon_type == 'amcharts' else 'Weather Icons font'})")
+    logger.info(f"🎨 Väder-ikoner: {icon_type} ({'SVG amCharts' if icon_type == 'amcharts' else 'Weather Icons font'})")
     
-    print("✅ REN SSOT implementerad - inga dubletter kvar!")
-    print("=" * 80)
+    logger.info("✅ REN SSOT implementerad - inga dubletter kvar!")
+    logger.info("=" * 80)
     
+    finish_startup()
     return True
 
 if __name__ == '__main__':
@@ -506,5 +788,5 @@ if __name__ == '__main__':
             threaded=True
         )
     else:
-        print("❌ Kunde inte starta Flask-appen")
+        logger.error("❌ Kunde inte starta Flask-appen")
         sys.exit(1)
\ No newline at end of file
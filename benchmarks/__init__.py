@@ -0,0 +1,21 @@
+"""
+Flask Weather Dashboard - Benchmarks
+Offline-benchmarks för klienternas parsning, trycktrend och API-endpoints.
+
+Upstream-svar (SMHI pmp3g, metobs, IBWW-varningar, Netatmo getstationsdata,
+ipgeolocation) serveras från fixtures i stället för nätverket: inspelade
+payloads i benchmarks/fixtures/ om de finns, annars syntetiska payloads i
+samma format och i flera storlekar.
+
+Användning (från projektroten):
+    python3 -m benchmarks run                      # Kör allt, spara JSON i benchmarks/results/
+    python3 -m benchmarks run -k warnings --quick  # Filtrera och kör snabbt
+    python3 -m benchmarks run --compare benchmarks/results/<tidigare>.json
+    python3 -m benchmarks compare <gammal>.json <ny>.json --threshold 0.1
+    python3 -m benchmarks list
+    python3 -m benchmarks import-cassette runtime/cassettes/<tid>  # Inspelade svar som 'recorded'
+
+Lasttest mot en körande app (se fake_upstream.py och fleet.py):
+    python3 -m benchmarks fake-upstream --latency-ms 150 --jitter-ms 50
+    python3 -m benchmarks fleet --kiosks 1,10,50,100 --stage-seconds 60 --speed 10
+"""
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Kommandorad för benchmark-sviten (python3 -m benchmarks ...).
+"""
+
+import argparse
+import logging
+import sys
+
+from .runner import (
+    compare_results, ensure_project_on_path, get_benchmarks, import_suites,
+    load_results, print_comparison, run_benchmarks, save_results
+)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks', description='Offline-benchmarks för väderdashboarden')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='Kör benchmarks och spara JSON-resultat')
+    run_parser.add_argument('-k', '--filter', help='Kör bara benchmarks vars "namn[storlek]" innehåller texten')
+    run_parser.add_argument('--repeat', type=int, default=7, help='Antal körningar per mätning (default 7)')
+    run_parser.add_argument('--min-time', type=float, default=0.1, help='Minsta tid per körning i sekunder (default 0.1)')
+    run_parser.add_argument('--quick', action='store_true', help='Snabbkörning: repeat=3, min-time=0.02')
+    run_parser.add_argument('--output', help='Resultatfil (default benchmarks/results/<tid>-<rev>.json)')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='Jämför mot tidigare resultatfil efter körning')
+    run_parser.add_argument('--threshold', type=float, default=0.10, help='Regressionströskel (default 0.10 = 10%%)')
+
+    compare_parser = subparsers.add_parser('compare', help='Jämför två resultatfiler')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+
+    list_parser = subparsers.add_parser('list', help='Lista benchmarks')
+    list_parser.add_argument('-k', '--filter')
+
+    import_parser = subparsers.add_parser('import-cassette', help='Gör upstream-kassett till recorded-fixtures')
+    import_parser.add_argument('cassette_dir')
+    import_parser.add_argument('--pick', choices=('latest', 'largest'), default='latest',
+                               help='Vilket 200-svar per fixture som används (default latest)')
+
+    fake_parser = subparsers.add_parser('fake-upstream', help='Starta lokala fejkservrar för SMHI/Netatmo/ipgeolocation')
+    fake_parser.add_argument('--host', default='127.0.0.1')
+    fake_parser.add_argument('--port', type=int, default=8090)
+    fake_parser.add_argument('--latency-ms', type=float, default=0.0, help='Fast latens per svar')
+    fake_parser.add_argument('--jitter-ms', type=float, default=0.0, help='Slumpmässig extra latens 0..N ms')
+    fake_parser.add_argument('--error-rate', type=float, default=0.0, help='Andel felsvar (0-1)')
+    fake_parser.add_argument('--error-status', type=int, default=503)
+    fake_parser.add_argument('--timeout-rate', type=float, default=0.0, help='Andel anrop som hänger tills klienten får timeout')
+    fake_parser.add_argument('--no-conditional', action='store_true', help='Ignorera If-None-Match/If-Modified-Since (aldrig 304)')
+    fake_parser.add_argument('--size', action='append', metavar='RUTT=STORLEK',
+                             help='Payload-storlek per rutt, t.ex. smhi_warnings=storm_day (kan upprepas)')
+    fake_parser.add_argument('--seed', type=int)
+
+    fleet_parser = subparsers.add_parser('fleet', help='Simulera N kiosker mot en körande app')
+    fleet_parser.add_argument('--url', default='http://127.0.0.1:8036')
+    fleet_parser.add_argument('--kiosks', default='1,10,50', help='Antal kiosker per steg (default 1,10,50)')
+    fleet_parser.add_argument('--stage-seconds', type=float, default=60.0, help='Mättid per steg')
+    fleet_parser.add_argument('--speed', type=float, default=1.0, help='Tidskomprimering av kioskernas intervall')
+    fleet_parser.add_argument('--server-pid', type=int, action='append',
+                              help='Läs CPU/RSS från /proc för pid (inkl. barn, t.ex. gunicorn-master); annars /metrics')
+    fleet_parser.add_argument('--synchronized', action='store_true', help='Starta alla kiosker samtidigt (ingen utspridning)')
+    fleet_parser.add_argument('--seed', type=int)
+    fleet_parser.add_argument('--output', help='Spara resultat som JSON')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(['run'] + list(argv))
+    return args
+
+
+def main(argv=None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == 'compare':
+        comparison = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+        print_comparison(comparison, args.threshold)
+        return 1 if comparison['regressions'] else 0
+
+    if args.command == 'import-cassette':
+        from .fixtures import import_cassette
+        written = import_cassette(args.cassette_dir, args.pick)
+        for fixture, path in written.items():
+            print(f"📼 {fixture} → {path}")
+        if not written:
+            print("⚠️ Inga 200-svar i kassetten matchade någon fixture")
+        return 0 if written else 1
+
+    if args.command == 'fake-upstream':
+        from .fake_upstream import run_server
+        return run_server(args)
+
+    if args.command == 'fleet':
+        from .fleet import run_fleet_cli
+        return run_fleet_cli(args)
+
+    # Klienterna loggar per anrop - håll loggningen borta från mätningarna
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    logging.getLogger().setLevel(logging.ERROR)
+
+    ensure_project_on_path()
+    for module_name, error in import_suites().items():
+        print(f"⚠️ {module_name} kunde inte importeras: {error}")
+
+    if args.command == 'list':
+        for entry in get_benchmarks(args.filter):
+            print(f"{entry['name']}: {', '.join(entry['sizes'])}")
+        return 0
+
+    repeat, min_time = (3, 0.02) if args.quick else (args.repeat, args.min_time)
+
+    # Inga benchmarks får nå nätet: okända URL:er svarar 404 från en tom transport
+    from .fixtures import fixture_transport
+    print(f"🏁 Kör benchmarks (repeat={repeat}, min-time={min_time}s)")
+    with fixture_transport([]):
+        report = run_benchmarks(args.filter, repeat=repeat, min_time=min_time)
+
+    path = save_results(report, args.output)
+    print(f"\n💾 Resultat sparade: {path} ({len(report['results'])} mätningar, {len(report['skipped'])} överhoppade)")
+
+    if args.compare:
+        comparison = compare_results(load_results(args.compare), report, args.threshold)
+        print_comparison(comparison, args.threshold)
+        return 1 if comparison['regressions'] else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
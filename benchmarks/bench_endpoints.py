@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+End-to-end-benchmarks: hel uppdateringscykel och endpoint-latens via Flask test-klient.
+
+Appen initieras som i initialize_app() men med offline-klienter och utan
+bakgrundstrådar; datan kommer från en uppdateringscykel mot fixtures.
+"""
+
+import copy
+import importlib.util
+import logging
+import os
+
+from .fixtures import LATITUDE, LONGITUDE, PROJECT_ROOT, default_routes, fixture_transport
+from .runner import SkipBenchmark, benchmark
+
+ENDPOINTS = [
+    '/',
+    '/api/current',
+    '/api/forecast',
+    '/api/daily',
+    '/api/warnings',
+    '/api/status',
+    '/api/pressure_trend',
+    '/metrics',
+]
+
+WARNING_SCENARIOS = ['typical', 'storm_day']
+
+_app_state = {'client': None}
+
+
+def _load_example_config():
+    """Läs CONFIG från config_example.py (config.py är lokal och kan saknas)."""
+    path = os.path.join(PROJECT_ROOT, 'reference', 'config_example.py')
+    spec = importlib.util.spec_from_file_location('bench_config_example', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    config = copy.deepcopy(module.CONFIG)
+    config['smhi']['latitude'] = LATITUDE
+    config['smhi']['longitude'] = LONGITUDE
+    config.setdefault('ipgeolocation', {})['api_key'] = 'bench-key'
+    config['use_netatmo'] = True
+    return config
+
+
+def _install_offline_clients(config):
+    """Sätt offline-klienter i weather_state som init_api_clients() skulle gjort."""
+    from core.weather_state import set_api_client, update_weather_state
+    from core.weather_updater import register_data_sources
+    from smhi_client import SMHIClient
+    from smhi_warnings_client import SMHIWarningsClient
+    from .bench_netatmo import make_client
+    from .bench_sun import _calculator
+
+    update_weather_state('config', config)
+    update_weather_state('use_netatmo', True)
+    update_weather_state('netatmo_available', True)
+    update_weather_state('warnings_enabled', True)
+    update_weather_state('weather_effects_enabled', config.get('weather_effects', {}).get('enabled', False))
+    update_weather_state('weather_effects_config', config.get('weather_effects', {}))
+
+    set_api_client('smhi_client', SMHIClient(LATITUDE, LONGITUDE))
+    set_api_client('smhi_warnings_client', SMHIWarningsClient())
+    set_api_client('netatmo_client', make_client(2_000))
+    set_api_client('sun_calculator', _calculator('bench-key'))
+    register_data_sources(config)
+
+
+def _expire_client_caches():
+    """Tvinga nästa cykel att hämta allt (mot fixtures) igen."""
+    from core.weather_state import get_api_client
+
+    smhi_client = get_api_client('smhi_client')
+    smhi_client.last_fetch_time = None
+    smhi_client.humidity_last_fetch = None
+    get_api_client('smhi_warnings_client').last_fetch_time = None
+    get_api_client('netatmo_client').invalidate_cache()
+
+    sun_calculator = get_api_client('sun_calculator')
+    sun_calculator._api_results = {}
+    if os.path.exists(sun_calculator.cache_file):
+        os.remove(sun_calculator.cache_file)
+
+
+def _prepare_app():
+    """Importera appen och fyll state en gång (delas av alla endpoint-mätningar)."""
+    if _app_state['client'] is not None:
+        return _app_state['client']
+
+    try:
+        import flask  # noqa: F401
+    except ImportError:
+        raise SkipBenchmark('flask saknas')
+
+    # app.py kör setup_logging() vid import (INFO + köhanterare) - återställ
+    # benchmarkens tysta loggning så att ingen logg-I/O hamnar i mätningarna
+    root = logging.getLogger()
+    level, handlers = root.level, list(root.handlers)
+    from app import app
+    from core.logging_setup import shutdown_logging
+    from core.weather_updater import update_weather_data, update_warnings_cycle
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        if handler not in handlers:
+            root.removeHandler(handler)
+    root.setLevel(level)
+
+    config = _load_example_config()
+    _install_offline_clients(config)
+    with fixture_transport(default_routes()):
+        update_weather_data()
+        update_warnings_cycle()
+
+    _app_state['client'] = app.test_client()
+    return _app_state['client']
+
+
+@benchmark('cycle.update_weather_data', WARNING_SCENARIOS)
+def bench_update_cycle(size):
+    """Hel uppdateringscykel (alla källor) + varningsjobbet mot fixtures (alla cacher kalla)."""
+    _prepare_app()
+    from core.weather_updater import update_weather_data, update_warnings_cycle
+
+    routes = default_routes(warnings=size)
+
+    def run():
+        _expire_client_caches()
+        with fixture_transport(routes):
+            update_weather_data(force=True)
+            update_warnings_cycle()
+    return run
+
+
+@benchmark('endpoint.latency', ENDPOINTS)
+def bench_endpoint(size):
+    client = _prepare_app()
+
+    response = client.get(size)
+    if response.status_code != 200:
+        raise SkipBenchmark(f'{size} svarade {response.status_code}')
+
+    return lambda: client.get(size)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmarks för NetatmoClient: blending, trycktrend och historik-I/O.
+"""
+
+import os
+import tempfile
+
+from .fixtures import encode, fixture_sizes, fixture_transport, load_fixture, pressure_history
+from .runner import benchmark
+
+from netatmo_client import NetatmoClient
+
+# Historikstorlekar: 2k = nuvarande tak, 20k/200k = tätare mätning eller längre historik
+HISTORY_SIZES = {'2k': 2_000, '20k': 20_000, '200k': 200_000}
+
+_tmp_dir = tempfile.mkdtemp(prefix='vaderdisplay-bench-')
+
+
+class OfflineNetatmoClient(NetatmoClient):
+    """NetatmoClient utan token-fil, autentisering eller historikfil från cwd."""
+
+    def _load_saved_tokens(self):
+        pass
+
+    def _authenticate(self):
+        self.access_token = 'bench-access'
+        return True
+
+    def _load_pressure_history(self):
+        return {'timestamps': [], 'pressures': []}
+
+
+def make_client(history_points: int = 0) -> OfflineNetatmoClient:
+    """
+    Skapa offline-klient med syntetisk tryckhistorik.
+
+    Args:
+        history_points: Antal punkter i historiken (0 = tom)
+    """
+    client = OfflineNetatmoClient('bench-id', 'bench-secret', 'bench-refresh')
+    client.token_file = os.path.join(_tmp_dir, 'tokens.json')
+    client.pressure_history_file = os.path.join(_tmp_dir, 'pressure_history.json')
+    if history_points:
+        client._pressure_history = pressure_history(history_points)
+    return client
+
+
+@benchmark('netatmo.parse_station_data_with_blending', fixture_sizes('netatmo_stationsdata'))
+def bench_blending(size):
+    client = make_client()
+    body = load_fixture('netatmo_stationsdata', size)['body']
+    return lambda: client._parse_station_data_with_blending(body)
+
+
+@benchmark('netatmo.analyze_pressure_trend', list(HISTORY_SIZES))
+def bench_pressure_trend(size):
+    return make_client(HISTORY_SIZES[size])._analyze_pressure_trend
+
+
+@benchmark('netatmo.save_pressure_history', list(HISTORY_SIZES))
+def bench_save_history(size):
+    return make_client(HISTORY_SIZES[size])._save_pressure_history
+
+
+@benchmark('netatmo.get_current_weather', fixture_sizes('netatmo_stationsdata'))
+def bench_current_weather(size):
+    """Hela hämtningen: HTTP (fixture), JSON, blending, historik och trycktrend."""
+    client = make_client(HISTORY_SIZES['2k'])
+    routes = [('getstationsdata', encode(load_fixture('netatmo_stationsdata', size)))]
+
+    def run():
+        client.invalidate_cache()
+        with fixture_transport(routes):
+            return client.get_current_weather()
+    return run
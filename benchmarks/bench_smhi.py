@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmarks för SMHIClient: JSON-avkodning, parsning och prognoser.
+"""
+
+import json
+import time
+
+from .fixtures import (
+    LATITUDE, LONGITUDE, encode, fixture_sizes, fixture_transport, load_fixture
+)
+from .runner import benchmark
+
+from smhi_client import SMHIClient
+import weather_symbols
+
+
+def _client_with_forecast(size: str) -> SMHIClient:
+    """SMHIClient med pmp3g-data i cachen (get_data() går aldrig mot nätet)."""
+    client = SMHIClient(LATITUDE, LONGITUDE)
+    client.cached_data = load_fixture('smhi_pmp3g', size)
+    client.last_fetch_time = time.time()
+    client.cache_duration = 10 ** 9
+    return client
+
+
+@benchmark('smhi.json_decode', fixture_sizes('smhi_pmp3g'))
+def bench_json_decode(size):
+    body = encode(load_fixture('smhi_pmp3g', size))
+    return lambda: json.loads(body)
+
+
+@benchmark('smhi.parse_parameters', fixture_sizes('smhi_pmp3g'))
+def bench_parse_parameters(size):
+    client = _client_with_forecast(size)
+    series = client.cached_data['timeSeries']
+
+    def run():
+        for entry in series:
+            client.parse_parameters(entry)
+    return run
+
+
+@benchmark('smhi.get_12h_forecast', fixture_sizes('smhi_pmp3g'))
+def bench_12h_forecast(size):
+    return _client_with_forecast(size).get_12h_forecast
+
+
+@benchmark('smhi.classify_symbols', fixture_sizes('smhi_pmp3g'))
+def bench_classify_symbols(size):
+    """Animation triggers och ikoner för hela prognosen (bulkuppslag i weather_symbols)."""
+    client = _client_with_forecast(size)
+    points = [client.parse_parameters(entry) for entry in client.cached_data['timeSeries']]
+    points = [point for point in points if point.get('weather_symbol')]
+    symbols = [point['weather_symbol'] for point in points]
+
+    def run():
+        client._animation_triggers(points)
+        weather_symbols.icon_classes(symbols)
+    return run
+
+
+@benchmark('smhi.get_daily_forecast', fixture_sizes('smhi_pmp3g'))
+def bench_daily_forecast(size):
+    client = _client_with_forecast(size)
+    return lambda: client.get_daily_forecast(5)
+
+
+@benchmark('smhi.get_current_weather', fixture_sizes('smhi_pmp3g'))
+def bench_current_weather(size):
+    return _client_with_forecast(size).get_current_weather
+
+
+@benchmark('smhi.find_nearest_humidity_station', fixture_sizes('smhi_metobs_stations'))
+def bench_humidity_station_lookup(size):
+    client = SMHIClient(LATITUDE, LONGITUDE)
+    routes = [('metobs', encode(load_fixture('smhi_metobs_stations', size)))]
+
+    def run():
+        with fixture_transport(routes):
+            return client.find_nearest_humidity_station()
+    return run
+
+
+@benchmark('smhi.fetch_raw_data', fixture_sizes('smhi_pmp3g'))
+def bench_fetch_raw_data(size):
+    client = SMHIClient(LATITUDE, LONGITUDE)
+    routes = [('metfcst', encode(load_fixture('smhi_pmp3g', size)))]
+
+    def run():
+        with fixture_transport(routes):
+            return client.fetch_raw_data()
+    return run
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmarks för SunCalculator: minnestabell, API-svar och lokal NOAA-beräkning.
+"""
+
+import os
+import tempfile
+from datetime import date
+
+from .fixtures import LATITUDE, LONGITUDE, encode, fixture_transport, load_fixture
+from .runner import benchmark
+
+import solar
+from utils import SunCalculator
+
+_tmp_dir = tempfile.mkdtemp(prefix='vaderdisplay-bench-')
+
+
+def _calculator(api_key=None) -> SunCalculator:
+    calculator = SunCalculator(api_key, use_api=api_key is not None)
+    calculator.cache_file = os.path.join(_tmp_dir, 'sun_cache.json')
+    return calculator
+
+
+@benchmark('sun.get_sun_times', ['cached', 'api_cached'])
+def bench_cached(size):
+    """Uppslag i drift: årstabell respektive inlästa API-svar i minnet (ingen fil-I/O)."""
+    calculator = _calculator('bench-key' if size == 'api_cached' else None)
+    if size == 'api_cached':
+        calculator._save_api_result(LATITUDE, LONGITUDE, date.today(),
+                                    {'sunrise': '2025-06-21T03:31:00', 'sunset': '2025-06-21T22:08:00',
+                                     'source': 'ipgeolocation.io', 'date': date.today().isoformat()})
+    calculator.get_sun_times(LATITUDE, LONGITUDE)
+    return lambda: calculator.get_sun_times(LATITUDE, LONGITUDE)
+
+
+@benchmark('sun.fetch_from_api', ['ipgeolocation'])
+def bench_fetch_from_api(size):
+    calculator = _calculator('bench-key')
+    routes = [('ipgeolocation', encode(load_fixture('ipgeolocation_astronomy', 'single')))]
+    today = date.today()
+
+    def run():
+        with fixture_transport(routes):
+            return calculator._fetch_from_api(LATITUDE, LONGITUDE, today)
+    return run
+
+
+@benchmark('sun.compute_year_table', ['year'])
+def bench_year_table(size):
+    """Kall start för en plats: ett helt års soltider i ett svep."""
+    year = date.today().year
+    return lambda: solar.compute_year_table(LATITUDE, LONGITUDE, year)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmarks för SMHIWarningsClient: parse_warning och sammanfattningar.
+"""
+
+import json
+import time
+
+from .fixtures import encode, fixture_sizes, fixture_transport, load_fixture
+from .runner import benchmark
+
+from smhi_warnings_client import SMHIWarningsClient
+
+
+def _client_with_warnings(size: str) -> SMHIWarningsClient:
+    """Varningsklient med IBWW-data i cachen."""
+    client = SMHIWarningsClient(cache_duration=10 ** 9)
+    client.cached_warnings = load_fixture('smhi_warnings', size)
+    client.last_fetch_time = time.time()
+    return client
+
+
+def _with_transport(size: str, func):
+    """
+    Kör func med IBWW-fixturen som upstream.
+
+    En tom varningslista räknas inte som cache i klienten, så 'none' hämtar
+    om vid varje anrop - det ska mätas, inte ge 404.
+    """
+    routes = [('ibww', encode(load_fixture('smhi_warnings', size)))]
+
+    def run():
+        with fixture_transport(routes):
+            return func()
+    return run
+
+
+@benchmark('warnings.json_decode', fixture_sizes('smhi_warnings'))
+def bench_json_decode(size):
+    body = encode(load_fixture('smhi_warnings', size))
+    return lambda: json.loads(body)
+
+
+@benchmark('warnings.parse_warning', fixture_sizes('smhi_warnings'))
+def bench_parse_warning(size):
+    client = _client_with_warnings(size)
+    warnings = client.cached_warnings
+
+    def run():
+        for warning in warnings:
+            client.parse_warning(warning)
+    return run
+
+
+@benchmark('warnings.get_heavy_rain_warnings', fixture_sizes('smhi_warnings'))
+def bench_heavy_rain(size):
+    return _with_transport(size, _client_with_warnings(size).get_heavy_rain_warnings)
+
+
+@benchmark('warnings.get_warnings_summary', fixture_sizes('smhi_warnings'))
+def bench_summary(size):
+    return _with_transport(size, _client_with_warnings(size).get_warnings_summary)
+
+
+@benchmark('warnings.update_cycle', fixture_sizes('smhi_warnings'))
+def bench_update_cycle(size):
+    """Samma anrop som update_warnings_data() gör per cykel."""
+    client = _client_with_warnings(size)
+
+    def run():
+        client.get_heavy_rain_warnings()
+        client.get_active_heavy_rain_warnings()
+        client.get_warnings_summary()
+    return _with_transport(size, run)
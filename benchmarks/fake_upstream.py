@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Lokala fejkservrar för SMHI, Netatmo och ipgeolocation.
+
+En HTTP-server svarar på alla upstream-sökvägar (de skiljer sig åt även utan
+värdnamn), så appen pekas hit med diagnostics.upstream_overrides
+{'*': 'http://127.0.0.1:8090'}. Payloads kommer från fixtures.py.
+
+Per rutt går det att ställa in latens, jitter, felfrekvens, timeouts och
+payload-storlek. Svaren har ETag och Last-Modified och 304 ges vid
+If-None-Match/If-Modified-Since (kan stängas av). Inställningarna kan
+ändras under körning via POST /_fake/config och räknare läses på
+GET /_fake/stats.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+from .fixtures import encode, fixture_sizes, load_fixture, netatmo_token
+
+# Rutt -> (metod, sökvägsmönster, fixture, default-storlek)
+# Ordningen spelar roll: latest-hour måste matcha före stationslistan
+ROUTES: List[Tuple[str, str, str, Optional[str], Optional[str]]] = [
+    ('smhi_forecast', 'GET', r'^/api/category/pmp3g/', 'smhi_pmp3g', '10d'),
+    ('smhi_metobs_latest', 'GET', r'^/api/version/[^/]+/parameter/\d+/station/\d+/period/latest-hour/',
+     'smhi_metobs_latest_hour', 'single'),
+    ('smhi_metobs_stations', 'GET', r'^/api/version/[^/]+/parameter/\d+\.json', 'smhi_metobs_stations', '250'),
+    ('smhi_warnings', 'GET', r'^/ibww/api/', 'smhi_warnings', 'typical'),
+    ('netatmo_token', 'POST', r'^/oauth2/token', None, None),
+    ('netatmo_stationsdata', 'GET', r'^/api/getstationsdata', 'netatmo_stationsdata', 'typical'),
+    ('ipgeolocation', 'GET', r'^/astronomy', 'ipgeolocation_astronomy', 'single'),
+]
+
+DEFAULT_BEHAVIOUR: Dict[str, Any] = {
+    'latency_ms': 0.0,        # Fast fördröjning före svar
+    'jitter_ms': 0.0,         # Slumpmässigt tillägg 0..jitter_ms
+    'error_rate': 0.0,        # Andel svar med error_status
+    'error_status': 503,
+    'timeout_rate': 0.0,      # Andel anrop som hänger timeout_seconds (klienten får timeout)
+    'timeout_seconds': 35.0,  # Längre än klienternas REQUEST_TIMEOUT
+    'conditional': True,      # ETag/Last-Modified + 304
+    'size': None,             # Fixture-storlek (None = rutt-default)
+}
+
+
+class FakeUpstream:
+    """
+    Fejkserver med inställbart beteende per rutt.
+
+    Används från CLI (python3 -m benchmarks fake-upstream) eller direkt:
+
+        server = FakeUpstream(port=0).start()
+        set_host_overrides({'*': server.base_url})
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8090, seed: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._behaviour: Dict[str, Dict[str, Any]] = {name: dict(DEFAULT_BEHAVIOUR) for name, *_ in ROUTES}
+        self._bodies: Dict[str, Tuple[bytes, str, float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {name: {} for name, *_ in ROUTES}
+        self._patterns = [(name, method, re.compile(pattern), fixture, size)
+                          for name, method, pattern, fixture, size in ROUTES]
+
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeUpstream':
+        """Starta servern i en bakgrundstråd."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name='FakeUpstream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    # === BETEENDE ===
+
+    def configure(self, route: str = '*', **behaviour) -> None:
+        """
+        Ändra beteende för en rutt ('*' = alla).
+
+        Args:
+            route: Ruttnamn från ROUTES eller '*'
+            **behaviour: Nycklar från DEFAULT_BEHAVIOUR
+        """
+        unknown = set(behaviour) - set(DEFAULT_BEHAVIOUR)
+        if unknown:
+            raise ValueError(f"Okända inställningar: {', '.join(sorted(unknown))}")
+
+        names = list(self._behaviour) if route == '*' else [route]
+        with self._lock:
+            for name in names:
+                if name not in self._behaviour:
+                    raise ValueError(f"Okänd rutt: {name}")
+                if 'size' in behaviour and behaviour['size'] is not None:
+                    fixture = next(r[3] for r in ROUTES if r[0] == name)
+                    if fixture is None or behaviour['size'] not in fixture_sizes(fixture):
+                        raise ValueError(f"Ogiltig storlek för {name}: {behaviour['size']}")
+                self._behaviour[name].update(behaviour)
+                self._bodies.pop(name, None)
+
+    def get_config(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(values) for name, values in self._behaviour.items()}
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    # === SVAR ===
+
+    def _match(self, method: str, path: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        for name, route_method, pattern, fixture, size in self._patterns:
+            if route_method == method and pattern.search(path):
+                return name, fixture, size
+        return None
+
+    def _body(self, name: str, fixture: Optional[str], default_size: Optional[str]) -> Tuple[bytes, str, float]:
+        """Payload, ETag och Last-Modified (genereras en gång per storlek)."""
+        cached = self._bodies.get(name)
+        if cached is not None:
+            return cached
+
+        size = self._behaviour[name]['size'] or default_size
+        body = encode(load_fixture(fixture, size) if fixture else netatmo_token())
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        entry = (body, etag, time.time())
+        self._bodies[name] = entry
+        return entry
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._stats[name]
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def respond(self, method: str, path: str, headers) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Bygg svar för ett anrop.
+
+        Returns:
+            tuple: (status, headers, body)
+        """
+        match = self._match(method, path)
+        if match is None:
+            return 404, {'Content-Type': 'application/json'}, b'{"error":"no route"}'
+
+        name, fixture, default_size = match
+        with self._lock:
+            behaviour = dict(self._behaviour[name])
+            body, etag, last_modified = self._body(name, fixture, default_size)
+            roll_timeout = self._rng.random()
+            roll_error = self._rng.random()
+            jitter = self._rng.random() * behaviour['jitter_ms']
+
+        if roll_timeout < behaviour['timeout_rate']:
+            self._count(name, 'timeout')
+            time.sleep(behaviour['timeout_seconds'])
+            return 504, {'Content-Type': 'application/json'}, b'{"error":"timeout"}'
+
+        delay = (behaviour['latency_ms'] + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if roll_error < behaviour['error_rate']:
+            status = int(behaviour['error_status'])
+            self._count(name, str(status))
+            return status, {'Content-Type': 'application/json'}, b'{"error":"fake upstream error"}'
+
+        response_headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'ETag': etag,
+            'Last-Modified': formatdate(last_modified, usegmt=True),
+            'Cache-Control': 'max-age=0',
+        }
+
+        if behaviour['conditional'] and _not_modified(headers, etag, last_modified):
+            self._count(name, '304')
+            return 304, response_headers, b''
+
+        self._count(name, '200')
+        return 200, response_headers, body
+
+
+def _not_modified(headers, etag: str, last_modified: float) -> bool:
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= int(last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _make_handler(fake: FakeUpstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body and self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def _send_json(self, status: int, payload: Any) -> None:
+            self._send(status, {'Content-Type': 'application/json'}, json.dumps(payload, indent=2).encode('utf-8'))
+
+        def _read_body(self) -> bytes:
+            length = int(self.headers.get('Content-Length') or 0)
+            return self.rfile.read(length) if length else b''
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/_fake/config':
+                return self._send_json(200, fake.get_config())
+            if path == '/_fake/stats':
+                return self._send_json(200, fake.get_stats())
+            self._send(*fake.respond('GET', path, self.headers))
+
+        def do_POST(self):
+            path = self.path.split('?', 1)[0]
+            body = self._read_body()
+            if path == '/_fake/config':
+                # {"<rutt>|*": {"latency_ms": 200, ...}, ...}
+                try:
+                    for route, behaviour in json.loads(body or b'{}').items():
+                        fake.configure(route, **behaviour)
+                except (ValueError, TypeError, AttributeError) as e:
+                    return self._send_json(400, {'error': str(e)})
+                return self._send_json(200, fake.get_config())
+            self._send(*fake.respond('POST', path, self.headers))
+
+    return Handler
+
+
+def parse_size_overrides(values: List[str]) -> Dict[str, str]:
+    """
+    Tolka --size rutt=storlek.
+
+    Returns:
+        dict: rutt -> storlek
+    """
+    overrides = {}
+    for value in values or []:
+        route, _, size = value.partition('=')
+        if not size:
+            raise ValueError(f"--size ska vara rutt=storlek, fick: {value}")
+        overrides[route] = size
+    return overrides
+
+
+def run_server(args) -> int:
+    """CLI: starta fejkservern och kör tills Ctrl+C."""
+    fake = FakeUpstream(args.host, args.port, seed=args.seed)
+    fake.configure('*', latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                   error_rate=args.error_rate, error_status=args.error_status,
+                   timeout_rate=args.timeout_rate, conditional=not args.no_conditional)
+    for route, size in parse_size_overrides(args.size).items():
+        fake.configure(route, size=size)
+
+    print(f"🧪 Fejk-upstream på {fake.base_url}")
+    print(f"   Config: 'diagnostics': {{'upstream_overrides': {{'*': '{fake.base_url}'}}}}")
+    print(f"   Rutter: {', '.join(name for name, *_ in ROUTES)}")
+    print(f"   Ändra under körning: curl -X POST {fake.base_url}/_fake/config -d '{{\"*\": {{\"latency_ms\": 500}}}}'")
+
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+        print(f"\n📊 Anrop per rutt: {json.dumps(fake.get_stats(), ensure_ascii=False)}")
+    return 0
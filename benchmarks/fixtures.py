@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Fixtures för benchmarks - upstream-payloads i SMHI/Netatmo/ipgeolocation-format.
+
+Varje fixture har flera storlekar. En inspelad payload i
+benchmarks/fixtures/<fixture>.json (t.ex. sparad från en riktig körning)
+läggs till som storleken 'recorded'. Syntetiska payloads genereras med fast
+seed och tider relativt nu, så att klienternas "framtida tidpunkter"-logik
+beter sig som i drift.
+
+FixtureTransport ersätter upstream-modulens Session så att klienterna kan
+köras hela vägen (inkl. JSON-avkodning) utan nätverk.
+"""
+
+import json
+import math
+import os
+import random
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RECORDED_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Klienterna importeras som toppnivå-moduler, precis som i appen
+sys.path.append(os.path.join(PROJECT_ROOT, 'reference', 'data'))
+
+SEED = 20240601
+
+# Stockholm - samma som config_example
+LATITUDE = 59.3293
+LONGITUDE = 18.0686
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _now_hour() -> datetime:
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+# === SMHI PMP3G (prognos) ===
+
+_PMP3G_PARAMETERS = (
+    ('msl', 'hmsl', 'hPa'), ('t', 'hl', 'Cel'), ('vis', 'hl', 'km'),
+    ('wd', 'hl', 'degree'), ('ws', 'hl', 'm/s'), ('r', 'hl', 'percent'),
+    ('tstm', 'hl', 'percent'), ('tcc_mean', 'hl', 'octas'), ('lcc_mean', 'hl', 'octas'),
+    ('mcc_mean', 'hl', 'octas'), ('hcc_mean', 'hl', 'octas'), ('gust', 'hl', 'm/s'),
+    ('pmin', 'hl', 'kg/m2/h'), ('pmean', 'hl', 'kg/m2/h'), ('pmax', 'hl', 'kg/m2/h'),
+    ('pmedian', 'hl', 'kg/m2/h'), ('spp', 'hl', 'percent'), ('pcat', 'hl', 'category'),
+    ('Wsymb2', 'hl', 'category'),
+)
+
+
+def _pmp3g_valid_times(layout: str) -> List[datetime]:
+    """Tidpunkter enligt SMHI:s upplösning (1h nära, sedan 3h, 6h, 12h)."""
+    start = _now_hour()
+
+    if layout == '24h':
+        return [start + timedelta(hours=h) for h in range(25)]
+    if layout == 'hourly_10d':
+        return [start + timedelta(hours=h) for h in range(241)]
+
+    # Som riktiga pmp3g: timvis ~2 dygn, sedan glesare upp till 10 dygn
+    hours = list(range(0, 49)) + list(range(51, 96, 3)) + list(range(96, 168, 6)) + list(range(168, 241, 12))
+    return [start + timedelta(hours=h) for h in hours]
+
+
+def smhi_pmp3g(layout: str = '10d') -> Dict[str, Any]:
+    """
+    Syntetisk pmp3g point-prognos.
+
+    Args:
+        layout: '24h', '10d' (realistisk upplösning) eller 'hourly_10d'
+    """
+    rng = random.Random(SEED)
+    series = []
+
+    for index, valid_time in enumerate(_pmp3g_valid_times(layout)):
+        temperature = 8 + 6 * math.sin(index / 24 * 2 * math.pi) + rng.uniform(-1, 1)
+        symbol = rng.choice((1, 2, 3, 4, 5, 6, 8, 9, 18, 19, 15, 11))
+        values = {
+            'msl': round(1012 + 8 * math.sin(index / 40) + rng.uniform(-0.5, 0.5), 1),
+            't': round(temperature, 1),
+            'vis': round(rng.uniform(5, 50), 1),
+            'wd': rng.randrange(0, 360),
+            'ws': round(rng.uniform(0, 14), 1),
+            'r': rng.randrange(40, 100),
+            'tstm': rng.randrange(0, 10),
+            'tcc_mean': rng.randrange(0, 9),
+            'lcc_mean': rng.randrange(0, 9),
+            'mcc_mean': rng.randrange(0, 9),
+            'hcc_mean': rng.randrange(0, 9),
+            'gust': round(rng.uniform(2, 22), 1),
+            'pmin': round(max(0.0, rng.uniform(-1, 2)), 1),
+            'pmean': round(max(0.0, rng.uniform(-1, 3)), 1),
+            'pmax': round(max(0.0, rng.uniform(-1, 6)), 1),
+            'pmedian': round(max(0.0, rng.uniform(-1, 2)), 1),
+            'spp': rng.choice((-9, 0, 30, 100)),
+            'pcat': rng.randrange(0, 7),
+            'Wsymb2': symbol,
+        }
+        series.append({
+            'validTime': _iso(valid_time),
+            'parameters': [
+                {'name': name, 'levelType': level_type, 'level': 0 if level_type == 'hmsl' else 2,
+                 'unit': unit, 'values': [values[name]]}
+                for name, level_type, unit in _PMP3G_PARAMETERS
+            ]
+        })
+
+    approved = _iso(_now_hour() - timedelta(hours=1))
+    return {
+        'approvedTime': approved,
+        'referenceTime': approved,
+        'geometry': {'type': 'Point', 'coordinates': [[LONGITUDE, LATITUDE]]},
+        'timeSeries': series,
+    }
+
+
+# === SMHI METOBS (luftfuktighet) ===
+
+def smhi_metobs_stations(count: int = 250) -> Dict[str, Any]:
+    """Stationslista för parameter 6 (relativ luftfuktighet)."""
+    rng = random.Random(SEED)
+    stations = []
+
+    for index in range(count):
+        key = 98210 if index == 0 else 10000 + index * 7
+        stations.append({
+            'key': str(key),
+            'name': 'Stockholm-Observatoriekullen A' if index == 0 else f'Station {index}',
+            'owner': 'SMHI',
+            'ownerCategory': 'CLIMATE',
+            'measuringStations': 'CORE',
+            'id': key,
+            'height': round(rng.uniform(0, 800), 1),
+            'latitude': round(55.3 + rng.uniform(0, 13.7), 4),
+            'longitude': round(11.1 + rng.uniform(0, 12.9), 4),
+            'active': rng.random() > 0.15,
+            'from': 946684800000,
+            'to': 1893456000000,
+            'summary': 'Latest hour',
+            'updated': 1718000000000,
+        })
+
+    return {
+        'key': '6',
+        'title': 'Relativ Luftfuktighet - momentanvärde, 1 gång/tim',
+        'summary': 'momentanvärde, 1 gång/tim',
+        'valueType': 'SAMPLING',
+        'station': stations,
+    }
+
+
+def smhi_metobs_latest_hour() -> Dict[str, Any]:
+    """latest-hour-data för en station."""
+    measured = _now_hour()
+    return {
+        'value': [{'date': int(measured.timestamp() * 1000), 'value': '71', 'quality': 'G'}],
+        'updated': int(measured.timestamp() * 1000),
+        'parameter': {'key': '6', 'name': 'Relativ Luftfuktighet', 'unit': 'percent'},
+        'station': {'key': '98210', 'name': 'Stockholm-Observatoriekullen A', 'height': 43.133},
+        'period': {'key': 'latest-hour'},
+    }
+
+
+# === SMHI IBWW (varningar) ===
+
+_WARNING_EVENTS = (
+    ('RAIN', 'Regn', ('CLOUDBURST', 'Skyfallsliknande regn'), ('HEAVY_RAIN', 'Mycket regn')),
+    ('WIND', 'Vind', ('STORM', 'Storm'), ('GALE', 'Kuling')),
+    ('THUNDERSTORM', 'Åska', ('THUNDER', 'Åska'), ('THUNDER', 'Åska')),
+    ('FIRE', 'Brandrisk', ('FIRE_RISK', 'Brandrisk'), ('FIRE_RISK', 'Brandrisk')),
+)
+_WARNING_LEVELS = (('YELLOW', 'Gul', 'Minor'), ('ORANGE', 'Orange', 'Moderate'), ('RED', 'Röd', 'Severe'))
+_COUNTIES = ('Stockholms län', 'Uppsala län', 'Södermanlands län', 'Östergötlands län',
+             'Västra Götalands län', 'Skåne län', 'Gävleborgs län', 'Dalarnas län')
+
+
+def _polygon(rng: random.Random, points: int) -> List[List[float]]:
+    center_lon, center_lat = rng.uniform(12, 20), rng.uniform(56, 66)
+    ring = [[round(center_lon + 0.5 * math.cos(2 * math.pi * i / points), 5),
+             round(center_lat + 0.3 * math.sin(2 * math.pi * i / points), 5)] for i in range(points)]
+    ring.append(ring[0])
+    return ring
+
+
+def smhi_warnings(scenario: str = 'typical') -> List[Dict[str, Any]]:
+    """
+    IBWW warning.json (lista med varningar).
+
+    Args:
+        scenario: 'none', 'typical', 'ten_day' eller 'storm_day'
+    """
+    rng = random.Random(SEED)
+    settings = {
+        'none': (0, 1, 1, 10),
+        'typical': (4, 1, 2, 40),
+        'ten_day': (30, 1, 3, 60),
+        'storm_day': (60, 3, 6, 200),
+    }[scenario]
+    warning_count, min_areas, max_areas, polygon_points = settings
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    warnings = []
+
+    for index in range(warning_count):
+        if scenario == 'storm_day':
+            event_code, event_sv, primary, secondary = _WARNING_EVENTS[index % 2]
+            start = now - timedelta(hours=rng.randrange(0, 6))
+        else:
+            event_code, event_sv, primary, secondary = rng.choice(_WARNING_EVENTS)
+            spread_hours = 240 if scenario == 'ten_day' else 48
+            start = now + timedelta(hours=rng.randrange(-12, spread_hours))
+
+        areas = []
+        for area_index in range(rng.randint(min_areas, max_areas)):
+            level_code, level_sv, _ = rng.choice(_WARNING_LEVELS)
+            description_code, description_sv = primary if rng.random() < 0.6 else secondary
+            area_start = start + timedelta(hours=area_index)
+            counties = rng.sample(_COUNTIES, rng.randint(1, 3))
+            areas.append({
+                'id': index * 10 + area_index,
+                'approximateStart': _iso(area_start),
+                'approximateEnd': _iso(area_start + timedelta(hours=rng.randrange(3, 36))),
+                'published': _iso(now - timedelta(hours=2)),
+                'normalProbability': True,
+                'pushNotice': level_code != 'YELLOW',
+                'areaName': {'sv': f'{counties[0]} (område {area_index + 1})', 'en': counties[0]},
+                'warningLevel': {'sv': level_sv, 'en': level_code.title(), 'code': level_code},
+                'eventDescription': {'sv': description_sv, 'en': description_sv, 'code': description_code},
+                'affectedAreas': [{'id': 1 + _COUNTIES.index(name), 'sv': name, 'en': name} for name in counties],
+                'descriptions': [
+                    {'title': {'sv': 'Händelse', 'en': 'Incident', 'code': 'INCIDENT'},
+                     'text': {'sv': f'{description_sv} väntas, lokalt 40-60 mm på kort tid.', 'en': ''}},
+                    {'title': {'sv': 'Påverkan', 'en': 'Affect', 'code': 'AFFECT'},
+                     'text': {'sv': 'Översvämning av vägar och källare kan förekomma.', 'en': ''}},
+                ],
+                'area': {
+                    'type': 'FeatureCollection',
+                    'features': [{
+                        'type': 'Feature',
+                        'properties': {},
+                        'geometry': {'type': 'Polygon', 'coordinates': [_polygon(rng, polygon_points)]},
+                    }],
+                },
+            })
+
+        warnings.append({
+            'id': 1000 + index,
+            'normalProbability': True,
+            'event': {'sv': event_sv, 'en': event_code.title(), 'code': event_code,
+                      'mhoClassification': {'sv': 'Meteorologi', 'en': 'Meteorology', 'code': 'MET'}},
+            'descriptions': [],
+            'warningAreas': areas,
+        })
+
+    return warnings
+
+
+# === NETATMO GETSTATIONSDATA ===
+
+_NETATMO_MODULES = (
+    ('NAModule1', 'Utomhus', {'Temperature': 7.4, 'Humidity': 83}),
+    ('NAModule3', 'Regnmätare', {'Rain': 0.1, 'sum_rain_1': 0.4, 'sum_rain_24': 3.2}),
+    ('NAModule2', 'Vindmätare', {'WindStrength': 12, 'WindAngle': 210, 'GustStrength': 25, 'GustAngle': 200}),
+    ('NAModule4', 'Sovrum', {'Temperature': 20.1, 'Humidity': 48, 'CO2': 720}),
+)
+
+
+def netatmo_stationsdata(layout: str = 'typical') -> Dict[str, Any]:
+    """
+    getstationsdata-svar.
+
+    Args:
+        layout: 'single' (1 enhet + utomhusmodul), 'typical' (1 enhet + 3 moduler)
+                eller 'multi' (3 enheter med 5 moduler var)
+    """
+    rng = random.Random(SEED)
+    device_count, module_count = {'single': (1, 1), 'typical': (1, 3), 'multi': (3, 5)}[layout]
+    now = int(datetime.now(timezone.utc).timestamp())
+    devices = []
+
+    for device_index in range(device_count):
+        modules = []
+        for module_index in range(module_count):
+            module_type, module_name, readings = _NETATMO_MODULES[module_index % len(_NETATMO_MODULES)]
+            dashboard = {'time_utc': now - rng.randrange(30, 600)}
+            dashboard.update({key: value + (rng.uniform(-1, 1) if isinstance(value, float) else 0)
+                              for key, value in readings.items()})
+            modules.append({
+                '_id': f'02:00:00:{device_index:02x}:{module_index:02x}:aa',
+                'type': module_type,
+                'module_name': module_name if module_index < len(_NETATMO_MODULES) else f'{module_name} {module_index}',
+                'reachable': True,
+                'battery_percent': rng.randrange(20, 100),
+                'rf_status': rng.randrange(50, 90),
+                'data_type': list(readings.keys()),
+                'dashboard_data': dashboard,
+            })
+
+        devices.append({
+            '_id': f'70:ee:50:00:00:{device_index:02x}',
+            'station_name': 'Hemma' if device_index == 0 else f'Stuga {device_index}',
+            'type': 'NAMain',
+            'reachable': True,
+            'wifi_status': 56,
+            'data_type': ['Temperature', 'CO2', 'Humidity', 'Noise', 'Pressure'],
+            'place': {'city': 'Stockholm', 'country': 'SE', 'timezone': 'Europe/Stockholm',
+                      'location': [LONGITUDE, LATITUDE], 'altitude': 30},
+            'dashboard_data': {
+                'time_utc': now - rng.randrange(30, 600),
+                'Temperature': 21.3, 'CO2': 650, 'Humidity': 45, 'Noise': 38,
+                'Pressure': 1013.2, 'AbsolutePressure': 1009.6, 'pressure_trend': 'stable',
+            },
+            'modules': modules,
+        })
+
+    return {
+        'body': {
+            'devices': devices,
+            'user': {'mail': 'bench@example.com', 'administrative': {'unit': 0, 'lang': 'sv-SE', 'pressureunit': 0}},
+        },
+        'status': 'ok',
+        'time_exec': 0.05,
+        'time_server': now,
+    }
+
+
+def netatmo_token() -> Dict[str, Any]:
+    """OAuth2 token-svar."""
+    return {'access_token': 'bench-access', 'refresh_token': 'bench-refresh', 'expires_in': 10800}
+
+
+def pressure_history(points: int, days: float = 7.0) -> Dict[str, List[float]]:
+    """
+    Tryckhistorik i pressure_history.json-format, jämnt fördelad över given tid.
+
+    Args:
+        points: Antal mätpunkter (2k = ca 5 min upplösning över 7 dygn)
+        days: Tidsspann bakåt från nu
+    """
+    rng = random.Random(SEED)
+    end = datetime.now(timezone.utc).timestamp()
+    step = days * 86400 / max(1, points - 1)
+    start = end - step * (points - 1)
+
+    timestamps = [start + i * step for i in range(points)]
+    pressures = [round(1010 + 12 * math.sin(i / points * 6 * math.pi) + rng.uniform(-0.3, 0.3), 1)
+                 for i in range(points)]
+    return {'timestamps': timestamps, 'pressures': pressures}
+
+
+# === IPGEOLOCATION ASTRONOMY ===
+
+def ipgeolocation_astronomy() -> Dict[str, Any]:
+    """astronomy-svar från ipgeolocation.io."""
+    today = datetime.now().date().isoformat()
+    return {
+        'location': {'latitude': f'{LATITUDE:.5f}', 'longitude': f'{LONGITUDE:.5f}',
+                     'country_name': 'Sweden', 'city': 'Stockholm'},
+        'date': today,
+        'current_time': '12:00:00.000',
+        'sunrise': '06:42', 'sunset': '19:31', 'sun_status': '-',
+        'solar_noon': '13:06', 'day_length': '12:49',
+        'sun_altitude': 31.2, 'sun_distance': 149880000.0, 'sun_azimuth': 182.4,
+        'moonrise': '21:10', 'moonset': '11:52', 'moon_status': '-',
+        'moon_altitude': -12.3, 'moon_distance': 384400.0, 'moon_azimuth': 40.1,
+        'moon_parallactic_angle': -20.5,
+    }
+
+
+# === FIXTURE-REGISTER ===
+
+# fixture -> storlek -> generator
+FIXTURES: Dict[str, Dict[str, Callable[[], Any]]] = {
+    'smhi_pmp3g': {layout: (lambda layout=layout: smhi_pmp3g(layout)) for layout in ('24h', '10d', 'hourly_10d')},
+    'smhi_metobs_stations': {str(count): (lambda count=count: smhi_metobs_stations(count)) for count in (250, 1000)},
+    'smhi_metobs_latest_hour': {'single': smhi_metobs_latest_hour},
+    'smhi_warnings': {scenario: (lambda scenario=scenario: smhi_warnings(scenario))
+                      for scenario in ('none', 'typical', 'ten_day', 'storm_day')},
+    'netatmo_stationsdata': {layout: (lambda layout=layout: netatmo_stationsdata(layout))
+                             for layout in ('single', 'typical', 'multi')},
+    'ipgeolocation_astronomy': {'single': ipgeolocation_astronomy},
+}
+
+
+def fixture_sizes(fixture: str) -> List[str]:
+    """
+    Tillgängliga storlekar för en fixture (inkl. 'recorded' om inspelad finns).
+
+    Args:
+        fixture: Fixturens namn, t.ex. 'smhi_warnings'
+    """
+    sizes = list(FIXTURES[fixture])
+    if os.path.exists(os.path.join(RECORDED_DIR, f'{fixture}.json')):
+        sizes.append('recorded')
+    return sizes
+
+
+def load_fixture(fixture: str, size: str) -> Any:
+    """
+    Ladda en payload.
+
+    Args:
+        fixture: Fixturens namn
+        size: Storlek från fixture_sizes()
+
+    Returns:
+        Avkodad payload (ny kopia vid varje anrop)
+    """
+    if size == 'recorded':
+        with open(os.path.join(RECORDED_DIR, f'{fixture}.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return FIXTURES[fixture][size]()
+
+
+def encode(payload: Any) -> bytes:
+    """Koda payload som upstream gör (kompakt UTF-8 JSON)."""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# === KASSETTER ===
+
+# Sökvägsdel -> fixture (första träffen vinner, latest-hour före stationslistan)
+CASSETTE_FIXTURES = (
+    ('/category/pmp3g/', 'smhi_pmp3g'),
+    ('/period/latest-hour/', 'smhi_metobs_latest_hour'),
+    ('opendata-download-metobs.smhi.se/api/version/', 'smhi_metobs_stations'),
+    ('/ibww/', 'smhi_warnings'),
+    ('/api/getstationsdata', 'netatmo_stationsdata'),
+    ('/astronomy', 'ipgeolocation_astronomy'),
+)
+
+
+def import_cassette(cassette_dir: str, pick: str = 'latest') -> Dict[str, str]:
+    """
+    Spara svar från en upstream-kassett som 'recorded'-fixtures.
+
+    Args:
+        cassette_dir: Kassettkatalog (diagnostics.upstream_mode = 'record')
+        pick: 'latest' (sista 200-svaret per fixture) eller 'largest'
+
+    Returns:
+        dict: fixture -> sökväg till sparad fil
+    """
+    from cassette import read_interactions, read_body
+
+    chosen: Dict[str, Tuple[Dict[str, Any], bytes]] = {}
+    for entry in read_interactions(cassette_dir):
+        if entry.get('status') != 200:
+            continue
+        fixture = next((name for fragment, name in CASSETTE_FIXTURES if fragment in entry['path_key']), None)
+        if fixture is None:
+            continue
+        body = read_body(cassette_dir, entry)
+        if pick == 'largest' and fixture in chosen and len(chosen[fixture][1]) >= len(body):
+            continue
+        chosen[fixture] = (entry, body)
+
+    os.makedirs(RECORDED_DIR, exist_ok=True)
+    written = {}
+    for fixture, (entry, body) in sorted(chosen.items()):
+        path = os.path.join(RECORDED_DIR, f'{fixture}.json')
+        # Validera att svaret är JSON innan det blir fixture
+        payload = json.loads(body)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        written[fixture] = path
+    return written
+
+
+# === TRANSPORT ===
+
+class FixtureTransport:
+    """
+    Session-ersättare för upstream.request(): svarar med fixture-bytes.
+
+    routes är en lista (url-delsträng, body-bytes) där första träffen vinner.
+    """
+
+    def __init__(self, routes: List[Tuple[str, bytes]]):
+        self.routes = routes
+        self.calls = 0
+
+    def request(self, method: str, url: str, **kwargs):
+        import requests
+
+        self.calls += 1
+        response = requests.models.Response()
+        response.url = url
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = 'application/json'
+
+        for fragment, body in self.routes:
+            if fragment in url:
+                response.status_code = 200
+                response._content = body
+                return response
+
+        response.status_code = 404
+        response._content = b'{"error": "no fixture"}'
+        return response
+
+
+def default_routes(pmp3g: str = '10d', stations: str = '250', warnings: str = 'typical',
+                   netatmo: str = 'typical') -> List[Tuple[str, bytes]]:
+    """
+    Rutter för alla upstream-källor med valda fixture-storlekar.
+    """
+    return [
+        ('metfcst', encode(load_fixture('smhi_pmp3g', pmp3g))),
+        ('period/latest-hour', encode(load_fixture('smhi_metobs_latest_hour', 'single'))),
+        ('metobs', encode(load_fixture('smhi_metobs_stations', stations))),
+        ('ibww', encode(load_fixture('smhi_warnings', warnings))),
+        ('oauth2/token', encode(netatmo_token())),
+        ('getstationsdata', encode(load_fixture('netatmo_stationsdata', netatmo))),
+        ('ipgeolocation', encode(load_fixture('ipgeolocation_astronomy', 'single'))),
+    ]
+
+
+@contextmanager
+def fixture_transport(routes: Optional[List[Tuple[str, bytes]]] = None) -> Iterator[FixtureTransport]:
+    """
+    Låt upstream-modulen svara från fixtures under with-blocket.
+
+    Args:
+        routes: Rutter (default: default_routes())
+    """
+    import upstream
+
+    transport = FixtureTransport(routes if routes is not None else default_routes())
+    original = upstream._get_session
+    upstream._get_session = lambda: transport
+    try:
+        yield transport
+    finally:
+        upstream._get_session = original
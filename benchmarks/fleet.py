@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Lastgenerator: N simulerade kiosker mot en körande app.
+
+Varje kiosk följer dashboard.js: sidladdning (/, statiska filer och /dist-buntar en gång,
+första renderingen från sidans inbäddade data - annars /api/current +
+/api/forecast + /api/daily parallellt - och /api/weather-effects-config om
+effekter är på), sedan samma trio var UPDATE_INTERVAL och /api/theme var
+THEME_CHECK_INTERVAL. --speed delar intervallen så att en timmes drift kan
+komprimeras. Som webbläsarens cache skickar kiosken senaste ETag per
+endpoint (If-None-Match); 304-svar räknas separat i rapporten.
+
+Flottan växer i steg (--kiosks 1,10,50) och för varje steg rapporteras
+p50/p99-latens, genomströmning, fel samt serverns CPU och RSS - från
+/proc via --server-pid, annars från appens /metrics.
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+
+from .runner import collect_metadata, format_duration
+
+# Samma värden som static/js/dashboard.js och fetch-api-client.js
+UPDATE_INTERVAL = 30.0
+THEME_CHECK_INTERVAL = 60.0
+API_TIMEOUT = 10.0
+DATA_ENDPOINTS = ('/api/current', '/api/forecast', '/api/daily')
+
+# Statiska filer och hashade buntar (/dist) som sidan länkar in
+_STATIC_PATTERN = re.compile(r'(?:href|src)="(/(?:static|dist)/[^"]+)"')
+_INITIAL_DATA_PATTERN = re.compile(r'<script id="initial-data" type="application/json">(.*?)</script>', re.DOTALL)
+API_HEADERS = {'Cache-Control': 'no-cache'}
+ASSET_HEADERS = {'Accept-Encoding': 'gzip'}  # Som webbläsaren - /dist svarar då med .gz-kopian
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Närmaste rang-percentil ur en sorterad lista."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def read_initial_data(html: str) -> Optional[Dict[str, Any]]:
+    """
+    Inbäddad data ur index.html (som readInitialData() i fetch-api-client.js).
+
+    Returns:
+        dict: {current, forecast, daily, ...} eller None om blocket saknas/är tomt
+    """
+    match = _INITIAL_DATA_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return None
+    if not data or not (data.get('current') or {}).get('smhi'):
+        return None
+    return data
+
+
+class Recorder:
+    """Trådsäker insamling av (tid, rutt, latens, ok, bytes, 304)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[float, str, float, bool, int, bool]] = []
+
+    def add(self, route: str, latency: float, ok: bool, size: int, not_modified: bool = False) -> None:
+        with self._lock:
+            self.samples.append((time.time(), route, latency, ok, size, not_modified))
+
+    def window(self, start: float, end: float) -> List[Tuple[float, str, float, bool, int, bool]]:
+        with self._lock:
+            return [sample for sample in self.samples if start <= sample[0] < end]
+
+
+class Kiosk(threading.Thread):
+    """
+    En skärm med egna Sessions (keep-alive som i webbläsaren).
+
+    Session är inte trådsäker: kiosk-tråden använder self.session och varje
+    parallellt anrop i _update_all_data en egen (som webbläsarens parallella
+    anslutningar mot samma värd). ETags sparas per sökväg; de parallella
+    anropen skriver till olika nycklar.
+    """
+
+    def __init__(self, index: int, base_url: str, recorder: Recorder, pool: ThreadPoolExecutor,
+                 stop_event: threading.Event, speed: float, start_delay: float):
+        super().__init__(name=f'Kiosk-{index}', daemon=True)
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.pool = pool
+        self.stop_event = stop_event
+        self.update_interval = UPDATE_INTERVAL / speed
+        self.theme_interval = THEME_CHECK_INTERVAL / speed
+        self.start_delay = start_delay
+        self.session = requests.Session()
+        self.parallel_sessions = [requests.Session() for _ in DATA_ENDPOINTS]
+        self.etags: Dict[str, str] = {}
+        self.current: Optional[Dict[str, Any]] = None
+
+    def _get(self, path: str, route: Optional[str] = None, session: Optional[requests.Session] = None,
+             headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
+        headers = dict(headers or API_HEADERS)
+        if path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        start = time.perf_counter()
+        try:
+            response = (session or self.session).get(self.base_url + path, timeout=API_TIMEOUT,
+                                                     headers=headers)
+            # Överförda bytes (komprimerat om servern gzippat), inte uppackat innehåll
+            size = int(response.headers.get('Content-Length') or len(response.content))
+            not_modified = response.status_code == 304
+            self.recorder.add(route or path, time.perf_counter() - start, response.ok, size, not_modified)
+            if response.ok and not not_modified and response.headers.get('ETag'):
+                self.etags[path] = response.headers['ETag']
+            return response
+        except requests.RequestException:
+            self.recorder.add(route or path, time.perf_counter() - start, False, 0)
+            return None
+
+    def _update_all_data(self) -> Optional[Dict[str, Any]]:
+        """Som updateAllData(): tre anrop parallellt (Promise.all)."""
+        futures = [self.pool.submit(self._get, path, None, session)
+                   for path, session in zip(DATA_ENDPOINTS, self.parallel_sessions)]
+        responses = [future.result() for future in futures]
+        current = responses[0]
+        # 304: webbläsaren använder sin cachade kopia
+        if current is not None and current.ok and current.status_code != 304:
+            try:
+                self.current = current.json()
+            except ValueError:
+                pass
+        return self.current
+
+    def _page_load(self) -> None:
+        response = self._get('/')
+        initial_data = None
+        if response is not None and response.ok:
+            # Statiska filer en gång - därefter ligger de i webbläsarens cache
+            for path in dict.fromkeys(_STATIC_PATTERN.findall(response.text)):
+                self._get(path, route='static', headers=ASSET_HEADERS)
+            initial_data = read_initial_data(response.text)
+
+        # Första renderingen från inbäddad data - API:erna anropas först vid nästa uppdatering
+        if initial_data:
+            current = self.current = initial_data['current']
+        else:
+            current = self._update_all_data()
+        if current and (current.get('config') or {}).get('weather_effects_enabled'):
+            self._get('/api/weather-effects-config')
+
+    def run(self) -> None:
+        if self.stop_event.wait(self.start_delay):
+            return
+
+        self._page_load()
+        next_update = time.monotonic() + self.update_interval
+        next_theme = time.monotonic() + self.theme_interval
+
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            if now >= next_update:
+                self._update_all_data()
+                next_update += self.update_interval
+            if now >= next_theme:
+                self._get('/api/theme')
+                next_theme += self.theme_interval
+            self.stop_event.wait(max(0.0, min(next_update, next_theme) - time.monotonic()))
+
+        self.session.close()
+        for session in self.parallel_sessions:
+            session.close()
+
+
+# === SERVERRESURSER ===
+
+def _proc_children(pid: int) -> List[int]:
+    children = []
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children', 'r') as f:
+            for child in f.read().split():
+                children.append(int(child))
+                children.extend(_proc_children(int(child)))
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def _proc_usage(pid: int) -> Tuple[float, int]:
+    """(CPU-sekunder, RSS-bytes) för en process via /proc."""
+    with open(f'/proc/{pid}/stat', 'r') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    ticks = os.sysconf('SC_CLK_TCK')
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    with open(f'/proc/{pid}/statm', 'r') as f:
+        rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    return cpu, rss
+
+
+def _metrics_usage(session: requests.Session, base_url: str) -> Optional[Tuple[float, int]]:
+    """(CPU-sekunder, RSS-bytes) från appens /metrics (den worker som svarar)."""
+    try:
+        text = session.get(base_url.rstrip('/') + '/metrics', timeout=API_TIMEOUT).text
+    except requests.RequestException:
+        return None
+    cpu = re.search(r'^vaderdisplay_process_cpu_seconds (\S+)$', text, re.MULTILINE)
+    rss = re.search(r'^vaderdisplay_process_resident_memory_bytes (\S+)$', text, re.MULTILINE)
+    if not cpu or not rss:
+        return None
+    return float(cpu.group(1)), int(float(rss.group(1)))
+
+
+class ServerProbe:
+    """Läser serverns CPU/RSS - /proc för angivna pid:ar (inkl. barn), annars /metrics."""
+
+    def __init__(self, base_url: str, pids: Optional[List[int]] = None):
+        self.base_url = base_url
+        self.pids = pids or []
+        self.session = requests.Session()
+
+    @property
+    def source(self) -> str:
+        return 'proc' if self.pids else 'metrics'
+
+    def sample(self) -> Optional[Tuple[float, int]]:
+        if not self.pids:
+            return _metrics_usage(self.session, self.base_url)
+
+        cpu_total, rss_total = 0.0, 0
+        for pid in dict.fromkeys(pid for root in self.pids for pid in [root] + _proc_children(root)):
+            try:
+                cpu, rss = _proc_usage(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+            cpu_total += cpu
+            rss_total += rss
+        return cpu_total, rss_total
+
+
+# === STEG OCH RAPPORT ===
+
+def summarize_stage(kiosks: int, samples, duration: float, usage_start, usage_end) -> Dict[str, Any]:
+    """Sammanfatta ett stegs mätningar."""
+    latencies = sorted(sample[2] for sample in samples)
+    errors = sum(1 for sample in samples if not sample[3])
+
+    per_route: Dict[str, Dict[str, Any]] = {}
+    for route in sorted({sample[1] for sample in samples}):
+        route_samples = [sample for sample in samples if sample[1] == route]
+        route_latencies = sorted(sample[2] for sample in route_samples)
+        per_route[route] = {
+            'requests': len(route_latencies),
+            'not_modified': sum(1 for sample in route_samples if sample[5]),
+            'p50': percentile(route_latencies, 0.50),
+            'p99': percentile(route_latencies, 0.99),
+        }
+
+    summary = {
+        'kiosks': kiosks,
+        'duration': duration,
+        'requests': len(samples),
+        'errors': errors,
+        'not_modified': sum(1 for sample in samples if sample[5]),
+        'throughput': len(samples) / duration if duration > 0 else 0.0,
+        'bytes': sum(sample[4] for sample in samples),
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+        'routes': per_route,
+        'server_cpu_percent': None,
+        'server_rss_bytes': None,
+    }
+    if usage_start and usage_end:
+        summary['server_cpu_percent'] = (usage_end[0] - usage_start[0]) / duration * 100 if duration > 0 else None
+        summary['server_rss_bytes'] = usage_end[1]
+    return summary
+
+
+def print_stage(stage: Dict[str, Any]) -> None:
+    cpu = f"{stage['server_cpu_percent']:5.1f}%" if stage['server_cpu_percent'] is not None else '    -'
+    rss = f"{stage['server_rss_bytes'] / 1048576:6.1f} MB" if stage['server_rss_bytes'] is not None else '     -'
+    print(f"  🖥️  {stage['kiosks']:>4} kiosker  {stage['throughput']:7.1f} req/s  "
+          f"p50 {format_duration(stage['p50']):>10}  p99 {format_duration(stage['p99']):>10}  "
+          f"304 {stage['not_modified']:>5}  fel {stage['errors']:>4}  CPU {cpu}  RSS {rss}")
+
+
+def run_fleet(base_url: str, stages: List[int], stage_seconds: float, speed: float = 1.0,
+              server_pids: Optional[List[int]] = None, synchronized: bool = False,
+              seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Kör flottan steg för steg.
+
+    Args:
+        base_url: Appens bas-URL
+        stages: Antal kiosker per steg (växande)
+        stage_seconds: Mättid per steg
+        speed: Tidskomprimering (2 = dubbelt så täta anrop)
+        server_pids: Pid:ar att läsa CPU/RSS för (None = /metrics)
+        synchronized: Alla nya kiosker startar samtidigt (t.ex. efter strömavbrott)
+        seed: Seed för startförskjutning
+
+    Returns:
+        dict: {'meta': ..., 'stages': [...]}
+    """
+    rng = random.Random(seed)
+    recorder = Recorder()
+    stop_event = threading.Event()
+    probe = ServerProbe(base_url, server_pids)
+    pool = ThreadPoolExecutor(max_workers=min(512, max(8, len(DATA_ENDPOINTS) * max(stages))),
+                              thread_name_prefix='KioskFetch')
+    kiosks: List[Kiosk] = []
+    results = []
+
+    try:
+        for target in stages:
+            while len(kiosks) < target:
+                # Riktiga skärmar är inte i fas - sprid starten över ett uppdateringsintervall
+                delay = 0.0 if synchronized else rng.uniform(0, UPDATE_INTERVAL / speed)
+                kiosk = Kiosk(len(kiosks), base_url, recorder, pool, stop_event, speed, delay)
+                kiosk.start()
+                kiosks.append(kiosk)
+
+            usage_start = probe.sample()
+            stage_start = time.time()
+            time.sleep(stage_seconds)
+            stage_end = time.time()
+            usage_end = probe.sample()
+
+            stage = summarize_stage(len(kiosks), recorder.window(stage_start, stage_end),
+                                    stage_end - stage_start, usage_start, usage_end)
+            results.append(stage)
+            print_stage(stage)
+    finally:
+        stop_event.set()
+        for kiosk in kiosks:
+            kiosk.join(timeout=API_TIMEOUT + 1)
+        pool.shutdown(wait=False)
+
+    meta = collect_metadata()
+    meta.update({'base_url': base_url, 'stage_seconds': stage_seconds, 'speed': speed,
+                 'synchronized': synchronized, 'server_probe': probe.source})
+    return {'meta': meta, 'stages': results}
+
+
+def run_fleet_cli(args) -> int:
+    """CLI: python3 -m benchmarks fleet ..."""
+    stages = sorted({int(value) for value in args.kiosks.split(',') if value.strip()})
+    if not stages or stages[0] < 1:
+        print("❌ --kiosks ska vara t.ex. 1,10,50")
+        return 2
+
+    print(f"🏁 Kiosk-flotta mot {args.url}: steg {stages}, {args.stage_seconds}s/steg, speed ×{args.speed}")
+    report = run_fleet(args.url, stages, args.stage_seconds, speed=args.speed,
+                       server_pids=args.server_pid, synchronized=args.synchronized, seed=args.seed)
+
+    print("\n📊 Per rutt i sista steget:")
+    for route, stats in report['stages'][-1]['routes'].items():
+        print(f"  {route:<32} {stats['requests']:>6} anrop  {stats['not_modified']:>6} × 304  p50 {format_duration(stats['p50']):>10}  "
+              f"p99 {format_duration(stats['p99']):>10}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultat sparade: {args.output}")
+    return 0
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Benchmark-runner: register, tidtagning, JSON-resultat och jämförelse.
+
+En benchmark registreras med @benchmark och är en setup-funktion som tar
+en storlek och returnerar funktionen som ska tidtas. Setup ingår aldrig i
+mätningen. Varje mätning kalibrerar antalet loopar så att en körning tar
+minst min_time sekunder och upprepas sedan repeat gånger.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+RESULTS_FORMAT_VERSION = 1
+
+# Registrerade benchmarks i registreringsordning
+_registry: List[Dict[str, Any]] = []
+
+
+class SkipBenchmark(Exception):
+    """Kastas från setup när en benchmark inte kan köras (t.ex. saknat beroende)."""
+
+
+def benchmark(name: str, sizes: List[str]) -> Callable:
+    """
+    Registrera en benchmark.
+
+    Args:
+        name: Namn, prefixat med grupp, t.ex. 'smhi.parse_parameters'
+        sizes: Storlekar att köra (skickas till setup)
+
+    Returns:
+        Dekorator för setup-funktionen setup(size) -> callable
+    """
+    def decorator(setup: Callable[[str], Callable[[], Any]]) -> Callable:
+        _registry.append({'name': name, 'sizes': list(sizes), 'setup': setup})
+        return setup
+    return decorator
+
+
+def get_benchmarks(name_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Hämta registrerade benchmarks, valfritt filtrerade på delsträng.
+
+    Args:
+        name_filter: Delsträng som ska finnas i "namn[storlek]"
+    """
+    selected = []
+    for entry in _registry:
+        sizes = [size for size in entry['sizes']
+                 if not name_filter or name_filter in f"{entry['name']}[{size}]"]
+        if sizes:
+            selected.append(dict(entry, sizes=sizes))
+    return selected
+
+
+def _time_loops(func: Callable[[], Any], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - start
+
+
+def measure(func: Callable[[], Any], repeat: int = 7, min_time: float = 0.1,
+            warmup: int = 1) -> Dict[str, Any]:
+    """
+    Tidta en funktion.
+
+    Args:
+        func: Funktion utan argument
+        repeat: Antal körningar som statistiken baseras på
+        min_time: Minsta tid per körning (antal loopar kalibreras)
+        warmup: Antal uppvärmningsanrop (cache, lazy init)
+
+    Returns:
+        dict: Sekunder per anrop - min, median, mean, p95, stdev + loops/runs
+    """
+    for _ in range(warmup):
+        func()
+
+    loops = 1
+    while True:
+        elapsed = _time_loops(func, loops)
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        # Sikta på min_time med lite marginal, men minst dubbla
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+    runs = sorted(_time_loops(func, loops) / loops for _ in range(max(1, repeat)))
+    p95_index = min(len(runs) - 1, int(round(0.95 * (len(runs) - 1))))
+
+    return {
+        'unit': 'seconds',
+        'loops': loops,
+        'runs': len(runs),
+        'min': runs[0],
+        'median': statistics.median(runs),
+        'mean': statistics.fmean(runs),
+        'p95': runs[p95_index],
+        'stdev': statistics.pstdev(runs) if len(runs) > 1 else 0.0,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), capture_output=True, text=True, timeout=5
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def collect_metadata() -> Dict[str, Any]:
+    """Miljöinfo som sparas med resultaten."""
+    return {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Formatera sekunder med lämplig enhet."""
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def run_benchmarks(name_filter: Optional[str] = None, repeat: int = 7,
+                   min_time: float = 0.1) -> Dict[str, Any]:
+    """
+    Kör valda benchmarks och skriv en rad per mätning.
+
+    Returns:
+        dict: {'meta': ..., 'results': {namn[storlek]: statistik}, 'skipped': {...}}
+    """
+    results: Dict[str, Any] = {}
+    skipped: Dict[str, str] = {}
+
+    for entry in get_benchmarks(name_filter):
+        for size in entry['sizes']:
+            key = f"{entry['name']}[{size}]"
+            try:
+                func = entry['setup'](size)
+            except SkipBenchmark as e:
+                skipped[key] = str(e)
+                print(f"  ⏭️  {key:<55} hoppas över: {e}")
+                continue
+
+            stats = measure(func, repeat=repeat, min_time=min_time)
+            results[key] = stats
+            print(f"  ⏱️  {key:<55} median {format_duration(stats['median']):>10}  "
+                  f"p95 {format_duration(stats['p95']):>10}  ({stats['loops']} loopar × {stats['runs']})")
+
+    meta = collect_metadata()
+    meta.update({'repeat': repeat, 'min_time': min_time, 'filter': name_filter})
+    return {'meta': meta, 'results': results, 'skipped': skipped}
+
+
+def save_results(report: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Spara resultat som JSON.
+
+    Args:
+        report: Från run_benchmarks()
+        path: Målfil (default benchmarks/results/<tidsstämpel>[-<rev>].json)
+
+    Returns:
+        str: Sökväg till sparad fil
+    """
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        revision = report['meta'].get('git_revision')
+        filename = f"{stamp}-{revision}.json" if revision else f"{stamp}.json"
+        path = os.path.join(RESULTS_DIR, filename)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Läs sparade resultat."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.10) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Jämför medianer mellan två körningar.
+
+    Args:
+        baseline: Tidigare resultat
+        current: Nya resultat
+        threshold: Relativ ändring som räknas som regression/förbättring
+
+    Returns:
+        dict: 'regressions', 'improvements', 'unchanged', 'missing', 'new'
+    """
+    old_results = baseline.get('results', {})
+    new_results = current.get('results', {})
+    comparison: Dict[str, List[Dict[str, Any]]] = {
+        'regressions': [], 'improvements': [], 'unchanged': [], 'missing': [], 'new': []
+    }
+
+    for key in sorted(set(old_results) | set(new_results)):
+        if key not in new_results:
+            comparison['missing'].append({'name': key})
+            continue
+        if key not in old_results:
+            comparison['new'].append({'name': key, 'median': new_results[key]['median']})
+            continue
+
+        old_median = old_results[key]['median']
+        new_median = new_results[key]['median']
+        ratio = new_median / old_median if old_median > 0 else float('inf')
+        row = {'name': key, 'old': old_median, 'new': new_median, 'ratio': ratio}
+
+        if ratio > 1 + threshold:
+            comparison['regressions'].append(row)
+        elif ratio < 1 - threshold:
+            comparison['improvements'].append(row)
+        else:
+            comparison['unchanged'].append(row)
+
+    return comparison
+
+
+def print_comparison(comparison: Dict[str, List[Dict[str, Any]]], threshold: float) -> None:
+    """Skriv jämförelsen som tabell."""
+    print(f"\n📊 Jämförelse (median, tröskel ±{threshold * 100:.0f}%)")
+
+    for label, icon, rows in (('Regressioner', '🔴', comparison['regressions']),
+                              ('Förbättringar', '🟢', comparison['improvements']),
+                              ('Oförändrade', '⚪', comparison['unchanged'])):
+        if not rows:
+            continue
+        print(f"\n{icon} {label}:")
+        for row in sorted(rows, key=lambda r: r['ratio'], reverse=True):
+            change = (row['ratio'] - 1) * 100
+            print(f"  {row['name']:<55} {format_duration(row['old']):>10} → "
+                  f"{format_duration(row['new']):>10}  ({change:+.1f}%)")
+
+    if comparison['new']:
+        print(f"\n🆕 Nya: {', '.join(row['name'] for row in comparison['new'])}")
+    if comparison['missing']:
+        print(f"\n❔ Saknas i nya körningen: {', '.join(row['name'] for row in comparison['missing'])}")
+
+
+def import_suites() -> Dict[str, str]:
+    """
+    Importera alla bench_*-moduler så att de registrerar sig.
+
+    Returns:
+        dict: Moduler som inte kunde importeras -> felmeddelande
+    """
+    import importlib
+    import pkgutil
+
+    failed: Dict[str, str] = {}
+    package_dir = os.path.dirname(__file__)
+    for module_info in sorted(pkgutil.iter_modules([package_dir]), key=lambda m: m.name):
+        if module_info.name.startswith('bench_'):
+            try:
+                importlib.import_module(f"benchmarks.{module_info.name}")
+            except ImportError as e:
+                failed[module_info.name] = str(e)
+    return failed
+
+
+def ensure_project_on_path() -> None:
+    """Gör projektroten importerbar (app, core) när modulen körs med -m."""
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
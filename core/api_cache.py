@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Serialiseringscache för API-svaren
+/api/current, /api/forecast, /api/daily och /api/warnings byggs och
+serialiseras en gång per state-version (core/weather_state.py räknar upp
+versionen vid varje ändring) i stället för vid varje anrop. Samma JSON-text
+bäddas in i index.html, så att första renderingen visar riktig data utan
+extra anrop.
+
+/api/current innehåller också tidsberoende fält (solens position, tema,
+warm start-ålder) och byggs därför om minst en gång per minut.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from .weather_state import (
+    get_weather_state, get_state_version, is_warnings_enabled,
+    get_warnings_data, get_warnings_last_update
+)
+from .config_manager import get_current_theme
+from .weather_updater import format_api_response_with_pressure_trend, get_current_sun_position
+from .leader_election import get_warm_start_info
+from .metrics import CACHE_REQUESTS
+
+# Vädersymbol-tabellerna ligger bland klienterna i reference/data
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data'))
+import weather_symbols
+
+logger = logging.getLogger(__name__)
+
+# Hur länge tidsberoende fält (sun_position, theme) får återanvändas
+TIME_BUCKET_SECONDS = 60
+
+
+def _build_current() -> Dict[str, Any]:
+    """Aktuell väderdata med villkorsstyrd Netatmo-formatering (FAS 2)."""
+    weather_state = get_weather_state()
+
+    formatted_netatmo = None
+    if weather_state['netatmo_data'] and weather_state['netatmo_available']:
+        formatted_netatmo = format_api_response_with_pressure_trend(
+            weather_state['netatmo_data'],
+            weather_state['smhi_data']
+        )
+
+    # FAS 2: Utökad config för frontend-intelligens
+    ui_config = None
+    if weather_state['config']:
+        ui_config = {
+            'wind_unit': weather_state['config'].get('ui', {}).get('wind_unit', 'land'),
+            'use_netatmo': weather_state['use_netatmo'],
+            'netatmo_available': weather_state['netatmo_available'],
+            'weather_effects_enabled': weather_state['weather_effects_enabled'],
+            'weather_icon_type': weather_state['config'].get('ui', {}).get('weather_icon_type', 'font'),  # AMCHARTS: Ikon-typ
+            'warnings_enabled': weather_state['warnings_enabled']
+        }
+
+    return {
+        'smhi': weather_state['smhi_data'],
+        'netatmo': formatted_netatmo,
+        'sun': weather_state['sun_data'],
+        'sun_position': get_current_sun_position(),
+        'last_update': weather_state['last_update'],
+        'theme': get_current_theme(),
+        'status': weather_state['status'],
+        'warm_start': get_warm_start_info(),
+        'config': ui_config
+    }
+
+
+def _build_forecast() -> Dict[str, Any]:
+    weather_state = get_weather_state()
+    return {
+        'forecast': weather_state['forecast_data'],
+        'last_update': weather_state['last_update']
+    }
+
+
+def _build_daily() -> Dict[str, Any]:
+    weather_state = get_weather_state()
+    return {
+        'daily_forecast': weather_state['daily_forecast_data'],
+        'last_update': weather_state['last_update']
+    }
+
+
+def _build_warnings() -> Dict[str, Any]:
+    """SMHI-varningar med metadata, eller tomt svar med orsak."""
+    if not is_warnings_enabled():
+        return {
+            'error': 'SMHI Warnings ej aktiverat',
+            'enabled': False,
+            'heavy_rain_warnings': [],
+            'active_heavy_rain_warnings': [],
+            'summary': {'total_warnings': 0}
+        }
+
+    warnings_data = get_warnings_data()
+    if not warnings_data:
+        return {
+            'error': 'Inga varningsdata tillgängliga',
+            'enabled': True,
+            'api_available': False,
+            'heavy_rain_warnings': [],
+            'active_heavy_rain_warnings': [],
+            'summary': {'total_warnings': 0}
+        }
+
+    return {
+        **warnings_data,
+        'enabled': True,
+        'cache_info': {
+            'cache_duration_minutes': 10,
+            'last_api_update': get_warnings_last_update()
+        }
+    }
+
+
+# Payload-namn -> (byggfunktion, beror på klockan)
+PAYLOADS: Dict[str, Tuple[Callable[[], Dict[str, Any]], bool]] = {
+    'current': (_build_current, True),
+    'forecast': (_build_forecast, False),
+    'daily': (_build_daily, False),
+    'warnings': (_build_warnings, False),
+}
+
+# Namn -> {'key', 'payload', 'body', 'etag'}
+_api_cache_state: Dict[str, Any] = {
+    'entries': {},
+    'hits': 0,
+    'misses': 0,
+}
+_api_cache_lock = threading.Lock()
+
+
+def _cache_key(name: str) -> Tuple[int, int]:
+    time_dependent = PAYLOADS[name][1]
+    bucket = int(time.time() // TIME_BUCKET_SECONDS) if time_dependent else 0
+    return get_state_version(), bucket
+
+
+def _get_entry(name: str) -> Dict[str, Any]:
+    """Cachad post för payloaden, byggs om när state-versionen ändrats."""
+    key = _cache_key(name)
+    entry = _api_cache_state['entries'].get(name)
+    if entry is not None and entry['key'] == key:
+        _api_cache_state['hits'] += 1
+        CACHE_REQUESTS.inc('api_payload', 'hit')
+        return entry
+
+    with _api_cache_lock:
+        entry = _api_cache_state['entries'].get(name)
+        if entry is not None and entry['key'] == key:
+            return entry
+
+        payload = PAYLOADS[name][0]()
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        entry = {
+            'key': key,
+            'payload': payload,
+            'body': body,
+            'etag': hashlib.sha1(body.encode('utf-8')).hexdigest()[:16],
+        }
+        _api_cache_state['entries'][name] = entry
+        _api_cache_state['misses'] += 1
+
+    CACHE_REQUESTS.inc('api_payload', 'miss')
+    return entry
+
+
+def get_payload(name: str) -> Dict[str, Any]:
+    """
+    Hämta en API-payload som dict (för t.ex. förrendering i templaten).
+
+    Args:
+        name: 'current', 'forecast', 'daily' eller 'warnings'
+
+    Returns:
+        dict: Payload - får inte muteras, den delas med cachen
+    """
+    return _get_entry(name)['payload']
+
+
+def get_payload_json(name: str) -> Tuple[str, str]:
+    """
+    Hämta en API-payload serialiserad.
+
+    Args:
+        name: 'current', 'forecast', 'daily' eller 'warnings'
+
+    Returns:
+        tuple: (JSON-text, ETag-värde utan citattecken)
+    """
+    entry = _get_entry(name)
+    return entry['body'], entry['etag']
+
+
+def get_embedded_snapshot() -> str:
+    """
+    Alla payloads som ett JSON-objekt för inbäddning i <script type="application/json">.
+
+    'rendered_at' (epoch) låter sidan se om den visas från service workerns cache.
+
+    Texten sätts ihop av de cachade serialiseringarna; '<', '>' och '&' escapas
+    så att data aldrig kan avsluta script-taggen.
+
+    Returns:
+        str: JSON-text säker att lägga direkt i HTML
+    """
+    parts = [f'"{name}":{get_payload_json(name)[0]}' for name in PAYLOADS]
+    parts.append(f'"rendered_at":{int(time.time())}')
+    text = '{' + ','.join(parts) + '}'
+    return (text.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+            .replace('\u2028', '\\u2028').replace('\u2029', '\\u2029'))
+
+
+def _format_clock(iso_time: Optional[str]) -> Optional[str]:
+    """ISO-tid -> 'HH:MM' i serverns lokala tid (samma som kioskens)."""
+    if not iso_time:
+        return None
+    try:
+        parsed = datetime.fromisoformat(iso_time)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone()
+    return parsed.strftime('%H:%M')
+
+
+def _format_temperature(value: Any) -> Optional[str]:
+    """Samma format som formatTemperature() i formatters-dashboard.js."""
+    if not isinstance(value, (int, float)) or value != value:
+        return None
+    return f"{value:.1f}°"
+
+
+def get_first_paint() -> Optional[Dict[str, Any]]:
+    """
+    Huvudvärden förrenderade för index.html, från samma payload som /api/current.
+
+    Returns:
+        dict: Texter och ikonklass för kortet, eller None innan första datan finns
+    """
+    current = get_payload('current')
+    smhi = current.get('smhi')
+    if not smhi:
+        return None
+
+    sun_position = current.get('sun_position') or {}
+    is_daytime = sun_position.get('is_daytime', 6 <= datetime.now().hour < 20)
+    netatmo = current.get('netatmo') or {}
+    sun = current.get('sun') or {}
+    symbol = smhi.get('weather_symbol')
+
+    return {
+        'temperature': _format_temperature(smhi.get('temperature')),
+        'netatmo_temperature': _format_temperature(netatmo.get('temperature')),
+        'icon_class': weather_symbols.icon_class(symbol, is_daytime),
+        'description': weather_symbols.description(symbol),
+        'sunrise': _format_clock(sun.get('sunrise')),
+        'sunset': _format_clock(sun.get('sunset')),
+        'status': current.get('status'),
+        'last_update': _format_clock(current.get('last_update')),
+    }
+
+
+def get_api_cache_status() -> Dict[str, Any]:
+    """
+    Status för /api/status.
+
+    Returns:
+        dict: State-version, träffar/missar och cachade payloads
+    """
+    entries = _api_cache_state['entries']
+    return {
+        'state_version': get_state_version(),
+        'hits': _api_cache_state['hits'],
+        'misses': _api_cache_state['misses'],
+        'payloads': {
+            name: {'state_version': entry['key'][0], 'bytes': len(entry['body'].encode('utf-8'))}
+            for name, entry in list(entries.items())
+        },
+    }
@@ -0,0 +1,741 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Asset-pipeline
+Slår ihop dashboardens JS- och CSS-filer till ett fåtal buntar vid start,
+minifierar dem, skriver innehållshashade filnamn (dashboard.3f9c1a2b7d4e.js)
+plus förkomprimerade .gz-kopior och serveras med Cache-Control: immutable.
+
+En omladdning av kiosken kostar då en HTML-sida och i övrigt cacheträffar
+i webbläsaren - en ändrad fil ger ny hash och därmed ny URL. Typsnitt som
+CSS:en refererar (Weather Icons, Font Awesome) kopieras också med hash så
+att sidan fungerar helt utan internet. Font Awesome hämtas en gång till
+static/assets/vendor/ med:
+
+    python3 -m core.assets vendor
+
+Ikonuppsättningarnas SVG-filer slås ihop till en <symbol>-sprite per set
+(se icon_sprites.py) med samma hashning och cachning.
+
+Buntarna byggs i runtime-katalogen och återanvänds om källorna inte
+ändrats sedan förra starten (nyckel = hash av källfilerna + inställningar).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .icon_sprites import build_sprite
+from .leader_election import get_deployment_config
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+
+# URL-prefix för byggda buntar och typsnitt (route i app.py)
+ASSET_URL_PREFIX = '/dist'
+
+# Cache-Control för hashade filer - innehållet under en URL ändras aldrig
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+FONT_AWESOME_VERSION = '6.4.0'
+FONT_AWESOME_CDN = f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FONT_AWESOME_VERSION}'
+FONT_AWESOME_CSS = 'assets/vendor/font-awesome/css/all.min.css'
+
+# Bunt -> källfiler (relativt static/) i laddningsordning
+BUNDLES: Dict[str, List[str]] = {
+    'dashboard.css': [
+        'assets/icons/weather-icons/css/weather-icons.min.css',
+        'assets/icons/weather-icons/css/weather-icons-wind.min.css',
+        FONT_AWESOME_CSS,
+        'css/styles.css',
+    ],
+    'weather-effects.css': [
+        'css/weather-effects.css',
+    ],
+    'weather-effects.js': [
+        'js/weather-effects-renderer.js',
+        'js/weather-effects.js',
+    ],
+    # Samma renderare som worker-script (OffscreenCanvas) - laddas av weather-effects.js
+    'weather-effects-worker.js': [
+        'js/weather-effects-renderer.js',
+    ],
+    'dashboard.js': [
+        'js/dashboard/formatters-dashboard.js',
+        'js/dashboard/wind-calculations.js',
+        'js/dashboard/dom-helpers.js',
+        'js/dashboard/client-scheduler.js',
+        'js/dashboard-components/weather-icon-renderer.js',
+        'js/dashboard-components/fontawesome-renderer.js',
+        'js/dashboard-components/circular-clock.js',
+        'js/dashboard-components/barometer-display.js',
+        'js/dashboard-data/intelligent-data-source.js',
+        'js/dashboard-components/ui-adaptation-engine.js',
+        'js/dashboard-data/fetch-api-client.js',
+        'js/dashboard-data/offline-cache.js',
+        'js/dashboard-data/client-telemetry.js',
+        'js/dashboard-views/current-weather-view.js',
+        'js/dashboard-views/forecast-view.js',
+        'js/dashboard.js',
+    ],
+}
+
+# Ikon-set -> SVG-katalog (relativt static/) som blir en sprite
+# Bara set som weather-icon-renderer.js laddar - Weather Icons ritas med sitt typsnitt
+SPRITES: Dict[str, str] = {
+    'amcharts': 'assets/icons/amcharts-svg',
+}
+
+# SVG-filer som inte är ikoner (amCharts översiktsbild med alla ikoner i en fil)
+SPRITE_EXCLUDE = ('assets/icons/amcharts-svg/animated/weather.svg',)
+
+# Källor som får saknas (Font Awesome innan 'vendor' körts - CDN används då)
+OPTIONAL_SOURCES = (FONT_AWESOME_CSS,)
+
+MIMETYPES = {
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+    '.eot': 'application/vnd.ms-fontobject',
+    '.svg': 'image/svg+xml',
+}
+
+# Redan komprimerade format får ingen .gz-kopia
+_NO_GZIP = ('.woff', '.woff2')
+
+_MANIFEST_FILE = 'manifest.json'
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+# Byggstate för denna process
+_asset_state: Dict[str, Any] = {
+    'enabled': False,
+    'dir': None,
+    'bundles': {},
+    'sprites': {},
+    'files': {},
+    'font_awesome_bundled': False,
+    'reused': False,
+    'built_at': None,
+    'build_ms': None,
+    'error': None,
+}
+_asset_lock = threading.Lock()
+
+
+def get_assets_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta asset-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett assets-konfiguration
+    """
+    assets_config = (config or {}).get('assets', {})
+    output_dir = assets_config.get('output_dir') or os.path.join(get_deployment_config(config)['runtime_dir'], 'assets')
+
+    return {
+        'enabled': assets_config.get('enabled', True),
+        'minify': assets_config.get('minify', True),
+        'output_dir': output_dir,
+        'keep_old_hours': max(0.0, float(assets_config.get('keep_old_hours', 24))),
+    }
+
+
+# === MINIFIERING ===
+
+# Tecken efter vilka '/' inleder ett regex-literal i stället för division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};~+-*%<>^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                   'delete', 'void', 'throw', 'instanceof', 'yield', 'await'}
+# Radbrytning efter dessa kan aldrig påverka automatisk semikoloninsättning
+_NEWLINE_DROPPABLE = set('{;,([')
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c in '_$' or ord(c) > 127
+
+
+def _scan_quoted(source: str, i: int, quote: str) -> int:
+    """Index efter en sträng/regex som börjar på i (hanterar escapes)."""
+    n = len(source)
+    j = i + 1
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote or c == '\n':
+            return j + 1
+        j += 1
+    return n
+
+
+def _scan_regex(source: str, i: int) -> int:
+    """Index efter ett regex-literal (inkl. teckenklasser med '/')."""
+    n = len(source)
+    j = i + 1
+    in_class = False
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return j
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            return j + 1
+        j += 1
+    return n
+
+
+def minify_js(source: str) -> str:
+    """
+    Konservativ JS-minifiering: tar bort kommentarer, indrag och onödiga blanksteg.
+
+    Radbrytningar behålls där de kan vara betydelsefulla (automatisk
+    semikoloninsättning), strängar, template literals och regex-literals
+    lämnas orörda. Ingen omdöpning av variabler.
+
+    Args:
+        source: JavaScript-källkod
+
+    Returns:
+        str: Minifierad kod
+    """
+    out: List[str] = []
+    template_depth: List[int] = []   # Klammerdjup i varje öppen ${ ... }
+    i, n = 0, len(source)
+    last = ''          # Senast skrivna signifikanta tecken
+    last_word = ''     # Senast skrivna identifierare/nyckelord
+    pending = ''       # Blanksteg som väntar: '', ' ' eller '\n'
+
+    def emit(token: str) -> None:
+        nonlocal pending
+        if pending and out:
+            if pending == '\n':
+                if last not in _NEWLINE_DROPPABLE:
+                    out.append('\n')
+            elif (_is_word_char(last) and _is_word_char(token[0])) or (last in '+-' and token[0] in '+-'):
+                out.append(' ')
+        pending = ''
+        out.append(token)
+
+    while i < n:
+        c = source[i]
+
+        # Template literal (eller fortsättning efter ${ ... })
+        if c == '`' or (c == '}' and template_depth and template_depth[-1] == 0):
+            if c == '}':
+                template_depth.pop()
+            j = i + 1
+            while j < n:
+                if source[j] == '\\':
+                    j += 2
+                    continue
+                if source[j] == '`':
+                    j += 1
+                    break
+                if source[j] == '$' and source[j + 1:j + 2] == '{':
+                    j += 2
+                    template_depth.append(0)
+                    break
+                j += 1
+            emit(source[i:j])
+            last, last_word, i = source[j - 1], '', j
+            continue
+
+        if c in ' \t\r\n\f\v':
+            j = i
+            while j < n and source[j] in ' \t\r\n\f\v':
+                j += 1
+            if '\n' in source[i:j] or pending == '\n':
+                pending = '\n'
+            else:
+                pending = ' '
+            i = j
+            continue
+
+        if c == '/' and source[i + 1:i + 2] == '/':
+            j = source.find('\n', i)
+            i = n if j < 0 else j
+            continue
+
+        if c == '/' and source[i + 1:i + 2] == '*':
+            j = source.find('*/', i + 2)
+            end = n if j < 0 else j + 2
+            if '\n' in source[i:end]:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i = end
+            continue
+
+        if c in '"\'':
+            j = _scan_quoted(source, i, c)
+            emit(source[i:j])
+            last, last_word, i = c, '', j
+            continue
+
+        if c == '/' and (not last or last in _REGEX_PRECEDERS or last_word in _REGEX_KEYWORDS):
+            j = _scan_regex(source, i)
+            emit(source[i:j])
+            last, last_word, i = '/', '', j
+            continue
+
+        if _is_word_char(c) or (c == '.' and source[i + 1:i + 2].isdigit()):
+            j = i + 1
+            while j < n and (_is_word_char(source[j]) or (source[j] == '.' and source[i].isdigit())):
+                j += 1
+            word = source[i:j]
+            emit(word)
+            last, last_word, i = word[-1], word, j
+            continue
+
+        if template_depth:
+            if c == '{':
+                template_depth[-1] += 1
+            elif c == '}':
+                template_depth[-1] -= 1
+        emit(c)
+        last, last_word, i = c, '', i + 1
+
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source: str) -> str:
+    """
+    CSS-minifiering: kommentarer bort, blanksteg ihop, inga blanksteg runt { } ; , och sista ; före }.
+
+    Args:
+        source: CSS-källkod
+
+    Returns:
+        str: Minifierad CSS
+    """
+    out: List[str] = []
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c in '"\'':
+            j = _scan_quoted(source, i, c)
+            out.append(source[i:j])
+            i = j
+        elif c == '/' and source[i + 1:i + 2] == '*':
+            j = source.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            out.append(' ')
+        elif c.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            out.append(' ')
+        else:
+            out.append(c)
+            i += 1
+
+    css = ''.join(out)
+    # Strängar är redan skyddade ovan men kan innehålla tecknen nedan - dela upp på dem
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', css)
+    for index in range(0, len(parts), 2):
+        part = re.sub(r' +', ' ', parts[index])
+        part = re.sub(r' ?([{};,]) ?', r'\1', part)
+        parts[index] = part.replace(';}', '}')
+    return ''.join(parts).strip() + '\n'
+
+
+# === BYGGE ===
+
+def _hashed_name(name: str, data: bytes) -> str:
+    """'dashboard.js' + innehåll -> 'dashboard.<12 hex>.js'."""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix='.asset-', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _rewrite_css_urls(css: str, source: str, fonts: Dict[str, str]) -> str:
+    """
+    Peka om relativa url() i en CSS-källa till hashade kopior i bygget.
+
+    Args:
+        css: CSS-innehåll
+        source: Källans sökväg relativt static/
+        fonts: Fylls med källsökväg (relativt static/) -> hashat filnamn
+
+    Returns:
+        str: CSS med url(/dist/<hashat namn>) för filer som finns lokalt
+    """
+    base = posixpath.dirname(source)
+
+    def replace(match: 're.Match') -> str:
+        url = match.group(2).strip()
+        if url.startswith(('data:', 'http:', 'https:', '/', '#')):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(posixpath.join(base, path))
+        full_path = os.path.join(STATIC_DIR, *resolved.split('/'))
+        if not os.path.isfile(full_path):
+            return match.group(0)
+        if resolved not in fonts:
+            with open(full_path, 'rb') as f:
+                fonts[resolved] = _hashed_name(posixpath.basename(resolved), f.read())
+        return f"url({ASSET_URL_PREFIX}/{fonts[resolved]}{suffix})"
+
+    return _CSS_URL.sub(replace, css)
+
+
+def _build_key(settings: Dict[str, Any]) -> str:
+    """Hash av alla källfiler och inställningar - samma nyckel = samma bygge."""
+    digest = hashlib.sha256(json.dumps({'minify': settings['minify'], 'bundles': BUNDLES,
+                                        'sprites': SPRITES}).encode('utf-8'))
+    sources = [source for bundle_sources in BUNDLES.values() for source in bundle_sources]
+    for directory in SPRITES.values():
+        for root_dir, dirs, files in os.walk(os.path.join(STATIC_DIR, *directory.split('/'))):
+            dirs.sort()
+            sources.extend(os.path.relpath(os.path.join(root_dir, name), STATIC_DIR).replace(os.sep, '/')
+                           for name in sorted(files) if name.endswith('.svg'))
+    for source in sources:
+        path = os.path.join(STATIC_DIR, *source.split('/'))
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            digest.update(f"{source}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_manifest(output_dir: str, key: str) -> Optional[Dict[str, Any]]:
+    """Föregående bygges manifest om det gäller samma källor och alla filer finns kvar."""
+    try:
+        with open(os.path.join(output_dir, _MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('key') != key:
+        return None
+    if not all(os.path.isfile(os.path.join(output_dir, name)) for name in manifest.get('files', {})):
+        return None
+    return manifest
+
+
+def _remove_old_files(output_dir: str, keep: set, keep_old_hours: float) -> None:
+    """Ta bort gamla hashade filer (sidor som redan laddats kan behöva dem en stund)."""
+    cutoff = time.time() - keep_old_hours * 3600
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name in keep or name == _MANIFEST_FILE or name.startswith('.'):
+            continue
+        base = name[:-3] if name.endswith('.gz') else name
+        if base in keep:
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _write_output(output_dir: str, name: str, data: bytes) -> Tuple[str, int]:
+    """Skriv hashad fil + .gz-kopia. Returnerar (hashat namn, gzip-storlek)."""
+    hashed = _hashed_name(name, data)
+    gz_data = gzip.compress(data, 9, mtime=0)
+    _write_atomic(os.path.join(output_dir, hashed), data)
+    _write_atomic(os.path.join(output_dir, hashed + '.gz'), gz_data)
+    return hashed, len(gz_data)
+
+
+def _build(settings: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Bygg alla buntar, sprites och typsnitt till output_dir. Returnerar manifestet."""
+    output_dir = settings['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+
+    fonts: Dict[str, str] = {}
+    bundles: Dict[str, Dict[str, Any]] = {}
+    files: Dict[str, str] = {}
+
+    for name, sources in BUNDLES.items():
+        is_css = name.endswith('.css')
+        parts = []
+        used = []
+        for source in sources:
+            path = os.path.join(STATIC_DIR, *source.split('/'))
+            if not os.path.isfile(path):
+                if source in OPTIONAL_SOURCES:
+                    continue
+                raise FileNotFoundError(f"Källfil saknas för {name}: static/{source}")
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            if is_css:
+                text = _rewrite_css_urls(text, source, fonts)
+                text = minify_css(text) if settings['minify'] else text
+            else:
+                # Varje fil avslutas med ; så att sammanslagningen inte ändrar tolkningen
+                text = (minify_js(text) if settings['minify'] else text).rstrip() + '\n;\n'
+            parts.append(f"/* {source} */\n{text}" if not settings['minify'] else text)
+            used.append(source)
+
+        data = ''.join(parts).encode('utf-8')
+        hashed, gzip_bytes = _write_output(output_dir, name, data)
+        bundles[name] = {'file': hashed, 'sources': used, 'bytes': len(data), 'gzip_bytes': gzip_bytes}
+        files[hashed] = name
+
+    sprites: Dict[str, Dict[str, Any]] = {}
+    for set_name, directory in SPRITES.items():
+        exclude = [posixpath.relpath(path, directory) for path in SPRITE_EXCLUDE if path.startswith(directory + '/')]
+        sprite = build_sprite(set_name, os.path.join(STATIC_DIR, *directory.split('/')), minify_css, exclude)
+        if not sprite['symbols']:
+            continue
+        data = sprite['svg'].encode('utf-8')
+        hashed, gzip_bytes = _write_output(output_dir, f"{set_name}-sprite.svg", data)
+        sprites[set_name] = {'file': hashed, 'symbols': len(sprite['symbols']),
+                             'bytes': len(data), 'gzip_bytes': gzip_bytes}
+        files[hashed] = directory
+
+    for source, hashed in fonts.items():
+        target = os.path.join(output_dir, hashed)
+        shutil.copyfile(os.path.join(STATIC_DIR, *source.split('/')), target)
+        if not hashed.endswith(_NO_GZIP):
+            with open(target, 'rb') as f:
+                _write_atomic(target + '.gz', gzip.compress(f.read(), 9, mtime=0))
+        files[hashed] = source
+
+    manifest = {'key': key, 'bundles': bundles, 'sprites': sprites, 'files': files}
+    _write_atomic(os.path.join(output_dir, _MANIFEST_FILE),
+                  json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    _remove_old_files(output_dir, set(files), settings['keep_old_hours'])
+    return manifest
+
+
+def build_assets(config: Optional[Dict[str, Any]]) -> bool:
+    """
+    Bygg (eller återanvänd) asset-buntarna - anropas vid start och när assets-config ändras.
+
+    Vid fel serveras de enskilda filerna från /static som tidigare.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        bool: True om buntarna kan användas
+    """
+    settings = get_assets_config(config)
+    with _asset_lock:
+        _asset_state['enabled'] = False
+        if not settings['enabled']:
+            _asset_state.update({'bundles': {}, 'sprites': {}, 'files': {}, 'error': None})
+            logger.info("📦 Asset-buntar avstängda - enskilda filer från /static")
+            return False
+
+        start = time.perf_counter()
+        try:
+            key = _build_key(settings)
+            manifest = _load_manifest(settings['output_dir'], key)
+            reused = manifest is not None
+            if not reused:
+                manifest = _build(settings, key)
+        except Exception as e:
+            _asset_state.update({'bundles': {}, 'sprites': {}, 'files': {}, 'error': f"{type(e).__name__}: {e}"})
+            logger.error(f"❌ Kunde inte bygga asset-buntar ({e}) - enskilda filer från /static används")
+            return False
+
+        build_ms = (time.perf_counter() - start) * 1000
+        _asset_state.update({
+            'enabled': True,
+            'dir': settings['output_dir'],
+            'bundles': manifest['bundles'],
+            'sprites': manifest.get('sprites', {}),
+            'files': manifest['files'],
+            'font_awesome_bundled': FONT_AWESOME_CSS in manifest['bundles'].get('dashboard.css', {}).get('sources', []),
+            'reused': reused,
+            'built_at': time.time(),
+            'build_ms': round(build_ms, 1),
+            'error': None,
+        })
+
+    summary = ', '.join(f"{bundle['file']} ({bundle['gzip_bytes'] / 1024:.0f} kB gz)"
+                        for bundle in list(manifest['bundles'].values()) + list(_asset_state['sprites'].values()))
+    logger.info(f"📦 Asset-buntar {'återanvända' if reused else 'byggda'} på {build_ms:.0f} ms: {summary}")
+    if not _asset_state['font_awesome_bundled']:
+        logger.info("📦 Font Awesome hämtas från CDN - kör 'python3 -m core.assets vendor' för offline-drift")
+    return True
+
+
+def get_template_assets() -> Dict[str, Any]:
+    """
+    URL:er för index.html (Jinja context processor).
+
+    Returns:
+        dict: 'bundles' (bunt -> /dist-URL, tom om avstängt), 'sprites' (ikon-set -> /dist-URL)
+              och 'font_awesome' (separat stilmall för Font Awesome, None om den ingår i CSS-bunten)
+    """
+    enabled = _asset_state['enabled']
+    bundles = {name: f"{ASSET_URL_PREFIX}/{bundle['file']}"
+               for name, bundle in _asset_state['bundles'].items()} if enabled else {}
+    sprites = {name: f"{ASSET_URL_PREFIX}/{sprite['file']}"
+               for name, sprite in _asset_state['sprites'].items()} if enabled else {}
+
+    if bundles and _asset_state['font_awesome_bundled']:
+        font_awesome = None
+    elif os.path.isfile(os.path.join(STATIC_DIR, *FONT_AWESOME_CSS.split('/'))):
+        font_awesome = f"/static/{FONT_AWESOME_CSS}"
+    else:
+        font_awesome = f"{FONT_AWESOME_CDN}/css/all.min.css"
+
+    return {'bundles': bundles, 'sprites': sprites, 'font_awesome': font_awesome}
+
+
+def get_shell_urls() -> List[str]:
+    """
+    Alla filer som sidan laddar från servern - precachas av service workern.
+
+    Returns:
+        list: /dist-URL:er för aktuellt bygge (buntar, sprites, typsnitt),
+              eller /static-URL:er för de enskilda filerna om buntarna är avstängda
+    """
+    if _asset_state['enabled']:
+        return [f"{ASSET_URL_PREFIX}/{name}" for name in sorted(_asset_state['files'])]
+
+    urls = [f"/static/{source}" for sources in BUNDLES.values() for source in sources
+            if source not in OPTIONAL_SOURCES or os.path.isfile(os.path.join(STATIC_DIR, *source.split('/')))]
+    return list(dict.fromkeys(urls))
+
+
+def resolve_asset(filename: str, accept_gzip: bool) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    Filen bakom en /dist-URL.
+
+    Bara filer från aktuellt (eller äldre, ännu ej städat) bygge serveras -
+    inga godtyckliga sökvägar.
+
+    Args:
+        filename: Hashat filnamn från URL:en
+        accept_gzip: Klienten accepterar gzip
+
+    Returns:
+        tuple: (sökväg, mimetype, content-encoding eller None) eller None om okänd
+    """
+    output_dir = _asset_state['dir']
+    if not output_dir or '/' in filename or '\\' in filename or filename.startswith('.') or filename == _MANIFEST_FILE:
+        return None
+
+    path = os.path.join(output_dir, filename)
+    if not os.path.isfile(path):
+        return None
+
+    mimetype = MIMETYPES.get(os.path.splitext(filename)[1], 'application/octet-stream')
+    if accept_gzip and os.path.isfile(path + '.gz'):
+        return path + '.gz', mimetype, 'gzip'
+    return path, mimetype, None
+
+
+def get_assets_status() -> Dict[str, Any]:
+    """
+    Status för /api/status.
+
+    Returns:
+        dict: Buntar med storlek, byggtid och ev. fel
+    """
+    return {
+        'enabled': _asset_state['enabled'],
+        'bundles': {name: {key: bundle[key] for key in ('file', 'bytes', 'gzip_bytes')}
+                    for name, bundle in _asset_state['bundles'].items()},
+        'sprites': _asset_state['sprites'],
+        'font_awesome_bundled': _asset_state['font_awesome_bundled'],
+        'reused': _asset_state['reused'],
+        'build_ms': _asset_state['build_ms'],
+        'error': _asset_state['error'],
+    }
+
+
+# === VENDOR: FONT AWESOME LOKALT ===
+
+def vendor_font_awesome() -> bool:
+    """
+    Hämta Font Awesome (CSS + webfonts) från cdnjs till static/assets/vendor/.
+
+    Körs manuellt en gång (kräver internet) - därefter ingår Font Awesome
+    i CSS-bunten och dashboarden behöver inga externa anrop.
+
+    Returns:
+        bool: True om allt hämtades
+    """
+    import requests
+
+    css_path = os.path.join(STATIC_DIR, *FONT_AWESOME_CSS.split('/'))
+    vendor_dir = os.path.dirname(os.path.dirname(css_path))
+
+    response = requests.get(f"{FONT_AWESOME_CDN}/css/all.min.css", timeout=30)
+    response.raise_for_status()
+    css = response.text
+
+    fonts = sorted({match.group(2).split('?')[0].split('#')[0] for match in _CSS_URL.finditer(css)
+                    if not match.group(2).startswith(('data:', 'http:', 'https:', '/'))})
+    for relative in fonts:
+        target = os.path.normpath(os.path.join(os.path.dirname(css_path), relative))
+        if not target.startswith(vendor_dir + os.sep):
+            continue
+        font_response = requests.get(f"{FONT_AWESOME_CDN}/css/{relative}", timeout=30)
+        font_response.raise_for_status()
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(font_response.content)
+        print(f"  ✅ {os.path.relpath(target, STATIC_DIR)} ({len(font_response.content) / 1024:.0f} kB)")
+
+    os.makedirs(os.path.dirname(css_path), exist_ok=True)
+    with open(css_path, 'w', encoding='utf-8') as f:
+        f.write(css)
+    print(f"  ✅ {FONT_AWESOME_CSS}")
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m core.assets', description='Asset-buntar för dashboarden')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help='Bygg buntarna (görs annars vid start)')
+    subparsers.add_parser('vendor', help=f'Hämta Font Awesome {FONT_AWESOME_VERSION} till static/assets/vendor/')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.command == 'vendor':
+        print(f"📥 Hämtar Font Awesome {FONT_AWESOME_VERSION} från cdnjs...")
+        vendor_font_awesome()
+        return 0
+
+    from .config_manager import load_config
+    if not build_assets(load_config()):
+        return 1
+    status = get_assets_status()
+    for name, bundle in list(status['bundles'].items()) + list(status['sprites'].items()):
+        print(f"  📦 {name}: {bundle['file']} ({bundle['bytes'] / 1024:.0f} kB, {bundle['gzip_bytes'] / 1024:.0f} kB gz)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,13 +4,24 @@ Flask Weather Dashboard - Konfigurationshantering
 FAS 2: Refaktorering - All config-hantering centraliserad
 """
 
+import importlib.util
 import json
+import logging
 import os
 import sys
 from typing import Dict, Any, Optional
 
 from .weather_state import update_weather_state
 
+# Vädersymbol-tabellerna ligger bland klienterna i reference/data
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data'))
+import weather_symbols
+
+logger = logging.getLogger(__name__)
+
+# Filen som den aktiva konfigurationen lästes från (config.py eller config.json)
+_config_source: Dict[str, Optional[str]] = {'path': None}
+
 
 def load_config() -> Optional[Dict[str, Any]]:
     """
@@ -26,43 +37,41 @@ def load_config() -> Optional[Dict[str, Any]]:
             sys.path.insert(0, reference_path)
         
         # Importera CONFIG från config.py
+        import config as config_module
         from config import CONFIG
+        _config_source['path'] = os.path.abspath(config_module.__file__)
         
-        print(f"✅ Konfiguration laddad från config.py")
-        print(f"📍 Plats: {CONFIG['display']['location_name']}")
-        print(f"🌬️ Vindenheter: {CONFIG['ui']['wind_unit']}")
-        print(f"🎨 Tema: {CONFIG['ui']['theme']}")
+        logger.info(f"✅ Konfiguration laddad från config.py")
+        logger.info(f"📍 Plats: {CONFIG['display']['location_name']}")
+        logger.info(f"🌬️ Vindenheter: {CONFIG['ui']['wind_unit']}")
+        logger.info(f"🎨 Tema: {CONFIG['ui']['theme']}")
         
-        # FAS 2: Läs use_netatmo från config
+        # FAS 2: Läs use_netatmo och WeatherEffects från config
+        apply_config_flags(CONFIG)
         use_netatmo = CONFIG.get('use_netatmo', True)
-        update_weather_state('use_netatmo', use_netatmo)
-        print(f"🧠 FAS 2: Netatmo-läge: {'AKTIVT' if use_netatmo else 'INAKTIVT (SMHI-only)'}")
+        logger.info(f"🧠 FAS 2: Netatmo-läge: {'AKTIVT' if use_netatmo else 'INAKTIVT (SMHI-only)'}")
         
-        # FAS 2: WeatherEffects config-läsning
         weather_effects_config = CONFIG.get('weather_effects', {})
         weather_effects_enabled = weather_effects_config.get('enabled', False)
-        update_weather_state('weather_effects_enabled', weather_effects_enabled)
-        update_weather_state('weather_effects_config', weather_effects_config)
-        
-        print(f"🌦️ FAS 2: WeatherEffects: {'AKTIVERAT' if weather_effects_enabled else 'INAKTIVERAT'}")
+        logger.info(f"🌦️ FAS 2: WeatherEffects: {'AKTIVERAT' if weather_effects_enabled else 'INAKTIVERAT'}")
         if weather_effects_enabled:
             rain_count = weather_effects_config.get('rain_config', {}).get('droplet_count', 50)
             snow_count = weather_effects_config.get('snow_config', {}).get('flake_count', 25)
             intensity = weather_effects_config.get('intensity', 'auto')
-            print(f"   🌧️ Regn: {rain_count} droppar, ❄️ Snö: {snow_count} flingor, 🎚️ Intensitet: {intensity}")
+            logger.info(f"   🌧️ Regn: {rain_count} droppar, ❄️ Snö: {snow_count} flingor, 🎚️ Intensitet: {intensity}")
         
         return CONFIG
         
     except ImportError as e:
-        print(f"❌ Kunde inte importera config.py: {e}")
-        print("🔧 Kontrollera att reference/config.py finns och har giltigt CONFIG dict")
+        logger.error(f"❌ Kunde inte importera config.py: {e}")
+        logger.info("🔧 Kontrollera att reference/config.py finns och har giltigt CONFIG dict")
         
         # Fallback till JSON om config.py inte finns
-        print("🔄 Försöker fallback till config.json...")
+        logger.info("🔄 Försöker fallback till config.json...")
         return load_config_json_fallback()
         
     except Exception as e:
-        print(f"❌ Oväntat fel vid config.py-läsning: {e}")
+        logger.error(f"❌ Oväntat fel vid config.py-läsning: {e}")
         return None
 
 
@@ -79,32 +88,83 @@ def load_config_json_fallback() -> Optional[Dict[str, Any]]:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
         
-        print(f"⚠️ Fallback: Konfiguration laddad från {config_path}")
-        print("💡 TIP: Skapa reference/config.py för bättre kommentarer!")
+        logger.warning(f"⚠️ Fallback: Konfiguration laddad från {config_path}")
+        logger.info("💡 TIP: Skapa reference/config.py för bättre kommentarer!")
+        
+        _config_source['path'] = os.path.abspath(config_path)
         
         # FAS 2: Fallback till False för weather_effects om det saknas i JSON
+        apply_config_flags(config)
         use_netatmo = config.get('use_netatmo', True)
-        weather_effects_config = config.get('weather_effects', {})
-        weather_effects_enabled = weather_effects_config.get('enabled', False)
-        
-        update_weather_state('use_netatmo', use_netatmo)
-        update_weather_state('weather_effects_enabled', weather_effects_enabled)
-        update_weather_state('weather_effects_config', weather_effects_config)
+        weather_effects_enabled = config.get('weather_effects', {}).get('enabled', False)
         
-        print(f"🧠 FAS 2: Netatmo-läge (fallback): {'AKTIVT' if use_netatmo else 'INAKTIVT'}")
-        print(f"🌦️ FAS 2: WeatherEffects (fallback): {'AKTIVERAT' if weather_effects_enabled else 'INAKTIVERAT'}")
+        logger.info(f"🧠 FAS 2: Netatmo-läge (fallback): {'AKTIVT' if use_netatmo else 'INAKTIVT'}")
+        logger.info(f"🌦️ FAS 2: WeatherEffects (fallback): {'AKTIVERAT' if weather_effects_enabled else 'INAKTIVERAT'}")
         
         return config
         
     except FileNotFoundError:
-        print(f"❌ Varken config.py eller config.json hittades!")
-        print(f"🔧 Skapa antingen reference/config.py eller {config_path}")
+        logger.error(f"❌ Varken config.py eller config.json hittades!")
+        logger.info(f"🔧 Skapa antingen reference/config.py eller {config_path}")
         return None
     except json.JSONDecodeError as e:
-        print(f"❌ JSON-fel i fallback config.json: {e}")
+        logger.error(f"❌ JSON-fel i fallback config.json: {e}")
         return None
 
 
+def apply_config_flags(config: Dict[str, Any]) -> None:
+    """
+    Sätt de weather_state-flaggor som härleds direkt ur config.
+    
+    Args:
+        config (dict): Applikationskonfiguration
+    """
+    weather_effects_config = config.get('weather_effects', {})
+    update_weather_state('use_netatmo', config.get('use_netatmo', True))
+    update_weather_state('weather_effects_enabled', weather_effects_config.get('enabled', False))
+    update_weather_state('weather_effects_config', weather_effects_config)
+
+
+def get_config_path() -> Optional[str]:
+    """
+    Sökväg till filen som aktiv config lästes från.
+    
+    Returns:
+        str: Absolut sökväg, eller None om ingen config laddats
+    """
+    return _config_source['path']
+
+
+def read_config_file(path: str) -> Dict[str, Any]:
+    """
+    Läs en config-fil på nytt utan att röra den importerade modulen.
+    
+    Args:
+        path: config.py (CONFIG-dict) eller config.json
+        
+    Returns:
+        dict: Ny konfiguration
+        
+    Raises:
+        Exception: Syntaxfel, saknad CONFIG eller ogiltig JSON
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    else:
+        spec = importlib.util.spec_from_file_location('_config_reload_candidate', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        config = getattr(module, 'CONFIG', None)
+    
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} saknar CONFIG-dict")
+    for section in ('smhi', 'ui', 'display'):
+        if not isinstance(config.get(section), dict):
+            raise ValueError(f"{path} saknar sektionen '{section}'")
+    return config
+
+
 def validate_weather_effects_config(config_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
     FAS 2: Validera WeatherEffects-konfiguration med robust error handling.
@@ -146,7 +206,7 @@ def validate_weather_effects_config(config_data: Optional[Dict[str, Any]]) -> Di
     }
     
     if not config_data or not isinstance(config_data, dict):
-        print("⚠️ Ogiltig WeatherEffects-config, använder default")
+        logger.warning("⚠️ Ogiltig WeatherEffects-config, använder default")
         return default_config
     
     # Deep merge med default config
@@ -166,7 +226,7 @@ def validate_weather_effects_config(config_data: Optional[Dict[str, Any]]) -> Di
         # Intensitet
         valid_intensities = ['auto', 'light', 'medium', 'heavy']
         if validated_config['intensity'] not in valid_intensities:
-            print(f"⚠️ Ogiltig intensitet '{validated_config['intensity']}', använder 'auto'")
+            logger.warning(f"⚠️ Ogiltig intensitet '{validated_config['intensity']}', använder 'auto'")
             validated_config['intensity'] = 'auto'
         
         # Rain config validering
@@ -193,14 +253,18 @@ def validate_weather_effects_config(config_data: Optional[Dict[str, Any]]) -> Di
         if not isinstance(snow_config.get('characters'), list) or len(snow_config['characters']) == 0:
             snow_config['characters'] = ['*', '+']
         
+        # LP156WH4: Målframerate för canvas-renderarens frame-governor
+        lp_config = validated_config['lp156wh4_optimizations']
+        lp_config['target_fps'] = max(15, min(60, int(lp_config.get('target_fps', 60))))
+        
         # Transition duration
         validated_config['transition_duration'] = max(500, min(3000, int(validated_config.get('transition_duration', 1000))))
         
-        print("✅ WeatherEffects-konfiguration validerad")
+        logger.info("✅ WeatherEffects-konfiguration validerad")
         
     except (ValueError, TypeError) as e:
-        print(f"⚠️ Fel vid WeatherEffects config-validering: {e}")
-        print("🔄 Använder säkra default-värden")
+        logger.warning(f"⚠️ Fel vid WeatherEffects config-validering: {e}")
+        logger.info("🔄 Använder säkra default-värden")
     
     return validated_config
 
@@ -215,22 +279,7 @@ def get_smhi_weather_effect_type(weather_symbol: int) -> str:
     Returns:
         str: WeatherEffects-typ ('rain', 'snow', 'sleet', 'thunder', 'clear')
     """
-    if not isinstance(weather_symbol, (int, float)) or weather_symbol < 1 or weather_symbol > 27:
-        return 'clear'
-    
-    symbol = int(weather_symbol)
-    
-    # SMHI symbol mapping
-    if symbol in [8, 9, 10, 18, 19, 20]:          # Regnskurar och regn
-        return 'rain'
-    elif symbol in [15, 16, 17, 25, 26, 27]:      # Snöbyar och snöfall
-        return 'snow'
-    elif symbol in [12, 13, 14, 22, 23, 24]:      # Snöblandat regn
-        return 'sleet'
-    elif symbol in [11, 21]:                      # Åska
-        return 'thunder'
-    else:                                         # Klart väder (1-7)
-        return 'clear'
+    return weather_symbols.effect_type(weather_symbol)
 
 
 def get_current_theme(config: Optional[Dict[str, Any]] = None) -> str:
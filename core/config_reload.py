@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Omladdning av config utan omstart
+Ett schemalagt jobb bevakar config-filens mtime. Vid ändring läses filen
+på nytt, jämförs med aktiv config och bara det som påverkas byggs om.
+
+En omstart av processen tappar alla cacher och kräver en kall hämtning
+plus ny Netatmo-autentisering. Här ersätts bara t.ex. SMHI-klienten när
+koordinaterna ändras eller jobben när ett intervall ändras - övriga
+klienter behåller cacher, tokens och trycktrend-historik. En config med
+syntaxfel loggas och ignoreras (den gamla fortsätter gälla).
+
+Varje worker laddar om själv (teman, loggning, viloläge); klienter och
+jobb byggs bara om i den worker som äger datainsamlingen.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .assets import build_assets
+from .config_manager import apply_config_flags, get_config_path, read_config_file
+from .demand import init_demand
+from .leader_election import is_ingestion_owner
+from .logging_setup import setup_logging, rate_limited
+from .scheduler import add_job, start_scheduler
+from .tracing import init_tracing
+from .weather_state import get_weather_state, update_weather_state, get_api_client
+
+logger = logging.getLogger(__name__)
+
+# Ändringar som inte kan tillämpas under drift
+RESTART_REQUIRED = ('deployment', 'scheduler.max_workers')
+
+# Omladdningsstate för denna process
+_reload_state: Dict[str, Any] = {
+    'path': None,
+    'mtime_ns': None,
+    'reloads': 0,
+    'last_reload': None,
+    'last_changes': [],
+    'last_actions': [],
+    'restart_required': [],
+    'last_error': None,
+}
+_reload_lock = threading.Lock()
+
+
+def get_config_reload_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta omladdnings-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett config_reload-konfiguration
+    """
+    reload_config = (config or {}).get('config_reload', {})
+
+    return {
+        'enabled': reload_config.get('enabled', True),
+        'poll_seconds': max(1.0, float(reload_config.get('poll_seconds', 5))),
+    }
+
+
+def diff_config(old: Any, new: Any, prefix: str = '') -> List[str]:
+    """
+    Jämför två config-dicts.
+
+    'comment'-nycklar ignoreras. Listor och värden jämförs i sin helhet.
+
+    Args:
+        old: Aktiv config (eller del av den)
+        new: Ny config
+        prefix: Sökväg hit (används rekursivt)
+
+    Returns:
+        list: Ändrade sökvägar, t.ex. ['smhi.latitude', 'ui.theme']
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return [] if old == new else [prefix]
+
+    changes = []
+    for key in sorted(set(old) | set(new), key=str):
+        if key == 'comment':
+            continue
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if key not in old or key not in new:
+            changes.append(path)
+        else:
+            changes.extend(diff_config(old[key], new[key], path))
+    return changes
+
+
+def changed_under(changes: List[str], *prefixes: str) -> List[str]:
+    """
+    Ändringar som rör något av prefixen (även när hela sektionen lagts till/tagits bort).
+
+    Args:
+        changes: Sökvägar från diff_config()
+        *prefixes: T.ex. 'smhi' eller 'ui.refresh_interval_minutes'
+
+    Returns:
+        list: Matchande ändringar
+    """
+    return [change for change in changes
+            if any(change == prefix or change.startswith(prefix + '.') or prefix.startswith(change + '.')
+                   for prefix in prefixes)]
+
+
+def apply_config(new_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Byt till en ny config och bygg om det som påverkas.
+
+    Args:
+        new_config (dict): Ny konfiguration
+
+    Returns:
+        dict: 'changes', 'actions' och 'restart_required'
+    """
+    old_config = get_weather_state()['config'] or {}
+    changes = diff_config(old_config, new_config)
+    if not changes:
+        return {'changes': [], 'actions': [], 'restart_required': []}
+
+    restart_required = changed_under(changes, *RESTART_REQUIRED)
+    actions = ['config']
+
+    update_weather_state('config', new_config)
+    apply_config_flags(new_config)
+
+    # Per worker
+    if changed_under(changes, 'logging'):
+        setup_logging(new_config)
+        actions.append('logging')
+    if changed_under(changes, 'diagnostics.trace_buffer_size', 'diagnostics.slow_cycle_seconds'):
+        init_tracing(new_config)
+        actions.append('tracing')
+    if changed_under(changes, 'demand', 'deployment.runtime_dir'):
+        init_demand(new_config)
+        actions.append('demand')
+    if changed_under(changes, 'assets', 'deployment.runtime_dir'):
+        build_assets(new_config)
+        actions.append('assets')
+
+    # Klienter, datakällor och jobb - bara där datainsamlingen körs
+    if is_ingestion_owner() and get_api_client('smhi_client') is not None:
+        from .weather_updater import apply_config_changes
+        actions.extend(apply_config_changes(new_config, changes))
+
+    logger.info(f"🔁 Config omladdad: {', '.join(changes)} → {', '.join(actions)}")
+    if restart_required:
+        logger.warning(f"⚠️ Kräver omstart för att gälla: {', '.join(restart_required)}")
+
+    return {'changes': changes, 'actions': actions, 'restart_required': restart_required}
+
+
+def check_config_file(force: bool = False) -> bool:
+    """
+    Schemalagt jobb: ladda om config om filen ändrats.
+
+    Args:
+        force: Läs om även om mtime är oförändrad
+
+    Returns:
+        bool: Alltid True (en trasig config ska inte ge backoff på bevakningen)
+    """
+    path = _reload_state['path']
+    if not path:
+        return True
+
+    with _reload_lock:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"⚠️ Kan inte läsa {path}: {e}", extra=rate_limited(300))
+            return True
+
+        if mtime_ns == _reload_state['mtime_ns'] and not force:
+            return True
+        _reload_state['mtime_ns'] = mtime_ns
+
+        try:
+            new_config = read_config_file(path)
+        except Exception as e:
+            # Behåll aktiv config - t.ex. halvsparad fil eller syntaxfel
+            _reload_state['last_error'] = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Ny config ignoreras ({path}): {e}")
+            return True
+
+        try:
+            result = apply_config(new_config)
+        except Exception as e:
+            _reload_state['last_error'] = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Fel vid tillämpning av ny config: {e}")
+            return True
+
+        _reload_state['last_error'] = None
+        if result['changes']:
+            _reload_state['reloads'] += 1
+            _reload_state['last_reload'] = time.time()
+            _reload_state['last_changes'] = result['changes']
+            _reload_state['last_actions'] = result['actions']
+            _reload_state['restart_required'] = result['restart_required']
+    return True
+
+
+def init_config_reload(config: Dict[str, Any]) -> bool:
+    """
+    Starta bevakningen av config-filen (anropas i alla workers).
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        bool: True om bevakning startades
+    """
+    settings = get_config_reload_config(config)
+    path = get_config_path()
+    if not settings['enabled'] or not path:
+        return False
+
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+    _reload_state['path'] = path
+    _reload_state['mtime_ns'] = mtime_ns
+
+    add_job('config_watch', check_config_file, settings['poll_seconds'],
+            description=f"Laddar om {os.path.basename(path)} vid ändring")
+    start_scheduler(config)
+    logger.info(f"🔁 Bevakar {path} (var {settings['poll_seconds']:.0f}s) - ändringar gäller utan omstart")
+    return True
+
+
+def get_config_reload_status() -> Dict[str, Any]:
+    """
+    Status för /api/status och /api/config/reload.
+
+    Returns:
+        dict: Bevakad fil, antal omladdningar och senaste ändringar
+    """
+    last_reload = _reload_state['last_reload']
+    return {
+        'watching': _reload_state['path'],
+        'reloads': _reload_state['reloads'],
+        'last_reload': datetime.fromtimestamp(last_reload).isoformat(timespec='seconds') if last_reload else None,
+        'last_changes': _reload_state['last_changes'],
+        'last_actions': _reload_state['last_actions'],
+        'restart_required': _reload_state['restart_required'],
+        'last_error': _reload_state['last_error'],
+    }
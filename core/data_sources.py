@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Register över datakällor
+Varje källa deklarerar sin TTL, vilka weather_state-nycklar den fyller och
+vilka andra källor den bygger på.
+
+Uppdateringsjobbet anropar refresh_due_sources() och registret hämtar bara
+de källor vars data faktiskt gått ut: soltider en gång per dygn,
+luftfuktighet en gång i timmen, SMHI-prognosen var 15:e minut. En källa
+uppdateras också när någon av dess beroenden just uppdaterats (t.ex.
+aktuellt väder när ny luftfuktighet finns). Nya leverantörer registreras
+med register_data_source() utan att uppdateringsfunktionen behöver ändras.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+from .tracing import span
+from .weather_state import update_weather_state
+
+logger = logging.getLogger(__name__)
+
+# Utfall per källa och körning
+OUTCOME_REFRESHED = 'refreshed'
+OUTCOME_FRESH = 'fresh'
+OUTCOME_FAILED = 'failed'
+OUTCOME_DISABLED = 'disabled'
+OUTCOME_BUSY = 'busy'           # Uppdateras redan av ett annat jobb
+
+# Källor som går ut inom så här många sekunder hämtas redan nu. Jobben har
+# jitter, så en källa med samma TTL som jobbets intervall skulle annars
+# ibland vara några sekunder från att gå ut och missa en hel cykel.
+DEFAULT_EARLY_REFRESH_SECONDS = 60
+
+
+class DataSource:
+    """En datakälla och dess uppdateringshistorik."""
+
+    def __init__(self, name: str, refresh: Callable[[], bool], outputs: Iterable[str],
+                 ttl_seconds: float, depends_on: Iterable[str] = (),
+                 expires_at: Optional[Callable[[float], float]] = None,
+                 enabled: Optional[Callable[[], bool]] = None,
+                 critical: bool = False, description: str = ''):
+        """
+        Args:
+            name: Unikt källnamn, t.ex. 'smhi_forecast'
+            refresh: Hämtar data och skriver outputs till weather_state; False = misslyckades
+            outputs: weather_state-nycklar som källan äger
+            ttl_seconds: Hur länge hämtad data gäller
+            depends_on: Källor som ska vara uppdaterade före denna
+            expires_at: Valfri funktion (senaste lyckade epoch -> utgångstid), t.ex. midnatt
+            enabled: Valfri funktion; avstängd källa hoppas över och dess nycklar nollställs
+            critical: Misslyckad kritisk källa gör hela uppdateringen misslyckad (backoff)
+            description: Beskrivning för statusvyn
+        """
+        self.name = name
+        self.refresh = refresh
+        self.outputs = tuple(outputs)
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.depends_on = tuple(depends_on)
+        self.expires_at_func = expires_at
+        self.enabled = enabled
+        self.critical = critical
+        self.description = description
+
+        self.last_success: Optional[float] = None
+        self.last_attempt: Optional[float] = None
+        self.last_outcome: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.stale = False
+        self._lock = threading.Lock()
+
+    def is_enabled(self) -> bool:
+        return self.enabled is None or bool(self.enabled())
+
+    def expires_at(self) -> Optional[float]:
+        """Epoch då datan går ut (None = aldrig hämtad)."""
+        if self.last_success is None:
+            return None
+        expiry = self.last_success + self.ttl_seconds
+        if self.expires_at_func is not None:
+            expiry = min(expiry, self.expires_at_func(self.last_success))
+        return expiry
+
+    def is_expired(self, now: float, early_seconds: float = 0.0) -> bool:
+        expiry = self.expires_at()
+        return self.stale or expiry is None or now >= expiry - early_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        def _iso(epoch: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(epoch).isoformat(timespec='seconds') if epoch else None
+
+        return {
+            'name': self.name,
+            'description': self.description,
+            'outputs': list(self.outputs),
+            'depends_on': list(self.depends_on),
+            'ttl_seconds': self.ttl_seconds,
+            'critical': self.critical,
+            'enabled': self.is_enabled(),
+            'last_success': _iso(self.last_success),
+            'last_attempt': _iso(self.last_attempt),
+            'expires_at': _iso(self.expires_at()),
+            'last_outcome': self.last_outcome,
+            'last_error': self.last_error,
+            'last_duration_ms': round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
+
+
+_sources: Dict[str, DataSource] = {}
+_registry_lock = threading.Lock()
+
+# Senaste lyckade hämtning per källa från en warm start-snapshot (tills källan registreras)
+_restored_times: Dict[str, float] = {}
+
+
+def get_data_sources_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta datakälle-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett datakälle-konfiguration ('ttl_overrides' i sekunder)
+    """
+    sources_config = (config or {}).get('data_sources', {})
+    overrides = sources_config.get('ttl_minutes') or {}
+
+    return {
+        'ttl_overrides': {name: max(0.0, float(minutes)) * 60 for name, minutes in overrides.items()},
+        'early_refresh_seconds': max(0.0, float(sources_config.get('early_refresh_seconds',
+                                                                   DEFAULT_EARLY_REFRESH_SECONDS))),
+    }
+
+
+def register_data_source(source: DataSource) -> DataSource:
+    """
+    Registrera (eller ersätt) en datakälla.
+
+    Ersätts en källa med samma namn behålls dess historik, så att en
+    omstart av klienterna inte gör färsk data förfallen.
+
+    Args:
+        source: Källan
+
+    Returns:
+        DataSource: Den registrerade källan
+    """
+    with _registry_lock:
+        previous = _sources.get(source.name)
+        if previous is not None:
+            source.last_success = previous.last_success
+            source.last_attempt = previous.last_attempt
+            source.last_outcome = previous.last_outcome
+            source.refreshes = previous.refreshes
+            source.failures = previous.failures
+        elif source.name in _restored_times:
+            # Warm start: datan i weather_state är lika gammal som i snapshoten
+            source.last_success = _restored_times.pop(source.name)
+        _sources[source.name] = source
+    logger.debug(f"📦 Datakälla registrerad: {source.name} (TTL {source.ttl_seconds:.0f}s, "
+                 f"ger {', '.join(source.outputs)})")
+    return source
+
+
+def unregister_data_source(name: str) -> bool:
+    """Ta bort en källa. Returnerar False om den inte fanns."""
+    with _registry_lock:
+        return _sources.pop(name, None) is not None
+
+
+def get_source_times() -> Dict[str, float]:
+    """Senaste lyckade hämtning (epoch) per källa - sparas i state-snapshoten."""
+    with _registry_lock:
+        return {name: source.last_success for name, source in _sources.items() if source.last_success}
+
+
+def restore_source_times(times: Dict[str, float]) -> None:
+    """
+    Återställ hämtningstider från en snapshot så att färsk data inte hämtas om.
+
+    Args:
+        times: Källnamn -> epoch (från get_source_times())
+    """
+    with _registry_lock:
+        for name, last_success in times.items():
+            source = _sources.get(name)
+            if source is None:
+                _restored_times[name] = last_success
+            elif source.last_success is None:
+                source.last_success = last_success
+
+
+def invalidate_data_source(name: str) -> bool:
+    """Markera en källas data som förfallen (hämtas vid nästa körning)."""
+    source = _sources.get(name)
+    if source is None:
+        return False
+    source.stale = True
+    return True
+
+
+def _resolve_order(sources: Dict[str, DataSource]) -> List[DataSource]:
+    """
+    Sortera källor så att beroenden kommer först (registreringsordning annars).
+
+    Raises:
+        ValueError: Okänt beroende eller cirkulärt beroende
+    """
+    ordered: List[DataSource] = []
+    state: Dict[str, str] = {}
+
+    def visit(source: DataSource, path: Tuple[str, ...]) -> None:
+        if state.get(source.name) == 'done':
+            return
+        if state.get(source.name) == 'visiting':
+            raise ValueError(f"Cirkulärt beroende mellan datakällor: {' -> '.join(path + (source.name,))}")
+        state[source.name] = 'visiting'
+        for dependency in source.depends_on:
+            if dependency not in sources:
+                raise ValueError(f"Datakälla {source.name} beror på okänd källa {dependency}")
+            visit(sources[dependency], path + (source.name,))
+        state[source.name] = 'done'
+        ordered.append(source)
+
+    for source in sources.values():
+        visit(source, ())
+    return ordered
+
+
+def _run_source(source: DataSource) -> str:
+    """Kör en källas refresh och uppdatera historiken."""
+    if not source._lock.acquire(blocking=False):
+        return OUTCOME_BUSY
+    try:
+        started = time.perf_counter()
+        source.last_attempt = time.time()
+        try:
+            with span(f"source.{source.name}"):
+                ok = source.refresh() is not False
+            source.last_error = None if ok else 'refresh returnerade False'
+        except Exception as e:
+            ok = False
+            source.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Datakälla {source.name} misslyckades: {e}")
+        source.last_duration = time.perf_counter() - started
+
+        if ok:
+            source.last_success = source.last_attempt
+            source.stale = False
+            source.refreshes += 1
+            return OUTCOME_REFRESHED
+        source.failures += 1
+        return OUTCOME_FAILED
+    finally:
+        source._lock.release()
+
+
+def refresh_due_sources(force: bool = False, only: Optional[Iterable[str]] = None,
+                        early_seconds: float = DEFAULT_EARLY_REFRESH_SECONDS) -> Dict[str, str]:
+    """
+    Uppdatera de källor vars data gått ut, i beroendeordning.
+
+    En källa körs om den aldrig lyckats, dess TTL passerats, den
+    invaliderats, force är satt, eller något beroende uppdaterades i samma
+    körning. Misslyckas en källa behålls dess tidigare data och den
+    försöker igen vid nästa körning. Beroenden styr bara ordningen - en
+    källa avgör själv hur den hanterar att ett beroende saknar data.
+
+    Args:
+        force: Hämta alla källor oavsett TTL
+        only: Begränsa till dessa källnamn (tvingas; beroenden körs om de är förfallna)
+        early_seconds: Hämta källor som går ut inom så här många sekunder
+
+    Returns:
+        dict: Källnamn -> utfall ('refreshed', 'fresh', 'failed', 'disabled', 'busy')
+    """
+    with _registry_lock:
+        ordered = _resolve_order(dict(_sources))
+
+    wanted = requested = None
+    if only is not None:
+        requested = set(only)
+        wanted = set(requested)
+        # Ta med beroenden (transitivt) så att de kan hämtas om de förfallit
+        for source in reversed(ordered):
+            if source.name in wanted:
+                wanted.update(source.depends_on)
+
+    outcomes: Dict[str, str] = {}
+    now = time.time()
+    for source in ordered:
+        if wanted is not None and source.name not in wanted:
+            continue
+
+        if not source.is_enabled():
+            if source.last_outcome != OUTCOME_DISABLED:
+                for key in source.outputs:
+                    update_weather_state(key, None)
+            outcome = OUTCOME_DISABLED
+        else:
+            dependency_refreshed = any(outcomes.get(dep) == OUTCOME_REFRESHED for dep in source.depends_on)
+            # Explicit begärda källor (only) tvingas; beroenden bara om de förfallit
+            forced = force or (requested is not None and source.name in requested)
+            if forced or dependency_refreshed or source.is_expired(now, early_seconds):
+                outcome = _run_source(source)
+            else:
+                outcome = OUTCOME_FRESH
+
+        if outcome != OUTCOME_BUSY:
+            source.last_outcome = outcome
+        outcomes[source.name] = outcome
+
+    refreshed = [name for name, outcome in outcomes.items() if outcome == OUTCOME_REFRESHED]
+    failed = [name for name, outcome in outcomes.items() if outcome == OUTCOME_FAILED]
+    logger.debug(f"📦 Datakällor: uppdaterade {', '.join(refreshed) or '-'}"
+                 + (f" | misslyckade {', '.join(failed)}" if failed else ''))
+    return outcomes
+
+
+def critical_sources_ok(outcomes: Dict[str, str]) -> bool:
+    """False om någon kritisk källa misslyckades i körningen."""
+    return not any(_sources[name].critical and outcome == OUTCOME_FAILED
+                   for name, outcome in outcomes.items() if name in _sources)
+
+
+def get_data_sources_status() -> Dict[str, Any]:
+    """
+    Status för alla källor (för /api/data-sources).
+
+    Returns:
+        dict: Källor i beroendeordning
+    """
+    with _registry_lock:
+        sources = dict(_sources)
+    try:
+        ordered = _resolve_order(sources)
+        error = None
+    except ValueError as e:
+        ordered = list(sources.values())
+        error = str(e)
+    return {
+        'sources': [source.to_dict() for source in ordered],
+        'error': error,
+    }
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Efterfrågestyrd uppdatering
+Spårar när en skärm senast hämtade data och växlar bakgrundsjobben till
+en gles keep-warm-takt när ingen tittat på idle_minutes.
+
+Många kiosker är släckta nattetid men skulle annars fortsätta hämta SMHI,
+varningar och Netatmo var 10-15:e minut. När en skärm hör av sig igen
+lämnas viloläget direkt och jobben triggas i prioritetsordning (aktuellt
+väder först) så att datan hinner bli färsk inom sekunder.
+
+Med flera workers (deployment.multi_worker) kan anropen landa hos en
+följare. Aktiviteten skrivs då som mtime på en delad fil i runtime-
+katalogen och ledarens kontrolljobb läser den.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .leader_election import get_deployment_config, is_ingestion_owner
+from .metrics import Gauge, METRIC_PREFIX, register_collector, register_metric
+from .scheduler import set_idle_mode, trigger_job
+
+logger = logging.getLogger(__name__)
+
+# Routes som betyder att en skärm visar dashboarden (inte /metrics, /api/status, /api/jobs m.fl.)
+DEFAULT_VIEWER_ROUTES = (
+    '/', '/api/current', '/api/forecast', '/api/daily', '/api/warnings',
+    '/api/theme', '/api/pressure_trend', '/api/weather',
+)
+DEFAULT_WAKE_ORDER = ('weather', 'warnings', 'netatmo')
+
+# Hur ofta aktivitetsfilen som mest skrivs per process
+ACTIVITY_FILE_TOUCH_SECONDS = 10
+
+VIEWER_IDLE = register_metric(Gauge(
+    f'{METRIC_PREFIX}_viewer_idle',
+    'Bakgrundsjobben i viloläge (1) eftersom ingen skärm hämtat data på idle_minutes.'
+))
+SECONDS_SINCE_VIEWER = register_metric(Gauge(
+    f'{METRIC_PREFIX}_seconds_since_viewer_activity',
+    'Sekunder sedan en skärm senast hämtade data.'
+))
+
+# Efterfrågestate för denna process
+_demand_state: Dict[str, Any] = {
+    'settings': None,
+    'last_activity': None,
+    'last_file_touch': 0.0,
+    'activity_file': None,
+    'idle': False,
+    'idle_since': None,
+    'idle_transitions': 0,
+    'wakes': 0,
+    'last_wake': None,
+}
+_demand_lock = threading.Lock()
+
+
+def get_demand_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta efterfråge-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett demand-konfiguration
+    """
+    demand = (config or {}).get('demand', {})
+
+    return {
+        'enabled': demand.get('enabled', True),
+        'idle_seconds': max(60.0, float(demand.get('idle_minutes', 30)) * 60),
+        'keep_warm_seconds': max(60.0, float(demand.get('keep_warm_minutes', 60)) * 60),
+        'check_seconds': max(5.0, float(demand.get('check_seconds', 30))),
+        'wake_order': tuple(demand.get('wake_order') or DEFAULT_WAKE_ORDER),
+        'viewer_routes': frozenset(demand.get('viewer_routes') or DEFAULT_VIEWER_ROUTES),
+    }
+
+
+def init_demand(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Initiera spårningen (anropas vid start i alla workers).
+
+    Uppstarten räknas som aktivitet så att första idle_minutes alltid
+    körs i normal takt.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Aktiva inställningar
+    """
+    settings = get_demand_config(config)
+    deployment = get_deployment_config(config)
+
+    with _demand_lock:
+        _demand_state['settings'] = settings
+        _demand_state['last_activity'] = time.time()
+        _demand_state['activity_file'] = None
+        if deployment['multi_worker']:
+            _demand_state['activity_file'] = os.path.join(deployment['runtime_dir'], 'viewer_activity')
+
+    register_collector(_collect_demand)
+    if settings['enabled']:
+        logger.info(f"🌙 Efterfrågestyrd uppdatering: viloläge efter {settings['idle_seconds'] / 60:.0f} min "
+                    f"utan skärm (keep-warm var {settings['keep_warm_seconds'] / 60:.0f} min)")
+    return settings
+
+
+def _touch_activity_file(path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a'):
+            pass
+        os.utime(path, None)
+    except OSError as e:
+        logger.debug(f"Kunde inte skriva aktivitetsfil {path}: {e}")
+
+
+def _file_activity(path: Optional[str]) -> Optional[float]:
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def record_client_activity(route: Optional[str]) -> None:
+    """
+    Registrera ett anrop från en skärm (anropas före varje request).
+
+    Args:
+        route: Flask route-mönster, t.ex. '/api/current'
+    """
+    settings = _demand_state['settings']
+    if not settings or not settings['enabled'] or route not in settings['viewer_routes']:
+        return
+
+    now = time.time()
+    _demand_state['last_activity'] = now
+
+    activity_file = _demand_state['activity_file']
+    if activity_file and now - _demand_state['last_file_touch'] >= ACTIVITY_FILE_TOUCH_SECONDS:
+        _demand_state['last_file_touch'] = now
+        _touch_activity_file(activity_file)
+
+    if _demand_state['idle'] and is_ingestion_owner():
+        _wake('skärm återansluten')
+
+
+def get_last_activity() -> Optional[float]:
+    """Senaste skärmaktivitet (epoch) i denna eller, vid multi-worker, någon worker."""
+    local = _demand_state['last_activity']
+    shared = _file_activity(_demand_state['activity_file'])
+    candidates = [value for value in (local, shared) if value is not None]
+    return max(candidates) if candidates else None
+
+
+def _enter_idle(idle_for: float) -> None:
+    with _demand_lock:
+        if _demand_state['idle']:
+            return
+        _demand_state['idle'] = True
+        _demand_state['idle_since'] = time.time()
+        _demand_state['idle_transitions'] += 1
+
+    jobs = set_idle_mode(True)
+    logger.info(f"🌙 Ingen skärm på {idle_for / 60:.0f} min - viloläge för {', '.join(jobs) or 'inga jobb'}")
+
+
+def _wake(reason: str) -> List[str]:
+    """Lämna viloläget och trigga jobben i prioritetsordning."""
+    with _demand_lock:
+        if not _demand_state['idle']:
+            return []
+        _demand_state['idle'] = False
+        _demand_state['idle_since'] = None
+        _demand_state['wakes'] += 1
+        _demand_state['last_wake'] = time.time()
+
+    set_idle_mode(False)
+    triggered = [name for name in _demand_state['settings']['wake_order'] if trigger_job(name)]
+    logger.info(f"☀️ Viloläge avslutat ({reason}) - uppdaterar {', '.join(triggered) or 'inget'}")
+    return triggered
+
+
+def check_demand() -> bool:
+    """
+    Schemalagt kontrolljobb (bara hos den som äger datainsamlingen).
+
+    Returns:
+        bool: Alltid True (kontrollen i sig misslyckas inte)
+    """
+    settings = _demand_state['settings']
+    if not settings or not settings['enabled']:
+        return True
+
+    last_activity = get_last_activity() or 0.0
+    idle_for = time.time() - last_activity
+
+    if not _demand_state['idle'] and idle_for >= settings['idle_seconds']:
+        _enter_idle(idle_for)
+    elif _demand_state['idle'] and idle_for < settings['idle_seconds']:
+        # Aktivitet hos en annan worker
+        _wake('skärm aktiv hos annan worker')
+    return True
+
+
+def _collect_demand() -> None:
+    VIEWER_IDLE.set(value=1 if _demand_state['idle'] else 0)
+    last_activity = get_last_activity()
+    if last_activity is not None:
+        SECONDS_SINCE_VIEWER.set(value=time.time() - last_activity)
+
+
+def get_demand_status() -> Dict[str, Any]:
+    """
+    Status för /api/status och /api/jobs.
+
+    Returns:
+        dict: Viloläge, senaste aktivitet och räknare
+    """
+    def iso(timestamp: Optional[float]) -> Optional[str]:
+        return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+    settings = _demand_state['settings'] or {}
+    last_activity = get_last_activity()
+    return {
+        'enabled': settings.get('enabled', False),
+        'idle': _demand_state['idle'],
+        'idle_since': iso(_demand_state['idle_since']),
+        'last_viewer_activity': iso(last_activity),
+        'seconds_since_activity': round(time.time() - last_activity, 1) if last_activity else None,
+        'idle_after_seconds': settings.get('idle_seconds'),
+        'keep_warm_seconds': settings.get('keep_warm_seconds'),
+        'idle_transitions': _demand_state['idle_transitions'],
+        'wakes': _demand_state['wakes'],
+        'last_wake': iso(_demand_state['last_wake']),
+    }
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - SVG-sprites för ikonuppsättningarna
+Slår ihop alla SVG-filer i en ikonkatalog (amCharts, Weather Icons) till
+en sprite med en <symbol> per ikon, så att frontend hämtar en fil i
+stället för en per ikon och refererar ikonerna med fragment-id.
+
+Varje fil minifieras (kommentarer, editor-metadata och blanksteg bort).
+Id:n inom en ikon prefixas med ikonens symbol-id så att t.ex. amCharts
+filter 'blur' inte krockar när spriten infogas i sidan. amCharts-filernas
+<style>-block (nästan identiska animationer) samlas till ett gemensamt
+block där varje regel bara förekommer en gång.
+
+Symbol-id = set + sökväg utan .svg, t.ex. 'amcharts-day-rainy-1' för
+amcharts-svg/day/rainy-1.svg. Filer som redan är sprites hoppas över.
+"""
+
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+# Spritens rotelement: osynligt men renderat (display:none bryter filter i vissa webbläsare)
+SPRITE_ROOT_STYLE = 'position:absolute;width:0;height:0;overflow:hidden'
+
+# Element som bara är editor-metadata
+_DROP_ELEMENTS = {'metadata', 'title', 'desc', 'namedview'}
+_EDITOR_NAMESPACES = ('inkscape', 'sodipodi', 'adobe', 'sketch', 'figma')
+
+_URL_REF = re.compile(r'url\(\s*#([^)\s]+)\s*\)')
+_NUMBER_SPACING = re.compile(r'\s*([,A-Za-z])\s*')
+
+
+def _local(name: str) -> Tuple[str, str]:
+    """'{ns}tag' -> (ns, tag)."""
+    if name.startswith('{'):
+        ns, _, local = name[1:].partition('}')
+        return ns, local
+    return '', name
+
+
+def _escape(value: str) -> str:
+    return (value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace('"', '&quot;'))
+
+
+def _compact_geometry(value: str) -> str:
+    """Blanksteg bort runt kommatecken och kommandon i path-data/points."""
+    return _NUMBER_SPACING.sub(r'\1', ' '.join(value.split()))
+
+
+def _view_box(root: ET.Element) -> str:
+    """viewBox från filen (amCharts skriver 'viewbox'), annars från width/height."""
+    for key in ('viewBox', 'viewbox'):
+        if root.get(key):
+            return ' '.join(root.get(key).replace(',', ' ').split())
+    width = re.sub(r'[^\d.]', '', root.get('width', '') or '') or '24'
+    height = re.sub(r'[^\d.]', '', root.get('height', '') or '') or width
+    return f"0 0 {width} {height}"
+
+
+def _is_editor_node(name: str) -> bool:
+    ns, _ = _local(name)
+    return any(marker in ns for marker in _EDITOR_NAMESPACES)
+
+
+def _serialize(element: ET.Element, id_map: Dict[str, str], out: List[str]) -> None:
+    """Skriv ett element (utan namnrymdsprefix för SVG) med omskrivna id-referenser."""
+    _, tag = _local(element.tag)
+    attrs = []
+    for name, value in element.attrib.items():
+        if _is_editor_node(name):
+            continue
+        ns, local = _local(name)
+        if ns == XLINK_NS:
+            local = f"xlink:{local}"
+        elif ns == 'http://www.w3.org/XML/1998/namespace':
+            continue
+        if local == 'id':
+            value = id_map.get(value, value)
+        elif local in ('href', 'xlink:href') and value.startswith('#'):
+            value = '#' + id_map.get(value[1:], value[1:])
+        elif 'url(' in value:
+            value = _URL_REF.sub(lambda m: f"url(#{id_map.get(m.group(1), m.group(1))})", value)
+        if local in ('d', 'points'):
+            value = _compact_geometry(value)
+        elif local == 'style':
+            value = ';'.join(part.strip() for part in value.split(';')
+                             if part.strip() and not part.strip().startswith('enable-background'))
+            if not value:
+                continue
+        attrs.append(f' {local}="{_escape(value)}"')
+
+    children = [child for child in element
+                if isinstance(child.tag, str) and not _is_editor_node(child.tag)
+                and _local(child.tag)[1] not in _DROP_ELEMENTS and _local(child.tag)[1] != 'style']
+    text = (element.text or '').strip() if tag in ('text', 'tspan', 'textPath') else ''
+
+    if not children and not text:
+        out.append(f"<{tag}{''.join(attrs)}/>")
+        return
+    out.append(f"<{tag}{''.join(attrs)}>{_escape(text)}")
+    for child in children:
+        _serialize(child, id_map, out)
+    out.append(f"</{tag}>")
+
+
+def _split_css_rules(css: str) -> List[str]:
+    """Toppnivåregler i (minifierad) CSS, inkl. @keyframes-block."""
+    rules, depth, start = [], 0, 0
+    for index, char in enumerate(css):
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:index + 1].strip())
+                start = index + 1
+    return rules
+
+
+def symbol_id(set_name: str, relative_path: str) -> str:
+    """'amcharts' + 'day/rainy-1.svg' -> 'amcharts-day-rainy-1'."""
+    stem = os.path.splitext(relative_path)[0].replace('\\', '/').replace('/', '-')
+    return f"{set_name}-{stem}"
+
+
+def build_sprite(set_name: str, directory: str, minify_css,
+                 exclude: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Bygg en sprite av alla SVG-filer under en katalog.
+
+    Args:
+        set_name: Uppsättningens namn (prefix för symbol-id)
+        directory: Katalog med SVG-filer (sökes rekursivt)
+        minify_css: Funktion för att minifiera <style>-innehåll
+        exclude: Filer (relativt katalogen) som inte ska med
+
+    Returns:
+        dict: 'svg' (spritens text), 'symbols' (lista med id) och 'sources' (relativa filer)
+    """
+    symbols: List[str] = []
+    ids: List[str] = []
+    sources: List[str] = []
+    css_rules: Dict[str, str] = {}   # Selektor/at-regel -> första definitionen
+    css_order: List[str] = []
+
+    for root_dir, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith('.svg'):
+                continue
+            path = os.path.join(root_dir, filename)
+            relative = os.path.relpath(path, directory).replace(os.sep, '/')
+            if relative in exclude:
+                continue
+
+            try:
+                tree = ET.parse(path)
+            except ET.ParseError as e:
+                logger.warning(f"⚠️ Hoppar över {set_name}/{relative} i sprite: {e}")
+                continue
+            root = tree.getroot()
+            if root.find(f'.//{{{SVG_NS}}}symbol') is not None:
+                continue  # Redan en sprite
+
+            sid = symbol_id(set_name, relative)
+            id_map = {element.get('id'): f"{sid}-{element.get('id')}"
+                      for element in root.iter() if element.get('id') and element is not root}
+
+            for style in root.iter(f'{{{SVG_NS}}}style'):
+                for rule in _split_css_rules(minify_css(style.text or '')):
+                    key = rule[:rule.index('{')].strip()
+                    if key not in css_rules:
+                        css_rules[key] = rule
+                        css_order.append(key)
+
+            out = [f'<symbol id="{sid}" viewBox="{_view_box(root)}"']
+            if root.get('preserveAspectRatio'):
+                out.append(f' preserveAspectRatio="{root.get("preserveAspectRatio")}"')
+            out.append('>')
+            for child in root:
+                if isinstance(child.tag, str) and not _is_editor_node(child.tag) \
+                        and _local(child.tag)[1] not in _DROP_ELEMENTS and _local(child.tag)[1] != 'style':
+                    if _local(child.tag)[1] == 'defs' and all(_local(c.tag)[1] == 'style' for c in child):
+                        continue  # defs med bara <style> - lyft ut ovan
+                    _serialize(child, id_map, out)
+            out.append('</symbol>')
+
+            symbols.append(''.join(out))
+            ids.append(sid)
+            sources.append(relative)
+
+    style_block = ''
+    if css_order:
+        style_block = f"<defs><style>{''.join(css_rules[key] for key in css_order)}</style></defs>"
+
+    svg = (f'<svg xmlns="{SVG_NS}" xmlns:xlink="{XLINK_NS}" aria-hidden="true" style="{SPRITE_ROOT_STYLE}">'
+           f"{style_block}{''.join(symbols)}</svg>\n")
+    return {'svg': svg, 'symbols': ids, 'sources': sources}
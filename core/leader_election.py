@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Multi-worker koordinering
+Ledarval via fil-lås när appen körs under en WSGI-server med flera workers.
+
+Endast ledaren skapar API-klienter och kör bakgrundsuppdateringar (och är
+därmed ensam om att skriva tokens.json, pressure_history.json och
+sun_cache.json). Ledaren publicerar en snapshot efter varje uppdatering och
+övriga workers (följare) läser den. Med warm_start skrivs snapshoten även i
+single-läge och läses in vid uppstart innan porten öppnas. Låset är ett flock() på en delad fil och
+släpps automatiskt av kärnan om ledarprocessen dör - följarna försöker ta
+låset periodiskt och tar då över.
+"""
+
+import os
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+from .weather_state import get_weather_state, update_weather_state, restore_section_timestamps
+from .state_snapshot import SNAPSHOT_KEYS, build_snapshot, write_snapshot_atomic, read_snapshot
+from .data_sources import restore_source_times
+
+logger = logging.getLogger(__name__)
+
+ROLE_SINGLE = 'single'
+ROLE_LEADER = 'leader'
+ROLE_FOLLOWER = 'follower'
+
+DEFAULT_RUNTIME_DIR = os.path.join(os.path.dirname(__file__), '..', 'runtime')
+
+# Koordineringsstate för denna process
+_coordination: Dict[str, Any] = {
+    'role': ROLE_SINGLE,
+    'lock_fd': None,
+    'lock_file': None,
+    'snapshot_file': None,
+    'snapshot_mtime_ns': None,
+    'became_leader_at': None,
+    'last_sync': None,
+    'warm_start': None,
+}
+_coordination_lock = threading.Lock()
+
+
+def get_deployment_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta deployment-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett deployment-konfiguration
+    """
+    deployment = (config or {}).get('deployment', {})
+    runtime_dir = deployment.get('runtime_dir') or DEFAULT_RUNTIME_DIR
+
+    return {
+        'multi_worker': deployment.get('multi_worker', False),
+        'runtime_dir': runtime_dir,
+        'lock_file': deployment.get('lock_file') or os.path.join(runtime_dir, 'leader.lock'),
+        'snapshot_file': deployment.get('snapshot_file') or os.path.join(runtime_dir, 'state_snapshot.json'),
+        'snapshot_poll_seconds': max(1, deployment.get('snapshot_poll_seconds', 5)),
+        'election_interval_seconds': max(1, deployment.get('election_interval_seconds', 10)),
+        'warm_start': deployment.get('warm_start', True),
+        'warm_start_max_age_seconds': max(0.0, float(deployment.get('warm_start_max_age_hours', 24)) * 3600),
+    }
+
+
+def get_worker_role() -> str:
+    """
+    Hämta denna process roll.
+
+    Returns:
+        str: 'single', 'leader' eller 'follower'
+    """
+    return _coordination['role']
+
+
+def is_ingestion_owner() -> bool:
+    """
+    Kontrollera om denna process äger datainsamlingen.
+
+    Returns:
+        bool: True i single-läge eller om processen är ledare
+    """
+    return _coordination['role'] in (ROLE_SINGLE, ROLE_LEADER)
+
+
+def get_coordination_status() -> Dict[str, Any]:
+    """
+    Hämta koordineringsstatus för /api/status.
+
+    Returns:
+        dict: Roll, pid och snapshot-info
+    """
+    return {
+        'role': _coordination['role'],
+        'pid': os.getpid(),
+        'became_leader_at': _coordination['became_leader_at'],
+        'last_snapshot_sync': _coordination['last_sync'],
+    }
+
+
+def _try_acquire_lock(lock_file: str) -> bool:
+    """
+    Försök ta ledarlåset utan att blockera.
+
+    Args:
+        lock_file (str): Sökväg till låsfilen
+
+    Returns:
+        bool: True om låset togs
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(lock_file)), exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except (BlockingIOError, PermissionError):
+        os.close(fd)
+        return False
+    except OSError:
+        os.close(fd)
+        raise
+
+    # Skriv vår pid för felsökning - låset hålls så länge fd:n är öppen
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode('ascii'))
+    _coordination['lock_fd'] = fd
+    return True
+
+
+def _become_leader(start_ingestion: Callable[[], None]) -> None:
+    """
+    Växla denna process till ledarroll och starta datainsamlingen.
+
+    Args:
+        start_ingestion (callable): Startar API-klienter och bakgrundsuppdateringar
+    """
+    with _coordination_lock:
+        _coordination['role'] = ROLE_LEADER
+        _coordination['became_leader_at'] = time.time()
+
+    logger.info(f"👑 Worker {os.getpid()} är ledare - äger datainsamlingen")
+    start_ingestion()
+
+
+def _apply_snapshot(snapshot: Dict[str, Any]) -> None:
+    """Skriv snapshotens väderdata och sektionstider till lokal weather_state."""
+    for key in SNAPSHOT_KEYS:
+        if key in snapshot:
+            update_weather_state(key, snapshot[key])
+    restore_section_timestamps(snapshot['_meta'].get('section_timestamps', {}))
+
+
+def restore_warm_start(config: Dict[str, Any]) -> bool:
+    """
+    Läs senaste snapshot in i weather_state vid uppstart (före första cykeln).
+
+    Kiosker får då senast kända data direkt i stället för "Startar..." medan
+    första hämtningen pågår. Datakällornas hämtningstider återställs också,
+    så att data som fortfarande är färsk (t.ex. dagens soltider) inte hämtas
+    om. Snapshots äldre än warm_start_max_age_hours ignoreras.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        bool: True om data lästes in
+    """
+    settings = get_deployment_config(config)
+    if not settings['warm_start']:
+        return False
+
+    snapshot = read_snapshot(settings['snapshot_file'])
+    if snapshot is None:
+        return False
+
+    saved_at = snapshot['_meta'].get('saved_at') or 0
+    age = time.time() - saved_at
+    if age > settings['warm_start_max_age_seconds']:
+        logger.info(f"🧊 Snapshot är {age / 3600:.1f} h gammal - kallstart")
+        return False
+
+    _apply_snapshot(snapshot)
+    restore_source_times(snapshot['_meta'].get('data_sources', {}))
+
+    saved_at_local = datetime.fromtimestamp(saved_at)
+    _coordination['warm_start'] = {'saved_at': saved_at, 'restored_at': time.time()}
+    update_weather_state('status', f"Senast kända data från {saved_at_local.strftime('%H:%M')} "
+                                   f"({age / 60:.0f} min) - uppdaterar...")
+    logger.info(f"🔥 Warm start: data från {saved_at_local.isoformat(timespec='seconds')} "
+                f"({age / 60:.0f} min gammal) - uppdatering fortsätter i bakgrunden")
+    return True
+
+
+def get_warm_start_info() -> Optional[Dict[str, Any]]:
+    """
+    Ålder på visad data om den kommer från en warm start-snapshot.
+
+    Returns:
+        dict: 'saved_at' och 'age_seconds', eller None efter första lyckade cykel
+    """
+    warm_start = _coordination['warm_start']
+    if not warm_start:
+        return None
+    return {
+        'saved_at': datetime.fromtimestamp(warm_start['saved_at']).isoformat(timespec='seconds'),
+        'age_seconds': round(time.time() - warm_start['saved_at'], 1),
+    }
+
+
+def clear_warm_start() -> None:
+    """Första egna cykeln är klar - datan kommer inte längre från snapshoten."""
+    _coordination['warm_start'] = None
+
+
+def sync_from_snapshot() -> bool:
+    """
+    Läs ledarens snapshot in i lokal weather_state om den har ändrats.
+
+    Returns:
+        bool: True om ny data lästes in
+    """
+    snapshot_file = _coordination['snapshot_file']
+    if not snapshot_file:
+        return False
+
+    try:
+        mtime_ns = os.stat(snapshot_file).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+    if mtime_ns == _coordination['snapshot_mtime_ns']:
+        return False
+
+    snapshot = read_snapshot(snapshot_file)
+    if snapshot is None:
+        return False
+
+    _apply_snapshot(snapshot)
+    warm_start = _coordination['warm_start']
+    if warm_start and (snapshot['_meta'].get('saved_at') or 0) > warm_start['saved_at']:
+        clear_warm_start()
+
+    _coordination['snapshot_mtime_ns'] = mtime_ns
+    _coordination['last_sync'] = time.time()
+    return True
+
+
+def publish_state_snapshot() -> None:
+    """
+    Publicera aktuell state till följarna och för warm start (no-op hos följare).
+    """
+    if _coordination['role'] == ROLE_FOLLOWER or not _coordination['snapshot_file']:
+        return
+
+    write_snapshot_atomic(_coordination['snapshot_file'], build_snapshot())
+
+
+def _follower_loop(settings: Dict[str, Any], start_ingestion: Callable[[], None]) -> None:
+    """
+    Följarloop: synka snapshot och försök ta över ledarskapet.
+
+    Args:
+        settings (dict): Deployment-inställningar
+        start_ingestion (callable): Anropas om processen blir ledare
+    """
+    poll_seconds = settings['snapshot_poll_seconds']
+    election_interval = settings['election_interval_seconds']
+    next_election = time.monotonic() + election_interval
+
+    while True:
+        time.sleep(poll_seconds)
+
+        try:
+            sync_from_snapshot()
+        except Exception as e:
+            logger.error(f"❌ Snapshot-synk misslyckades: {e}")
+
+        if time.monotonic() < next_election:
+            continue
+        next_election = time.monotonic() + election_interval
+
+        try:
+            if _try_acquire_lock(settings['lock_file']):
+                logger.info(f"🔄 Ledaren borta - worker {os.getpid()} tar över")
+                _become_leader(start_ingestion)
+                return
+        except Exception as e:
+            logger.error(f"❌ Ledarval misslyckades: {e}")
+
+
+def start_worker_coordination(config: Dict[str, Any], start_ingestion: Callable[[], None]) -> str:
+    """
+    Starta datainsamling enligt deployment-läge.
+
+    I single-läge (standard) anropas start_ingestion direkt. I multi-worker-läge
+    tar den första workern låset och blir ledare; övriga blir följare som läser
+    ledarens snapshot och tar över om ledaren försvinner.
+
+    Args:
+        config (dict): Applikationskonfiguration
+        start_ingestion (callable): Startar API-klienter och bakgrundsuppdateringar
+
+    Returns:
+        str: Processens roll efter start
+    """
+    settings = get_deployment_config(config)
+
+    if settings['warm_start']:
+        # Snapshot skrivs efter varje cykel även i single-läge
+        _coordination['snapshot_file'] = settings['snapshot_file']
+
+    if not settings['multi_worker']:
+        start_ingestion()
+        return ROLE_SINGLE
+
+    if not HAS_FCNTL:
+        logger.warning("⚠️ Multi-worker kräver fcntl (POSIX) - kör i single-läge")
+        start_ingestion()
+        return ROLE_SINGLE
+
+    _coordination['lock_file'] = settings['lock_file']
+    _coordination['snapshot_file'] = settings['snapshot_file']
+
+    if _try_acquire_lock(settings['lock_file']):
+        _become_leader(start_ingestion)
+        return ROLE_LEADER
+
+    _coordination['role'] = ROLE_FOLLOWER
+    logger.info(f"👥 Worker {os.getpid()} är följare - läser ledarens snapshot")
+
+    # Visa senaste kända data direkt istället för att vänta på första poll
+    sync_from_snapshot()
+    if get_weather_state()['last_update'] is None:
+        update_weather_state('status', 'Väntar på data från ledar-worker...')
+
+    follower_thread = threading.Thread(
+        target=_follower_loop,
+        args=(settings, start_ingestion),
+        daemon=True
+    )
+    follower_thread.start()
+
+    return ROLE_FOLLOWER
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Loggning
+Nivåbaserad, icke-blockerande loggning för alla moduler.
+
+Alla loggers skriver till en QueueHandler på root-loggern. En QueueListener
+i en egen tråd gör själva I/O:n (stdout/fil), så request-handlers och
+bakgrundsjobb blockerar aldrig på weather.log. Heta loggrader kan rate-
+begränsas eller samplas per anropsställe via extra=rate_limited(...) /
+extra=sampled(...).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+DEFAULT_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+DEFAULT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+DEFAULT_QUEUE_SIZE = 10000
+
+# Aktiv logg-setup (listener och handler byts ut vid omkonfiguration)
+_logging_state: Dict[str, Any] = {
+    'listener': None,
+    'queue_handler': None,
+    'configured_levels': {},
+}
+_setup_lock = threading.Lock()
+
+
+def rate_limited(seconds: float) -> Dict[str, Any]:
+    """
+    Extra-argument för loggrader som högst ska skrivas en gång per intervall.
+
+    Args:
+        seconds (float): Minsta tid mellan två rader från samma anropsställe
+
+    Returns:
+        dict: Att skicka som extra= till logger-anropet
+    """
+    return {'rate_limit_seconds': seconds}
+
+
+def sampled(every: int) -> Dict[str, Any]:
+    """
+    Extra-argument för loggrader där bara var N:e ska skrivas.
+
+    Args:
+        every (int): Skriv var N:e rad från samma anropsställe
+
+    Returns:
+        dict: Att skicka som extra= till logger-anropet
+    """
+    return {'sample_every': every}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate-begränsning och sampling per anropsställe (fil + radnummer).
+
+    Poster utan rate_limit_seconds/sample_every passerar alltid. Antalet
+    undertryckta rader läggs till i nästa rad som släpps igenom.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._sites: Dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = getattr(record, 'rate_limit_seconds', None)
+        every = getattr(record, 'sample_every', None)
+
+        if interval is None and every is None:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+
+        with self._lock:
+            # [senast släppt, antal undertryckta, räknare]
+            entry = self._sites.setdefault(site, [None, 0, 0])
+            entry[2] += 1
+
+            if interval is not None:
+                allowed = entry[0] is None or now - entry[0] >= interval
+            else:
+                allowed = (entry[2] - 1) % max(1, int(every)) == 0
+
+            if not allowed:
+                entry[1] += 1
+                return False
+
+            suppressed = entry[1]
+            entry[0] = now
+            entry[1] = 0
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} undertryckta)"
+            record.args = None
+
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler som slänger poster istället för att blockera när kön är full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    En JSON-rad per loggpost (för loggaggregering).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def get_logging_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta logg-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration (eller None)
+
+    Returns:
+        dict: Komplett logg-konfiguration
+    """
+    logging_config = (config or {}).get('logging', {})
+
+    return {
+        'level': str(logging_config.get('level', 'INFO')).upper(),
+        'module_levels': logging_config.get('module_levels', {}),
+        'json': logging_config.get('json', False),
+        'file': logging_config.get('file'),
+        'file_max_bytes': logging_config.get('file_max_bytes', 5 * 1024 * 1024),
+        'file_backup_count': logging_config.get('file_backup_count', 3),
+        'stdout': logging_config.get('stdout', True),
+        'queue_size': logging_config.get('queue_size', DEFAULT_QUEUE_SIZE),
+    }
+
+
+def _build_output_handlers(settings: Dict[str, Any]) -> list:
+    """
+    Skapa handlers som QueueListener skriver till.
+
+    Args:
+        settings (dict): Från get_logging_config()
+
+    Returns:
+        list: logging.Handler-instanser
+    """
+    if settings['json']:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(DEFAULT_FORMAT, DEFAULT_DATEFMT)
+
+    handlers = []
+
+    if settings['stdout']:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    if settings['file']:
+        file_handler = logging.handlers.RotatingFileHandler(
+            settings['file'],
+            maxBytes=settings['file_max_bytes'],
+            backupCount=settings['file_backup_count'],
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    return handlers
+
+
+def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Konfigurera (eller omkonfigurera) loggningen.
+
+    Anropas tidigt utan config så att uppstartsloggar fångas, och igen när
+    config är laddad. Omkonfiguration stoppar gammal listener (som då
+    tömmer sin kö) innan den nya startas.
+
+    Args:
+        config (dict): Applikationskonfiguration (eller None för standard)
+    """
+    settings = get_logging_config(config)
+
+    with _setup_lock:
+        root = logging.getLogger()
+
+        old_listener = _logging_state['listener']
+        old_handler = _logging_state['queue_handler']
+        if old_listener:
+            old_listener.stop()
+        if old_handler:
+            root.removeHandler(old_handler)
+
+        log_queue = queue.Queue(maxsize=settings['queue_size'])
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+
+        listener = logging.handlers.QueueListener(
+            log_queue,
+            *_build_output_handlers(settings),
+            respect_handler_level=True
+        )
+        listener.start()
+
+        root.addHandler(queue_handler)
+        root.setLevel(getattr(logging, settings['level'], logging.INFO))
+
+        # Återställ moduler som inte längre har egen nivå
+        for name in _logging_state['configured_levels']:
+            if name not in settings['module_levels']:
+                logging.getLogger(name).setLevel(logging.NOTSET)
+
+        for name, level in settings['module_levels'].items():
+            logging.getLogger(name).setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+        _logging_state.update({
+            'listener': listener,
+            'queue_handler': queue_handler,
+            'configured_levels': dict(settings['module_levels']),
+        })
+
+
+def shutdown_logging() -> None:
+    """
+    Stoppa listener och skriv ut allt som ligger i kön.
+    """
+    with _setup_lock:
+        listener = _logging_state['listener']
+        if listener:
+            listener.stop()
+            _logging_state['listener'] = None
+
+
+def get_dropped_log_count() -> int:
+    """
+    Antal loggposter som slängts p.g.a. full kö.
+
+    Returns:
+        int: Antal slängda poster sedan senaste konfiguration
+    """
+    handler = _logging_state['queue_handler']
+    return handler.dropped if handler else 0
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Metrics
+Prometheus-kompatibla metrics för /metrics.
+
+Räknare och histogram lagras i minnet; en observation kostar ett lås, en
+bisect och några heltalsadditioner. Exponeringen sker i Prometheus text-
+format (version 0.0.4) och renderas bara när /metrics anropas. Värden som
+bara behövs vid scrape (t.ex. dataålder) hämtas via collectors.
+"""
+
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Lägg till reference/data för instrumenteringskrokarna
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data'))
+
+from .weather_state import get_section_timestamps
+from .logging_setup import rate_limited
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'vaderdisplay'
+
+# Buckets i sekunder - upstream-anrop och cykler ligger typiskt 0.05-10 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets i bytes för response-storlek
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label_value(value: Any) -> str:
+    """Escapa backslash, citattecken och radbrytning i label-värden."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    """Formatera labels som {a="x",b="y"}."""
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Formatera ett värde enligt Prometheus (heltal utan decimaler)."""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monoton räknare med labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Gauge med labels (sätts direkt eller via collector)."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, *label_values: str, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def replace_all(self, values: Dict[Tuple[str, ...], float]) -> None:
+        with self._lock:
+            self._values = dict(values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Histogram med fasta buckets.
+
+    Räknar per bucket (ej kumulativt) vid observe() och summerar vid render,
+    så att en observation bara rör en bucket.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label_values -> [bucket_counts..., +Inf-count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[label_values] = series
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            labels = _format_labels(self.label_names, label_values, ('le', '+Inf'))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            base_labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{base_labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{base_labels} {cumulative}")
+        return lines
+
+
+# === METRICS-REGISTER ===
+
+UPSTREAM_REQUESTS = Counter(
+    f'{METRIC_PREFIX}_upstream_requests_total',
+    'Upstream-anrop per källa och utfall.',
+    ('source', 'outcome')
+)
+UPSTREAM_DURATION = Histogram(
+    f'{METRIC_PREFIX}_upstream_request_duration_seconds',
+    'Svarstid för upstream-anrop.',
+    ('source',)
+)
+CACHE_REQUESTS = Counter(
+    f'{METRIC_PREFIX}_cache_requests_total',
+    'Cache-uppslag per klient-cache och utfall (hit, miss, stale).',
+    ('cache', 'outcome')
+)
+UPDATE_CYCLE_DURATION = Histogram(
+    f'{METRIC_PREFIX}_update_cycle_duration_seconds',
+    'Längd på uppdateringscykler.',
+    ('cycle',)
+)
+HTTP_REQUESTS = Counter(
+    f'{METRIC_PREFIX}_http_requests_total',
+    'Inkommande HTTP-anrop per route och status.',
+    ('route', 'method', 'status')
+)
+HTTP_DURATION = Histogram(
+    f'{METRIC_PREFIX}_http_request_duration_seconds',
+    'Svarstid för inkommande HTTP-anrop per route.',
+    ('route',)
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    f'{METRIC_PREFIX}_http_response_size_bytes',
+    'Storlek på HTTP-svar per route.',
+    ('route',),
+    buckets=SIZE_BUCKETS
+)
+DATA_AGE = Gauge(
+    f'{METRIC_PREFIX}_data_age_seconds',
+    'Sekunder sedan varje datasektion senast uppdaterades.',
+    ('section',)
+)
+
+PROCESS_CPU = Gauge(
+    f'{METRIC_PREFIX}_process_cpu_seconds',
+    'Processens totala CPU-tid (user + system) i sekunder.'
+)
+PROCESS_RSS = Gauge(
+    f'{METRIC_PREFIX}_process_resident_memory_bytes',
+    'Processens residenta minne (RSS) i bytes.'
+)
+
+CIRCUIT_STATE = Gauge(
+    f'{METRIC_PREFIX}_upstream_circuit_state',
+    'Circuit breaker per upstream-värd (0 = stängd, 1 = half-open, 2 = öppen).',
+    ('host',)
+)
+CIRCUIT_REJECTED = Gauge(
+    f'{METRIC_PREFIX}_upstream_circuit_rejected',
+    'Anrop stoppade av öppen circuit breaker sedan start, per värd.',
+    ('host',)
+)
+
+_metrics: List[Any] = [
+    UPSTREAM_REQUESTS, UPSTREAM_DURATION, CACHE_REQUESTS, UPDATE_CYCLE_DURATION,
+    HTTP_REQUESTS, HTTP_DURATION, HTTP_RESPONSE_SIZE, DATA_AGE,
+    PROCESS_CPU, PROCESS_RSS, CIRCUIT_STATE, CIRCUIT_REJECTED,
+]
+_collectors: List[Callable[[], None]] = []
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def register_metric(metric: Any) -> Any:
+    """
+    Registrera ett extra metric-objekt för exponering.
+
+    Args:
+        metric: Counter, Gauge eller Histogram
+
+    Returns:
+        Samma metric (för användning som modul-konstant)
+    """
+    if metric not in _metrics:
+        _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    """
+    Registrera en collector som uppdaterar gauges precis före rendering.
+
+    Args:
+        collector: Funktion utan argument
+    """
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def _on_upstream(source: str, duration: float, outcome: str) -> None:
+    UPSTREAM_REQUESTS.inc(source, outcome)
+    UPSTREAM_DURATION.observe(source, value=duration)
+
+
+def _on_cache(cache: str, outcome: str) -> None:
+    CACHE_REQUESTS.inc(cache, outcome)
+
+
+def _collect_data_age() -> None:
+    now = time.time()
+    DATA_AGE.replace_all({
+        (section,): now - updated_at
+        for section, updated_at in get_section_timestamps().items()
+    })
+
+
+def _read_rss_bytes() -> Optional[int]:
+    """RSS från /proc (Linux); annars toppvärdet från getrusage."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss är i kB på Linux men i bytes på macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+_CIRCUIT_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+def _collect_circuit_breakers() -> None:
+    from circuit_breaker import get_breakers_status
+
+    breakers = get_breakers_status()
+    CIRCUIT_STATE.replace_all({(b['host'],): _CIRCUIT_STATE_VALUES[b['state']] for b in breakers})
+    CIRCUIT_REJECTED.replace_all({(b['host'],): b['rejected'] for b in breakers})
+
+
+def _collect_process() -> None:
+    PROCESS_CPU.set(value=time.process_time())
+    rss = _read_rss_bytes()
+    if rss is not None:
+        PROCESS_RSS.set(value=rss)
+
+
+def init_metrics() -> None:
+    """
+    Koppla klienternas instrumenteringskrokar till metrics-registret.
+    """
+    global _initialized
+
+    with _init_lock:
+        if _initialized:
+            return
+
+        from instrumentation import add_upstream_observer, add_cache_observer
+        add_upstream_observer(_on_upstream)
+        add_cache_observer(_on_cache)
+        register_collector(_collect_data_age)
+        register_collector(_collect_process)
+        register_collector(_collect_circuit_breakers)
+        _initialized = True
+
+
+def observe_update_cycle(cycle: str, duration: float) -> None:
+    """
+    Registrera längden på en uppdateringscykel.
+
+    Args:
+        cycle (str): Cykelns namn, t.ex. 'full' eller 'netatmo'
+        duration (float): Längd i sekunder
+    """
+    UPDATE_CYCLE_DURATION.observe(cycle, value=duration)
+
+
+def observe_http_request(route: str, method: str, status: int, duration: float,
+                         size: Optional[int]) -> None:
+    """
+    Registrera ett inkommande HTTP-anrop.
+
+    Args:
+        route (str): Route-mönster (t.ex. '/api/current'), inte rå URL
+        method (str): HTTP-metod
+        status (int): HTTP-status
+        duration (float): Svarstid i sekunder
+        size (int): Svarets storlek i bytes (None om okänd)
+    """
+    HTTP_REQUESTS.inc(route, method, str(status))
+    HTTP_DURATION.observe(route, value=duration)
+    if size is not None:
+        HTTP_RESPONSE_SIZE.observe(route, value=size)
+
+
+def render_metrics() -> str:
+    """
+    Rendera alla metrics i Prometheus text-format.
+
+    Returns:
+        str: Exponeringstext
+    """
+    for collector in list(_collectors):
+        try:
+            collector()
+        except Exception as e:
+            # En trasig collector får aldrig sänka /metrics
+            logger.error(f"❌ Metrics-collector misslyckades: {e}", extra=rate_limited(300))
+
+    lines: List[str] = []
+    for metric in list(_metrics):
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
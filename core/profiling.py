@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Profilering
+Sampling-profiler och tracemalloc för den körande processen.
+
+Profileraren läser alla trådars stackar via sys._current_frames() med fast
+intervall i stället för att instrumentera varje funktionsanrop (som cProfile),
+så overheaden är liten och oberoende av vad processen gör. Mätningen är
+väggklocka: trådar som sover syns i sina vänte-anrop. Bara en profil i taget
+får köras och längden begränsas av config.
+
+tracemalloc startas och stoppas explicit, stoppas automatiskt efter en
+maxtid och rapporterar diffen mot en baslinje-snapshot.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+MIN_SAMPLE_INTERVAL_MS = 1
+MAX_TRACEMALLOC_FRAMES = 25
+
+# Stackar räknas per (trådnamn, ramar från yttersta till innersta)
+FrameKey = Tuple[str, int, str]
+
+_profile_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+
+_tracemalloc_state: Dict[str, Any] = {
+    'baseline': None,
+    'baseline_taken_at': None,
+    'started_at': None,
+    'frames': None,
+    'stop_timer': None,
+}
+
+
+def get_profiling_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta profilerings-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration (eller None)
+
+    Returns:
+        dict: Komplett profilerings-konfiguration
+    """
+    diagnostics = (config or {}).get('diagnostics', {})
+
+    return {
+        'profiling_enabled': diagnostics.get('profiling_enabled', False),
+        'profiling_allow_remote': diagnostics.get('profiling_allow_remote', False),
+        'max_profile_seconds': max(1, diagnostics.get('max_profile_seconds', 30)),
+        'sample_interval_ms': max(MIN_SAMPLE_INTERVAL_MS, diagnostics.get('sample_interval_ms', 10)),
+        'tracemalloc_max_minutes': max(1, diagnostics.get('tracemalloc_max_minutes', 30)),
+    }
+
+
+def _frame_key(frame) -> FrameKey:
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _format_frame(key: FrameKey) -> str:
+    filename, lineno, name = key
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def run_sampling_profile(seconds: float, interval_ms: float) -> Optional[Dict[str, Any]]:
+    """
+    Sampla alla trådars stackar under angiven tid.
+
+    Körs i anropande tråd (som själv exkluderas från mätningen).
+
+    Args:
+        seconds (float): Profilens längd (redan begränsad av anroparen)
+        interval_ms (float): Tid mellan samplingar
+
+    Returns:
+        dict: stacks (Counter), samples, duration, interval_ms - eller None
+              om en annan profil redan körs
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+
+    try:
+        own_ident = threading.get_ident()
+        interval = max(MIN_SAMPLE_INTERVAL_MS, interval_ms) / 1000.0
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        samples = 0
+
+        logger.info(f"🔬 Sampling-profil startad ({seconds:.0f}s, {interval * 1000:.0f} ms intervall)")
+        start = time.perf_counter()
+        deadline = start + seconds
+
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_key(frame))
+                    frame = frame.f_back
+                stack.reverse()
+
+                if ident not in thread_names:
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+                stacks[(thread_names.get(ident, str(ident)), tuple(stack))] += 1
+
+            # Släpp ramreferenserna direkt så att de inte håller objekt vid liv
+            del frames, frame
+            samples += 1
+            time.sleep(interval)
+
+        duration = time.perf_counter() - start
+        logger.info(f"🔬 Sampling-profil klar - {samples} samplingar på {duration:.1f}s")
+
+        return {
+            'stacks': stacks,
+            'samples': samples,
+            'duration': duration,
+            'interval_ms': interval * 1000,
+        }
+
+    finally:
+        _profile_lock.release()
+
+
+def format_folded(profile: Dict[str, Any]) -> str:
+    """
+    Formatera profil som folded stacks (flamegraph.pl / speedscope).
+
+    Args:
+        profile (dict): Resultat från run_sampling_profile()
+
+    Returns:
+        str: En rad per unik stack: "tråd;yttre;...;inre antal"
+    """
+    lines = []
+    for (thread_name, stack), count in profile['stacks'].most_common():
+        frames = [thread_name.replace(';', '_')] + [_format_frame(key).replace(';', '_') for key in stack]
+        lines.append(f"{';'.join(frames)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def format_top(profile: Dict[str, Any], limit: int = 40) -> str:
+    """
+    Formatera profil som pstats-liknande tabell per funktion.
+
+    self = samplingar där funktionen låg överst, cum = samplingar där den
+    fanns någonstans i stacken.
+
+    Args:
+        profile (dict): Resultat från run_sampling_profile()
+        limit (int): Max antal rader
+
+    Returns:
+        str: Tabell sorterad på kumulativ tid
+    """
+    self_counts: Counter = Counter()
+    cum_counts: Counter = Counter()
+    total = 0
+
+    for (_, stack), count in profile['stacks'].items():
+        total += count
+        if stack:
+            self_counts[stack[-1]] += count
+        for key in set(stack):
+            cum_counts[key] += count
+
+    lines = [
+        f"{profile['samples']} samplingar på {profile['duration']:.1f}s "
+        f"({profile['interval_ms']:.0f} ms intervall, {total} tråd-stackar, väggklocka)",
+        "",
+        f"{'self':>8} {'self%':>7} {'cum':>8} {'cum%':>7}  funktion",
+    ]
+
+    for key, cum in cum_counts.most_common(max(1, limit)):
+        own = self_counts.get(key, 0)
+        lines.append(
+            f"{own:>8} {100.0 * own / total if total else 0:>6.1f}% "
+            f"{cum:>8} {100.0 * cum / total if total else 0:>6.1f}%  {_format_frame(key)}"
+        )
+
+    return '\n'.join(lines) + '\n'
+
+
+# === TRACEMALLOC ===
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Ta en snapshot utan tracemallocs egna och importmaskineriets allokeringar."""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def get_tracemalloc_status() -> Dict[str, Any]:
+    """
+    Hämta tracemalloc-status.
+
+    Returns:
+        dict: Om spårning pågår, minnesanvändning och tidpunkter
+    """
+    tracing = tracemalloc.is_tracing()
+    status = {
+        'tracing': tracing,
+        'started_at': _tracemalloc_state['started_at'],
+        'baseline_taken_at': _tracemalloc_state['baseline_taken_at'],
+        'frames': _tracemalloc_state['frames'],
+    }
+
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        status['traced_current_bytes'] = current
+        status['traced_peak_bytes'] = peak
+        status['tracemalloc_overhead_bytes'] = tracemalloc.get_tracemalloc_memory()
+
+    return status
+
+
+def start_tracemalloc(frames: int, max_minutes: float) -> Dict[str, Any]:
+    """
+    Starta tracemalloc och ta baslinje-snapshot.
+
+    Pågående spårning behålls men får en ny baslinje.
+
+    Args:
+        frames (int): Antal ramar per allokering (1-25)
+        max_minutes (float): Stoppa automatiskt efter så här lång tid
+
+    Returns:
+        dict: Status efter start
+    """
+    frames = min(max(1, frames), MAX_TRACEMALLOC_FRAMES)
+
+    with _tracemalloc_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracemalloc_state['started_at'] = time.time()
+            _tracemalloc_state['frames'] = frames
+
+            stop_timer = threading.Timer(max_minutes * 60, _auto_stop_tracemalloc)
+            stop_timer.daemon = True
+            stop_timer.start()
+            _tracemalloc_state['stop_timer'] = stop_timer
+            logger.info(f"🧠 tracemalloc startad ({frames} ramar, auto-stopp efter {max_minutes:.0f} min)")
+
+        _tracemalloc_state['baseline'] = _snapshot()
+        _tracemalloc_state['baseline_taken_at'] = time.time()
+
+    return get_tracemalloc_status()
+
+
+def _auto_stop_tracemalloc() -> None:
+    if tracemalloc.is_tracing():
+        logger.warning("⏰ tracemalloc stoppad automatiskt efter maxtid")
+        stop_tracemalloc()
+
+
+def stop_tracemalloc() -> Dict[str, Any]:
+    """
+    Stoppa tracemalloc och släpp snapshots.
+
+    Returns:
+        dict: Status efter stopp
+    """
+    with _tracemalloc_lock:
+        stop_timer = _tracemalloc_state['stop_timer']
+        if stop_timer is not None:
+            stop_timer.cancel()
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("🧠 tracemalloc stoppad")
+
+        _tracemalloc_state.update({
+            'baseline': None,
+            'baseline_taken_at': None,
+            'started_at': None,
+            'frames': None,
+            'stop_timer': None,
+        })
+
+    return get_tracemalloc_status()
+
+
+def get_tracemalloc_diff(limit: int = 25, group_by: str = 'lineno',
+                         reset_baseline: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Jämför en ny snapshot mot baslinjen.
+
+    Args:
+        limit (int): Antal allokeringsställen i svaret
+        group_by (str): 'lineno', 'filename' eller 'traceback'
+        reset_baseline (bool): Använd den nya snapshoten som baslinje framöver
+
+    Returns:
+        dict: Största förändringarna per allokeringsställe, eller None om
+              tracemalloc inte är igång
+    """
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        group_by = 'lineno'
+
+    with _tracemalloc_lock:
+        baseline = _tracemalloc_state['baseline']
+        if not tracemalloc.is_tracing() or baseline is None:
+            return None
+
+        snapshot = _snapshot()
+        baseline_taken_at = _tracemalloc_state['baseline_taken_at']
+        if reset_baseline:
+            _tracemalloc_state['baseline'] = snapshot
+            _tracemalloc_state['baseline_taken_at'] = time.time()
+
+    stats = snapshot.compare_to(baseline, group_by)
+    top: List[Dict[str, Any]] = []
+
+    for stat in stats[:max(1, limit)]:
+        frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+        top.append({
+            'site': frames[0] if frames else '<okänd>',
+            'traceback': frames if group_by == 'traceback' else None,
+            'size_diff_bytes': stat.size_diff,
+            'size_bytes': stat.size,
+            'count_diff': stat.count_diff,
+            'count': stat.count,
+        })
+
+    return {
+        'group_by': group_by,
+        'baseline_taken_at': baseline_taken_at,
+        'total_size_diff_bytes': sum(stat.size_diff for stat in stats),
+        'top': top,
+        'status': get_tracemalloc_status(),
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Webbapp-manifest och service worker
+Gör dashboarden installerbar och offline-tålig för kiosker på ostadigt wifi.
+
+Service workern (static/js/service-worker.js) serveras från /service-worker.js
+så att den gäller hela sidan. Överst läggs SW_CONFIG till: cache-version,
+app-skalet att precacha (hashade buntar/sprites/typsnitt från core/assets.py
++ ikoner) och vilka API:er som sparas för offline-läge. Versionen är en hash
+av skalet och workerns källkod, så ett nytt bygge ger en ny worker som byter
+ut det gamla skalet.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+from .assets import STATIC_DIR, get_shell_urls
+
+logger = logging.getLogger(__name__)
+
+SERVICE_WORKER_URL = '/service-worker.js'
+MANIFEST_URL = '/manifest.webmanifest'
+SERVICE_WORKER_SOURCE = os.path.join(STATIC_DIR, 'js', 'service-worker.js')
+
+# API-svar som sparas och visas med ålder när servern inte nås
+OFFLINE_API_PATHS = ('/api/current', '/api/forecast', '/api/daily', '/api/warnings')
+
+# Ikoner och övriga statiska filer som alltid hör till skalet
+SHELL_STATIC_FILES = ('favicon.ico', 'apple-touch-icon.png', 'icon-192.png', 'icon-512.png')
+
+# Manifestets färger per tema (samma som --bg-primary i styles.css)
+THEME_COLORS = {
+    'dark': '#0a0a0a',
+    'light': '#ffffff',
+}
+
+# Renderad worker per (källa, skal, inställningar) - byggs om när buntarna byggs om
+_pwa_state: Dict[str, Any] = {
+    'key': None,
+    'script': None,
+    'version': None,
+    'precache': [],
+}
+
+
+def get_pwa_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta PWA-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett pwa-konfiguration
+    """
+    pwa_config = (config or {}).get('pwa', {})
+
+    return {
+        'enabled': pwa_config.get('enabled', True),
+        'api_timeout_seconds': max(0.5, float(pwa_config.get('api_timeout_seconds', 3))),
+        'max_data_age_hours': max(1.0, float(pwa_config.get('max_data_age_hours', 24))),
+        'display': pwa_config.get('display', 'fullscreen'),
+    }
+
+
+def build_manifest(config: Optional[Dict[str, Any]], location_name: str, theme: str) -> Dict[str, Any]:
+    """
+    Webbapp-manifest för installation på kiosk/mobil.
+
+    Args:
+        config (dict): Applikationskonfiguration
+        location_name: Platsnamn från display-config
+        theme: Aktuellt tema ('dark'/'light')
+
+    Returns:
+        dict: Manifest enligt W3C Web App Manifest
+    """
+    color = THEME_COLORS.get(theme, THEME_COLORS['dark'])
+    return {
+        'name': f"Väder Dashboard - {location_name}",
+        'short_name': f"Väder {location_name}",
+        'lang': 'sv',
+        'start_url': '/',
+        'scope': '/',
+        'display': get_pwa_config(config)['display'],
+        'orientation': 'landscape',
+        'background_color': color,
+        'theme_color': color,
+        'icons': [
+            {'src': '/static/icon-192.png', 'sizes': '192x192', 'type': 'image/png', 'purpose': 'any'},
+            {'src': '/static/icon-512.png', 'sizes': '512x512', 'type': 'image/png', 'purpose': 'any'},
+        ],
+    }
+
+
+def _precache_urls() -> List[str]:
+    urls = ['/'] + get_shell_urls()
+    urls += [f"/static/{name}" for name in SHELL_STATIC_FILES if os.path.isfile(os.path.join(STATIC_DIR, name))]
+    return urls
+
+
+def render_service_worker(config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Service workerns källkod med SW_CONFIG överst.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        str: JavaScript, eller None om PWA är avstängt eller källan saknas
+    """
+    settings = get_pwa_config(config)
+    if not settings['enabled']:
+        return None
+
+    try:
+        with open(SERVICE_WORKER_SOURCE, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError as e:
+        logger.error(f"❌ Service worker saknas ({SERVICE_WORKER_SOURCE}): {e}")
+        return None
+
+    precache = _precache_urls()
+    key = (source, tuple(precache), settings['api_timeout_seconds'], settings['max_data_age_hours'])
+    if _pwa_state['key'] == key:
+        return _pwa_state['script']
+
+    version = hashlib.sha256(json.dumps([source, precache]).encode('utf-8')).hexdigest()[:12]
+    sw_config = {
+        'version': version,
+        'precache': precache,
+        'apiPaths': list(OFFLINE_API_PATHS),
+        'apiTimeoutMs': int(settings['api_timeout_seconds'] * 1000),
+        'maxDataAgeMs': int(settings['max_data_age_hours'] * 3600 * 1000),
+    }
+    script = f"const SW_CONFIG = {json.dumps(sw_config, ensure_ascii=False)};\n{source}"
+
+    _pwa_state.update({'key': key, 'script': script, 'version': version, 'precache': precache})
+    logger.info(f"📲 Service worker {version}: {len(precache)} filer i app-skalet")
+    return script
+
+
+def get_template_pwa(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    PWA-länkar för index.html.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: 'manifest' och 'service_worker' (None = avregistrera befintlig worker)
+    """
+    enabled = get_pwa_config(config)['enabled']
+    return {
+        'manifest': MANIFEST_URL,
+        'service_worker': SERVICE_WORKER_URL if enabled else None,
+    }
+
+
+def get_pwa_status(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Status för /api/status.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Aktiverad, workerns version och antal precachade filer
+    """
+    return {
+        'enabled': get_pwa_config(config)['enabled'],
+        'service_worker_version': _pwa_state['version'],
+        'precache_files': len(_pwa_state['precache']),
+    }
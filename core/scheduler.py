@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Jobbschemaläggare
+En prioritetskö (heapq) av jobb som körs på en liten trådpool.
+
+Ersätter de tidigare sleep-looparna och Netatmo-klientens threading.Timer.
+Varje jobb har eget intervall, jitter, valfri linjering mot klockan (t.ex.
+några minuter efter SMHI:s timvisa modellkörning) och exponentiell backoff
+vid fel. En dispatcher-tråd sover tills nästa jobb är due, så processen
+vaknar bara när något faktiskt ska göras (färre wake-ups på en Pi).
+
+Ett jobb körs aldrig parallellt med sig självt; blir det due medan det
+redan kör schemaläggs nästa körning när det är klart. Ett jobb räknas som
+misslyckat om det kastar ett undantag eller returnerar False.
+
+Jobb kan ha ett glesare viloläges-intervall (idle_interval) som används
+när ingen skärm tittar (se core/demand.py och set_idle_mode()).
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+from .logging_setup import rate_limited
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_JITTER_SECONDS = 10
+DEFAULT_BACKOFF_BASE_SECONDS = 30
+DEFAULT_BACKOFF_MAX_SECONDS = 600
+
+
+class Job:
+    """Ett schemalagt jobb och dess körhistorik."""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: Optional[float],
+                 jitter: float = 0.0, align_offset: Optional[float] = None,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX_SECONDS,
+                 description: str = '', idle_interval: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval = interval            # None = engångsjobb
+        self.jitter = max(0.0, jitter)
+        self.align_offset = align_offset    # Sekunder in i varje intervall (epok-linjerat)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.description = description
+        self.idle_interval = idle_interval  # Intervall i viloläge (None = samma som interval)
+
+        self.next_run: Optional[float] = None
+        self.running = False
+        self.paused = False
+        self.trigger_pending = False
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_start: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+        self.token = 0                      # Ökas vid varje omschemaläggning - gamla heap-poster ignoreras
+
+    def next_after(self, now: float, failed: bool) -> Optional[float]:
+        """
+        Beräkna nästa körning.
+
+        Args:
+            now: Nuvarande tid (time.time())
+            failed: Om senaste körningen misslyckades
+
+        Returns:
+            float: Tidpunkt, eller None för engångsjobb som är klara
+        """
+        if failed and self.consecutive_failures:
+            delay = self.backoff_base * (2 ** (self.consecutive_failures - 1))
+            if self.interval:
+                delay = min(delay, self.interval)
+            return now + min(delay, self.backoff_max) + random.uniform(0, self.jitter)
+
+        if not self.interval:
+            return None
+
+        if self.idle_interval and _scheduler_state['idle']:
+            # Viloläge: gles keep-warm-takt utan linjering
+            return now + self.idle_interval + random.uniform(0, self.jitter)
+
+        if self.align_offset is not None:
+            periods = int((now - self.align_offset) // self.interval) + 1
+            due = self.align_offset + periods * self.interval
+        else:
+            due = now + self.interval
+        return due + random.uniform(0, self.jitter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+        return {
+            'name': self.name,
+            'description': self.description,
+            'interval_seconds': self.interval,
+            'idle_interval_seconds': self.idle_interval,
+            'jitter_seconds': self.jitter,
+            'align_offset_seconds': self.align_offset,
+            'next_run': iso(self.next_run),
+            'next_run_in_seconds': round(self.next_run - time.time(), 1) if self.next_run else None,
+            'running': self.running,
+            'paused': self.paused,
+            'runs': self.runs,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'last_start': iso(self.last_start),
+            'last_duration_seconds': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'last_success': iso(self.last_success),
+            'last_error': self.last_error,
+        }
+
+
+# Schemaläggarens state för denna process
+_scheduler_state: Dict[str, Any] = {
+    'jobs': {},
+    'heap': [],
+    'executor': None,
+    'thread': None,
+    'running': False,
+    'max_workers': DEFAULT_MAX_WORKERS,
+    'wakeups': 0,
+    'idle': False,
+}
+_condition = threading.Condition()
+_sequence = itertools.count()
+
+
+def get_scheduler_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta scheduler-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett scheduler-konfiguration
+    """
+    scheduler = (config or {}).get('scheduler', {})
+    align_minute = scheduler.get('smhi_align_minute')
+
+    return {
+        'max_workers': max(1, int(scheduler.get('max_workers', DEFAULT_MAX_WORKERS))),
+        'jitter_seconds': max(0.0, float(scheduler.get('jitter_seconds', DEFAULT_JITTER_SECONDS))),
+        'smhi_align_minute': None if align_minute is None else int(align_minute) % 60,
+        'backoff_base_seconds': max(1.0, float(scheduler.get('backoff_base_seconds', DEFAULT_BACKOFF_BASE_SECONDS))),
+        'backoff_max_seconds': max(1.0, float(scheduler.get('backoff_max_minutes', DEFAULT_BACKOFF_MAX_SECONDS / 60)) * 60),
+        'allow_remote_trigger': scheduler.get('allow_remote_trigger', False),
+    }
+
+
+def _push(job: Job, when: float) -> None:
+    """Lägg jobbet i kön (anropas med _condition hållen)."""
+    job.token += 1
+    job.next_run = when
+    heapq.heappush(_scheduler_state['heap'], (when, next(_sequence), job.name, job.token))
+    _condition.notify()
+
+
+def add_job(name: str, func: Callable[[], Any], interval: Optional[float], first_run: Optional[float] = None,
+            jitter: float = 0.0, align_offset: Optional[float] = None,
+            backoff_base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+            backoff_max: float = DEFAULT_BACKOFF_MAX_SECONDS, description: str = '',
+            idle_interval: Optional[float] = None) -> Job:
+    """
+    Registrera (eller ersätt) ett jobb.
+
+    Args:
+        name: Unikt namn
+        func: Funktion utan argument; False eller undantag = misslyckad körning
+        interval: Sekunder mellan körningar (None = engångsjobb)
+        first_run: Sekunder till första körningen (None = enligt intervall/linjering)
+        jitter: Slumpmässig fördröjning 0..jitter sekunder per körning
+        align_offset: Linjera mot klockan - sekunder in i varje intervall
+        backoff_base: Första omförsöket efter fel (fördubblas per fel i rad)
+        backoff_max: Tak för backoff (och aldrig längre än intervallet)
+        description: Visas i /api/jobs
+        idle_interval: Glesare intervall i viloläge (None = påverkas inte)
+
+    Returns:
+        Job
+    """
+    job = Job(name, func, interval, jitter, align_offset, backoff_base, backoff_max, description, idle_interval)
+    now = time.time()
+
+    with _condition:
+        previous = _scheduler_state['jobs'].get(name)
+        if previous is not None:
+            # Behåll historiken när ett jobb ersätts (t.ex. ny token-refresh)
+            for attribute in ('runs', 'failures', 'last_start', 'last_duration', 'last_error', 'last_success'):
+                setattr(job, attribute, getattr(previous, attribute))
+            # Kör det gamla jobbet räknas det nya som körande - dispatchern skjuter då
+            # första körningen (trigger_pending) tills den gamla körningen är klar
+            job.running = previous.running
+            previous.token += 1
+        _scheduler_state['jobs'][name] = job
+        when = now + first_run if first_run is not None else job.next_after(now, failed=False)
+        if when is not None:
+            _push(job, when)
+    return job
+
+
+def remove_job(name: str) -> bool:
+    """
+    Ta bort ett jobb (kör det just nu får det köra klart).
+
+    Returns:
+        bool: True om jobbet fanns
+    """
+    with _condition:
+        job = _scheduler_state['jobs'].pop(name, None)
+        if job is None:
+            return False
+        job.token += 1
+        _condition.notify()
+    return True
+
+
+def schedule_once(name: str, delay: float, func: Callable[[], Any]) -> '_OneShotHandle':
+    """
+    Engångsjobb - ersätter threading.Timer (t.ex. Netatmo token-refresh).
+
+    Args:
+        name: Jobbnamn (ett nytt anrop med samma namn ersätter det gamla)
+        delay: Sekunder till körning
+        func: Funktion utan argument
+
+    Returns:
+        Handtag med cancel()
+    """
+    add_job(name, func, interval=None, first_run=delay, description='Engångsjobb')
+    return _OneShotHandle(name)
+
+
+class _OneShotHandle:
+    """Timer-kompatibelt handtag för schedule_once()."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def cancel(self) -> None:
+        with _condition:
+            job = _scheduler_state['jobs'].get(self.name)
+            if job is not None and job.interval is None and not job.running:
+                _scheduler_state['jobs'].pop(self.name, None)
+                job.token += 1
+
+
+def trigger_job(name: str) -> bool:
+    """
+    Kör ett jobb så snart som möjligt (manuellt).
+
+    Returns:
+        bool: False om jobbet inte finns
+    """
+    with _condition:
+        job = _scheduler_state['jobs'].get(name)
+        if job is None:
+            return False
+        if job.running:
+            job.trigger_pending = True
+        else:
+            _push(job, time.time())
+    logger.info(f"▶️ Jobb '{name}' triggat manuellt")
+    return True
+
+
+def set_job_paused(name: str, paused: bool) -> bool:
+    """
+    Pausa eller återuppta ett jobb.
+
+    Returns:
+        bool: False om jobbet inte finns
+    """
+    with _condition:
+        job = _scheduler_state['jobs'].get(name)
+        if job is None:
+            return False
+        job.paused = paused
+        if not paused and not job.running:
+            _push(job, time.time())
+    return True
+
+
+def set_idle_mode(idle: bool) -> List[str]:
+    """
+    Slå på/av viloläge för jobb med idle_interval.
+
+    In i viloläge flyttas nästa körning fram till senaste start +
+    idle_interval. Ut ur viloläge flyttas den tillbaka till senaste start +
+    interval (anroparen triggar dem som ska köras direkt).
+
+    Args:
+        idle: True = gles keep-warm-takt
+
+    Returns:
+        list: Namn på påverkade jobb
+    """
+    now = time.time()
+    affected = []
+    with _condition:
+        if _scheduler_state['idle'] == idle:
+            return affected
+        _scheduler_state['idle'] = idle
+        for job in _scheduler_state['jobs'].values():
+            if not job.idle_interval or not job.interval:
+                continue
+            affected.append(job.name)
+            if job.running or job.next_run is None:
+                continue
+            if idle:
+                _push(job, max(job.next_run, (job.last_start or now) + job.idle_interval))
+            else:
+                _push(job, max(now, min(job.next_run, (job.last_start or now) + job.interval)))
+    return affected
+
+
+def is_idle_mode() -> bool:
+    """True om schemaläggaren kör jobben i keep-warm-takt."""
+    return _scheduler_state['idle']
+
+
+def _run_job(job: Job, token: int) -> None:
+    """Kör ett jobb i poolen och schemalägg nästa körning."""
+    start = time.time()
+    failed = False
+    error = None
+
+    try:
+        result = job.func()
+        failed = result is False
+    except Exception as e:
+        failed = True
+        error = f"{type(e).__name__}: {e}"
+        logger.error(f"❌ Jobb '{job.name}' misslyckades: {e}", extra=rate_limited(60))
+
+    end = time.time()
+
+    with _condition:
+        current = _scheduler_state['jobs'].get(job.name)
+        # Ersatt under körningen: ersättaren ärvde running och får samma resultat
+        replacement = current if current is not None and current is not job and current.running else None
+
+        for target in filter(None, (job, replacement)):
+            target.running = False
+            target.runs += 1
+            target.last_start = start
+            target.last_duration = end - start
+            if failed:
+                target.failures += 1
+                target.consecutive_failures += 1
+                target.last_error = error or 'Jobbet rapporterade misslyckande'
+            else:
+                target.consecutive_failures = 0
+                target.last_error = None
+                target.last_success = end
+
+        if replacement is not None:
+            if replacement.trigger_pending:
+                # Ersättarens första körning väntade på den här
+                replacement.trigger_pending = False
+                _push(replacement, end)
+            return
+
+        if current is not job:
+            # Borttaget eller ersatt under körningen
+            return
+
+        if job.trigger_pending:
+            job.trigger_pending = False
+            _push(job, end)
+            return
+
+        if job.token != token:
+            # Omschemalagt (t.ex. add_job/trigger) medan det körde - den posten gäller
+            return
+
+        when = job.next_after(end, failed)
+        if when is None:
+            _scheduler_state['jobs'].pop(job.name, None)
+        elif failed:
+            logger.warning(f"⏳ Jobb '{job.name}' försöker igen om {when - end:.0f}s "
+                           f"({job.consecutive_failures} fel i rad)", extra=rate_limited(60))
+            _push(job, when)
+        else:
+            _push(job, when)
+
+
+def _dispatch_loop() -> None:
+    """Sov tills nästa jobb är due och lämna det till poolen."""
+    heap = _scheduler_state['heap']
+
+    with _condition:
+        while _scheduler_state['running']:
+            now = time.time()
+
+            # Släng inaktuella poster (ersatta, borttagna eller omschemalagda jobb)
+            while heap:
+                when, _, name, token = heap[0]
+                job = _scheduler_state['jobs'].get(name)
+                if job is None or job.token != token:
+                    heapq.heappop(heap)
+                    continue
+                break
+
+            if not heap:
+                _condition.wait()
+                _scheduler_state['wakeups'] += 1
+                continue
+
+            when, _, name, token = heap[0]
+            if when > now:
+                _condition.wait(when - now)
+                _scheduler_state['wakeups'] += 1
+                continue
+
+            heapq.heappop(heap)
+            job = _scheduler_state['jobs'][name]
+
+            if job.paused:
+                job.next_run = None
+                continue
+            if job.running:
+                job.trigger_pending = True
+                continue
+
+            job.running = True
+            job.next_run = None
+            _scheduler_state['executor'].submit(_run_job, job, token)
+
+
+def start_scheduler(config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Starta dispatcher-tråden och trådpoolen (idempotent).
+
+    Args:
+        config (dict): Applikationskonfiguration
+    """
+    settings = get_scheduler_config(config)
+
+    with _condition:
+        if _scheduler_state['running']:
+            return
+        _scheduler_state['running'] = True
+        _scheduler_state['max_workers'] = settings['max_workers']
+        _scheduler_state['executor'] = ThreadPoolExecutor(
+            max_workers=settings['max_workers'], thread_name_prefix='JobWorker'
+        )
+        thread = threading.Thread(target=_dispatch_loop, name='JobScheduler', daemon=True)
+        _scheduler_state['thread'] = thread
+        thread.start()
+
+    logger.info(f"⏱️ Schemaläggare startad ({settings['max_workers']} workers)")
+
+
+def stop_scheduler(wait: bool = False) -> None:
+    """Stoppa schemaläggaren (jobb som kör får köra klart)."""
+    with _condition:
+        if not _scheduler_state['running']:
+            return
+        _scheduler_state['running'] = False
+        _condition.notify_all()
+        executor = _scheduler_state['executor']
+
+    executor.shutdown(wait=wait)
+    logger.info("⏹️ Schemaläggare stoppad")
+
+
+def get_jobs_status() -> Dict[str, Any]:
+    """
+    Status för alla jobb (för /api/jobs).
+
+    Returns:
+        dict: Schemaläggare + jobb sorterade på nästa körning
+    """
+    with _condition:
+        jobs = [job.to_dict() for job in _scheduler_state['jobs'].values()]
+        return {
+            'running': _scheduler_state['running'],
+            'max_workers': _scheduler_state['max_workers'],
+            'busy_workers': sum(1 for job in _scheduler_state['jobs'].values() if job.running),
+            'wakeups': _scheduler_state['wakeups'],
+            'idle': _scheduler_state['idle'],
+            'jobs': sorted(jobs, key=lambda j: (j['next_run'] is None, j['next_run'] or '')),
+        }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Uppstartstidslinje
+Mäter tiden från import av app.py till att HTTP-porten kan öppnas, fas för
+fas, samt bakgrundsfaserna (Netatmo-autentisering, första cykeln) som
+körs efter att porten öppnats.
+
+Tidslinjen loggas en gång när initieringen är klar och finns i
+/api/status och /metrics, så att en regression (t.ex. en ny import eller
+ett blockerande nätverksanrop i uppstarten) syns direkt.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .metrics import Gauge, METRIC_PREFIX, register_metric
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PHASE_SECONDS = register_metric(Gauge(
+    f'{METRIC_PREFIX}_startup_phase_seconds',
+    'Sekunder från processtart till att uppstartsfasen var klar.',
+    ('phase',)
+))
+
+# Tidslinje för denna process (referenspunkt = import av denna modul)
+_startup_state: Dict[str, Any] = {
+    't0': time.perf_counter(),
+    'phases': [],
+    'ready_seconds': None,
+}
+_startup_lock = threading.Lock()
+
+
+def _elapsed() -> float:
+    return time.perf_counter() - _startup_state['t0']
+
+
+def mark_startup(phase: str, background: bool = False) -> float:
+    """
+    Markera att en uppstartsfas är klar.
+
+    Args:
+        phase: Fasens namn, t.ex. 'config' eller 'clients'
+        background: True för faser som körs efter att porten öppnats
+
+    Returns:
+        float: Sekunder sedan start
+    """
+    elapsed = _elapsed()
+    with _startup_lock:
+        previous = max((p['at_seconds'] for p in _startup_state['phases'] if not p['background']), default=0.0)
+        _startup_state['phases'].append({
+            'phase': phase,
+            'at_seconds': round(elapsed, 4),
+            'duration_seconds': None if background else round(elapsed - previous, 4),
+            'background': background,
+        })
+    STARTUP_PHASE_SECONDS.set(phase, value=elapsed)
+
+    if background and _startup_state['ready_seconds'] is not None:
+        logger.info(f"⏱️ Uppstart (bakgrund): {phase} klar efter {elapsed * 1000:.0f} ms")
+    return elapsed
+
+
+def mark_startup_once(phase: str) -> None:
+    """Markera en bakgrundsfas bara första gången (t.ex. första lyckade cykeln)."""
+    with _startup_lock:
+        if any(p['phase'] == phase for p in _startup_state['phases']):
+            return
+    mark_startup(phase, background=True)
+
+
+def finish_startup() -> float:
+    """
+    Initieringen är klar och porten kan öppnas - logga tidslinjen.
+
+    Returns:
+        float: Sekunder från start till redo
+    """
+    ready = mark_startup('ready')
+    _startup_state['ready_seconds'] = ready
+
+    steps = ', '.join(f"{p['phase']} {p['duration_seconds'] * 1000:.0f}"
+                      for p in _startup_state['phases'] if not p['background'] and p['phase'] != 'ready')
+    logger.info(f"⏱️ Uppstart klar på {ready * 1000:.0f} ms (ms per fas: {steps})")
+    return ready
+
+
+def get_startup_timeline() -> Dict[str, Any]:
+    """
+    Tidslinje för /api/status.
+
+    Returns:
+        dict: 'ready_seconds' och faserna i ordning
+    """
+    with _startup_lock:
+        phases: List[Dict[str, Any]] = [dict(p) for p in _startup_state['phases']]
+    ready: Optional[float] = _startup_state['ready_seconds']
+    return {
+        'ready_seconds': round(ready, 4) if ready is not None else None,
+        'phases': phases,
+    }
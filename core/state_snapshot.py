@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - State Snapshots
+Serialisering av väderdata-delen av weather_state till en delad fil.
+
+Snapshoten skrivs atomiskt (temp-fil + os.replace) så att läsare aldrig ser
+en halvskriven fil, och läses via mmap så att flera workers kan dela samma
+sidcache utan att kopiera filen i onödan. Samma fil används för warm start
+efter omstart eller strömavbrott (se leader_election.restore_warm_start).
+"""
+
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+from .data_sources import get_source_times
+from .weather_state import get_weather_state, get_section_timestamps
+
+logger = logging.getLogger(__name__)
+
+# Nycklar i weather_state som utgör "data" (config och klienter delas aldrig)
+SNAPSHOT_KEYS = (
+    'smhi_data',
+    'netatmo_data',
+    'forecast_data',
+    'daily_forecast_data',
+    'sun_data',
+    'humidity_data',
+    'last_update',
+    'status',
+    'netatmo_available',
+    'smhi_warnings_data',
+    'warnings_last_update',
+)
+
+SNAPSHOT_VERSION = 1
+
+
+def build_snapshot() -> Dict[str, Any]:
+    """
+    Bygg en snapshot av aktuell väderdata.
+
+    Returns:
+        dict: Väderdata + metadata (version, saved_at)
+    """
+    weather_state = get_weather_state()
+    snapshot = {key: weather_state.get(key) for key in SNAPSHOT_KEYS}
+    snapshot['_meta'] = {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': time.time(),
+        'pid': os.getpid(),
+        'section_timestamps': get_section_timestamps(),
+        'data_sources': get_source_times()
+    }
+    return snapshot
+
+
+def write_snapshot_atomic(path: str, snapshot: Dict[str, Any]) -> bool:
+    """
+    Skriv snapshot atomiskt till disk.
+
+    Args:
+        path (str): Målfil
+        snapshot (dict): Snapshot från build_snapshot()
+
+    Returns:
+        bool: True om skrivningen lyckades
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = None
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        payload = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Kunde inte skriva state-snapshot till {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return False
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Läs snapshot via mmap.
+
+    Args:
+        path (str): Snapshot-fil
+
+    Returns:
+        dict: Snapshot eller None om filen saknas/är ogiltig
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                snapshot = json.loads(mapped[:].decode('utf-8'))
+
+        if snapshot.get('_meta', {}).get('version') != SNAPSHOT_VERSION:
+            logger.warning(f"⚠️ Snapshot {path} har okänd version - ignoreras")
+            return None
+
+        return snapshot
+
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"❌ Kunde inte läsa state-snapshot {path}: {e}")
+        return None
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Renderingstelemetri från kioskerna
+Dashboarden (static/js/dashboard-data/client-telemetry.js) skickar var
+interval_minutes ett sammanställt mått på ramtider, long tasks, JS-heap,
+fetch-latens och effektpartiklar till /api/telemetry.
+
+Per kiosk sparas de senaste window_reports rapporterna; högst max_kiosks
+kiosker hålls i minnet (den som hörts av längst sedan får ge plats) och
+kiosker som varit tysta i stale_hours tas bort. Rullande värden per kiosk
+exponeras på /metrics (label kiosk) och /api/status.
+
+Med flera workers (deployment.multi_worker) landar rapporterna hos olika
+workers; varje worker visar de kiosker den själv tagit emot.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .assets import get_template_assets
+from .metrics import Counter, Gauge, METRIC_PREFIX, register_collector, register_metric
+from .weather_state import get_weather_state
+
+logger = logging.getLogger(__name__)
+
+# Största accepterade rapport (en normal rapport är ~0.5 kB)
+TELEMETRY_MAX_BYTES = 4096
+
+_KIOSK_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,48}$')
+
+TELEMETRY_REPORTS = register_metric(Counter(
+    f'{METRIC_PREFIX}_client_telemetry_reports_total',
+    'Mottagna telemetrirapporter från kioskerna per utfall (accepted, rejected).',
+    ('outcome',)
+))
+CLIENT_INFO = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_info',
+    'Kiosk med senast rapporterad release (dashboard-buntens hashade namn).',
+    ('kiosk', 'release')
+))
+CLIENT_FRAME_P95 = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_frame_p95_seconds',
+    'Ramtid, 95:e percentilen (medel över rapportfönstret).',
+    ('kiosk',)
+))
+CLIENT_SLOW_FRAMES = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_slow_frame_ratio',
+    'Andel ramar över 50 ms i rapportfönstret.',
+    ('kiosk',)
+))
+CLIENT_LONG_TASKS = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_long_tasks_per_minute',
+    'Long tasks (>50 ms på huvudtråden) per synlig minut.',
+    ('kiosk',)
+))
+CLIENT_HEAP = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_js_heap_bytes',
+    'Använd JS-heap vid senaste rapporten (bara Chromium).',
+    ('kiosk',)
+))
+CLIENT_FETCH_P95 = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_fetch_p95_seconds',
+    'Fetch-latens mot API:et, 95:e percentilen (medel över rapportfönstret).',
+    ('kiosk',)
+))
+CLIENT_FETCH_ERRORS = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_fetch_error_ratio',
+    'Andel misslyckade API-anrop i rapportfönstret.',
+    ('kiosk',)
+))
+CLIENT_EFFECT_FPS = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_effect_fps',
+    'Väder-effekternas bildfrekvens (medel över rapportfönstret).',
+    ('kiosk',)
+))
+CLIENT_EFFECT_SCALE = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_effect_scale',
+    'Lägsta partikelskala från frame-governorn i rapportfönstret (1 = alla partiklar).',
+    ('kiosk',)
+))
+CLIENT_EFFECT_PARTICLES = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_effect_particles',
+    'Aktiva effektpartiklar vid senaste rapporten.',
+    ('kiosk',)
+))
+CLIENT_REPORT_AGE = register_metric(Gauge(
+    f'{METRIC_PREFIX}_client_report_age_seconds',
+    'Sekunder sedan kiosken senast skickade telemetri.',
+    ('kiosk',)
+))
+
+# Gauge -> (nyckel i _kiosk_stats, faktor till metric-enhet)
+_KIOSK_GAUGES = (
+    (CLIENT_FRAME_P95, 'frame_p95_ms', 0.001),
+    (CLIENT_SLOW_FRAMES, 'slow_frame_ratio', 1),
+    (CLIENT_LONG_TASKS, 'long_tasks_per_minute', 1),
+    (CLIENT_HEAP, 'heap_used_mb', 1024 * 1024),
+    (CLIENT_FETCH_P95, 'fetch_p95_ms', 0.001),
+    (CLIENT_FETCH_ERRORS, 'fetch_error_ratio', 1),
+    (CLIENT_EFFECT_FPS, 'effect_fps', 1),
+    (CLIENT_EFFECT_SCALE, 'effect_scale', 1),
+    (CLIENT_EFFECT_PARTICLES, 'effect_particles', 1),
+)
+
+# Kiosk-id -> {'release', 'remote_addr', 'first_seen', 'last_seen', 'reports': deque}
+_telemetry_state: Dict[str, Any] = {
+    'kiosks': OrderedDict(),
+    'accepted': 0,
+    'rejected': 0,
+    'evicted': 0,
+}
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta telemetri-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Komplett telemetry-konfiguration
+    """
+    telemetry = (config or {}).get('telemetry', {})
+
+    return {
+        'enabled': telemetry.get('enabled', True),
+        'interval_seconds': int(min(60, max(1, float(telemetry.get('interval_minutes', 5)))) * 60),
+        'window_reports': int(min(288, max(1, telemetry.get('window_reports', 12)))),
+        'max_kiosks': int(min(500, max(1, telemetry.get('max_kiosks', 20)))),
+        'stale_seconds': max(1.0, float(telemetry.get('stale_hours', 24))) * 3600,
+    }
+
+
+def get_template_telemetry(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Telemetri-inställningar för index.html.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: 'interval_seconds' (None = skicka inget) och 'release'
+    """
+    settings = get_telemetry_config(config)
+    bundle = get_template_assets()['bundles'].get('dashboard.js')
+    return {
+        'interval_seconds': settings['interval_seconds'] if settings['enabled'] else None,
+        'release': bundle.rsplit('/', 1)[-1] if bundle else 'static',
+    }
+
+
+def _number(section: Any, key: str, upper: float) -> Optional[float]:
+    """Tal från rapporten, begränsat till 0..upper (None om det saknas eller är ogiltigt)."""
+    if not isinstance(section, dict):
+        return None
+    value = section.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return float(min(upper, max(0.0, value)))
+
+
+def _normalize_report(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Plocka ut kända fält ur en rapport - allt annat ignoreras."""
+    frames = payload.get('frames')
+    long_tasks = payload.get('long_tasks')
+    heap = payload.get('heap')
+    fetches = payload.get('fetch')
+    effects = payload.get('effects')
+
+    mode = effects.get('mode') if isinstance(effects, dict) else None
+    return {
+        'received': time.time(),
+        'period_s': _number(payload, 'period_s', 86400),
+        'visible_s': _number(payload, 'visible_s', 86400),
+        'frames': _number(frames, 'n', 1e6),
+        'frame_p50_ms': _number(frames, 'p50', 60000),
+        'frame_p95_ms': _number(frames, 'p95', 60000),
+        'frame_max_ms': _number(frames, 'max', 60000),
+        'slow_frames': _number(frames, 'slow', 1e6),
+        'long_tasks': _number(long_tasks, 'n', 1e6),
+        'long_task_total_ms': _number(long_tasks, 'total', 86400000),
+        'long_task_max_ms': _number(long_tasks, 'max', 86400000),
+        'heap_used_mb': _number(heap, 'used_mb', 1e5),
+        'heap_limit_mb': _number(heap, 'limit_mb', 1e5),
+        'fetches': _number(fetches, 'n', 1e6),
+        'fetch_errors': _number(fetches, 'errors', 1e6),
+        'fetch_p50_ms': _number(fetches, 'p50', 600000),
+        'fetch_p95_ms': _number(fetches, 'p95', 600000),
+        'effect_fps': _number(effects, 'fps', 240),
+        'effect_scale': _number(effects, 'scale', 1),
+        'effect_particles': _number(effects, 'particles', 1e5),
+        'effect_mode': mode if mode in ('worker', 'main') else None,
+    }
+
+
+def reject_telemetry() -> None:
+    """Räkna en avvisad rapport (ogiltig eller för stor)."""
+    with _telemetry_lock:
+        _telemetry_state['rejected'] += 1
+    TELEMETRY_REPORTS.inc('rejected')
+
+
+def record_telemetry(payload: Any, remote_addr: Optional[str],
+                     settings: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Ta emot en telemetrirapport från en kiosk.
+
+    Args:
+        payload: JSON-objektet från klienten
+        remote_addr: Klientens adress (används om kiosk-id saknas)
+        settings: Resultat från get_telemetry_config()
+
+    Returns:
+        tuple: (kiosk-id, None) eller (None, felmeddelande)
+    """
+    if not isinstance(payload, dict):
+        reject_telemetry()
+        return None, 'Rapporten måste vara ett JSON-objekt'
+
+    kiosk = payload.get('kiosk')
+    if not isinstance(kiosk, str) or not _KIOSK_ID_PATTERN.match(kiosk):
+        kiosk = remote_addr or 'okänd'
+    release = payload.get('release')
+    release = release[:64] if isinstance(release, str) and release else 'okänd'
+
+    report = _normalize_report(payload)
+    now = report['received']
+
+    with _telemetry_lock:
+        kiosks = _telemetry_state['kiosks']
+        entry = kiosks.pop(kiosk, None)
+        if entry is None:
+            while len(kiosks) >= settings['max_kiosks']:
+                evicted, _ = kiosks.popitem(last=False)
+                _telemetry_state['evicted'] += 1
+                logger.info(f"📉 Telemetri: {evicted} tas bort (max {settings['max_kiosks']} kiosker)")
+            entry = {'first_seen': now, 'reports': deque(maxlen=settings['window_reports'])}
+        elif entry['reports'].maxlen != settings['window_reports']:
+            entry['reports'] = deque(entry['reports'], maxlen=settings['window_reports'])
+
+        entry.update({'release': release, 'remote_addr': remote_addr, 'last_seen': now})
+        entry['reports'].append(report)
+        # Senast hörda sist - den först i ordningen är den som får ge plats
+        kiosks[kiosk] = entry
+        _telemetry_state['accepted'] += 1
+
+    TELEMETRY_REPORTS.inc('accepted')
+    return kiosk, None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _kiosk_stats(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Rullande värden över kioskens rapportfönster."""
+    reports = list(entry['reports'])
+
+    def values(key: str) -> List[float]:
+        return [report[key] for report in reports if report[key] is not None]
+
+    def last(key: str) -> Optional[float]:
+        found = values(key)
+        return found[-1] if found else None
+
+    def ratio(part: str, whole: str) -> Optional[float]:
+        total = sum(values(whole))
+        return sum(values(part)) / total if total else None
+
+    visible_minutes = sum(values('visible_s')) / 60
+    scales = values('effect_scale')
+    modes = [report['effect_mode'] for report in reports if report['effect_mode']]
+    return {
+        'release': entry['release'],
+        'remote_addr': entry['remote_addr'],
+        'reports': len(reports),
+        'last_seen': entry['last_seen'],
+        'frame_p95_ms': _mean(values('frame_p95_ms')),
+        'frame_max_ms': max(values('frame_max_ms'), default=None),
+        'slow_frame_ratio': ratio('slow_frames', 'frames'),
+        'long_tasks_per_minute': sum(values('long_tasks')) / visible_minutes if visible_minutes else None,
+        'long_task_max_ms': max(values('long_task_max_ms'), default=None),
+        'heap_used_mb': last('heap_used_mb'),
+        'heap_peak_mb': max(values('heap_used_mb'), default=None),
+        'fetch_p95_ms': _mean(values('fetch_p95_ms')),
+        'fetch_error_ratio': ratio('fetch_errors', 'fetches'),
+        'effect_fps': _mean(values('effect_fps')),
+        'effect_scale': min(scales) if scales else None,
+        'effect_particles': last('effect_particles'),
+        'effect_mode': modes[-1] if modes else None,
+    }
+
+
+def _snapshot(stale_seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """Rullande värden för alla kiosker (tysta kiosker rensas först)."""
+    now = time.time()
+    with _telemetry_lock:
+        kiosks = _telemetry_state['kiosks']
+        if stale_seconds is not None:
+            for kiosk in [k for k, entry in kiosks.items() if now - entry['last_seen'] > stale_seconds]:
+                del kiosks[kiosk]
+        return {kiosk: _kiosk_stats(entry) for kiosk, entry in kiosks.items()}
+
+
+def _collect_telemetry() -> None:
+    settings = get_telemetry_config(get_weather_state()['config'])
+    snapshot = _snapshot(settings['stale_seconds'])
+    now = time.time()
+
+    CLIENT_INFO.replace_all({(kiosk, stats['release']): 1 for kiosk, stats in snapshot.items()})
+    CLIENT_REPORT_AGE.replace_all({(kiosk,): now - stats['last_seen'] for kiosk, stats in snapshot.items()})
+    for gauge, key, factor in _KIOSK_GAUGES:
+        gauge.replace_all({(kiosk,): stats[key] * factor
+                           for kiosk, stats in snapshot.items() if stats[key] is not None})
+
+
+register_collector(_collect_telemetry)
+
+
+def get_telemetry_status(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Status för /api/status.
+
+    Args:
+        config (dict): Applikationskonfiguration
+
+    Returns:
+        dict: Inställningar, räknare och rullande värden per kiosk
+    """
+    settings = get_telemetry_config(config)
+
+    def rounded(stats: Dict[str, Any]) -> Dict[str, Any]:
+        result = {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+        result['last_seen'] = datetime.fromtimestamp(stats['last_seen']).isoformat(timespec='seconds')
+        return result
+
+    return {
+        'enabled': settings['enabled'],
+        'interval_seconds': settings['interval_seconds'],
+        'window_reports': settings['window_reports'],
+        'max_kiosks': settings['max_kiosks'],
+        'accepted': _telemetry_state['accepted'],
+        'rejected': _telemetry_state['rejected'],
+        'evicted': _telemetry_state['evicted'],
+        'kiosks': {kiosk: rounded(stats) for kiosk, stats in _snapshot(settings['stale_seconds']).items()},
+    }
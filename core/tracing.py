@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - Tracing
+Lättviktiga tidsspann (spans) för uppdateringscyklerna.
+
+En cykel startas med trace_cycle() och blir roten i ett span-träd; span()
+inuti samma tråd hänger på nya noder. Färdiga träd sparas i en ringbuffert
+som exponeras via /api/debug/timings. Utanför en cykel är span() nästan
+gratis (en trådlokal uppslagning), så klienternas krokar kan ligga kvar i
+heta vägar.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+# Lägg till reference/data för instrumenteringskrokarna
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data'))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_BUFFER_SIZE = 20
+
+_thread_local = threading.local()
+
+# Tracing-inställningar och ringbuffert för färdiga cykler
+_tracing_state: Dict[str, Any] = {
+    'slow_cycle_seconds': None,
+    'traces': deque(maxlen=DEFAULT_TRACE_BUFFER_SIZE),
+}
+_traces_lock = threading.Lock()
+
+
+class Span:
+    """En tidsmätt nod i ett span-träd."""
+
+    __slots__ = ('name', 'start', 'end', 'children', 'error')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List['Span'] = []
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """Serialisera spannet relativt rotens start."""
+        data = {
+            'name': self.name,
+            'offset_ms': round((self.start - origin) * 1000, 2),
+            'duration_ms': round(self.duration * 1000, 2),
+        }
+        if self.error:
+            data['error'] = self.error
+        if self.children:
+            data['children'] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+def get_tracing_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta tracing-inställningar med standardvärden.
+
+    Args:
+        config (dict): Applikationskonfiguration (eller None)
+
+    Returns:
+        dict: Komplett tracing-konfiguration
+    """
+    diagnostics = (config or {}).get('diagnostics', {})
+
+    return {
+        'trace_buffer_size': max(1, diagnostics.get('trace_buffer_size', DEFAULT_TRACE_BUFFER_SIZE)),
+        'slow_cycle_seconds': diagnostics.get('slow_cycle_seconds'),
+    }
+
+
+def init_tracing(config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Konfigurera ringbufferten och koppla klienternas span-krok till tracern.
+
+    Args:
+        config (dict): Applikationskonfiguration (eller None)
+    """
+    settings = get_tracing_config(config)
+
+    with _traces_lock:
+        old_traces = _tracing_state['traces']
+        _tracing_state['traces'] = deque(old_traces, maxlen=settings['trace_buffer_size'])
+        _tracing_state['slow_cycle_seconds'] = settings['slow_cycle_seconds']
+
+    from instrumentation import set_span_factory
+    set_span_factory(span)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+    """
+    Mät en fas inom pågående cykel i denna tråd.
+
+    Utanför trace_cycle() görs ingen mätning.
+
+    Args:
+        name (str): Fasens namn, t.ex. 'smhi.json_decode'
+    """
+    stack = getattr(_thread_local, 'stack', None)
+    if not stack:
+        yield None
+        return
+
+    node = Span(name)
+    stack[-1].children.append(node)
+    stack.append(node)
+    try:
+        yield node
+    except BaseException as e:
+        node.error = type(e).__name__
+        raise
+    finally:
+        node.end = time.perf_counter()
+        stack.pop()
+
+
+@contextmanager
+def trace_cycle(name: str) -> Iterator[Span]:
+    """
+    Mät en hel uppdateringscykel som rot i ett nytt span-träd.
+
+    Anropas trace_cycle() inuti en pågående cykel (t.ex. framtvingad
+    uppdatering) blir den ett vanligt span.
+
+    Args:
+        name (str): Cykelns namn, t.ex. 'full' eller 'netatmo'
+    """
+    if getattr(_thread_local, 'stack', None):
+        with span(name) as node:
+            yield node
+        return
+
+    root = Span(name)
+    started_at = time.time()
+    _thread_local.stack = [root]
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        root.end = time.perf_counter()
+        _thread_local.stack = None
+        _finish_cycle(root, started_at)
+
+
+def _finish_cycle(root: Span, started_at: float) -> None:
+    """Spara färdig cykel i ringbufferten och logga om den var långsam."""
+    trace = root.to_dict(root.start)
+    trace['started_at'] = datetime.fromtimestamp(started_at).isoformat()
+    trace['thread'] = threading.current_thread().name
+
+    with _traces_lock:
+        _tracing_state['traces'].append(trace)
+        slow_threshold = _tracing_state['slow_cycle_seconds']
+
+    if slow_threshold is not None and root.duration >= slow_threshold:
+        logger.warning(
+            f"🐢 Långsam cykel '{root.name}': {root.duration:.2f}s "
+            f"(gräns {slow_threshold}s)\n{format_trace(trace)}"
+        )
+
+
+def format_trace(trace: Dict[str, Any]) -> str:
+    """
+    Formatera ett span-träd som indenterad text för loggen.
+
+    Args:
+        trace (dict): Serialiserat span-träd
+
+    Returns:
+        str: En rad per span
+    """
+    lines: List[str] = []
+
+    def _walk(node: Dict[str, Any], depth: int) -> None:
+        error = f" ❌ {node['error']}" if node.get('error') else ''
+        lines.append(f"{'  ' * depth}{node['name']}: {node['duration_ms']:.1f} ms "
+                     f"(+{node['offset_ms']:.1f}){error}")
+        for child in node.get('children', []):
+            _walk(child, depth + 1)
+
+    _walk(trace, 0)
+    return '\n'.join(lines)
+
+
+def get_recent_traces(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Hämta färdiga cykler ur ringbufferten, senaste först.
+
+    Args:
+        limit (int): Max antal cykler (None = alla i bufferten)
+
+    Returns:
+        list: Serialiserade span-träd
+    """
+    with _traces_lock:
+        traces = list(_tracing_state['traces'])
+
+    traces.reverse()
+    if limit is not None:
+        traces = traces[:max(0, limit)]
+    return traces
+
+
+def get_tracing_status() -> Dict[str, Any]:
+    """
+    Hämta tracing-inställningar för /api/debug/timings.
+
+    Returns:
+        dict: Buffertstorlek, antal sparade cykler och långsam-gräns
+    """
+    with _traces_lock:
+        return {
+            'buffer_size': _tracing_state['traces'].maxlen,
+            'buffered': len(_tracing_state['traces']),
+            'slow_cycle_seconds': _tracing_state['slow_cycle_seconds'],
+        }
@@ -5,9 +5,13 @@ FAS 2: Refaktorering - Global state för väderdata och konfiguration
 SSOT-FIX: Utökad med warnings-stöd för komplett Single Source of Truth
 """
 
+import logging
+import time
 from datetime import datetime
 from typing import Dict, Optional, Any
 
+logger = logging.getLogger(__name__)
+
 # Global state för weather data - importeras av alla moduler
 weather_state: Dict[str, Any] = {
     'smhi_data': None,
@@ -15,6 +19,7 @@ weather_state: Dict[str, Any] = {
     'forecast_data': None,
     'daily_forecast_data': None,
     'sun_data': None,
+    'humidity_data': None,      # Luftfuktighetsobservation (datakällan smhi_humidity)
     'last_update': None,
     'config': None,
     'status': 'Startar...',
@@ -42,6 +47,18 @@ api_clients = {
     'smhi_warnings_client': None  # SSOT-FIX: Tillagt för warnings-stöd
 }
 
+# Datasektioner vars ålder spåras (för metrics och snapshot-metadata)
+DATA_SECTIONS = (
+    'smhi_data', 'netatmo_data', 'forecast_data',
+    'daily_forecast_data', 'sun_data', 'smhi_warnings_data'
+)
+
+# Senaste uppdatering (epoch) per datasektion - sätts bara för riktig data
+_section_timestamps: Dict[str, float] = {}
+
+# Räknas upp vid varje ändring av state - nyckel för serialiseringscachen (core/api_cache.py)
+_state_version = {'version': 0}
+
 def get_weather_state() -> Dict[str, Any]:
     """
     Hämta aktuell weather state.
@@ -60,7 +77,42 @@ def update_weather_state(key: str, value: Any) -> None:
         value (Any): Nytt värde
     """
     global weather_state
+    # Samma skalära värde igen (t.ex. netatmo_available varje cykel) ändrar inget;
+    # dict/list kan ha muterats på plats och räknas alltid som ändring
+    if isinstance(value, (dict, list)) or weather_state.get(key) != value:
+        _state_version['version'] += 1
     weather_state[key] = value
+    if key in DATA_SECTIONS and value is not None:
+        _section_timestamps[key] = time.time()
+
+def get_state_version() -> int:
+    """
+    Hämta state-versionen (ändras när något i weather state har ändrats).
+    
+    Returns:
+        int: Versionsnummer, unikt inom processen
+    """
+    return _state_version['version']
+
+def get_section_timestamps() -> Dict[str, float]:
+    """
+    Hämta tidpunkt (epoch) för senaste uppdatering per datasektion.
+    
+    Returns:
+        dict: Sektion → epoch-sekunder
+    """
+    return dict(_section_timestamps)
+
+def restore_section_timestamps(timestamps: Dict[str, float]) -> None:
+    """
+    Sätt sektionstider från en snapshot (så att åldern följer ursprungsdatan).
+    
+    Args:
+        timestamps (dict): Sektion → epoch-sekunder
+    """
+    for key, value in timestamps.items():
+        if key in DATA_SECTIONS:
+            _section_timestamps[key] = value
 
 def get_api_client(client_name: str) -> Optional[Any]:
     """
@@ -95,7 +147,8 @@ def update_status(new_status: str) -> None:
     global weather_state
     weather_state['status'] = new_status
     weather_state['last_update'] = datetime.now().isoformat()
-    print(f"📊 Status: {new_status}")
+    _state_version['version'] += 1
+    logger.info(f"📊 Status: {new_status}")
 
 def get_system_mode() -> str:
     """
@@ -192,6 +245,9 @@ def set_warnings_data(warnings_data: Dict[str, Any]) -> None:
     global weather_state
     weather_state['smhi_warnings_data'] = warnings_data
     weather_state['warnings_last_update'] = datetime.now().isoformat()
+    _state_version['version'] += 1
+    if warnings_data is not None:
+        _section_timestamps['smhi_warnings_data'] = time.time()
 
 def get_warnings_last_update() -> Optional[str]:
     """
@@ -214,6 +270,7 @@ def reset_state() -> None:
         'forecast_data': None,
         'daily_forecast_data': None,
         'sun_data': None,
+        'humidity_data': None,
         'last_update': None,
         'status': 'Återställd...',
         'netatmo_available': False,
@@ -231,5 +288,7 @@ def reset_state() -> None:
         'sun_calculator': None,
         'smhi_warnings_client': None  # SSOT-FIX: Inkludera warnings-klient
     }
+    _section_timestamps.clear()
+    _state_version['version'] += 1
     
-    print("🔄 Weather state återställd")
+    logger.info("🔄 Weather state återställd")
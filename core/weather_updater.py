@@ -6,11 +6,11 @@ SSOT-FIX: Utökad med warnings-stöd och trycktrend-funktioner
 """
 
 import os
+import logging
 import sys
-import threading
 import time
-from datetime import datetime
-from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
 
 # Lägg till reference/data för import av API-klienter
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data'))
@@ -18,9 +18,205 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'reference', 'data
 from .weather_state import (
     get_weather_state, update_weather_state, 
     get_api_client, set_api_client, update_status,
-    set_warnings_data, is_warnings_enabled
+    set_warnings_data, get_warnings_data, is_warnings_enabled
 )
 from .config_manager import get_smhi_weather_effect_type
+from .leader_election import publish_state_snapshot, get_deployment_config, clear_warm_start
+from .metrics import observe_update_cycle
+from .tracing import trace_cycle, span
+from upstream import deadline
+import weather_symbols
+from .data_sources import (
+    DataSource, register_data_source, refresh_due_sources, critical_sources_ok, invalidate_data_source,
+    get_data_sources_config, OUTCOME_REFRESHED, OUTCOME_DISABLED, OUTCOME_BUSY
+)
+from .scheduler import (
+    add_job, remove_job, trigger_job, get_jobs_status, get_scheduler_config,
+    schedule_once, start_scheduler
+)
+from .demand import check_demand, get_demand_config
+from .config_reload import changed_under
+from .startup import mark_startup_once
+
+logger = logging.getLogger(__name__)
+
+
+def get_upstream_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Hämta circuit breaker- och tidsbudget-inställningar med standardvärden.
+    
+    Args:
+        config (dict): Applikationskonfiguration
+        
+    Returns:
+        dict: Komplett upstream-konfiguration
+    """
+    upstream_config = (config or {}).get('upstream', {})
+    
+    return {
+        'circuit_breaker_enabled': upstream_config.get('circuit_breaker_enabled', True),
+        'breaker_failure_threshold': max(1, int(upstream_config.get('breaker_failure_threshold', 3))),
+        'breaker_open_seconds': max(1.0, float(upstream_config.get('breaker_open_seconds', 30))),
+        'breaker_max_open_seconds': max(1.0, float(upstream_config.get('breaker_max_open_seconds', 300))),
+        'cycle_budget_seconds': upstream_config.get('cycle_budget_seconds', 30),
+        'netatmo_budget_seconds': upstream_config.get('netatmo_budget_seconds', 15),
+        'warnings_budget_seconds': upstream_config.get('warnings_budget_seconds', 15),
+    }
+
+
+def configure_upstream(config: Dict[str, Any]) -> bool:
+    """
+    Sätt upstream-transport: circuit breakers, värd-omdirigering (lokala
+    fejkservrar) och kassett-inspelning/uppspelning.
+    
+    Args:
+        config (dict): Applikationskonfiguration
+        
+    Returns:
+        bool: False om replay begärts men kassetten inte kan läsas
+    """
+    from upstream import set_host_overrides, set_transport_mode, MODE_LIVE, MODE_RECORD, MODE_REPLAY
+    from circuit_breaker import configure_breakers
+    
+    diagnostics = config.get('diagnostics', {})
+    
+    # Circuit breakers per värd - en nere källa ska fela direkt
+    upstream_settings = get_upstream_config(config)
+    configure_breakers(
+        enabled=upstream_settings['circuit_breaker_enabled'],
+        failure_threshold=upstream_settings['breaker_failure_threshold'],
+        open_seconds=upstream_settings['breaker_open_seconds'],
+        max_open_seconds=upstream_settings['breaker_max_open_seconds']
+    )
+    
+    # Lokala fejkservrar vid lasttester (benchmarks/fake_upstream.py)
+    upstream_overrides = diagnostics.get('upstream_overrides') or {}
+    set_host_overrides(upstream_overrides)
+    if upstream_overrides:
+        logger.warning(f"🧪 Upstream-värdar omdirigerade: {upstream_overrides}")
+    
+    mode = diagnostics.get('upstream_mode') or MODE_LIVE
+    cassette_dir = diagnostics.get('cassette_dir')
+    if mode == MODE_RECORD and not cassette_dir:
+        runtime_dir = get_deployment_config(config)['runtime_dir']
+        cassette_dir = os.path.join(runtime_dir, 'cassettes', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    
+    try:
+        set_transport_mode(mode, cassette_dir,
+                           time_scale=diagnostics.get('replay_time_scale', 1.0),
+                           strict=diagnostics.get('replay_strict', False))
+    except (ValueError, OSError) as e:
+        logger.error(f"❌ Upstream-läge '{mode}' kunde inte aktiveras: {e}")
+        if mode == MODE_REPLAY:
+            # Hellre ingen data än oväntade anrop mot riktiga API:er
+            return False
+        set_transport_mode(MODE_LIVE)
+        return True
+    
+    if mode == MODE_RECORD:
+        logger.warning(f"📼 Spelar in all upstream-trafik till {cassette_dir}")
+    elif mode == MODE_REPLAY:
+        logger.warning(f"📼 Spelar upp upstream-trafik från {cassette_dir} "
+                       f"(tidsskala {diagnostics.get('replay_time_scale', 1.0)})")
+    return True
+
+
+def _build_smhi_client(config: Dict[str, Any]) -> None:
+    """Skapa SMHI-klienten för konfigurerad position."""
+    from smhi_client import SMHIClient
+    
+    smhi_lat = config['smhi']['latitude']
+    smhi_lon = config['smhi']['longitude']
+    set_api_client('smhi_client', SMHIClient(smhi_lat, smhi_lon))
+    logger.info(f"✅ SMHI-klient initierad för {smhi_lat}, {smhi_lon}")
+
+
+def _build_warnings_client(config: Dict[str, Any]) -> None:
+    """SSOT-FIX: Skapa SMHI Warnings-klienten om varningar är aktiverade."""
+    from smhi_warnings_client import SMHIWarningsClient
+    
+    if not get_weather_state()['warnings_enabled']:
+        set_api_client('smhi_warnings_client', None)
+        logger.info("📊 SMHI Varningar INAKTIVERAT i config")
+        return
+    
+    try:
+        # Konfigurerbar cache-duration (default 10 min för varningar)
+        warnings_cache_duration = config.get('smhi_warnings', {}).get('cache_duration_minutes', 10) * 60
+        smhi_warnings_client = SMHIWarningsClient(cache_duration=warnings_cache_duration)
+        set_api_client('smhi_warnings_client', smhi_warnings_client)
+        logger.info(f"✅ SMHI Warnings-klient initierad (cache: {warnings_cache_duration//60} min)")
+    except Exception as e:
+        logger.error(f"❌ SMHI Warnings-initialisering misslyckades: {e}")
+        logger.info("🔄 Fortsätter utan varningsstöd")
+        set_api_client('smhi_warnings_client', None)
+        update_weather_state('warnings_enabled', False)
+
+
+def _warm_up_netatmo(netatmo_client: Any) -> None:
+    """
+    Engångsjobb: Netatmo-autentisering och tryckhistorik efter att porten öppnats.
+    
+    Misslyckas autentiseringen körs SMHI-only som tidigare (när den
+    gjordes synkront i konstruktorn).
+    """
+    try:
+        netatmo_client.warm_up()
+        mark_startup_once('netatmo_auth')
+    except Exception as e:
+        if get_api_client('netatmo_client') is not netatmo_client:
+            return  # Ersatt av config-omladdning under tiden
+        logger.error(f"❌ FAS 2: Netatmo-initialisering misslyckades: {e}")
+        logger.info("🔄 FAS 2: Fortsätter i SMHI-only läge")
+        set_api_client('netatmo_client', None)
+        update_weather_state('netatmo_available', False)
+
+
+def _build_netatmo_client(config: Dict[str, Any]) -> None:
+    """
+    FAS 2: Skapa Netatmo-klienten om use_netatmo är satt.
+    
+    Konstruktorn gör ingen nätverkstrafik - autentisering och inläsning av
+    tryckhistorik körs som engångsjobb parallellt med första väderhämtningen.
+    """
+    from netatmo_client import NetatmoClient
+    
+    if not get_weather_state()['use_netatmo']:
+        set_api_client('netatmo_client', None)
+        update_weather_state('netatmo_available', False)
+        logger.info("📊 FAS 2: Netatmo INAKTIVERAT i config - kör SMHI-only läge")
+        return
+    
+    try:
+        netatmo_config = config['netatmo']
+        netatmo_client = NetatmoClient(
+            netatmo_config['client_id'],
+            netatmo_config['client_secret'],
+            netatmo_config['refresh_token'],
+            netatmo_config.get('preferred_station'),
+            defer_auth=True
+        )
+        set_api_client('netatmo_client', netatmo_client)
+        update_weather_state('netatmo_available', True)
+        schedule_once('netatmo_warmup', 0, lambda: _warm_up_netatmo(netatmo_client))
+        logger.info("✅ FAS 2: Netatmo-klient initierad med trycktrend-stöd (autentiseras i bakgrunden)")
+    except Exception as e:
+        logger.error(f"❌ FAS 2: Netatmo-initialisering misslyckades: {e}")
+        logger.info("🔄 FAS 2: Fortsätter i SMHI-only läge")
+        set_api_client('netatmo_client', None)
+        update_weather_state('netatmo_available', False)
+        # Behåll use_netatmo=True men markera som otillgänglig
+
+
+def _build_sun_calculator(config: Dict[str, Any]) -> None:
+    """Skapa sol-kalkylatorn (lokal NOAA-beräkning, ipgeolocation-API om use_api är satt)."""
+    from utils import SunCalculator
+    
+    ipgeolocation = config.get('ipgeolocation', {})
+    api_key = ipgeolocation.get('api_key', '').strip() or None
+    sun_calculator = SunCalculator(api_key, use_api=ipgeolocation.get('use_api', False))
+    set_api_client('sun_calculator', sun_calculator)
+    logger.info(f"✅ Sol-kalkylator initierad ({'API' if sun_calculator.use_api else 'Lokal'})")
 
 
 def init_api_clients(config: Dict[str, Any]) -> bool:
@@ -34,90 +230,45 @@ def init_api_clients(config: Dict[str, Any]) -> bool:
     Returns:
         bool: True om initialisering lyckades (åtminstone delvis)
     """
-    try:
-        from smhi_client import SMHIClient
-        from netatmo_client import NetatmoClient
-        from smhi_warnings_client import SMHIWarningsClient  # SSOT-FIX: Tillagt
-        from utils import SunCalculator
-    except ImportError as e:
-        print(f"❌ Import fel: {e}")
-        print("🔧 Kontrollera att reference/data/ finns och innehåller smhi_client.py m.fl.")
+    # Klientmodulerna importeras först i _build_* (bara de som används)
+    if not configure_upstream(config):
         return False
     
-    weather_state = get_weather_state()
-    use_netatmo = weather_state['use_netatmo']
-    warnings_enabled = weather_state['warnings_enabled']  # SSOT-FIX: Hämta från state
-    
     try:
         # SMHI Client (alltid obligatorisk)
-        smhi_lat = config['smhi']['latitude']
-        smhi_lon = config['smhi']['longitude']
-        smhi_client = SMHIClient(smhi_lat, smhi_lon)
-        set_api_client('smhi_client', smhi_client)
-        print(f"✅ SMHI-klient initierad för {smhi_lat}, {smhi_lon}")
+        _build_smhi_client(config)
         
         # SSOT-FIX: SMHI Warnings Client (villkorsstyrd)
-        if warnings_enabled:
-            try:
-                # Konfigurerbar cache-duration (default 10 min för varningar)
-                warnings_cache_duration = config.get('smhi_warnings', {}).get('cache_duration_minutes', 10) * 60
-                smhi_warnings_client = SMHIWarningsClient(cache_duration=warnings_cache_duration)
-                set_api_client('smhi_warnings_client', smhi_warnings_client)
-                print(f"✅ SMHI Warnings-klient initierad (cache: {warnings_cache_duration//60} min)")
-            except Exception as e:
-                print(f"❌ SMHI Warnings-initialisering misslyckades: {e}")
-                print("🔄 Fortsätter utan varningsstöd")
-                set_api_client('smhi_warnings_client', None)
-                update_weather_state('warnings_enabled', False)
-        else:
-            set_api_client('smhi_warnings_client', None)
-            print("📊 SMHI Varningar INAKTIVERAT i config")
+        _build_warnings_client(config)
         
         # FAS 2: Villkorsstyrd Netatmo Client
-        if use_netatmo:
-            try:
-                netatmo_config = config['netatmo']
-                netatmo_client = NetatmoClient(
-                    netatmo_config['client_id'],
-                    netatmo_config['client_secret'],
-                    netatmo_config['refresh_token'],
-                    netatmo_config.get('preferred_station')
-                )
-                set_api_client('netatmo_client', netatmo_client)
-                update_weather_state('netatmo_available', True)
-                print("✅ FAS 2: Netatmo-klient initierad med trycktrend-stöd")
-            except Exception as e:
-                print(f"❌ FAS 2: Netatmo-initialisering misslyckades: {e}")
-                print("🔄 FAS 2: Fortsätter i SMHI-only läge")
-                set_api_client('netatmo_client', None)
-                update_weather_state('netatmo_available', False)
-                # Behåll use_netatmo=True men markera som otillgänglig
-        else:
-            set_api_client('netatmo_client', None)
-            update_weather_state('netatmo_available', False)
-            print("📊 FAS 2: Netatmo INAKTIVERAT i config - kör SMHI-only läge")
+        _build_netatmo_client(config)
         
         # Sun Calculator (alltid obligatorisk)
-        api_key = config.get('ipgeolocation', {}).get('api_key', '').strip() or None
-        sun_calculator = SunCalculator(api_key)
-        set_api_client('sun_calculator', sun_calculator)
-        print(f"✅ Sol-kalkylator initierad ({'API' if api_key else 'Fallback'})")
+        _build_sun_calculator(config)
         
         # FAS 2: WeatherEffects sammanfattning
+        weather_state = get_weather_state()
         if weather_state['weather_effects_enabled']:
             effect_config = weather_state['weather_effects_config']
             rain_count = effect_config.get('rain_config', {}).get('droplet_count', 50)
             snow_count = effect_config.get('snow_config', {}).get('flake_count', 25)
-            print(f"🌦️ WeatherEffects aktiverat - Regn: {rain_count}, Snö: {snow_count}")
+            logger.info(f"🌦️ WeatherEffects aktiverat - Regn: {rain_count}, Snö: {snow_count}")
         
         # FAS 2: Sammanfattning av initialiserat läge
         from .weather_state import get_system_mode
-        print(f"🎯 FAS 2: Systemläge - {get_system_mode()}")
+        logger.info(f"🎯 FAS 2: Systemläge - {get_system_mode()}")
+        
+        register_data_sources(config)
         
         return True
         
+    except ImportError as e:
+        logger.error(f"❌ Import fel: {e}")
+        logger.info("🔧 Kontrollera att reference/data/ finns och innehåller smhi_client.py m.fl.")
+        return False
     except Exception as e:
-        print(f"❌ Fel vid initialisering av API-klienter: {e}")
+        logger.error(f"❌ Fel vid initialisering av API-klienter: {e}")
         return False
 
 
@@ -132,14 +283,17 @@ def update_warnings_data() -> None:
         return
     
     try:
-        print("⚠️ Uppdaterar SMHI varningar...")
+        logger.info("⚠️ Uppdaterar SMHI varningar...")
         
         # Hämta skyfallsvarningar (huvudfokus)
-        heavy_rain_warnings = smhi_warnings_client.get_heavy_rain_warnings()
-        active_rain_warnings = smhi_warnings_client.get_active_heavy_rain_warnings()
+        with span('warnings.heavy_rain'):
+            heavy_rain_warnings = smhi_warnings_client.get_heavy_rain_warnings()
+        with span('warnings.active_heavy_rain'):
+            active_rain_warnings = smhi_warnings_client.get_active_heavy_rain_warnings()
         
         # Hämta varningssammanfattning
-        warnings_summary = smhi_warnings_client.get_warnings_summary()
+        with span('warnings.summary'):
+            warnings_summary = smhi_warnings_client.get_warnings_summary()
         
         # Strukturera data för frontend
         warnings_data = {
@@ -157,18 +311,18 @@ def update_warnings_data() -> None:
         active_rain = len(active_rain_warnings)
         total_warnings = warnings_summary.get('total_warnings', 0)
         
-        print(f"✅ SMHI varningar uppdaterade - Skyfall: {total_rain} totalt, {active_rain} aktiva, {total_warnings} alla varningar")
+        logger.info(f"✅ SMHI varningar uppdaterade - Skyfall: {total_rain} totalt, {active_rain} aktiva, {total_warnings} alla varningar")
         
         # Extra logging för aktiva varningar
         if active_rain_warnings:
-            print("🚨 AKTIVA SKYFALLSVARNINGAR:")
+            logger.info("🚨 AKTIVA SKYFALLSVARNINGAR:")
             for warning in active_rain_warnings:
                 areas = ', '.join(warning.get('areas', []))[:50]  # Begränsa längd
                 severity = warning.get('severity_info', {}).get('description', 'Okänd')
-                print(f"   - {severity}: {areas}")
+                logger.info(f"   - {severity}: {areas}")
         
     except Exception as e:
-        print(f"❌ Fel vid uppdatering av SMHI varningar: {e}")
+        logger.error(f"❌ Fel vid uppdatering av SMHI varningar: {e}")
         # Sätt fallback-data vid fel
         fallback_data = {
             'heavy_rain_warnings': [],
@@ -276,103 +430,274 @@ def format_api_response_with_pressure_trend(netatmo_data: Optional[Dict[str, Any
                 'source': 'netatmo'
             }
             formatted_data['pressure_trend'] = formatted_trend
-            print(f"📊 FAS 2: API - Netatmo trycktrend: {formatted_trend['trend']} ({formatted_trend['analysis_quality']})")
+            logger.debug(f"📊 FAS 2: API - Netatmo trycktrend: {formatted_trend['trend']} ({formatted_trend['analysis_quality']})")
         else:
             # FAS 2: Använd SMHI-fallback om Netatmo-trend är n/a
             smhi_fallback = create_smhi_pressure_trend_fallback(smhi_data)
             formatted_data['pressure_trend'] = smhi_fallback
-            print(f"📊 FAS 2: API - SMHI trycktrend-fallback: {smhi_fallback['trend']}")
+            logger.debug(f"📊 FAS 2: API - SMHI trycktrend-fallback: {smhi_fallback['trend']}")
     else:
         # FAS 2: Inget trycktrend alls - skapa SMHI-fallback
         smhi_fallback = create_smhi_pressure_trend_fallback(smhi_data)
         formatted_data['pressure_trend'] = smhi_fallback
-        print("📊 FAS 2: API - Ingen Netatmo trycktrend, använder SMHI-fallback")
+        logger.debug("📊 FAS 2: API - Ingen Netatmo trycktrend, använder SMHI-fallback")
     
     return formatted_data
 
 
-def update_weather_data() -> None:
+def _next_midnight(epoch: float) -> float:
+    """Epoch för nästa lokala midnatt efter epoch (soltider gäller ett datum)."""
+    next_day = datetime.fromtimestamp(epoch).date() + timedelta(days=1)
+    return datetime.combine(next_day, datetime.min.time()).timestamp()
+
+
+def _refresh_smhi_humidity() -> bool:
+    """Datakälla: senaste luftfuktighetsobservation (SMHI metobs, timvis)."""
+    smhi_client = get_api_client('smhi_client')
+    if not smhi_client:
+        return False
+    
+    with span('smhi.humidity'):
+        humidity_data = smhi_client.get_station_humidity()
+    
+    if humidity_data is None:
+        # Behåll senaste observationen (märkt stale, ålder från dess tidsstämpel)
+        # så att ett enstaka fel mot SMHI inte tar bort luftfuktigheten
+        previous = get_weather_state().get('humidity_data')
+        if previous:
+            measured = _parse_epoch(previous.get('timestamp'))
+            stale = {**previous, 'stale': True}
+            if measured is not None:
+                stale['data_age_minutes'] = int((time.time() - measured) / 60)
+            update_weather_state('humidity_data', stale)
+            logger.warning(f"⚠️ Luftfuktighet kunde inte hämtas - visar observation från "
+                           f"{previous.get('timestamp')} ({stale['data_age_minutes']} min)")
+        return False
+    
+    update_weather_state('humidity_data', humidity_data)
+    return True
+
+
+def _parse_epoch(iso_time: Optional[str]) -> Optional[float]:
+    """SMHI validTime ('2025-06-21T10:00:00Z') till epoch, None vid fel."""
+    try:
+        return datetime.fromisoformat(iso_time.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _set_daylight(points: List[Dict[str, Any]], positions: List[Dict[str, Any]]) -> None:
+    """Lägg dag/natt-flagga och ikon-id på prognospunkter (bulkuppslag i weather_symbols)."""
+    symbols = [point.get('weather_symbol') for point in points]
+    daytime_flags = [position['is_daytime'] for position in positions]
+    icons = weather_symbols.icon_classes(symbols, daytime_flags)
+    svgs = weather_symbols.svg_paths(symbols, daytime_flags)
+    for point, position, icon, svg in zip(points, positions, icons, svgs):
+        point['is_daytime'] = position['is_daytime']
+        point['sun_phase'] = position['phase']
+        point['sun_elevation'] = position['elevation']
+        point['icon'] = icon
+        point['icon_svg'] = svg
+
+
+def annotate_daylight(forecast_data: Optional[List[Dict[str, Any]]],
+                      daily_forecast_data: Optional[List[Dict[str, Any]]]) -> None:
     """
-    FAS 2: Uppdatera väderdata med villkorsstyrd Netatmo-hantering + SMHI luftfuktighet.
-    SSOT-FIX: Inkluderar warnings-uppdatering.
+    Sätt is_daytime, sun_phase och ikon-id på varje prognospunkt.
+    
+    Görs en gång per hämtning så att /api/forecast och /api/daily inte
+    behöver räkna något per anrop (och frontend slipper gissa 06-20).
+    Timpunkter använder solens höjd vid punktens tid, dagspunkter solens
+    höjd vid sann middag (polarnatt ger natt-ikon).
+    
+    Args:
+        forecast_data: Punkter från get_12h_forecast() (ändras på plats)
+        daily_forecast_data: Dagar från get_daily_forecast() (ändras på plats)
     """
+    sun_calculator = get_api_client('sun_calculator')
+    config = get_weather_state()['config']
+    if not sun_calculator or not config:
+        return
+    lat, lon = config['smhi']['latitude'], config['smhi']['longitude']
+    
+    points, positions = [], []
+    for point in forecast_data or []:
+        epoch = _parse_epoch(point.get('valid_time'))
+        if epoch is not None:
+            points.append(point)
+            positions.append(sun_calculator.get_solar_position(lat, lon, epoch))
+    
+    for day in daily_forecast_data or []:
+        try:
+            day_date = datetime.strptime(day['date'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            continue
+        points.append(day)
+        positions.append(sun_calculator.get_solar_noon_position(lat, lon, day_date))
+    
+    _set_daylight(points, positions)
+
+
+def get_current_sun_position() -> Optional[Dict[str, Any]]:
+    """
+    Solens position just nu för konfigurerad plats (minuttabell, O(1)).
+    
+    Returns:
+        dict: 'elevation', 'azimuth', 'phase', 'is_daytime' eller None utan sol-kalkylator
+    """
+    sun_calculator = get_api_client('sun_calculator')
+    config = get_weather_state()['config']
+    if not sun_calculator or not config:
+        return None
+    return sun_calculator.get_solar_position(config['smhi']['latitude'], config['smhi']['longitude'])
+
+
+def _refresh_smhi_forecast() -> bool:
+    """Datakälla: aktuellt väder (med senaste luftfuktighet), 12h- och 5-dagarsprognos."""
     weather_state = get_weather_state()
     smhi_client = get_api_client('smhi_client')
+    if not smhi_client:
+        return False
+    
+    with span('smhi.current'):
+        smhi_data = smhi_client.get_current_weather()
+    if smhi_data:
+        # FAS 2: Luftfuktighet från egen källa (smhi_humidity, timvis)
+        smhi_data = smhi_client.merge_humidity(smhi_data, weather_state.get('humidity_data'))
+    update_weather_state('smhi_data', smhi_data)
+    
+    with span('smhi.forecast_12h'):
+        forecast_data = smhi_client.get_12h_forecast()
+    
+    with span('smhi.forecast_daily'):
+        daily_forecast_data = smhi_client.get_daily_forecast(5)
+    
+    with span('sun.daylight'):
+        annotate_daylight(forecast_data, daily_forecast_data)
+    update_weather_state('forecast_data', forecast_data)
+    update_weather_state('daily_forecast_data', daily_forecast_data)
+    
+    if not smhi_data:
+        logger.error("❌ FAS 2: SMHI-data misslyckades")
+        return False
+    
+    # FAS 2: Debug-logging för luftfuktighetsdata
+    humidity = smhi_data.get('humidity')
+    if humidity is not None:
+        logger.debug(f"✅ FAS 2: SMHI-data med luftfuktighet uppdaterad - {humidity}% från "
+                     f"{smhi_data.get('humidity_station')} (ålder: {smhi_data.get('humidity_age_minutes')} min)")
+    else:
+        logger.warning("⚠️ FAS 2: SMHI-data uppdaterad men ingen luftfuktighet tillgänglig")
+    
+    # FAS 2: WeatherEffects debugging
+    if weather_state['weather_effects_enabled'] and smhi_data.get('weather_symbol'):
+        weather_symbol = smhi_data['weather_symbol']
+        effect_type = get_smhi_weather_effect_type(weather_symbol)
+        precipitation = smhi_data.get('precipitation', 0)
+        logger.debug(f"🌦️ FAS 2: SMHI Symbol {weather_symbol} → WeatherEffect '{effect_type}' (precipitation: {precipitation}mm)")
+    return True
+
+
+def _refresh_netatmo() -> bool:
+    """Datakälla: Netatmo-stationens aktuella värden och trycktrend."""
     netatmo_client = get_api_client('netatmo_client')
+    
+    with span('netatmo.current_weather'):
+        netatmo_data = netatmo_client.get_current_weather()
+    if netatmo_data is None:
+        # Behåll befintlig data - försöker igen vid nästa körning
+        return False
+    update_weather_state('netatmo_data', netatmo_data)
+    
+    # Logga trycktrend-data för debug
+    if 'pressure_trend' in netatmo_data:
+        trend_data = netatmo_data['pressure_trend']
+        logger.debug(f"📊 FAS 2: Netatmo trycktrend: {trend_data.get('trend', 'n/a')} - {trend_data.get('description', 'Ingen beskrivning')}")
+        if trend_data.get('data_hours', 0) > 0:
+            logger.debug(f"📈 FAS 2: Datahistorik: {trend_data['data_hours']:.1f} timmar, ändring: {trend_data.get('pressure_change', 0):.1f} hPa")
+    else:
+        logger.warning("⚠️ FAS 2: Ingen trycktrend-data i Netatmo-respons")
+    return True
+
+
+def _refresh_sun() -> bool:
+    """Datakälla: dagens soluppgång och solnedgång."""
+    weather_state = get_weather_state()
     sun_calculator = get_api_client('sun_calculator')
+    if not sun_calculator or not weather_state['config']:
+        return False
+    
+    lat = weather_state['config']['smhi']['latitude']
+    lon = weather_state['config']['smhi']['longitude']
+    with span('sun.times'):
+        sun_data = sun_calculator.get_sun_times(lat, lon)
+    update_weather_state('sun_data', sun_data)
+    logger.debug("✅ FAS 2: Sol-data uppdaterad")
+    return sun_data is not None
+
+
+def register_data_sources(config: Dict[str, Any]) -> None:
+    """
+    Registrera de inbyggda datakällorna med TTL från config.
+    
+    Anropas efter att klienterna skapats. Nya leverantörer läggs till här
+    (eller från ett eget modul) med register_data_source().
+    
+    Args:
+        config (dict): Applikationskonfiguration
+    """
+    ui_config = config.get('ui', {})
+    overrides = get_data_sources_config(config)['ttl_overrides']
+    weather_state = get_weather_state()
+    
+    def ttl(name: str, default_seconds: float) -> float:
+        return overrides.get(name, default_seconds)
+    
+    register_data_source(DataSource(
+        'smhi_humidity', _refresh_smhi_humidity, ('humidity_data',),
+        ttl('smhi_humidity', 60 * 60),
+        description='Luftfuktighet från närmaste SMHI-station (observeras timvis)'))
+    register_data_source(DataSource(
+        'smhi_forecast', _refresh_smhi_forecast, ('smhi_data', 'forecast_data', 'daily_forecast_data'),
+        ttl('smhi_forecast', ui_config.get('refresh_interval_minutes', 15) * 60),
+        depends_on=('smhi_humidity',), critical=True,
+        description='SMHI aktuellt väder, 12h- och 5-dagarsprognos'))
+    register_data_source(DataSource(
+        'netatmo', _refresh_netatmo, ('netatmo_data',),
+        ttl('netatmo', ui_config.get('netatmo_refresh_interval_minutes', 10) * 60),
+        enabled=lambda: bool(get_api_client('netatmo_client') and weather_state['netatmo_available']),
+        description='Netatmo-station och trycktrend'))
+    register_data_source(DataSource(
+        'sun', _refresh_sun, ('sun_data',),
+        ttl('sun', ui_config.get('sun_cache_hours', 24) * 3600),
+        expires_at=_next_midnight,
+        description='Soluppgång och solnedgång (byts vid midnatt)'))
+
+
+def _refresh_weather_sections(force: bool = False) -> bool:
+    """
+    Uppdatera de datakällor vars data gått ut och sätt status (en cykels arbete).
+    Varningar har ett eget jobb (update_warnings_cycle).
+    
+    Args:
+        force: Hämta alla källor oavsett TTL
+    
+    Returns:
+        bool: False om en kritisk källa (SMHI) misslyckades eller cykeln avbröts av ett fel
+    """
+    weather_state = get_weather_state()
     
     try:
-        print(f"🔄 FAS 2: Uppdaterar väderdata... ({datetime.now().strftime('%H:%M:%S')})")
-        
-        # FAS 2: SMHI data med luftfuktighet (alltid obligatorisk)
-        if smhi_client:
-            # FAS 2: KRITISK ÄNDRING - Använd get_current_weather_with_humidity() istället för get_current_weather()
-            smhi_data = smhi_client.get_current_weather_with_humidity()
-            update_weather_state('smhi_data', smhi_data)
-            
-            forecast_data = smhi_client.get_12h_forecast()
-            update_weather_state('forecast_data', forecast_data)
-            
-            daily_forecast_data = smhi_client.get_daily_forecast(5)
-            update_weather_state('daily_forecast_data', daily_forecast_data)
-            
-            # FAS 2: Debug-logging för luftfuktighetsdata
-            if smhi_data:
-                humidity = smhi_data.get('humidity')
-                humidity_station = smhi_data.get('humidity_station')
-                humidity_age = smhi_data.get('humidity_age_minutes')
-                
-                if humidity is not None:
-                    print(f"✅ FAS 2: SMHI-data med luftfuktighet uppdaterad - {humidity}% från {humidity_station} (ålder: {humidity_age} min)")
-                else:
-                    print("⚠️ FAS 2: SMHI-data uppdaterad men ingen luftfuktighet tillgänglig")
-                
-                # FAS 2: WeatherEffects debugging
-                if weather_state['weather_effects_enabled'] and smhi_data.get('weather_symbol'):
-                    weather_symbol = smhi_data['weather_symbol']
-                    effect_type = get_smhi_weather_effect_type(weather_symbol)
-                    precipitation = smhi_data.get('precipitation', 0)
-                    print(f"🌦️ FAS 2: SMHI Symbol {weather_symbol} → WeatherEffect '{effect_type}' (precipitation: {precipitation}mm)")
-            else:
-                print("❌ FAS 2: SMHI-data misslyckades")
-        
-        # FAS 2: Villkorsstyrd Netatmo data
-        if netatmo_client and weather_state['netatmo_available']:
-            try:
-                netatmo_data = netatmo_client.get_current_weather()
-                update_weather_state('netatmo_data', netatmo_data)
-                
-                # Logga trycktrend-data för debug
-                if netatmo_data and 'pressure_trend' in netatmo_data:
-                    trend_data = netatmo_data['pressure_trend']
-                    print(f"📊 FAS 2: Netatmo trycktrend: {trend_data.get('trend', 'n/a')} - {trend_data.get('description', 'Ingen beskrivning')}")
-                    if trend_data.get('data_hours', 0) > 0:
-                        print(f"📈 FAS 2: Datahistorik: {trend_data['data_hours']:.1f} timmar, ändring: {trend_data.get('pressure_change', 0):.1f} hPa")
-                else:
-                    print("⚠️ FAS 2: Ingen trycktrend-data i Netatmo-respons")
-                    
-            except Exception as e:
-                print(f"❌ FAS 2: Netatmo-uppdatering misslyckades: {e}")
-                print("🔄 FAS 2: Fortsätter med SMHI-data endast")
-                update_weather_state('netatmo_data', None)
-        else:
-            update_weather_state('netatmo_data', None)
-            if weather_state['use_netatmo']:
-                print("📊 FAS 2: Netatmo konfigurerat men ej tillgängligt")
-            else:
-                print("📊 FAS 2: Netatmo inaktiverat - använder SMHI-only")
-        
-        # Sol data (alltid obligatorisk)
-        if sun_calculator and weather_state['config']:
-            lat = weather_state['config']['smhi']['latitude']
-            lon = weather_state['config']['smhi']['longitude']
-            sun_data = sun_calculator.get_sun_times(lat, lon)
-            update_weather_state('sun_data', sun_data)
-            print("✅ FAS 2: Sol-data uppdaterad")
-        
-        # SSOT-FIX: SMHI Warnings data (villkorsstyrd)
-        if is_warnings_enabled():
-            update_warnings_data()
+        logger.info(f"🔄 FAS 2: Uppdaterar väderdata... ({datetime.now().strftime('%H:%M:%S')})")
+        
+        outcomes = refresh_due_sources(force=force, early_seconds=get_data_sources_config(
+            weather_state['config'])['early_refresh_seconds'])
+        smhi_ok = critical_sources_ok(outcomes)
+        
+        if not weather_state['use_netatmo']:
+            logger.debug("📊 FAS 2: Netatmo inaktiverat - använder SMHI-only")
+        elif outcomes.get('netatmo') == OUTCOME_DISABLED:
+            logger.debug("📊 FAS 2: Netatmo konfigurerat men ej tillgängligt")
         
         # Uppdatera timestamp och status
         update_weather_state('last_update', datetime.now().isoformat())
@@ -396,97 +721,251 @@ def update_weather_data() -> None:
         final_status = f"Data uppdaterad ({' | '.join(status_parts)})"
         update_weather_state('status', final_status)
         
-        print("✅ FAS 2: Väderdata uppdaterad")
+        refreshed = [name for name, outcome in outcomes.items() if outcome == OUTCOME_REFRESHED]
+        logger.info(f"✅ FAS 2: Väderdata uppdaterad (hämtat: {', '.join(refreshed) or 'inget förfallet'})")
+        return smhi_ok
         
     except Exception as e:
-        print(f"❌ FAS 2: Fel vid väderuppdatering: {e}")
+        logger.error(f"❌ FAS 2: Fel vid väderuppdatering: {e}")
         update_weather_state('status', f"Fel vid uppdatering: {e}")
+        return False
 
 
-def background_updater() -> None:
+def update_weather_data(force: bool = False) -> bool:
     """
-    Huvudloop för väderuppdateringar.
+    FAS 2: Uppdatera väderdata med villkorsstyrd Netatmo-hantering + SMHI luftfuktighet.
+    Bara källor vars TTL gått ut hämtas (se core/data_sources.py).
+    
+    Args:
+        force: Hämta alla källor oavsett TTL
+    
+    Returns:
+        bool: True om SMHI-data hämtades (styr schemaläggarens backoff)
     """
-    weather_state = get_weather_state()
+    cycle_start = time.perf_counter()
+    budget = get_upstream_config(get_weather_state()['config'])['cycle_budget_seconds']
     
-    if not weather_state['config']:
-        print("⚠️ Ingen konfiguration - background_updater avslutar")
-        return
+    with trace_cycle('full'), deadline(budget):
+        success = _refresh_weather_sections(force)
     
-    # Initial uppdatering
-    update_weather_data()
+    observe_update_cycle('full', time.perf_counter() - cycle_start)
+    if success:
+        # Visad data kommer nu från egen hämtning, inte warm start-snapshoten
+        clear_warm_start()
+        mark_startup_once('first_cycle')
     
-    refresh_interval = weather_state['config'].get('ui', {}).get('refresh_interval_minutes', 15)
-    refresh_seconds = refresh_interval * 60
+    # Dela resultatet med följar-workers och spara för warm start vid nästa uppstart
+    publish_state_snapshot()
+    return success
+
+
+def update_warnings_cycle() -> bool:
+    """
+    SSOT-FIX: Uppdatera SMHI-varningar som egen cykel (eget jobb och intervall).
+    
+    Returns:
+        bool: False om varnings-API:t inte svarade
+    """
+    if not get_api_client('smhi_warnings_client') or not is_warnings_enabled():
+        return True
     
-    print(f"🔄 Background updater startar loop (interval: {refresh_interval} min)")
+    cycle_start = time.perf_counter()
+    budget = get_upstream_config(get_weather_state()['config'])['warnings_budget_seconds']
+    with trace_cycle('warnings'), deadline(budget):
+        update_warnings_data()
+    observe_update_cycle('warnings', time.perf_counter() - cycle_start)
     
-    while True:
-        time.sleep(refresh_seconds)
-        update_weather_data()
+    publish_state_snapshot()
+    return bool((get_warnings_data() or {}).get('api_available'))
 
 
-def netatmo_updater() -> None:
+def update_netatmo_data() -> bool:
     """
-    FAS 2: Villkorsstyrd snabb loop för Netatmo-uppdateringar.
+    FAS 2: Snabb Netatmo-uppdatering mellan fulla cykler.
+    Går via datakällan 'netatmo' så att nästa fulla cykel inte hämtar igen.
+    
+    Returns:
+        bool: False om Netatmo-anropet misslyckades
     """
     weather_state = get_weather_state()
     
-    if not weather_state['config'] or not weather_state['use_netatmo']:
-        print("🔄 FAS 2: Netatmo-uppdaterare inaktiverad (use_netatmo=False)")
-        return
+    if not get_api_client('netatmo_client') or not weather_state['netatmo_available']:
+        logger.info("🔄 FAS 2: Netatmo snabb-uppdaterare vilar (klient ej tillgänglig)")
+        return True
     
-    netatmo_interval = weather_state['config'].get('ui', {}).get('netatmo_refresh_interval_minutes', 10)
-    netatmo_seconds = netatmo_interval * 60
-    
-    print(f"🔄 FAS 2: Netatmo updater startar loop (interval: {netatmo_interval} min)")
-    
-    while True:
-        time.sleep(netatmo_seconds)
-        
-        # FAS 2: Kör bara om Netatmo är tillgängligt
-        netatmo_client = get_api_client('netatmo_client')
-        
-        if netatmo_client and weather_state['netatmo_available']:
-            try:
-                netatmo_data = netatmo_client.get_current_weather()
-                update_weather_state('netatmo_data', netatmo_data)
-                
-                # Logga trycktrend-uppdatering
-                if netatmo_data and 'pressure_trend' in netatmo_data:
-                    trend_data = netatmo_data['pressure_trend']
-                    print(f"🔄 FAS 2: Netatmo snabb-uppdatering: {trend_data.get('trend', 'n/a')} - {trend_data.get('analysis_quality', 'poor')}")
-                else:
-                    print("🔄 FAS 2: Netatmo snabb-uppdatering: Ingen trycktrend-data")
-                    
-            except Exception as e:
-                print(f"❌ FAS 2: Netatmo snabb-uppdatering fel: {e}")
-                # Behåll befintlig data men logga felet
-        else:
-            print("🔄 FAS 2: Netatmo snabb-uppdaterare vilar (klient ej tillgänglig)")
+    cycle_start = time.perf_counter()
+    budget = get_upstream_config(weather_state['config'])['netatmo_budget_seconds']
+    with trace_cycle('netatmo'), deadline(budget):
+        outcome = refresh_due_sources(only=('netatmo',)).get('netatmo')
+    observe_update_cycle('netatmo', time.perf_counter() - cycle_start)
+    
+    if outcome != OUTCOME_REFRESHED:
+        logger.error(f"❌ FAS 2: Netatmo snabb-uppdatering misslyckades ({outcome})")
+        # Behåll befintlig data
+        return outcome == OUTCOME_BUSY
+    
+    # Logga trycktrend-uppdatering
+    trend_data = (weather_state['netatmo_data'] or {}).get('pressure_trend')
+    if trend_data:
+        logger.info(f"🔄 FAS 2: Netatmo snabb-uppdatering: {trend_data.get('trend', 'n/a')} - {trend_data.get('analysis_quality', 'poor')}")
+    else:
+        logger.debug("🔄 FAS 2: Netatmo snabb-uppdatering: Ingen trycktrend-data")
+    
+    publish_state_snapshot()
+    return True
 
 
-def start_background_tasks(config: Dict[str, Any]) -> None:
+def schedule_update_jobs(config: Dict[str, Any], initial: bool = True) -> None:
     """
-    Starta alla background tasks.
+    Registrera (eller ersätt) uppdateringsjobben enligt config.
+    
+    Ersatta jobb behåller sin historik. Vid initial=False (config-omladdning)
+    körs de inte direkt utan enligt sina intervall.
     
     Args:
         config (dict): Applikationskonfiguration
+        initial: True vid uppstart - weather och warnings körs direkt
     """
     weather_state = get_weather_state()
+    settings = get_scheduler_config(config)
+    ui_config = config.get('ui', {})
+    jitter = settings['jitter_seconds']
+    backoff = {'backoff_base': settings['backoff_base_seconds'], 'backoff_max': settings['backoff_max_seconds']}
+    first_run = 0 if initial else None
+    
+    # Efterfrågestyrning: gles keep-warm-takt för datajobben när ingen skärm tittar
+    demand = get_demand_config(config)
+    if demand['enabled']:
+        backoff['idle_interval'] = demand['keep_warm_seconds']
     
-    # FAS 2: Starta bakgrundstrådar villkorsstyrt
-    bg_thread = threading.Thread(target=background_updater, daemon=True)
-    bg_thread.start()
-    print("✅ Bakgrunds-uppdaterare startad")
+    refresh_seconds = ui_config.get('refresh_interval_minutes', 15) * 60
+    align_offset = None
+    if settings['smhi_align_minute'] is not None:
+        # Linjera mot SMHI:s timvisa modellkörning, t.ex. hh:07, hh:22, ... vid 15 min
+        align_offset = (settings['smhi_align_minute'] * 60) % refresh_seconds
+    add_job('weather', update_weather_data, refresh_seconds, first_run=first_run, jitter=jitter,
+            align_offset=align_offset, description='Förfallna datakällor: SMHI-prognos, luftfuktighet, Netatmo och soltider', **backoff)
     
-    # FAS 2: Starta Netatmo-uppdaterare bara om aktiverat
+    if weather_state['warnings_enabled']:
+        warnings_seconds = config.get('smhi_warnings', {}).get('cache_duration_minutes', 10) * 60
+        add_job('warnings', update_warnings_cycle, warnings_seconds, first_run=first_run, jitter=jitter,
+                description='SMHI-varningar (IBWW)', **backoff)
+    else:
+        remove_job('warnings')
+    
+    # FAS 2: Netatmo-jobb bara om aktiverat (första fulla cykeln hämtar Netatmo)
     if weather_state['use_netatmo']:
-        netatmo_thread = threading.Thread(target=netatmo_updater, daemon=True)
-        netatmo_thread.start()
-        print("✅ FAS 2: Netatmo-uppdaterare startad (villkorsstyrd)")
+        netatmo_seconds = ui_config.get('netatmo_refresh_interval_minutes', 10) * 60
+        add_job('netatmo', update_netatmo_data, netatmo_seconds, jitter=jitter,
+                description='Netatmo snabb-uppdatering och trycktrend', **backoff)
+    else:
+        remove_job('netatmo')
+        logger.info("📊 FAS 2: Netatmo-jobb HOPPAS ÖVER (use_netatmo=False)")
+    
+    if demand['enabled']:
+        add_job('demand', check_demand, demand['check_seconds'],
+                description='Viloläge när ingen skärm hämtat data (keep-warm-takt)')
     else:
-        print("📊 FAS 2: Netatmo-uppdaterare HOPPAS ÖVER (use_netatmo=False)")
+        remove_job('demand')
+
+
+def start_background_tasks(config: Dict[str, Any]) -> None:
+    """
+    Registrera uppdateringsjobben och starta schemaläggaren.
+    
+    Jobb: 'weather' (förfallna datakällor), 'warnings', 'netatmo' (snabb
+    uppdatering), 'demand' (viloläge när ingen skärm tittar) samt
+    Netatmo-klientens token-refresh som engångsjobb.
+    
+    Args:
+        config (dict): Applikationskonfiguration
+    """
+    from instrumentation import set_timer_factory
+    
+    # Klienternas engångstimers (Netatmo token-refresh) går via schemaläggaren
+    set_timer_factory(schedule_once)
+    
+    schedule_update_jobs(config)
+    start_scheduler(config)
+    
+    jobs = ', '.join(job['name'] for job in get_jobs_status()['jobs'])
+    logger.info(f"✅ Bakgrundsjobb schemalagda: {jobs}")
+
+
+def apply_config_changes(config: Dict[str, Any], changes: List[str]) -> List[str]:
+    """
+    Bygg om bara de klienter, källor och jobb som påverkas av en ny config.
+    
+    Anropas av config-omladdningen i den worker som äger datainsamlingen.
+    Övriga klienter behåller sina cacher, tokens och historik.
+    
+    Args:
+        config (dict): Ny applikationskonfiguration (redan satt i weather_state)
+        changes (list): Ändrade sökvägar, t.ex. ['smhi.latitude', 'ui.refresh_interval_minutes']
+        
+    Returns:
+        list: Utförda åtgärder (för logg och /api/config)
+    """
+    actions = []
+    refetch = False
+    
+    if changed_under(changes, 'upstream', 'diagnostics.upstream_overrides', 'diagnostics.upstream_mode',
+                       'diagnostics.cassette_dir', 'diagnostics.replay_time_scale', 'diagnostics.replay_strict'):
+        configure_upstream(config)
+        actions.append('upstream')
+    
+    if changed_under(changes, 'smhi'):
+        _build_smhi_client(config)
+        invalidate_data_source('smhi_humidity')
+        invalidate_data_source('smhi_forecast')
+        invalidate_data_source('sun')
+        actions.append('smhi_client')
+        refetch = True
+    
+    if changed_under(changes, 'ipgeolocation'):
+        _build_sun_calculator(config)
+        invalidate_data_source('sun')
+        actions.append('sun_calculator')
+        refetch = True
+    
+    netatmo_changes = [c for c in changes if c == 'use_netatmo' or changed_under([c], 'netatmo')]
+    if netatmo_changes == ['netatmo.preferred_station'] and get_api_client('netatmo_client'):
+        # Bara visningsval - behåll klient och token
+        get_api_client('netatmo_client').set_preferred_station(config['netatmo'].get('preferred_station'))
+        invalidate_data_source('netatmo')
+        actions.append('netatmo_preferred_station')
+        refetch = True
+    elif netatmo_changes:
+        remove_job('netatmo_token_refresh')
+        _build_netatmo_client(config)
+        if not get_weather_state()['netatmo_available']:
+            update_weather_state('netatmo_data', None)
+        invalidate_data_source('netatmo')
+        actions.append('netatmo_client')
+        refetch = True
+    
+    if changed_under(changes, 'smhi_warnings') and get_api_client('smhi_warnings_client'):
+        # Ny cache-tid på befintlig klient (behåller cachade varningar)
+        warnings_cache = config.get('smhi_warnings', {}).get('cache_duration_minutes', 10) * 60
+        get_api_client('smhi_warnings_client').cache_duration = warnings_cache
+        actions.append('smhi_warnings_cache')
+    
+    if changed_under(changes, 'data_sources', 'ui.refresh_interval_minutes',
+                       'ui.netatmo_refresh_interval_minutes', 'ui.sun_cache_hours'):
+        register_data_sources(config)
+        actions.append('data_sources')
+    
+    if changed_under(changes, 'use_netatmo', 'smhi_warnings.cache_duration_minutes', 'demand',
+                       'ui.refresh_interval_minutes', 'ui.netatmo_refresh_interval_minutes',
+                       'scheduler.jitter_seconds', 'scheduler.smhi_align_minute',
+                       'scheduler.backoff_base_seconds', 'scheduler.backoff_max_minutes'):
+        schedule_update_jobs(config, initial=False)
+        actions.append('jobs')
+    
+    if refetch:
+        trigger_job('weather')
+        actions.append('refetch')
+    return actions
 
 
 def get_api_status() -> Dict[str, Any]:
@@ -517,12 +996,13 @@ def force_update_all_data() -> bool:
         bool: True om uppdatering lyckades
     """
     try:
-        print("🔄 Framtvingar komplett datauppdatering...")
-        update_weather_data()
-        print("✅ Framtvingad uppdatering klar")
+        logger.info("🔄 Framtvingar komplett datauppdatering...")
+        update_weather_data(force=True)
+        update_warnings_cycle()
+        logger.info("✅ Framtvingad uppdatering klar")
         return True
     except Exception as e:
-        print(f"❌ Framtvingad uppdatering misslyckades: {e}")
+        logger.error(f"❌ Framtvingad uppdatering misslyckades: {e}")
         return False
 
 
@@ -537,7 +1017,7 @@ def restart_api_clients(config: Dict[str, Any]) -> bool:
         bool: True om omstart lyckades
     """
     try:
-        print("🔄 Startar om API-klienter...")
+        logger.info("🔄 Startar om API-klienter...")
         
         # Rensa befintliga klienter
         set_api_client('smhi_client', None)
@@ -549,14 +1029,15 @@ def restart_api_clients(config: Dict[str, Any]) -> bool:
         success = init_api_clients(config)
         
         if success:
-            print("✅ API-klienter omstartade")
+            logger.info("✅ API-klienter omstartade")
             # Tvinga uppdatering med nya klienter
-            update_weather_data()
+            update_weather_data(force=True)
+            update_warnings_cycle()
         else:
-            print("❌ Omstart av API-klienter misslyckades")
+            logger.error("❌ Omstart av API-klienter misslyckades")
         
         return success
         
     except Exception as e:
-        print(f"❌ Fel vid omstart av API-klienter: {e}")
+        logger.error(f"❌ Fel vid omstart av API-klienter: {e}")
         return False
@@ -32,7 +32,8 @@ CONFIG = {
     'ipgeolocation': {
         # 🔐 KÄNSLIG API-NYCKEL - Fyll i din riktiga nyckel (VALFRITT)
         'api_key': 'YOUR_IPGEOLOCATION_API_KEY_HERE',           # Gratis från https://ipgeolocation.io/
-        'comment': 'Hämta gratis API-nyckel från https://ipgeolocation.io/ för exakta soltider. Om tom används förenklad beräkning.'
+        'use_api': False,                                       # False = Lokal NOAA-beräkning (exakt på ±1 min, ingen nätverkstrafik)
+        'comment': 'Soltider beräknas lokalt. Sätt use_api = True och fyll i nyckel för att hämta från https://ipgeolocation.io/ i stället.'
     },
     
     'display': {
@@ -70,6 +71,131 @@ CONFIG = {
         'sun_cache_hours': 24    # 1-168 timmar - Hur länge soltider cachas
     },
     
+    'logging': {
+        # 📝 LOGGNING: Nivåbaserad loggning som skrivs i bakgrundstråd (blockerar aldrig requests)
+        'level': 'INFO',            # 'DEBUG', 'INFO', 'WARNING', 'ERROR' - Standardnivå för alla moduler
+        'module_levels': {          # Nivå per modul - t.ex. 'netatmo_client': 'DEBUG' för blending-detaljer
+            'werkzeug': 'WARNING',  # Flask request-logg (en rad per anrop) - 'INFO' för att se alla anrop
+        },
+        'json': False,              # True = En JSON-rad per loggpost (för loggaggregering)
+        'file': None,               # None = Endast stdout (weather.log via nohup), eller sökväg till roterande loggfil
+        'comment': 'Heta loggrader (t.ex. /api/current) är rate-begränsade - se core/logging_setup.py'
+    },
+    
+    'deployment': {
+        # 🧵 MULTI-WORKER: För drift under gunicorn/uWSGI med flera workers (se wsgi.py)
+        # ⚠️  Lämna False vid vanlig start med python3 app.py
+        'multi_worker': False,            # True = En worker väljs till ledare och hämtar all data, övriga läser snapshot
+        'runtime_dir': None,              # None = <projektkatalog>/runtime - här hamnar låsfil och snapshot
+        'snapshot_poll_seconds': 5,       # 1-60: Hur ofta följar-workers läser ledarens snapshot
+        'election_interval_seconds': 10,  # 1-120: Hur ofta följare försöker ta över om ledaren dött
+        'warm_start': True,               # True = Spara snapshot efter varje cykel och visa den direkt vid uppstart
+        'warm_start_max_age_hours': 24,   # 1-168: Äldre snapshot ignoreras (kallstart med "Startar...")
+        'comment': 'Ledarval via fil-lås - ledaren ensam skriver tokens.json, pressure_history.json och sun_cache.json'
+    },
+    
+    'scheduler': {
+        # 🗓️ BAKGRUNDSJOBB: SMHI, varningar, Netatmo och token-refresh körs av en gemensam schemaläggare (/api/jobs)
+        'max_workers': 2,                 # 1-4: Antal jobb som får köra samtidigt
+        'jitter_seconds': 10,             # 0-60: Slumpmässig fördröjning per körning (undvik att alla jobb vaknar samtidigt)
+        'smhi_align_minute': None,        # None = Av, t.ex. 7 = Kör SMHI-jobbet på hh:07 (efter SMHI:s timvisa modellkörning)
+        'backoff_base_seconds': 30,       # Första omförsöket efter fel - fördubblas per fel i rad
+        'backoff_max_minutes': 10,        # Tak för backoff (aldrig längre än jobbets intervall)
+        'allow_remote_trigger': False,    # False = POST /api/jobs/<namn>/run|pause|resume endast från localhost
+        'comment': 'Jobben syns på /api/jobs - varningar har eget intervall (smhi_warnings.cache_duration_minutes)'
+    },
+    
+    'data_sources': {
+        # 📦 DATAKÄLLOR: Varje källa hämtas bara när dess data gått ut (status på /api/data-sources)
+        # Standard-TTL: smhi_forecast = ui.refresh_interval_minutes, smhi_humidity = 60,
+        # netatmo = ui.netatmo_refresh_interval_minutes, sun = ui.sun_cache_hours (och alltid vid midnatt)
+        'ttl_minutes': {},                # T.ex. {'smhi_humidity': 30} - åsidosätt TTL per källa
+        'early_refresh_seconds': 60,      # Hämta källor som går ut inom så här många sekunder (jobbens jitter)
+        'comment': 'Weather-jobbet kör på ui.refresh_interval_minutes men hämtar bara förfallna källor'
+    },
+    
+    'demand': {
+        # 🌙 VILOLÄGE: Gles uppdatering när ingen skärm hämtat data (t.ex. släckta kiosker nattetid)
+        'enabled': True,                  # False = alltid normal takt
+        'idle_minutes': 30,               # 5-240: Minuter utan skärmanrop innan viloläge
+        'keep_warm_minutes': 60,          # 15-240: Takt för SMHI, varningar och Netatmo i viloläge
+        'check_seconds': 30,              # Hur ofta viloläget kontrolleras (och aktivitet hos andra workers läses)
+        'wake_order': ['weather', 'warnings', 'netatmo'],  # Jobb som triggas direkt när en skärm återansluter
+        'comment': 'Status på /api/status och /api/jobs (demand). /metrics, /api/status och /api/jobs räknas inte som skärmaktivitet'
+    },
+    
+    'config_reload': {
+        # 🔁 OMLADDNING: Ändringar i denna fil gäller utan omstart - bara berörda klienter/jobb byggs om
+        'enabled': True,                  # False = ändringar kräver omstart
+        'poll_seconds': 5,                # Hur ofta filens ändringstid kontrolleras
+        'comment': 'Status på /api/config/reload (POST = läs om direkt). deployment och scheduler.max_workers kräver omstart'
+    },
+    
+    'assets': {
+        # 📦 ASSET-BUNTAR: JS/CSS slås ihop, minifieras och serveras med hashade namn (cachas för alltid i webbläsaren)
+        'enabled': True,                  # False = Enskilda filer från /static (felsökning av JS/CSS)
+        'minify': True,                   # False = Sammanslagna men oförändrade filer (läsbara i devtools)
+        'output_dir': None,               # None = runtime/assets
+        'keep_old_hours': 24,             # Gamla buntar sparas så länge (redan öppna sidor kan behöva dem)
+        'comment': 'Byggs vid start och vid ändring. Font Awesome lokalt: python3 -m core.assets vendor'
+    },
+    
+    'pwa': {
+        # 📲 OFFLINE-SKAL: Webbapp-manifest + service worker som cachar sidan, buntarna och senaste API-svaren
+        'enabled': True,                  # False = Ingen service worker (befintlig avregistreras vid nästa sidladdning)
+        'api_timeout_seconds': 3,         # Svarar servern inte inom så lång tid visas sparad data (med åldersbadge)
+        'max_data_age_hours': 24,         # Äldre sparad data visas inte
+        'display': 'fullscreen',          # ALTERNATIV: 'fullscreen', 'standalone', 'minimal-ui', 'browser'
+        'comment': 'Manifest på /manifest.webmanifest, worker på /service-worker.js'
+    },
+    
+    'telemetry': {
+        # 📈 KIOSK-TELEMETRI: Ramtider, long tasks, JS-heap, fetch-latens och effektpartiklar från varje skärm
+        'enabled': True,                  # False = Dashboarden skickar ingen telemetri
+        'interval_minutes': 5,            # 1-60: Hur ofta varje skärm skickar en sammanställning
+        'window_reports': 12,             # Rapporter per kiosk i det rullande fönstret (12 x 5 min = 1 timme)
+        'max_kiosks': 20,                 # Fler kiosker = den som hörts av längst sedan tas bort
+        'stale_hours': 24,                # Kiosker som inte hörts av på så länge tas bort
+        'comment': 'POST /api/telemetry - per kiosk på /metrics (vaderdisplay_client_*) och /api/status (telemetry)'
+    },
+    
+    'upstream': {
+        # 🔌 CIRCUIT BREAKERS: En nere värd (t.ex. api.netatmo.com) felar direkt i stället för 10s timeout per anrop
+        'circuit_breaker_enabled': True,
+        'breaker_failure_threshold': 3,   # Fel i rad (timeout, anslutningsfel, 5xx, 429) innan brytaren öppnas
+        'breaker_open_seconds': 30,       # Väntetid innan ett provanrop släpps igenom (fördubblas om det misslyckas)
+        'breaker_max_open_seconds': 300,  # Tak för väntetiden
+        
+        # ⏳ TIDSBUDGET: Varje anrops timeout kapas till det som återstår av cykelns budget
+        'cycle_budget_seconds': 30,       # Full cykel (SMHI + luftfuktighet + Netatmo + sol), None = Ingen budget
+        'netatmo_budget_seconds': 15,     # Netatmo snabb-uppdatering (inkl. 403 + omautentisering)
+        'warnings_budget_seconds': 15,    # SMHI-varningar
+        'comment': 'Status per värd på /api/status (upstream_breakers) och i /metrics'
+    },
+    
+    'diagnostics': {
+        # ⏱️ CYKEL-TIMINGS: Span-träd per uppdateringscykel på /api/debug/timings
+        'trace_buffer_size': 20,          # 1-500: Antal senaste cykler som sparas i minnet
+        'slow_cycle_seconds': None,       # None = Av, t.ex. 20 = Logga hela span-trädet när en cykel tar längre tid
+        
+        # 🔬 PROFILERING: /api/debug/profile och /api/debug/tracemalloc (felsökning av CPU/minne på plats)
+        'profiling_enabled': False,       # True = Aktivera profilerings-endpoints (403 annars)
+        'profiling_allow_remote': False,  # False = Endast anrop från localhost (använd SSH-tunnel)
+        'max_profile_seconds': 30,        # Tak för en sampling-profils längd
+        'sample_interval_ms': 10,         # Standardintervall mellan stacksamplingar
+        'tracemalloc_max_minutes': 30,    # tracemalloc stoppas automatiskt efter denna tid
+        
+        # 🧪 LASTTEST: Peka upstream-API:erna mot lokala fejkservrar (python3 -m benchmarks fake-upstream)
+        'upstream_overrides': {},         # {} = Riktiga API:er, t.ex. {'*': 'http://127.0.0.1:8090'} för alla värdar
+        
+        # 📼 KASSETTER: Spela in riktiga upstream-svar och spela upp dem offline (reproducera en specifik morgon)
+        'upstream_mode': 'live',          # 'live' = Normalt, 'record' = Spela in, 'replay' = Spela upp (inga nätverksanrop)
+        'cassette_dir': None,             # None = <runtime_dir>/cassettes/<tidsstämpel> vid record (krävs vid replay)
+        'replay_time_scale': 1.0,         # 1.0 = Inspelad svarstid, 0 = Direkt, 0.5 = Dubbelt så snabbt
+        'replay_strict': False,           # False = Upprepa sista svaret när kassetten tagit slut, True = Fel
+        'comment': 'Visar vilken fas (JSON-parsning, stationssökning, blending, trycktrend, sol-cache, varningar) som tar tid'
+    },
+    
     # =============================================================================
     # ✨ FAS 2: WEATHEREFFECTS KONFIGURATION - MagicMirror-kompatibel
     # =============================================================================
@@ -112,7 +238,7 @@ CONFIG = {
             'contrast_boost': 1.1,     # 1.0-1.3: Kontrast-förstärkning för LED LCD (standard: 1.1)
             'brightness_boost': 1.1,   # 1.0-1.3: Ljusstyrke-förstärkning (standard: 1.1)
             'gpu_acceleration': True,  # True/False: GPU-acceleration för Pi5 (standard: True)
-            'target_fps': 60,         # 30/60: Målframerate för animationer (standard: 60)
+            'target_fps': 60,         # 15-60: Målframerate för canvas-effekterna - partiklar skalas ned om den inte hålls
             'comment': 'Optimeringar för LP156WH4 panel och Pi5 GPU-prestanda'
         },
         
@@ -185,12 +311,12 @@ CONFIG = {
 #    7. Ersätt alla 'YOUR_NETATMO_*_HERE' med riktiga värden
 #    8. Starta om: python3 app.py
 
-# 🌅 STEG 4: FÖRBÄTTRA SOLTIDER (VALFRITT)
+# 🌅 STEG 4: SOLTIDER FRÅN API (VALFRITT - lokal beräkning räcker)
 #    1. Gå till https://ipgeolocation.io/
 #    2. Registrera dig för gratis konto (1000 anrop/månad)
 #    3. Kopiera din API-nyckel
-#    4. Ersätt 'YOUR_IPGEOLOCATION_API_KEY_HERE' med din nyckel
-#    (Om du hoppar över detta används förenklad solberäkning)
+#    4. Ersätt 'YOUR_IPGEOLOCATION_API_KEY_HERE' med din nyckel och sätt use_api = True
+#    (Om du hoppar över detta beräknas soltiderna lokalt med NOAA-algoritmen)
 
 # =============================================================================
 # 🌦️ WEATHEREFFECTS SNABBGUIDE - NYT FAS 2
@@ -312,7 +438,7 @@ CONFIG = {
 # ✅ LÖSNING: Kontrollera client_id, client_secret och refresh_token
 
 # ❌ PROBLEM: "Inga soltider eller konstiga tider"
-# ✅ LÖSNING: Kontrollera ipgeolocation api_key eller använd fallback-beräkning
+# ✅ LÖSNING: Kontrollera smhi latitude/longitude och systemets tidszon (soltider visas i lokal tid)
 
 # ❌ PROBLEM: "Vinddata visas fel"
 # ✅ LÖSNING: Kontrollera wind_unit-inställning
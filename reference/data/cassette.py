@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Inspelning och uppspelning av upstream-trafik (kassetter).
+
+I record-läge sparar upstream.request() varje anrop - status, headers,
+body, svarstid och undantag (timeout, anslutningsfel) - i en
+kassettkatalog. I replay-läge spelas samma svar upp igen, med inspelad
+svarstid gånger time_scale, så att t.ex. en långsam morgon med
+stormvarningar och en Netatmo 403 + omautentisering kan köras om exakt
+och profileras offline.
+
+Kassettkatalogens innehåll:
+    interactions.jsonl   En rad per anrop i inspelningsordning
+    bodies/<sha1>        Svarskroppar (identiska svar sparas en gång)
+
+Hemligheter sparas aldrig: Authorization-headern och request-body tas
+inte med, känsliga query-parametrar maskeras och token-fält i JSON-svar
+ersätts med 'REDACTED'.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, Deque, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+INTERACTIONS_FILE = 'interactions.jsonl'
+BODIES_DIR = 'bodies'
+CASSETTE_FORMAT_VERSION = 1
+
+REDACTED = 'REDACTED'
+SECRET_KEYS = frozenset({
+    'access_token', 'refresh_token', 'client_secret', 'client_id',
+    'apikey', 'api_key', 'password', 'code',
+})
+# Svarsheaders som inte ska sparas
+DROPPED_HEADERS = frozenset({'set-cookie', 'authorization'})
+
+# Undantag som kan spelas upp (namn -> klass)
+REPLAYABLE_ERRORS = {
+    'Timeout': requests.exceptions.Timeout,
+    'ReadTimeout': requests.exceptions.ReadTimeout,
+    'ConnectTimeout': requests.exceptions.ConnectTimeout,
+    'ConnectionError': requests.exceptions.ConnectionError,
+    'SSLError': requests.exceptions.SSLError,
+}
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """Inget inspelat svar för anropet (replay i strikt läge)."""
+
+
+def _redact_query(query: str) -> List[Tuple[str, str]]:
+    return sorted((key, REDACTED if key.lower() in SECRET_KEYS else value)
+                  for key, value in parse_qsl(query, keep_blank_values=True))
+
+
+def normalize_request(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    """
+    Nycklar för att matcha ett anrop mot inspelningen.
+
+    Args:
+        method: HTTP-metod
+        url: URL (kan innehålla query)
+        params: requests-params som läggs till query
+
+    Returns:
+        tuple: (exakt nyckel inkl. maskerad query, nyckel med bara metod + värd + sökväg)
+    """
+    parts = urlsplit(url)
+    query = _redact_query(parts.query)
+    if params:
+        query = sorted(query + [(str(key), REDACTED if str(key).lower() in SECRET_KEYS else str(value))
+                                for key, value in params.items() if value is not None])
+    path_key = f"{method.upper()} {parts.hostname}{parts.path}"
+    exact_key = f"{path_key}?{urlencode(query)}" if query else path_key
+    return exact_key, path_key
+
+
+def _redact_body(body: bytes, content_type: str) -> bytes:
+    """Maskera token-fält på toppnivå i JSON-objekt (t.ex. Netatmo oauth2/token)."""
+    if 'json' not in content_type or not body.lstrip().startswith(b'{'):
+        return body
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    secrets = [key for key in payload if key.lower() in SECRET_KEYS]
+    if not secrets:
+        return body
+    for key in secrets:
+        payload[key] = REDACTED
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+class CassetteRecorder:
+    """Skriver anrop till en kassettkatalog (trådsäker, append)."""
+
+    def __init__(self, cassette_dir: str):
+        self.cassette_dir = cassette_dir
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._seq = 0
+        os.makedirs(os.path.join(cassette_dir, BODIES_DIR), exist_ok=True)
+
+    def _write_body(self, body: bytes) -> str:
+        digest = hashlib.sha1(body).hexdigest()
+        relative = f"{BODIES_DIR}/{digest}"
+        path = os.path.join(self.cassette_dir, relative)
+        if not os.path.exists(path):
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        return relative
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._seq += 1
+            entry['seq'] = self._seq
+            entry['offset'] = round(time.monotonic() - self._start, 3)
+            line = json.dumps(entry, ensure_ascii=False)
+            with open(os.path.join(self.cassette_dir, INTERACTIONS_FILE), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def record(self, source: str, method: str, url: str, params: Optional[Dict[str, Any]],
+               response: Optional[requests.Response], elapsed: float,
+               error: Optional[BaseException] = None) -> None:
+        """
+        Spara ett anrop.
+
+        Args:
+            source: Logiskt källnamn
+            method: HTTP-metod
+            url: Anropad URL
+            params: requests-params
+            response: Svaret (None vid undantag)
+            elapsed: Svarstid i sekunder
+            error: Undantaget om anropet misslyckades
+        """
+        exact_key, path_key = normalize_request(method, url, params)
+        entry: Dict[str, Any] = {
+            'version': CASSETTE_FORMAT_VERSION,
+            'recorded_at': datetime.now().isoformat(timespec='milliseconds'),
+            'source': source,
+            'key': exact_key,
+            'path_key': path_key,
+            'elapsed': round(elapsed, 4),
+        }
+
+        if error is not None:
+            entry['error'] = type(error).__name__
+            entry['error_message'] = str(error)[:200]
+        else:
+            content_type = response.headers.get('Content-Type', '')
+            entry.update({
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {key: value for key, value in response.headers.items()
+                            if key.lower() not in DROPPED_HEADERS},
+                'body': self._write_body(_redact_body(response.content or b'', content_type)),
+                'encoding': response.encoding,
+            })
+
+        try:
+            self._append(entry)
+        except OSError as e:
+            logger.error(f"❌ Kunde inte spela in {source}: {e}")
+
+
+class CassettePlayer:
+    """
+    Spelar upp en kassett.
+
+    Anrop matchas i första hand på exakt nyckel (metod, värd, sökväg, query)
+    och annars på bara sökvägen. Varje nyckel spelas i inspelningsordning;
+    när kön är slut upprepas sista svaret (eller CassetteMissError i strikt
+    läge).
+    """
+
+    def __init__(self, cassette_dir: str, time_scale: float = 1.0, strict: bool = False):
+        self.cassette_dir = cassette_dir
+        self.time_scale = max(0.0, time_scale)
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_path: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self.stats = {'played': 0, 'repeated': 0, 'missed': 0}
+
+        path = os.path.join(cassette_dir, INTERACTIONS_FILE)
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        for entry in sorted(entries, key=lambda e: e.get('seq', 0)):
+            self._by_key[entry['key']].append(entry)
+            self._by_path[entry['path_key']].append(entry)
+        self.total = len(entries)
+
+    def _body(self, relative: Optional[str]) -> bytes:
+        if not relative:
+            return b''
+        body = self._bodies.get(relative)
+        if body is None:
+            with open(os.path.join(self.cassette_dir, relative), 'rb') as f:
+                body = f.read()
+            self._bodies[relative] = body
+        return body
+
+    def _next_entry(self, exact_key: str, path_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for queue, key in ((self._by_key.get(exact_key), exact_key), (self._by_path.get(path_key), path_key)):
+                while queue:
+                    entry = queue.popleft()
+                    if entry.get('_played'):
+                        continue
+                    entry['_played'] = True
+                    self._last[exact_key] = self._last[path_key] = entry
+                    self.stats['played'] += 1
+                    return entry
+
+            entry = self._last.get(exact_key) or self._last.get(path_key)
+            if entry is not None and not self.strict:
+                self.stats['repeated'] += 1
+                return entry
+            self.stats['missed'] += 1
+            return None
+
+    def play(self, source: str, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Spela upp svaret för ett anrop.
+
+        Raises:
+            requests.RequestException: Inspelat undantag, eller CassetteMissError
+        """
+        exact_key, path_key = normalize_request(method, url, params)
+        entry = self._next_entry(exact_key, path_key)
+        if entry is None:
+            raise CassetteMissError(f"Inget inspelat svar för {source}: {exact_key}")
+
+        if self.time_scale > 0 and entry.get('elapsed'):
+            time.sleep(entry['elapsed'] * self.time_scale)
+
+        if 'error' in entry:
+            error_class = REPLAYABLE_ERRORS.get(entry['error'], requests.exceptions.ConnectionError)
+            raise error_class(f"(kassett) {entry.get('error_message', entry['error'])}")
+
+        response = requests.models.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers.update(entry.get('headers') or {})
+        response.encoding = entry.get('encoding')
+        response.url = url
+        response.elapsed = timedelta(seconds=entry.get('elapsed') or 0)
+        response._content = self._body(entry.get('body'))
+        return response
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            remaining = sum(1 for queue in self._by_key.values() for entry in queue if not entry.get('_played'))
+            return dict(self.stats, total=self.total, remaining=remaining,
+                        cassette_dir=self.cassette_dir, time_scale=self.time_scale, strict=self.strict)
+
+
+def read_interactions(cassette_dir: str) -> List[Dict[str, Any]]:
+    """Läs alla inspelade anrop (för verktyg som bygger fixtures av en kassett)."""
+    with open(os.path.join(cassette_dir, INTERACTIONS_FILE), 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_body(cassette_dir: str, entry: Dict[str, Any]) -> bytes:
+    """Läs svarskroppen för ett inspelat anrop."""
+    if not entry.get('body'):
+        return b''
+    with open(os.path.join(cassette_dir, entry['body']), 'rb') as f:
+        return f.read()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Circuit breakers per upstream-värd.
+
+När t.ex. api.netatmo.com eller metobs-API:t ligger nere ska varje cykel
+inte vänta ut hela REQUEST_TIMEOUT per anrop. Efter failure_threshold fel
+i rad öppnas brytaren och anrop mot värden misslyckas direkt med
+CircuitOpenError. Efter open_seconds släpps ett provanrop igenom
+(half-open): lyckas det stängs brytaren, annars öppnas den igen med
+fördubblad väntetid upp till max_open_seconds.
+
+Fel = timeout, anslutningsfel, 5xx och 429. Övriga 4xx (t.ex. Netatmos 403
+vid utgånget token) betyder att värden svarar och räknas som lyckade.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_OPEN_SECONDS = 30.0
+DEFAULT_MAX_OPEN_SECONDS = 300.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Anropet stoppades av en öppen brytare (värden bedöms vara nere)."""
+
+
+class CircuitBreaker:
+    """Brytare för en värd."""
+
+    def __init__(self, host: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 open_seconds: float = DEFAULT_OPEN_SECONDS,
+                 max_open_seconds: float = DEFAULT_MAX_OPEN_SECONDS):
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(open_seconds, max_open_seconds)
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.current_open_seconds = open_seconds
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.trips = 0
+        self.last_failure: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """
+        Släpp igenom eller stoppa ett anrop.
+
+        Raises:
+            CircuitOpenError: Brytaren är öppen (eller ett provanrop pågår redan)
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return
+
+            now = time.monotonic()
+            if self.state == STATE_OPEN and now - self.opened_at >= self.current_open_seconds:
+                self.state = STATE_HALF_OPEN
+                self.probe_in_flight = False
+
+            if self.state == STATE_HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                logger.info(f"🔌 {self.host}: provanrop (half-open)")
+                return
+
+            self.rejected += 1
+            retry_in = max(0.0, self.current_open_seconds - (now - self.opened_at))
+            raise CircuitOpenError(f"{self.host} är nere enligt circuit breaker (nytt försök om {retry_in:.0f}s)")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info(f"✅ {self.host}: circuit breaker stängd - värden svarar igen")
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.current_open_seconds = self.open_seconds
+            self.probe_in_flight = False
+
+    def record_failure(self, reason: str) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure = reason
+
+            if self.state == STATE_HALF_OPEN:
+                # Provanropet misslyckades - vänta längre nästa gång
+                self.current_open_seconds = min(self.current_open_seconds * 2, self.max_open_seconds)
+                self._open()
+            elif self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self) -> None:
+        """Provanropet gav inget utfall (t.ex. avbrutet av deadline) - släpp nästa."""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        self.trips += 1
+        logger.warning(f"🔌 {self.host}: circuit breaker öppen i {self.current_open_seconds:.0f}s "
+                       f"efter {self.consecutive_failures} fel i rad ({self.last_failure})")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == STATE_OPEN:
+                retry_in = round(max(0.0, self.current_open_seconds - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'host': self.host,
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'open_seconds': self.current_open_seconds,
+                'retry_in_seconds': retry_in,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'last_failure': self.last_failure,
+            }
+
+
+# Värd -> brytare, samt inställningar för nya brytare
+_breakers: Dict[str, CircuitBreaker] = {}
+_settings: Dict[str, Any] = {
+    'enabled': True,
+    'failure_threshold': DEFAULT_FAILURE_THRESHOLD,
+    'open_seconds': DEFAULT_OPEN_SECONDS,
+    'max_open_seconds': DEFAULT_MAX_OPEN_SECONDS,
+}
+_registry_lock = threading.Lock()
+
+
+def configure_breakers(enabled: bool = True, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                       open_seconds: float = DEFAULT_OPEN_SECONDS,
+                       max_open_seconds: float = DEFAULT_MAX_OPEN_SECONDS) -> None:
+    """
+    Sätt inställningar (befintliga brytare nollställs).
+
+    Args:
+        enabled: False = inga brytare (alla anrop släpps igenom)
+        failure_threshold: Fel i rad innan brytaren öppnas
+        open_seconds: Första väntetiden innan provanrop
+        max_open_seconds: Tak för väntetiden när provanrop misslyckas
+    """
+    with _registry_lock:
+        _settings.update({
+            'enabled': enabled, 'failure_threshold': failure_threshold,
+            'open_seconds': open_seconds, 'max_open_seconds': max_open_seconds,
+        })
+        _breakers.clear()
+
+
+def get_breaker(host: str) -> Optional[CircuitBreaker]:
+    """Brytaren för en värd (skapas vid första anrop), None om avstängt."""
+    if not _settings['enabled']:
+        return None
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, _settings['failure_threshold'],
+                                         _settings['open_seconds'], _settings['max_open_seconds'])
+                _breakers[host] = breaker
+    return breaker
+
+
+def is_failure_status(status_code: int) -> bool:
+    """5xx och 429 räknas som fel för brytaren."""
+    return status_code >= 500 or status_code == 429
+
+
+def get_breakers_status() -> List[Dict[str, Any]]:
+    """Status för alla brytare (för /api/status och /metrics)."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return [breaker.to_dict() for breaker in sorted(breakers, key=lambda b: b.host)]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Instrumenteringskrokar för API-klienterna.
+
+Klienterna rapporterar upstream-anrop och cache-utfall hit utan att känna
+till core/. Servern registrerar observers (core/metrics.py); utan observers
+är en rapport bara en loop över en tom lista, så klienterna fungerar som
+förut när de körs fristående. På samma sätt är span() en no-op tills
+servern kopplat in sin tracer (core/tracing.py), och schedule_call() använder
+threading.Timer tills servern kopplat in sin schemaläggare (core/scheduler.py).
+"""
+
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, List, Optional
+
+# Cache-utfall
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_STALE = 'stale'
+
+_upstream_observers: List[Callable[[str, float, str], None]] = []
+_cache_observers: List[Callable[[str, str], None]] = []
+_span_factory: Optional[Callable[[str], ContextManager]] = None
+_timer_factory: Optional[Callable[[str, float, Callable[[], Any]], Any]] = None
+_NULL_SPAN = nullcontext()
+
+
+def add_upstream_observer(callback: Callable[[str, float, str], None]) -> None:
+    """
+    Registrera observer för upstream-anrop.
+
+    Args:
+        callback: Anropas med (source, duration_seconds, outcome)
+    """
+    if callback not in _upstream_observers:
+        _upstream_observers.append(callback)
+
+
+def add_cache_observer(callback: Callable[[str, str], None]) -> None:
+    """
+    Registrera observer för cache-utfall.
+
+    Args:
+        callback: Anropas med (cache_name, outcome)
+    """
+    if callback not in _cache_observers:
+        _cache_observers.append(callback)
+
+
+def report_upstream(source: str, duration: float, outcome: str) -> None:
+    """
+    Rapportera ett avslutat upstream-anrop.
+
+    Args:
+        source: Logiskt namn, t.ex. 'smhi_forecast' eller 'netatmo_auth'
+        duration: Anropets längd i sekunder
+        outcome: '2xx', '4xx', '5xx', 'timeout', 'error', 'deadline' (cykelns budget
+            slut) eller 'circuit_open' (stoppat av circuit breaker)
+    """
+    for callback in _upstream_observers:
+        callback(source, duration, outcome)
+
+
+def report_cache(cache: str, outcome: str) -> None:
+    """
+    Rapportera ett cache-utfall.
+
+    Args:
+        cache: Cachens namn, t.ex. 'smhi_forecast'
+        outcome: CACHE_HIT, CACHE_MISS eller CACHE_STALE
+    """
+    for callback in _cache_observers:
+        callback(cache, outcome)
+
+
+def set_span_factory(factory: Optional[Callable[[str], ContextManager]]) -> None:
+    """
+    Registrera tracerns span-fabrik (None kopplar bort den).
+
+    Args:
+        factory: Anropas med fasnamn och returnerar en context manager
+    """
+    global _span_factory
+    _span_factory = factory
+
+
+def span(name: str) -> ContextManager:
+    """
+    Tidsmät en fas i klientkoden.
+
+    Användning: with span('smhi.json_decode'): ...
+
+    Args:
+        name: Fasens namn, prefixat med klient, t.ex. 'netatmo.blending'
+
+    Returns:
+        Context manager (no-op utan registrerad tracer)
+    """
+    if _span_factory is None:
+        return _NULL_SPAN
+    return _span_factory(name)
+
+
+def set_timer_factory(factory: Optional[Callable[[str, float, Callable[[], Any]], Any]]) -> None:
+    """
+    Registrera schemaläggarens engångs-timer (None = threading.Timer).
+
+    Args:
+        factory: Anropas med (name, delay_seconds, callback) och returnerar
+            ett objekt med cancel()
+    """
+    global _timer_factory
+    _timer_factory = factory
+
+
+def schedule_call(name: str, delay: float, callback: Callable[[], Any]) -> Any:
+    """
+    Kör callback en gång efter delay sekunder.
+
+    Args:
+        name: Jobbnamn, t.ex. 'netatmo_token_refresh' (ersätter tidigare med samma namn
+            när en schemaläggare är registrerad)
+        delay: Sekunder till körning
+        callback: Funktion utan argument
+
+    Returns:
+        Handtag med cancel()
+    """
+    if _timer_factory is not None:
+        return _timer_factory(name, delay, callback)
+
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -6,18 +6,24 @@ OAuth2 implementation med smart data-blending från alla stationer
 """
 
 import json
+import logging
 import os
-import time
 import threading
+import time
 from datetime import datetime, timedelta
 import requests
 from urllib.parse import urlencode
 
+import upstream
+from instrumentation import report_cache, schedule_call, span, CACHE_HIT, CACHE_MISS, CACHE_STALE
+
+logger = logging.getLogger(__name__)
+
 
 class NetatmoClient:
     """Netatmo API-klient med OAuth2, smart data-blending och SMHI-kompatibel trycktrend-analys."""
     
-    def __init__(self, client_id, client_secret, refresh_token, preferred_station=None):
+    def __init__(self, client_id, client_secret, refresh_token, preferred_station=None, defer_auth=False):
         """
         Initialisera Netatmo-klient.
         
@@ -26,6 +32,8 @@ class NetatmoClient:
             client_secret (str): Netatmo app Client Secret  
             refresh_token (str): Initial refresh token från dev portal
             preferred_station (str): Önskad station/modul att visa (används för display, blending sker automatiskt)
+            defer_auth (bool): True = Ingen nätverksautentisering i konstruktorn - sker i warm_up()
+                eller vid första get_station_data() (snabb uppstart)
         """
         self.client_id = client_id
         self.client_secret = client_secret
@@ -42,6 +50,7 @@ class NetatmoClient:
         self.refresh_token = refresh_token
         self.token_expires_at = None
         self.token_file = "tokens.json"
+        self._auth_lock = threading.Lock()
         
         # Cache
         self._cache_data = None
@@ -51,9 +60,9 @@ class NetatmoClient:
         # Threading
         self._refresh_timer = None
         
-        # SMHI-KOMPATIBEL TRYCKTREND-HISTORIK
+        # SMHI-KOMPATIBEL TRYCKTREND-HISTORIK (läses in vid första användning)
         self.pressure_history_file = "pressure_history.json"
-        self._pressure_history = self._load_pressure_history()
+        self._pressure_history_data = None
         
         # Blending-prioriteter (moduler prioriteras för utomhusdata)
         self.blending_strategy = {
@@ -64,16 +73,44 @@ class NetatmoClient:
             'noise': ['main_device']                    # Ljud finns bara på huvudenhet
         }
         
-        print("🔑 Netatmo-klient initierad med smart data-blending + SMHI-kompatibel trycktrend-analys")
+        logger.info("🔑 Netatmo-klient initierad med smart data-blending + SMHI-kompatibel trycktrend-analys")
         
         # Ladda sparade tokens eller använd initial
         self._load_saved_tokens()
         
-        # Autentisera direkt
-        self._authenticate()
+        # Autentisera direkt (om inte uppstarten skjuter upp det)
+        if not defer_auth:
+            self._authenticate()
+    
+    def warm_up(self):
+        """
+        Läs in tryckhistorik och autentisera (körs i bakgrunden vid defer_auth=True).
+        
+        Raises:
+            Exception: Autentiseringen misslyckades
+        """
+        self._pressure_history  # Läser in filen
+        self._ensure_authenticated()
+    
+    def _ensure_authenticated(self):
+        """Autentisera om inget access token finns (en tråd i taget)."""
+        with self._auth_lock:
+            if not self.access_token:
+                self._authenticate()
     
     # === SMHI-KOMPATIBEL TRYCKTREND-HISTORIK FUNKTIONER ===
     
+    @property
+    def _pressure_history(self):
+        """Tryckhistorik - filen läses och rensas först när den behövs."""
+        if self._pressure_history_data is None:
+            self._pressure_history_data = self._load_pressure_history()
+        return self._pressure_history_data
+    
+    @_pressure_history.setter
+    def _pressure_history(self, history):
+        self._pressure_history_data = history
+    
     def _load_pressure_history(self):
         """Ladda tryckhistorik från fil."""
         if os.path.exists(self.pressure_history_file):
@@ -87,17 +124,17 @@ class NetatmoClient:
                     cutoff_time = time.time() - (7 * 24 * 3600)
                     clean_history = self._clean_old_pressure_data(history, cutoff_time)
                     
-                    print(f"📊 Laddad tryckhistorik: {len(clean_history['timestamps'])} mätpunkter")
+                    logger.info(f"📊 Laddad tryckhistorik: {len(clean_history['timestamps'])} mätpunkter")
                     return clean_history
                 else:
-                    print("⚠️ Ogiltig historikstruktur - skapar ny")
+                    logger.warning("⚠️ Ogiltig historikstruktur - skapar ny")
                     return {"timestamps": [], "pressures": []}
                     
             except (json.JSONDecodeError, KeyError) as e:
-                print(f"⚠️ Fel vid läsning av tryckhistorik: {e}")
+                logger.warning(f"⚠️ Fel vid läsning av tryckhistorik: {e}")
                 return {"timestamps": [], "pressures": []}
         else:
-            print("📁 Ingen tryckhistorik finns - skapar ny")
+            logger.info("📁 Ingen tryckhistorik finns - skapar ny")
             return {"timestamps": [], "pressures": []}
     
     def _clean_old_pressure_data(self, history, cutoff_time):
@@ -116,11 +153,11 @@ class NetatmoClient:
             
             removed_count = len(timestamps) - len(keep_indices)
             if removed_count > 0:
-                print(f"🗑️ Rensade {removed_count} gamla tryckdata-punkter")
+                logger.info(f"🗑️ Rensade {removed_count} gamla tryckdata-punkter")
             
             return cleaned_history
         else:
-            print("🗑️ All historik var för gammal - återställer tom historik")
+            logger.info("🗑️ All historik var för gammal - återställer tom historik")
             return {"timestamps": [], "pressures": []}
     
     def _save_pressure_history(self):
@@ -129,7 +166,7 @@ class NetatmoClient:
             with open(self.pressure_history_file, 'w', encoding='utf-8') as f:
                 json.dump(self._pressure_history, f, indent=2)
         except Exception as e:
-            print(f"❌ Fel vid sparande av tryckhistorik: {e}")
+            logger.error(f"❌ Fel vid sparande av tryckhistorik: {e}")
     
     def _add_pressure_measurement(self, pressure_hpa, timestamp=None):
         """
@@ -165,7 +202,7 @@ class NetatmoClient:
         # Spara till fil
         self._save_pressure_history()
         
-        print(f"📊 Tryckmätning sparad: {pressure_hpa} hPa (totalt {len(self._pressure_history['timestamps'])} punkter)")
+        logger.debug(f"📊 Tryckmätning sparad: {pressure_hpa} hPa (totalt {len(self._pressure_history['timestamps'])} punkter)")
     
     def _analyze_pressure_trend(self):
         """
@@ -500,26 +537,26 @@ class NetatmoClient:
                     token_data = json.load(f)
                 
                 self.refresh_token = token_data.get('refresh_token', self.initial_refresh_token)
-                print(f"🔄 Laddat sparade tokens från {self.token_file}")
+                logger.info(f"🔄 Laddat sparade tokens från {self.token_file}")
                 
             except (json.JSONDecodeError, KeyError) as e:
-                print(f"⚠️ Fel vid läsning av {self.token_file}: {e}")
-                print("🔧 Använder initial refresh_token från config")
+                logger.warning(f"⚠️ Fel vid läsning av {self.token_file}: {e}")
+                logger.info("🔧 Använder initial refresh_token från config")
         else:
-            print(f"📁 {self.token_file} finns inte - använder initial refresh_token")
+            logger.info(f"📁 {self.token_file} finns inte - använder initial refresh_token")
     
     def _save_tokens(self, token_data):
         """Spara tokens till fil för framtida användning."""
         try:
             with open(self.token_file, 'w') as f:
                 json.dump(token_data, f, indent=2)
-            print(f"💾 Tokens sparade i {self.token_file}")
+            logger.info(f"💾 Tokens sparade i {self.token_file}")
         except Exception as e:
-            print(f"❌ Fel vid sparande av tokens: {e}")
+            logger.error(f"❌ Fel vid sparande av tokens: {e}")
     
     def _authenticate(self):
         """Autentisera med refresh token för att få access token."""
-        print("🔐 Autentiserar med Netatmo...")
+        logger.info("🔐 Autentiserar med Netatmo...")
         
         # Förbered POST-data
         params = {
@@ -531,7 +568,8 @@ class NetatmoClient:
         
         try:
             # API-anrop
-            response = requests.post(
+            response = upstream.post(
+                'netatmo_auth',
                 f"https://{self.api_base}{self.auth_endpoint}",
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
                 data=urlencode(params),
@@ -555,7 +593,7 @@ class NetatmoClient:
             # Beräkna expiry-tid
             self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
             
-            print(f"✅ Netatmo autentiserad! Token expires: {self.token_expires_at.strftime('%H:%M:%S')}")
+            logger.info(f"✅ Netatmo autentiserad! Token expires: {self.token_expires_at.strftime('%H:%M:%S')}")
             
             # Spara tokens
             self._save_tokens(result)
@@ -565,10 +603,10 @@ class NetatmoClient:
             self._schedule_token_refresh(refresh_delay)
             
         except requests.RequestException as e:
-            print(f"❌ Nätverksfel vid Netatmo-autentisering: {e}")
+            logger.error(f"❌ Nätverksfel vid Netatmo-autentisering: {e}")
             raise
         except Exception as e:
-            print(f"❌ Fel vid Netatmo-autentisering: {e}")
+            logger.error(f"❌ Fel vid Netatmo-autentisering: {e}")
             raise
     
     def _schedule_token_refresh(self, delay_seconds):
@@ -578,19 +616,17 @@ class NetatmoClient:
         
         def refresh_token():
             try:
-                print("🔄 Auto-refresh av Netatmo token...")
+                logger.info("🔄 Auto-refresh av Netatmo token...")
                 self._authenticate()
             except Exception as e:
-                print(f"❌ Auto-refresh misslyckades: {e}")
+                logger.error(f"❌ Auto-refresh misslyckades: {e}")
                 # Retry efter 60s vid fel
-                print("🔄 Försöker igen om 60 sekunder...")
+                logger.info("🔄 Försöker igen om 60 sekunder...")
                 self._schedule_token_refresh(60)
         
-        self._refresh_timer = threading.Timer(delay_seconds, refresh_token)
-        self._refresh_timer.daemon = True
-        self._refresh_timer.start()
+        self._refresh_timer = schedule_call('netatmo_token_refresh', delay_seconds, refresh_token)
         
-        print(f"⏰ Token auto-refresh schemalagd om {delay_seconds//60} minuter")
+        logger.info(f"⏰ Token auto-refresh schemalagd om {delay_seconds//60} minuter")
     
     def _is_cache_valid(self):
         """Kontrollera om cache fortfarande är giltig."""
@@ -600,6 +636,20 @@ class NetatmoClient:
         cache_age = time.time() - self._cache_timestamp
         return cache_age < self._cache_duration
     
+    def invalidate_cache(self):
+        """Nästa get_station_data() hämtar från API:et (cachad data behålls som fallback)."""
+        self._cache_timestamp = None
+    
+    def set_preferred_station(self, preferred_station):
+        """
+        Byt visad station/modul utan ny klient eller token (config-omladdning).
+        
+        Args:
+            preferred_station (str): Önskad station/modul, None = automatiskt val
+        """
+        self.preferred_station = preferred_station
+        self.invalidate_cache()
+    
     def get_station_data(self):
         """
         Hämta väderstation-data från Netatmo API med smart blending.
@@ -609,18 +659,23 @@ class NetatmoClient:
         """
         # Använd cache om giltig
         if self._is_cache_valid():
-            print("📋 Använder cachad Netatmo-data")
+            logger.debug("📋 Använder cachad Netatmo-data")
+            report_cache('netatmo', CACHE_HIT)
             return self._cache_data
         
         if not self.access_token:
-            print("❌ Ingen access token - kan inte hämta data")
-            return None
+            try:
+                self._ensure_authenticated()
+            except Exception:
+                logger.error("❌ Ingen access token - kan inte hämta data")
+                return None
         
         try:
-            print("🌐 Hämtar Netatmo station data med smart blending...")
+            logger.debug("🌐 Hämtar Netatmo station data med smart blending...")
             
             # API-anrop
-            response = requests.get(
+            response = upstream.get(
+                'netatmo_data',
                 f"https://{self.api_base}{self.data_endpoint}",
                 headers={
                     'Content-Type': 'application/json',
@@ -631,10 +686,11 @@ class NetatmoClient:
             
             # Hantera 403 (invalid token)
             if response.status_code == 403:
-                print("⚠️ Token invalid (403) - försöker refresh...")
+                logger.warning("⚠️ Token invalid (403) - försöker refresh...")
                 self._authenticate()
                 # Retry med nytt token
-                response = requests.get(
+                response = upstream.get(
+                    'netatmo_data',
                     f"https://{self.api_base}{self.data_endpoint}",
                     headers={
                         'Content-Type': 'application/json',
@@ -646,33 +702,42 @@ class NetatmoClient:
             if response.status_code != 200:
                 raise Exception(f"HTTP {response.status_code}: {response.text}")
             
-            result = response.json()
+            with span('netatmo.json_decode'):
+                result = response.json()
             
             # Kontrollera fel
             if 'error' in result:
                 raise Exception(f"API Error: {result['error'].get('message', 'Okänt fel')}")
             
             # Parsa data med smart blending
-            station_data = self._parse_station_data_with_blending(result.get('body', {}))
+            with span('netatmo.blending'):
+                station_data = self._parse_station_data_with_blending(result.get('body', {}))
             
             # SMHI-KOMPATIBEL TRYCKTREND: Spara tryckdata till historik
             if station_data and station_data.get('pressure'):
-                self._add_pressure_measurement(station_data['pressure'])
+                with span('netatmo.pressure_history'):
+                    self._add_pressure_measurement(station_data['pressure'])
             
             # Uppdatera cache
             self._cache_data = station_data
             self._cache_timestamp = time.time()
+            report_cache('netatmo', CACHE_MISS)
             
             if station_data:
-                print(f"✅ Netatmo-data hämtad med blending: {station_data.get('temperature', 'N/A')}°C")
+                logger.info(f"✅ Netatmo-data hämtad med blending: {station_data.get('temperature', 'N/A')}°C")
             return station_data
             
         except requests.RequestException as e:
-            print(f"❌ Nätverksfel vid Netatmo data-hämtning: {e}")
-            return self._cache_data  # Returnera cache som fallback
+            logger.error(f"❌ Nätverksfel vid Netatmo data-hämtning: {e}")
+            return self._stale_cache_fallback()
         except Exception as e:
-            print(f"❌ Fel vid Netatmo data-hämtning: {e}")
-            return self._cache_data  # Returnera cache som fallback
+            logger.error(f"❌ Fel vid Netatmo data-hämtning: {e}")
+            return self._stale_cache_fallback()
+    
+    def _stale_cache_fallback(self):
+        """Returnera senast kända data (om någon) efter misslyckad hämtning."""
+        report_cache('netatmo', CACHE_STALE if self._cache_data else CACHE_MISS)
+        return self._cache_data
     
     def _clean_station_type(self, type_text):
         """
@@ -785,13 +850,13 @@ class NetatmoClient:
         try:
             devices = body.get('devices', [])
             if not devices:
-                print("⚠️ Inga devices hittades i Netatmo-data")
+                logger.warning("⚠️ Inga devices hittades i Netatmo-data")
                 return None
             
             # Samla alla stationer med deras data
             all_stations = []
             
-            print(f"🔍 Analyserar alla tillgängliga stationer för data-blending...")
+            logger.debug(f"🔍 Analyserar alla tillgängliga stationer för data-blending...")
             
             # Iterera över alla devices (huvudstationer)
             for device in devices:
@@ -847,15 +912,15 @@ class NetatmoClient:
                     all_stations.append(module_station)
             
             # Logga alla tillgängliga stationer
-            print(f"📊 Hittade {len(all_stations)} stationer för blending:")
+            logger.debug(f"📊 Hittade {len(all_stations)} stationer för blending:")
             for i, station in enumerate(all_stations, 1):
                 available_params = [k for k, v in station['data'].items() if v is not None]
                 parent_info = f" i {station.get('parent_station')}" if station.get('parent_station') else ""
-                print(f"  {i}. {station['name']} ({station['type']}, {station['category']}){parent_info}")
-                print(f"     📊 Data: {', '.join(available_params) if available_params else 'Inga'}")
+                logger.debug(f"  {i}. {station['name']} ({station['type']}, {station['category']}){parent_info}")
+                logger.debug(f"     📊 Data: {', '.join(available_params) if available_params else 'Inga'}")
             
             # Utför smart blending för varje parameter
-            print(f"\n🧠 Utför smart data-blending...")
+            logger.debug(f"🧠 Utför smart data-blending...")
             blended_data = {}
             data_sources = {}
             
@@ -866,13 +931,13 @@ class NetatmoClient:
                 if value is not None:
                     blended_data[param] = value
                     data_sources[param] = f"{source_name} ({source_type})"
-                    print(f"  ✅ {param}: {value} från {source_name} ({source_type})")
+                    logger.debug(f"  ✅ {param}: {value} från {source_name} ({source_type})")
                 else:
-                    print(f"  ❌ {param}: Inte tillgängligt")
+                    logger.debug(f"  ❌ {param}: Inte tillgängligt")
             
             # Skapa slutgiltigt dataset
             if not blended_data:
-                print("⚠️ Ingen data kunde blandas från stationerna")
+                logger.warning("⚠️ Ingen data kunde blandas från stationerna")
                 return None
             
             # Hitta primär station för visningsnamn (föredra preferred eller första med temperatur)
@@ -925,26 +990,26 @@ class NetatmoClient:
                 'blending_used': True  # Flagga att blending användes
             }
             
-            print(f"\n✅ Smart blending klar!")
-            print(f"🎯 Primär station: {final_data['station_name']} ({final_data['station_type']})")
-            print(f"📊 Blended data:")
+            logger.debug(f"✅ Smart blending klar!")
+            logger.debug(f"🎯 Primär station: {final_data['station_name']} ({final_data['station_type']})")
+            logger.debug(f"📊 Blended data:")
             for param, value in blended_data.items():
                 source = data_sources.get(param, 'Okänd')
                 if param == 'temperature':
-                    print(f"  🌡️ Temperatur: {value}°C från {source}")
+                    logger.debug(f"  🌡️ Temperatur: {value}°C från {source}")
                 elif param == 'humidity':
-                    print(f"  💧 Luftfuktighet: {value}% från {source}")
+                    logger.debug(f"  💧 Luftfuktighet: {value}% från {source}")
                 elif param == 'pressure':
-                    print(f"  📊 Tryck: {value} mbar från {source}")
+                    logger.debug(f"  📊 Tryck: {value} mbar från {source}")
                 elif param == 'co2':
-                    print(f"  🏭 CO2: {value} ppm från {source}")
+                    logger.debug(f"  🏭 CO2: {value} ppm från {source}")
                 elif param == 'noise':
-                    print(f"  🔊 Ljud: {value} dB från {source}")
+                    logger.debug(f"  🔊 Ljud: {value} dB från {source}")
             
             return final_data
             
         except Exception as e:
-            print(f"❌ Fel vid smart blending av Netatmo-data: {e}")
+            logger.error(f"❌ Fel vid smart blending av Netatmo-data: {e}")
             import traceback
             traceback.print_exc()
             return None
@@ -956,12 +1021,14 @@ class NetatmoClient:
         Returns:
             dict: Weather data kompatibel med WeatherDisplay inkl. SMHI-kompatibel trycktrend
         """
-        station_data = self.get_station_data()
+        with span('netatmo.station_data'):
+            station_data = self.get_station_data()
         if not station_data:
             return None
         
         # Utför SMHI-kompatibel trycktrend-analys
-        pressure_trend = self._analyze_pressure_trend()
+        with span('netatmo.pressure_trend'):
+            pressure_trend = self._analyze_pressure_trend()
         
         # Konvertera till SMHI-kompatibelt format + trycktrend
         weather_data = {
@@ -990,11 +1057,11 @@ class NetatmoClient:
                 primary_period = pressure_trend.get('primary_period', '3h')
                 smhi_info = f" (SMHI {primary_period}-analys)"
             
-            print(f"📈 SMHI-kompatibel trycktrend: {pressure_trend['trend']}{smhi_info}")
-            print(f"   Beskrivning: {pressure_trend['description']}")
-            print(f"   Datahistorik: {pressure_trend['data_hours']:.1f} timmar")
-            print(f"   Tryckändring: {pressure_trend['pressure_change']:.1f} hPa")
-            print(f"   Kvalitet: {pressure_trend['analysis_quality']}")
+            logger.info(f"📈 SMHI-kompatibel trycktrend: {pressure_trend['trend']}{smhi_info}")
+            logger.debug(f"   Beskrivning: {pressure_trend['description']}")
+            logger.debug(f"   Datahistorik: {pressure_trend['data_hours']:.1f} timmar")
+            logger.debug(f"   Tryckändring: {pressure_trend['pressure_change']:.1f} hPa")
+            logger.debug(f"   Kvalitet: {pressure_trend['analysis_quality']}")
         
         return weather_data
     
@@ -1002,7 +1069,7 @@ class NetatmoClient:
         """Städa upp resurser."""
         if self._refresh_timer:
             self._refresh_timer.cancel()
-        print("🧹 Netatmo-klient nedstängd")
+        logger.info("🧹 Netatmo-klient nedstängd")
 
 
 def main():
@@ -1100,4 +1167,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
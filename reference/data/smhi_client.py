@@ -11,11 +11,18 @@ Observations API: https://opendata.smhi.se/apidocs/metobs/index.html
 
 import requests
 import json
+import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 import time
 import math
 
+import upstream
+import weather_symbols
+from instrumentation import report_cache, span, CACHE_HIT, CACHE_MISS, CACHE_STALE
+
+logger = logging.getLogger(__name__)
+
 
 class SMHIClient:
     """Klient för att hämta väderdata från SMHI:s API med weather animations support och luftfuktighet."""
@@ -47,19 +54,8 @@ class SMHIClient:
     # FAS 1: Fallback-stationer för luftfuktighet (välkända aktiva stationer)
     HUMIDITY_FALLBACK_STATIONS = [98210, 71420, 52350]  # Stockholm, Göteborg, Malmö
     
-    # WEATHER ANIMATIONS: SMHI Symbol Mapping (1-27)
-    ANIMATION_MAPPING = {
-        # Regn och regnskurar
-        'rain': [8, 9, 10, 18, 19, 20],
-        # Snö och snöbyar  
-        'snow': [15, 16, 17, 25, 26, 27],
-        # Snöblandat regn
-        'sleet': [12, 13, 14, 22, 23, 24],
-        # Åska (kan kombineras med regn)
-        'thunder': [11, 21],
-        # Klart väder (ingen animation)
-        'clear': [1, 2, 3, 4, 5, 6, 7]
-    }
+    # WEATHER ANIMATIONS: SMHI Symbol Mapping (1-27) - vy av weather_symbols.EFFECT_TYPE
+    ANIMATION_MAPPING = weather_symbols.EFFECT_SYMBOLS
     
     def __init__(self, latitude: float, longitude: float):
         """
@@ -83,7 +79,7 @@ class SMHIClient:
         self.humidity_last_fetch = None
         self.humidity_cache_duration = 30 * 60  # 30 minuter för observations-data
         
-        print(f"🌍 SMHI-klient initierad för position: {latitude}, {longitude}")
+        logger.info(f"🌍 SMHI-klient initierad för position: {latitude}, {longitude}")
     
     def get_forecast_url(self) -> str:
         """Bygg URL för SMHI API-anrop."""
@@ -102,19 +98,20 @@ class SMHIClient:
         url = self.get_forecast_url()
         
         try:
-            print(f"📡 Hämtar data från SMHI: {url}")
+            logger.debug(f"📡 Hämtar data från SMHI: {url}")
             
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
+            response = upstream.get('smhi_forecast', url, timeout=self.REQUEST_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            with span('smhi.json_decode'):
+                data = response.json()
             
             # Kontrollera att vi har korrekt data-struktur
             if 'timeSeries' not in data:
-                print("❌ Ogiltig data-struktur från SMHI API")
+                logger.error("❌ Ogiltig data-struktur från SMHI API")
                 return None
             
-            print(f"✅ SMHI data hämtad - {len(data['timeSeries'])} tidpunkter")
+            logger.info(f"✅ SMHI data hämtad - {len(data['timeSeries'])} tidpunkter")
             
             # Cache data
             self.cached_data = data
@@ -123,19 +120,19 @@ class SMHIClient:
             return data
             
         except requests.exceptions.Timeout:
-            print(f"⏰ Timeout vid anrop till SMHI API ({self.REQUEST_TIMEOUT}s)")
+            logger.error(f"⏰ Timeout vid anrop till SMHI API ({self.REQUEST_TIMEOUT}s)")
             return None
         except requests.exceptions.ConnectionError:
-            print("🌐 Nätverksfel - kan inte nå SMHI API")
+            logger.error("🌐 Nätverksfel - kan inte nå SMHI API")
             return None
         except requests.exceptions.HTTPError as e:
-            print(f"🚫 HTTP-fel från SMHI API: {e}")
+            logger.error(f"🚫 HTTP-fel från SMHI API: {e}")
             return None
         except json.JSONDecodeError:
-            print("📋 Fel vid parsning av JSON från SMHI API")
+            logger.error("📋 Fel vid parsning av JSON från SMHI API")
             return None
         except Exception as e:
-            print(f"❌ Oväntat fel vid SMHI API-anrop: {e}")
+            logger.error(f"❌ Oväntat fel vid SMHI API-anrop: {e}")
             return None
     
     def get_data(self, force_refresh: bool = False) -> Optional[Dict]:
@@ -154,11 +151,24 @@ class SMHIClient:
             self.last_fetch_time and 
             time.time() - self.last_fetch_time < self.cache_duration):
             
-            print("💾 Använder cachad SMHI-data")
+            logger.debug("💾 Använder cachad SMHI-data")
+            report_cache('smhi_forecast', CACHE_HIT)
             return self.cached_data
         
         # Hämta ny data
-        return self.fetch_raw_data()
+        data = self.fetch_raw_data()
+        if data is not None:
+            report_cache('smhi_forecast', CACHE_MISS)
+            return data
+        
+        # Vid fel: hellre gammal prognos än ingen alls
+        if self.cached_data:
+            logger.warning("⚠️ Använder inaktuell SMHI-cache efter misslyckad hämtning")
+            report_cache('smhi_forecast', CACHE_STALE)
+            return self.cached_data
+        
+        report_cache('smhi_forecast', CACHE_MISS)
+        return None
     
     def parse_parameters(self, time_entry: Dict) -> Dict:
         """
@@ -197,36 +207,29 @@ class SMHIClient:
         Returns:
             Dict med animation-information
         """
-        # Hitta animation-typ baserat på symbol
-        animation_type = 'clear'  # Default
-        intensity = 'light'
-        
-        for anim_type, symbols in self.ANIMATION_MAPPING.items():
-            if weather_symbol in symbols:
-                animation_type = anim_type
-                break
-        
-        # Bestäm intensitet baserat på nederbörd och symbol
-        if precipitation > 5:
-            intensity = 'heavy'
-        elif precipitation > 1:
-            intensity = 'medium'
-        elif precipitation > 0.1:
-            intensity = 'light'
-        
-        # Special-hantering för kraftiga vädersymboler
-        if weather_symbol in [10, 20, 27]:  # Kraftigt regn/snö
-            intensity = 'heavy'
-        elif weather_symbol in [9, 19, 26]:  # Måttligt regn/snö
-            intensity = 'medium'
-        
-        return {
-            'type': animation_type,
-            'intensity': intensity,
-            'symbol': weather_symbol,
-            'precipitation': precipitation,
-            'wind_direction': wind_direction
-        }
+        return weather_symbols.animation_trigger(weather_symbol, precipitation, wind_direction)
+    
+    def _animation_triggers(self, points: List[Dict]) -> List[Dict]:
+        """
+        Animation triggers för flera prognospunkter (bulkuppslag i weather_symbols).
+        
+        Args:
+            points: Tolkade punkter med 'weather_symbol'
+            
+        Returns:
+            Lista med animation-information i samma ordning som points
+        """
+        return weather_symbols.animation_triggers(
+            [point['weather_symbol'] for point in points],
+            [point.get('precipitation', 0) for point in points],
+            [point.get('wind_direction') for point in points]
+        )
+    
+    def _add_animation_triggers(self, points: List[Dict]) -> None:
+        """Sätt animation_trigger på varje punkt som har vädersymbol (ändras på plats)."""
+        with_symbol = [point for point in points if point.get('weather_symbol')]
+        for point, trigger in zip(with_symbol, self._animation_triggers(with_symbol)):
+            point['animation_trigger'] = trigger
     
     def get_current_weather(self) -> Optional[Dict]:
         """
@@ -262,7 +265,7 @@ class SMHIClient:
                 continue
         
         if not best_entry:
-            print("⚠️ Ingen giltig tidpunkt hittades i SMHI-data")
+            logger.warning("⚠️ Ingen giltig tidpunkt hittades i SMHI-data")
             return None
         
         # Tolka parametrar
@@ -287,10 +290,10 @@ class SMHIClient:
                 weather.get('wind_direction')
             )
             
-            print(f"🎬 Animation trigger genererad: {weather['animation_trigger']['type']}")
+            logger.debug(f"🎬 Animation trigger genererad: {weather['animation_trigger']['type']}")
         else:
             weather['animation_trigger'] = {'type': 'clear'}
-            print("🎬 No weather symbol - clear animation trigger")
+            logger.debug("🎬 No weather symbol - clear animation trigger")
         
         return weather
     
@@ -305,14 +308,14 @@ class SMHIClient:
         data = self.get_data()
         
         if not data or 'timeSeries' not in data:
-            print("❌ Ingen SMHI-data tillgänglig för 12h-prognos")
+            logger.error("❌ Ingen SMHI-data tillgänglig för 12h-prognos")
             return []
         
         now = datetime.now(timezone.utc)
         forecast_points = []
         target_intervals = [3, 6, 9, 12]  # Timmar från nu
         
-        print(f"📊 Skapar 12h-prognos från {len(data['timeSeries'])} datapunkter")
+        logger.debug(f"📊 Skapar 12h-prognos från {len(data['timeSeries'])} datapunkter")
         
         for target_hour in target_intervals:
             target_time = now.timestamp() + (target_hour * 3600)  # Unix timestamp
@@ -340,7 +343,7 @@ class SMHIClient:
                         best_entry = entry
                         
                 except (ValueError, TypeError) as e:
-                    print(f"⚠️ Fel vid parsning av tid {valid_time_str}: {e}")
+                    logger.warning(f"⚠️ Fel vid parsning av tid {valid_time_str}: {e}")
                     continue
             
             if best_entry:
@@ -358,20 +361,15 @@ class SMHIClient:
                 if 'temperature' in weather:
                     weather['temp_formatted'] = f"{weather['temperature']:.1f}°C"
                 
-                # WEATHER ANIMATIONS: Lägg till animation trigger för prognoser
-                if weather.get('weather_symbol'):
-                    weather['animation_trigger'] = self._get_animation_trigger(
-                        weather['weather_symbol'],
-                        weather.get('precipitation', 0),
-                        weather.get('wind_direction')
-                    )
-                
                 forecast_points.append(weather)
-                print(f"  ✅ {target_hour}h: {weather.get('local_time')} - {weather.get('temp_formatted', 'N/A')}")
+                logger.debug(f"  ✅ {target_hour}h: {weather.get('local_time')} - {weather.get('temp_formatted', 'N/A')}")
             else:
-                print(f"  ❌ Ingen data hittad för +{target_hour}h")
+                logger.debug(f"  ❌ Ingen data hittad för +{target_hour}h")
+        
+        # WEATHER ANIMATIONS: Lägg till animation triggers för prognoser
+        self._add_animation_triggers(forecast_points)
         
-        print(f"📈 12h-prognos klar: {len(forecast_points)} prognoser med animation triggers")
+        logger.info(f"📈 12h-prognos klar: {len(forecast_points)} prognoser med animation triggers")
         return forecast_points
     
     def get_hourly_forecast(self, hours: int = 12) -> List[Dict]:
@@ -413,19 +411,13 @@ class SMHIClient:
                 weather['valid_time'] = valid_time_str
                 weather['hours_from_now'] = int(hours_diff)
                 
-                # Lägg till animation trigger
-                if weather.get('weather_symbol'):
-                    weather['animation_trigger'] = self._get_animation_trigger(
-                        weather['weather_symbol'],
-                        weather.get('precipitation', 0),
-                        weather.get('wind_direction')
-                    )
-                
                 forecast.append(weather)
                 
             except (ValueError, TypeError):
                 continue
         
+        # Lägg till animation triggers
+        self._add_animation_triggers(forecast)
         return forecast
     
     def get_daily_forecast(self, days: int = 4) -> List[Dict]:
@@ -473,7 +465,7 @@ class SMHIClient:
                         'weather_symbols': [],
                         'wind_speeds': [],
                         'precipitations': [],
-                        'animation_triggers': []
+                        'symbol_points': []
                     }
                 
                 weather = self.parse_parameters(entry)
@@ -483,13 +475,7 @@ class SMHIClient:
                     daily_data[date_key]['temperatures'].append(weather['temperature'])
                 if 'weather_symbol' in weather:
                     daily_data[date_key]['weather_symbols'].append(weather['weather_symbol'])
-                    # Lägg till animation trigger
-                    trigger = self._get_animation_trigger(
-                        weather['weather_symbol'],
-                        weather.get('precipitation', 0),
-                        weather.get('wind_direction')
-                    )
-                    daily_data[date_key]['animation_triggers'].append(trigger)
+                    daily_data[date_key]['symbol_points'].append(weather)
                 if 'wind_speed' in weather:
                     daily_data[date_key]['wind_speeds'].append(weather['wind_speed'])
                 if 'precipitation' in weather:
@@ -503,6 +489,8 @@ class SMHIClient:
         
         for date_key in sorted(daily_data.keys()):
             day_data = daily_data[date_key]
+            # Animation triggers för dagens punkter i ett bulkuppslag
+            day_data['animation_triggers'] = self._animation_triggers(day_data.pop('symbol_points'))
             
             summary = {
                 'date': date_key.isoformat(),
@@ -550,7 +538,7 @@ class SMHIClient:
             
             daily_forecast.append(summary)
         
-        print(f"📅 Dagsprognos klar: {len(daily_forecast)} dagar med animation triggers")
+        logger.info(f"📅 Dagsprognos klar: {len(daily_forecast)} dagar med animation triggers")
         return daily_forecast
     
     # === FAS 1: SMHI LUFTFUKTIGHET FUNKTIONER ===
@@ -564,29 +552,29 @@ class SMHIClient:
         """
         try:
             url = f"{self.METOBS_BASE_URL}/version/{self.METOBS_VERSION}/parameter/{self.HUMIDITY_PARAMETER}.json"
-            print(f"🔍 Söker närmaste luftfuktighetsstation: {url}")
+            logger.debug(f"🔍 Söker närmaste luftfuktighetsstation: {url}")
             
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
+            response = upstream.get('smhi_metobs', url, timeout=self.REQUEST_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
             stations = data.get('station', [])
             
             if not stations:
-                print("❌ Inga luftfuktighetsstationer hittades")
+                logger.error("❌ Inga luftfuktighetsstationer hittades")
                 return None
             
             # Filtrera aktiva stationer
             active_stations = [s for s in stations if s.get('active', False)]
-            print(f"📍 Hittade {len(active_stations)} luftfuktighetsstationer")
+            logger.info(f"📍 Hittade {len(active_stations)} luftfuktighetsstationer")
             
             if not active_stations:
-                print("⚠️ Inga aktiva luftfuktighetsstationer - använder fallback")
+                logger.warning("⚠️ Inga aktiva luftfuktighetsstationer - använder fallback")
                 # Använd fallback-stationer
                 for fallback_id in self.HUMIDITY_FALLBACK_STATIONS:
                     fallback_str = str(fallback_id)
                     if any(s['key'] == fallback_str for s in stations):
-                        print(f"✅ Använder fallback-station: {fallback_id}")
+                        logger.info(f"✅ Använder fallback-station: {fallback_id}")
                         return fallback_str
                 return None
             
@@ -611,14 +599,14 @@ class SMHIClient:
             
             if nearest_station:
                 station_id = nearest_station['key']
-                print(f"✅ Närmaste luftfuktighetsstation: {station_id} (avstånd: {min_distance:.1f} km)")
+                logger.info(f"✅ Närmaste luftfuktighetsstation: {station_id} (avstånd: {min_distance:.1f} km)")
                 return station_id
             else:
-                print("❌ Kunde inte beräkna avstånd till några stationer")
+                logger.error("❌ Kunde inte beräkna avstånd till några stationer")
                 return None
                 
         except Exception as e:
-            print(f"❌ Fel vid sökning av luftfuktighetsstation: {e}")
+            logger.error(f"❌ Fel vid sökning av luftfuktighetsstation: {e}")
             return None
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -660,12 +648,16 @@ class SMHIClient:
         if (self.humidity_cache and 
             self.humidity_last_fetch and 
             time.time() - self.humidity_last_fetch < self.humidity_cache_duration):
-            print("💾 Använder cachad luftfuktighetsdata")
+            logger.debug("💾 Använder cachad luftfuktighetsdata")
+            report_cache('smhi_humidity', CACHE_HIT)
             return self.humidity_cache
         
+        report_cache('smhi_humidity', CACHE_MISS)
+        
         # Hitta station om inte specificerad
         if not station_id:
-            station_id = self.find_nearest_humidity_station()
+            with span('smhi.humidity_station_lookup'):
+                station_id = self.find_nearest_humidity_station()
             if not station_id:
                 return None
         
@@ -674,16 +666,16 @@ class SMHIClient:
                    f"parameter/{self.HUMIDITY_PARAMETER}/station/{station_id}/"
                    f"period/latest-hour/data.json")
             
-            print(f"💧 Hämtar luftfuktighet från station {station_id}: {url}")
+            logger.debug(f"💧 Hämtar luftfuktighet från station {station_id}: {url}")
             
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
+            response = upstream.get('smhi_metobs', url, timeout=self.REQUEST_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
             values = data.get('value', [])
             
             if not values:
-                print(f"❌ Ingen luftfuktighetsdata från station {station_id}")
+                logger.error(f"❌ Ingen luftfuktighetsdata från station {station_id}")
                 return None
             
             # Ta senaste mätning
@@ -692,7 +684,7 @@ class SMHIClient:
             timestamp_ms = latest.get('date')
             
             if value is None or timestamp_ms is None:
-                print("❌ Ogiltig luftfuktighetsdata")
+                logger.error("❌ Ogiltig luftfuktighetsdata")
                 return None
             
             # Konvertera timestamp (SMHI använder millisekunder sedan 1970)
@@ -700,7 +692,7 @@ class SMHIClient:
                 timestamp = timestamp_ms / 1000  # Konvertera till sekunder
                 measurement_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
             except (ValueError, OSError) as e:
-                print(f"⚠️ Fel vid parsning av timestamp {timestamp_ms}: {e}")
+                logger.warning(f"⚠️ Fel vid parsning av timestamp {timestamp_ms}: {e}")
                 # Fallback: använd nuvarande tid
                 measurement_time = datetime.now(timezone.utc)
             
@@ -722,7 +714,7 @@ class SMHIClient:
                 'unit': '%'
             }
             
-            print(f"✅ Luftfuktighet: {value}% (ålder: {data_age_minutes} min)")
+            logger.info(f"✅ Luftfuktighet: {value}% (ålder: {data_age_minutes} min)")
             
             # Cache resultatet
             self.humidity_cache = humidity_data
@@ -731,7 +723,7 @@ class SMHIClient:
             return humidity_data
             
         except Exception as e:
-            print(f"❌ Fel vid hämtning av luftfuktighet: {e}")
+            logger.error(f"❌ Fel vid hämtning av luftfuktighet: {e}")
             return None
     
     def get_current_weather_with_humidity(self) -> Optional[Dict]:
@@ -745,80 +737,38 @@ class SMHIClient:
         # Hämta standard väderdata
         weather_data = self.get_current_weather()
         if not weather_data:
-            print("❌ Ingen grundläggande väderdata tillgänglig")
+            logger.error("❌ Ingen grundläggande väderdata tillgänglig")
             return None
         
         # Försök hämta luftfuktighet
-        humidity_data = self.get_station_humidity()
+        return self.merge_humidity(weather_data, self.get_station_humidity())
+    
+    @staticmethod
+    def merge_humidity(weather_data: Dict, humidity_data: Optional[Dict]) -> Dict:
+        """
+        Lägg till luftfuktighetsfält från get_station_humidity() i väderdata.
+        
+        Args:
+            weather_data: Data från get_current_weather() (ändras på plats)
+            humidity_data: Observation eller None
+            
+        Returns:
+            weather_data med 'humidity', 'humidity_timestamp', 'humidity_station', 'humidity_age_minutes'
+        """
         if humidity_data:
             weather_data['humidity'] = humidity_data['value']
             weather_data['humidity_timestamp'] = humidity_data['timestamp']
             weather_data['humidity_station'] = humidity_data['station_name']
             weather_data['humidity_age_minutes'] = humidity_data['data_age_minutes']
-            print(f"✅ Väderdata utökad med luftfuktighet: {humidity_data['value']}%")
+            logger.debug(f"✅ Väderdata utökad med luftfuktighet: {humidity_data['value']}%")
         else:
-            print("⚠️ Luftfuktighet ej tillgänglig - returnerar väderdata utan humidity")
+            logger.warning("⚠️ Luftfuktighet ej tillgänglig - returnerar väderdata utan humidity")
             weather_data['humidity'] = None
             weather_data['humidity_timestamp'] = None
             weather_data['humidity_station'] = None
             weather_data['humidity_age_minutes'] = None
         
         return weather_data
-    
-    # === BEFINTLIGA METODER (INGA ÄNDRINGAR) ===
-    
-    def get_forecast_url(self) -> str:
-        """Bygg URL för SMHI API-anrop."""
-        return (
-            f"{self.BASE_URL}/category/{self.CATEGORY}/version/{self.VERSION}/"
-            f"geotype/point/lon/{self.longitude}/lat/{self.latitude}/data.json"
-        )
-    
-    def fetch_raw_data(self) -> Optional[Dict]:
-        """
-        Hämta rådata från SMHI API.
-        
-        Returns:
-            Dict med rådata från SMHI eller None vid fel
-        """
-        url = self.get_forecast_url()
-        
-        try:
-            print(f"📡 Hämtar data från SMHI: {url}")
-            
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Kontrollera att vi har korrekt data-struktur
-            if 'timeSeries' not in data:
-                print("❌ Ogiltig data-struktur från SMHI API")
-                return None
-            
-            print(f"✅ SMHI data hämtad - {len(data['timeSeries'])} tidpunkter")
-            
-            # Cache data
-            self.cached_data = data
-            self.last_fetch_time = time.time()
-            
-            return data
-            
-        except requests.exceptions.Timeout:
-            print(f"⏰ Timeout vid anrop till SMHI API ({self.REQUEST_TIMEOUT}s)")
-            return None
-        except requests.exceptions.ConnectionError:
-            print("🌐 Nätverksfel - kan inte nå SMHI API")
-            return None
-        except requests.exceptions.HTTPError as e:
-            print(f"🚫 HTTP-fel från SMHI API: {e}")
-            return None
-        except json.JSONDecodeError:
-            print("📋 Fel vid parsning av JSON från SMHI API")
-            return None
-        except Exception as e:
-            print(f"❌ Oväntat fel vid SMHI API-anrop: {e}")
-            return None
 
 
 # === TEST FUNKTIONER ===
@@ -901,5 +851,6 @@ def test_humidity_functionality():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     test_smhi_client()
     test_humidity_functionality()
\ No newline at end of file
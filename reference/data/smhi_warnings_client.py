@@ -9,10 +9,16 @@ API-dokumentation: https://opendata.smhi.se/apidocs/warnings/index.html
 
 import requests
 import json
+import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 import time
 
+import upstream
+from instrumentation import report_cache, span, CACHE_HIT, CACHE_MISS, CACHE_STALE
+
+logger = logging.getLogger(__name__)
+
 
 class SMHIWarningsClient:
     """Klient för att hämta vädervarningar från SMHI:s Impact Based Weather Warnings API."""
@@ -71,7 +77,7 @@ class SMHIWarningsClient:
         self.cached_warnings = None
         self.last_fetch_time = None
         
-        print("⚠️ SMHI Warnings-klient initierad")
+        logger.info("⚠️ SMHI Warnings-klient initierad")
     
     def get_warnings_url(self) -> str:
         """Bygg URL för SMHI Warnings API-anrop."""
@@ -87,20 +93,21 @@ class SMHIWarningsClient:
         url = self.get_warnings_url()
         
         try:
-            print(f"📡 Hämtar varningar från SMHI: {url}")
+            logger.debug(f"📡 Hämtar varningar från SMHI: {url}")
             
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
+            response = upstream.get('smhi_warnings', url, timeout=self.REQUEST_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            with span('warnings.json_decode'):
+                data = response.json()
             
             # SMHI returnerar en direkt lista, inte ett objekt med 'warnings'
             if not isinstance(data, list):
-                print("❌ Ogiltig data-struktur från SMHI Warnings API - förväntar lista")
+                logger.error("❌ Ogiltig data-struktur från SMHI Warnings API - förväntar lista")
                 return None
             
             warnings_count = len(data)
-            print(f"✅ SMHI varningar hämtade - {warnings_count} varningar totalt")
+            logger.info(f"✅ SMHI varningar hämtade - {warnings_count} varningar totalt")
             
             # Cache data
             self.cached_warnings = data
@@ -109,19 +116,19 @@ class SMHIWarningsClient:
             return data
             
         except requests.exceptions.Timeout:
-            print(f"⏰ Timeout vid anrop till SMHI Warnings API ({self.REQUEST_TIMEOUT}s)")
+            logger.error(f"⏰ Timeout vid anrop till SMHI Warnings API ({self.REQUEST_TIMEOUT}s)")
             return None
         except requests.exceptions.ConnectionError:
-            print("🌐 Nätverksfel - kan inte nå SMHI Warnings API")
+            logger.error("🌐 Nätverksfel - kan inte nå SMHI Warnings API")
             return None
         except requests.exceptions.HTTPError as e:
-            print(f"🚫 HTTP-fel från SMHI Warnings API: {e}")
+            logger.error(f"🚫 HTTP-fel från SMHI Warnings API: {e}")
             return None
         except json.JSONDecodeError:
-            print("📋 Fel vid parsning av JSON från SMHI Warnings API")
+            logger.error("📋 Fel vid parsning av JSON från SMHI Warnings API")
             return None
         except Exception as e:
-            print(f"❌ Oväntat fel vid SMHI Warnings API-anrop: {e}")
+            logger.error(f"❌ Oväntat fel vid SMHI Warnings API-anrop: {e}")
             return None
     
     def get_warnings_data(self, force_refresh: bool = False) -> Optional[List]:
@@ -140,11 +147,24 @@ class SMHIWarningsClient:
             self.last_fetch_time and 
             time.time() - self.last_fetch_time < self.cache_duration):
             
-            print("💾 Använder cachade SMHI-varningar")
+            logger.debug("💾 Använder cachade SMHI-varningar")
+            report_cache('smhi_warnings', CACHE_HIT)
             return self.cached_warnings
         
         # Hämta ny data
-        return self.fetch_raw_warnings()
+        data = self.fetch_raw_warnings()
+        if data is not None:
+            report_cache('smhi_warnings', CACHE_MISS)
+            return data
+        
+        # Vid fel: behåll senast kända varningar hellre än att visa inga
+        if self.cached_warnings:
+            logger.warning("⚠️ Använder inaktuella SMHI-varningar efter misslyckad hämtning")
+            report_cache('smhi_warnings', CACHE_STALE)
+            return self.cached_warnings
+        
+        report_cache('smhi_warnings', CACHE_MISS)
+        return None
     
     def parse_warning(self, warning: Dict) -> List[Dict]:
         """
@@ -236,7 +256,7 @@ class SMHIWarningsClient:
             return parsed_warnings
             
         except Exception as e:
-            print(f"❌ Fel vid tolkning av varning: {e}")
+            logger.error(f"❌ Fel vid tolkning av varning: {e}")
             return []
     
     def _extract_description_text(self, descriptions: List[Dict]) -> str:
@@ -353,7 +373,7 @@ class SMHIWarningsClient:
                     if event_desc_code in self.HEAVY_RAIN_CRITERIA['event_description_codes']:
                         heavy_rain_warnings.append(parsed)
         
-        print(f"🌧️ Hittade {len(heavy_rain_warnings)} skyfallsvarningar")
+        logger.info(f"🌧️ Hittade {len(heavy_rain_warnings)} skyfallsvarningar")
         return heavy_rain_warnings
     
     def get_active_heavy_rain_warnings(self) -> List[Dict]:
@@ -366,7 +386,7 @@ class SMHIWarningsClient:
         all_rain_warnings = self.get_heavy_rain_warnings()
         active_warnings = [w for w in all_rain_warnings if w.get('is_active', False)]
         
-        print(f"⚠️ {len(active_warnings)} aktiva skyfallsvarningar just nu")
+        logger.info(f"⚠️ {len(active_warnings)} aktiva skyfallsvarningar just nu")
         return active_warnings
     
     def get_all_warnings(self, warning_types: List[str] = None) -> List[Dict]:
@@ -397,7 +417,7 @@ class SMHIWarningsClient:
             all_warnings.extend(parsed_warnings)  # Lägg till alla områden
         
         filter_info = f" (filtrerat: {warning_types})" if warning_types else ""
-        print(f"📋 Hämtade {len(all_warnings)} varningsområden{filter_info}")
+        logger.info(f"📋 Hämtade {len(all_warnings)} varningsområden{filter_info}")
         return all_warnings
     
     def get_warnings_summary(self) -> Dict:
@@ -494,4 +514,5 @@ def test_smhi_warnings_client():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     test_smhi_warnings_client()
\ No newline at end of file
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Lokal solberäkning enligt NOAA:s algoritm (Meeus, förenklad).
+
+Ger soluppgång, solnedgång, solens middagshöjd och skymning (civil,
+nautisk, astronomisk) med ungefär en minuts noggrannhet på svenska
+breddgrader - tidsekvationen och atmosfärisk refraktion är medräknade.
+Ett helt års tabell för en plats beräknas i ett svep (några ms), så
+ingen extern tjänst eller fil behövs i normal drift.
+
+Solens position (höjd, azimut och dygnsfas) finns som minuttabell per
+UTC-dygn, så att dag/natt för varje prognospunkt blir ett indexuppslag.
+
+Alla tider i tabellerna är UTC epoch-sekunder; konvertering till lokal tid
+sker först vid visning.
+"""
+
+import calendar
+import math
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Zenitvinkel för respektive händelse. 90.833° = solens övre kant i
+# horisonten med standardrefraktion (34') och solradie (16').
+ZENITH_SUNRISE = 90.833
+ZENITH_CIVIL = 96.0
+ZENITH_NAUTICAL = 102.0
+ZENITH_ASTRONOMICAL = 108.0
+
+# Händelsepar i tabellen: namn -> zenit
+TWILIGHT_ZENITHS = {
+    'sun': ZENITH_SUNRISE,
+    'civil': ZENITH_CIVIL,
+    'nautical': ZENITH_NAUTICAL,
+    'astronomical': ZENITH_ASTRONOMICAL,
+}
+
+# Hela dygnet över/under zenitgränsen
+POLAR_DAY = 'day'
+POLAR_NIGHT = 'night'
+
+# Dygnsfas utifrån solens (geometriska) höjd - gränserna = 90° - zenit ovan
+PHASE_DAY = 'day'
+PHASE_CIVIL = 'civil'
+PHASE_NAUTICAL = 'nautical'
+PHASE_NIGHT = 'night'
+_PHASE_LIMITS = (
+    (90.0 - ZENITH_SUNRISE, PHASE_DAY),
+    (90.0 - ZENITH_CIVIL, PHASE_CIVIL),
+    (90.0 - ZENITH_NAUTICAL, PHASE_NAUTICAL),
+)
+
+MINUTES_PER_DAY = 1440
+
+_SECONDS_PER_DAY = 86400.0
+_JD_UNIX_EPOCH = 2440587.5
+
+
+def julian_day(epoch: float) -> float:
+    """Juliansk dag för en UTC epoch-tid."""
+    return epoch / _SECONDS_PER_DAY + _JD_UNIX_EPOCH
+
+
+def solar_terms(jd: float) -> Tuple[float, float]:
+    """
+    Solens deklination och tidsekvationen för en juliansk dag.
+
+    Args:
+        jd: Juliansk dag
+
+    Returns:
+        tuple: (deklination i radianer, tidsekvationen i minuter)
+    """
+    t = (jd - 2451545.0) / 36525.0
+
+    mean_long = math.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+    mean_anom = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccent = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    center = (math.sin(mean_anom) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + math.sin(2 * mean_anom) * (0.019993 - 0.000101 * t)
+              + math.sin(3 * mean_anom) * 0.000289)
+    omega = math.radians(125.04 - 1934.136 * t)
+    app_long = math.radians(math.degrees(mean_long) + center - 0.00569 - 0.00478 * math.sin(omega))
+
+    mean_obliq = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    obliq = math.radians(mean_obliq + 0.00256 * math.cos(omega))
+
+    declination = math.asin(math.sin(obliq) * math.sin(app_long))
+
+    y = math.tan(obliq / 2) ** 2
+    eq_time = 4 * math.degrees(
+        y * math.sin(2 * mean_long)
+        - 2 * eccent * math.sin(mean_anom)
+        + 4 * eccent * y * math.sin(mean_anom) * math.cos(2 * mean_long)
+        - 0.5 * y * y * math.sin(4 * mean_long)
+        - 1.25 * eccent * eccent * math.sin(2 * mean_anom)
+    )
+    return declination, eq_time
+
+
+def _hour_angle(lat_rad: float, declination: float, zenith: float) -> Optional[float]:
+    """Timvinkel (grader) för zenitvinkeln, eller None/±inf vid polardag/polarnatt."""
+    cos_ha = (math.cos(math.radians(zenith)) / (math.cos(lat_rad) * math.cos(declination))
+              - math.tan(lat_rad) * math.tan(declination))
+    if cos_ha > 1:
+        return None           # Solen når aldrig upp till zenitgränsen
+    if cos_ha < -1:
+        return math.inf       # Solen går aldrig under zenitgränsen
+    return math.degrees(math.acos(cos_ha))
+
+
+def compute_day(latitude: float, longitude: float, day: date) -> Dict[str, object]:
+    """
+    Soltider för ett datum (lokalt soldygn på platsen).
+
+    Args:
+        latitude: Latitud i decimala grader
+        longitude: Longitud i decimala grader (öst positiv)
+        day: Datum
+
+    Returns:
+        dict: 'solar_noon' samt per händelse i TWILIGHT_ZENITHS ett par
+              '<namn>_rise'/'<namn>_set' (epoch) eller None och '<namn>_polar'
+    """
+    midnight = calendar.timegm(day.timetuple())
+    # Clampa latitud bort från polerna (tan -> oändligt)
+    lat_rad = math.radians(max(-89.99, min(89.99, latitude)))
+
+    # Första approximation vid lokal middag, sedan en förfining vid verklig soltid
+    noon = midnight + (720 - 4 * longitude) * 60
+    declination, eq_time = solar_terms(julian_day(noon))
+    noon = midnight + (720 - 4 * longitude - eq_time) * 60
+    declination, eq_time = solar_terms(julian_day(noon))
+    noon = midnight + (720 - 4 * longitude - eq_time) * 60
+
+    result: Dict[str, object] = {'solar_noon': noon}
+    for name, zenith in TWILIGHT_ZENITHS.items():
+        hour_angle = _hour_angle(lat_rad, declination, zenith)
+        if hour_angle is None or hour_angle == math.inf:
+            result[f'{name}_rise'] = result[f'{name}_set'] = None
+            result[f'{name}_polar'] = POLAR_NIGHT if hour_angle is None else POLAR_DAY
+        else:
+            result[f'{name}_rise'] = noon - hour_angle * 240
+            result[f'{name}_set'] = noon + hour_angle * 240
+            result[f'{name}_polar'] = None
+    return result
+
+
+def compute_year_table(latitude: float, longitude: float, year: int) -> List[Dict[str, object]]:
+    """
+    Förberäkna soltider för varje dag ett helt år.
+
+    Args:
+        latitude: Latitud i decimala grader
+        longitude: Longitud i decimala grader
+        year: Årtal
+
+    Returns:
+        list: En post från compute_day() per dag (index = dag på året - 1)
+    """
+    first = date(year, 1, 1)
+    days = 366 if calendar.isleap(year) else 365
+    return [compute_day(latitude, longitude, first + timedelta(days=offset)) for offset in range(days)]
+
+
+def phase_for_elevation(elevation: float) -> str:
+    """
+    Dygnsfas för en geometrisk solhöjd.
+
+    Args:
+        elevation: Solhöjd i grader (utan refraktion)
+
+    Returns:
+        str: PHASE_DAY, PHASE_CIVIL, PHASE_NAUTICAL eller PHASE_NIGHT
+    """
+    for limit, phase in _PHASE_LIMITS:
+        if elevation >= limit:
+            return phase
+    return PHASE_NIGHT
+
+
+def refraction_correction(elevation: float) -> float:
+    """Atmosfärisk refraktion (grader) att lägga till en geometrisk solhöjd (NOAA)."""
+    if elevation > 85.0:
+        return 0.0
+    tan_e = math.tan(math.radians(elevation))
+    if elevation > 5.0:
+        arcsec = 58.1 / tan_e - 0.07 / tan_e ** 3 + 0.000086 / tan_e ** 5
+    elif elevation > -0.575:
+        arcsec = 1735.0 + elevation * (-518.2 + elevation * (103.4 + elevation * (-12.79 + elevation * 0.711)))
+    else:
+        arcsec = -20.772 / tan_e
+    return arcsec / 3600.0
+
+
+def _position(lat_rad: float, longitude: float, minutes_utc: float,
+              declination: float, eq_time: float) -> Tuple[float, float]:
+    """Geometrisk solhöjd och azimut (grader, azimut medurs från norr)."""
+    true_solar_time = (minutes_utc + eq_time + 4 * longitude) % MINUTES_PER_DAY
+    hour_angle = math.radians(true_solar_time / 4 - 180)
+
+    cos_zenith = (math.sin(lat_rad) * math.sin(declination)
+                  + math.cos(lat_rad) * math.cos(declination) * math.cos(hour_angle))
+    zenith = math.acos(max(-1.0, min(1.0, cos_zenith)))
+
+    denominator = math.cos(lat_rad) * math.sin(zenith)
+    if abs(denominator) < 1e-9:
+        azimuth = 180.0
+    else:
+        cos_az = (math.sin(lat_rad) * math.cos(zenith) - math.sin(declination)) / denominator
+        azimuth = math.degrees(math.acos(max(-1.0, min(1.0, cos_az))))
+        azimuth = (azimuth + 180) % 360 if hour_angle > 0 else (540 - azimuth) % 360
+    return 90.0 - math.degrees(zenith), azimuth
+
+
+def solar_position(latitude: float, longitude: float, epoch: float) -> Dict[str, object]:
+    """
+    Solens position vid en tidpunkt (exakt beräkning, utan tabell).
+
+    Args:
+        latitude: Latitud i decimala grader
+        longitude: Longitud i decimala grader
+        epoch: UTC epoch-sekunder
+
+    Returns:
+        dict: 'elevation' (med refraktion), 'azimuth', 'phase' och 'is_daytime'
+    """
+    declination, eq_time = solar_terms(julian_day(epoch))
+    lat_rad = math.radians(max(-89.99, min(89.99, latitude)))
+    elevation, azimuth = _position(lat_rad, longitude, (epoch % _SECONDS_PER_DAY) / 60,
+                                   declination, eq_time)
+    return describe_position(elevation, azimuth)
+
+
+def describe_position(elevation: float, azimuth: float) -> Dict[str, object]:
+    """Gör om geometrisk höjd/azimut till API-format."""
+    phase = phase_for_elevation(elevation)
+    return {
+        'elevation': round(elevation + refraction_correction(elevation), 2),
+        'azimuth': round(azimuth, 2),
+        'phase': phase,
+        'is_daytime': phase == PHASE_DAY,
+    }
+
+
+def compute_day_positions(latitude: float, longitude: float, day_start: float) -> Tuple[array, array]:
+    """
+    Minuttabell med solens position för ett UTC-dygn.
+
+    Deklination och tidsekvation beräknas en gång per timme (de ändras
+    försumbart inom timmen), resten per minut.
+
+    Args:
+        latitude: Latitud i decimala grader
+        longitude: Longitud i decimala grader
+        day_start: UTC epoch för dygnets början (00:00 UTC)
+
+    Returns:
+        tuple: (geometrisk höjd, azimut) som array('f') med 1440 värden
+    """
+    lat_rad = math.radians(max(-89.99, min(89.99, latitude)))
+    elevations = array('f', bytes(4 * MINUTES_PER_DAY))
+    azimuths = array('f', bytes(4 * MINUTES_PER_DAY))
+
+    for hour in range(24):
+        declination, eq_time = solar_terms(julian_day(day_start + hour * 3600 + 1800))
+        for minute in range(hour * 60, hour * 60 + 60):
+            elevations[minute], azimuths[minute] = _position(lat_rad, longitude, minute + 0.5,
+                                                             declination, eq_time)
+    return elevations, azimuths
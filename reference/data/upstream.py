@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Gemensam HTTP-åtkomst för API-klienterna.
+
+Alla upstream-anrop (SMHI, Netatmo, ipgeolocation) går genom request() så
+att tidtagning och utfall rapporteras på ett ställe. Varje tråd har en egen
+requests.Session så att TCP/TLS-anslutningar återanvänds mellan cykler.
+
+Värdar kan pekas om (set_host_overrides) så att hela appen körs mot lokala
+fejkservrar vid last- och skalningstester. Med set_transport_mode() kan all
+trafik spelas in till, eller spelas upp från, en kassett (se cassette.py).
+
+Varje värd har en circuit breaker (circuit_breaker.py) och en cykel kan sätta
+en deadline (with deadline(25): ...) som kapar varje anrops timeout till den
+tid som återstår - en trasig källa ska inte fördröja de andra.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from circuit_breaker import get_breaker, is_failure_status
+from instrumentation import report_upstream, span
+
+MODE_LIVE = 'live'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+_thread_local = threading.local()
+
+# Värd -> bas-URL, t.ex. {'api.netatmo.com': 'http://127.0.0.1:8090'}; '*' matchar alla värdar
+_host_overrides: Dict[str, str] = {}
+
+# Kassett-inspelning/uppspelning (None = riktiga anrop utan inspelning)
+_recorder = None
+_player = None
+
+
+def set_host_overrides(overrides: Optional[Dict[str, str]]) -> None:
+    """
+    Peka om upstream-värdar (för lokala fejkservrar).
+
+    Args:
+        overrides: Värd -> bas-URL ('scheme://host[:port]'). '*' gäller alla
+            värdar som inte har en egen rad. None eller {} stänger av.
+    """
+    global _host_overrides
+    _host_overrides = {host: base.rstrip('/') for host, base in (overrides or {}).items()}
+
+
+def set_transport_mode(mode: str = MODE_LIVE, cassette_dir: Optional[str] = None,
+                       time_scale: float = 1.0, strict: bool = False) -> None:
+    """
+    Välj transport: riktiga anrop, inspelning eller uppspelning.
+
+    Args:
+        mode: 'live', 'record' eller 'replay'
+        cassette_dir: Kassettkatalog (krävs för record/replay)
+        time_scale: Replay: faktor på inspelad svarstid (1 = som inspelat, 0 = direkt)
+        strict: Replay: fel i stället för att upprepa sista svaret när kassetten tagit slut
+
+    Raises:
+        ValueError: Okänt läge eller saknad katalog
+        OSError: Kassetten kan inte läsas (replay)
+    """
+    global _recorder, _player
+
+    if mode not in (MODE_LIVE, MODE_RECORD, MODE_REPLAY):
+        raise ValueError(f"Okänt upstream-läge: {mode}")
+    if mode != MODE_LIVE and not cassette_dir:
+        raise ValueError(f"upstream-läge '{mode}' kräver cassette_dir")
+
+    from cassette import CassettePlayer, CassetteRecorder
+    _recorder = CassetteRecorder(cassette_dir) if mode == MODE_RECORD else None
+    _player = CassettePlayer(cassette_dir, time_scale, strict) if mode == MODE_REPLAY else None
+
+
+def get_transport_status() -> Dict[str, Any]:
+    """Aktuellt transportläge (och uppspelningsstatus vid replay)."""
+    if _player is not None:
+        return dict(_player.get_status(), mode=MODE_REPLAY)
+    if _recorder is not None:
+        return {'mode': MODE_RECORD, 'cassette_dir': _recorder.cassette_dir}
+    return {'mode': MODE_LIVE}
+
+
+def get_host_overrides() -> Dict[str, str]:
+    """Aktuella värd-omdirigeringar."""
+    return dict(_host_overrides)
+
+
+def _apply_host_override(url: str) -> str:
+    """Byt scheme och värd mot omdirigeringen; sökväg och query behålls."""
+    parts = urlsplit(url)
+    base = _host_overrides.get(parts.hostname or '') or _host_overrides.get('*')
+    if not base:
+        return url
+    rest = url[len(f"{parts.scheme}://{parts.netloc}"):]
+    return base + rest
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Cykelns tidsbudget är slut - anropet görs inte."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Tidsbudget för alla upstream-anrop i with-blocket (i denna tråd).
+
+    Nästlade budgetar kan bara korta den yttre. None = ingen budget.
+
+    Args:
+        seconds: Sekunder från nu
+    """
+    previous = getattr(_thread_local, 'deadline', None)
+    if seconds is not None:
+        candidate = time.monotonic() + seconds
+        _thread_local.deadline = candidate if previous is None else min(previous, candidate)
+    try:
+        yield
+    finally:
+        _thread_local.deadline = previous
+
+
+def remaining_budget() -> Optional[float]:
+    """Sekunder kvar av trådens deadline (None = ingen budget)."""
+    current = getattr(_thread_local, 'deadline', None)
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def _cap_timeout(timeout: Any, remaining: float) -> Any:
+    """Kapa requests-timeout (tal eller (connect, read)) till återstående budget."""
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
+
+def _get_session() -> requests.Session:
+    """Hämta trådens Session (skapas vid första anrop)."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def _status_outcome(status_code: int) -> str:
+    """Gruppera HTTP-status till '2xx', '3xx', '4xx' eller '5xx'."""
+    return f"{status_code // 100}xx"
+
+
+def request(source: str, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Utför ett upstream-anrop med tidtagning.
+
+    Args:
+        source: Logiskt källnamn för metrics, t.ex. 'smhi_forecast'
+        method: HTTP-metod
+        url: URL
+        **kwargs: Skickas vidare till requests (timeout, params, headers, data...)
+
+    Returns:
+        requests.Response
+
+    Raises:
+        requests.RequestException: Som requests - klienternas felhantering är oförändrad
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    breaker = get_breaker(urlsplit(url).hostname or source)
+    budget_capped = False
+
+    try:
+        remaining = remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                outcome = 'deadline'
+                raise DeadlineExceeded(f"Cykelns tidsbudget slut före {source}")
+            capped = _cap_timeout(kwargs.get('timeout'), remaining)
+            budget_capped = capped != kwargs.get('timeout')
+            kwargs['timeout'] = capped
+
+        if breaker is not None:
+            try:
+                breaker.before_request()
+            except requests.RequestException:
+                outcome = 'circuit_open'
+                raise
+
+        with span(f'http.{source}'):
+            if _player is not None:
+                response = _player.play(source, method, url, kwargs.get('params'))
+            else:
+                response = _session_request(source, method, url, kwargs)
+        outcome = _status_outcome(response.status_code)
+
+        if breaker is not None:
+            if is_failure_status(response.status_code):
+                breaker.record_failure(f"HTTP {response.status_code}")
+            else:
+                breaker.record_success()
+        return response
+    except requests.exceptions.Timeout as e:
+        if outcome not in ('deadline', 'circuit_open'):
+            outcome = 'timeout'
+            if breaker is not None:
+                if budget_capped:
+                    # Timeouten kom från vår budget, inte från värden
+                    breaker.release_probe()
+                else:
+                    breaker.record_failure(type(e).__name__)
+        raise
+    except requests.RequestException as e:
+        if outcome != 'circuit_open' and breaker is not None:
+            breaker.record_failure(type(e).__name__)
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.release_probe()
+        raise
+    finally:
+        report_upstream(source, time.perf_counter() - start, outcome)
+
+
+def _session_request(source: str, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+    """
+    Riktigt anrop via trådens Session, inspelat om record-läge är aktivt.
+
+    Kassetten får den ursprungliga URL:en så att en inspelning mot
+    fejkservrar kan spelas upp utan omdirigering och tvärtom.
+    """
+    target_url = _apply_host_override(url) if _host_overrides else url
+    recorder = _recorder
+    if recorder is None:
+        return _get_session().request(method, target_url, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        response = _get_session().request(method, target_url, **kwargs)
+    except requests.RequestException as e:
+        recorder.record(source, method, url, kwargs.get('params'), None, time.perf_counter() - start, error=e)
+        raise
+    recorder.record(source, method, url, kwargs.get('params'), response, time.perf_counter() - start)
+    return response
+
+
+def get(source: str, url: str, **kwargs) -> requests.Response:
+    """GET via request()."""
+    return request(source, 'GET', url, **kwargs)
+
+
+def post(source: str, url: str, **kwargs) -> requests.Response:
+    """POST via request()."""
+    return request(source, 'POST', url, **kwargs)
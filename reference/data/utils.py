@@ -2,188 +2,86 @@
 """
 Hjälpfunktioner och utilities för SMHI + Netatmo Weather Dashboard
 FAS 4: Komplett Weather Icons implementation med font-rendering för Tkinter
-Inkluderar soluppgång/solnedgång-beräkningar med API-stöd och fallback
+Inkluderar soluppgång/solnedgång-beräkningar (lokal NOAA-algoritm, valfritt API)
 """
 
-import math
 import json
+import logging
 import requests
+import threading
 from datetime import datetime, date, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
 import time
 
+import solar
+import upstream
+import weather_symbols
+from instrumentation import report_cache, span, CACHE_HIT, CACHE_MISS
 
-# === WEATHER ICONS UNICODE MAPPNINGAR FÖR FAS 4 ===
+logger = logging.getLogger(__name__)
+
+
+# === WEATHER ICONS MAPPNINGAR (VYER AV weather_symbols-TABELLERNA) ===
 
 # Weather Icons Unicode mappningar för Tkinter font-rendering
-WEATHER_ICONS_UNICODE = {
-    # Dag-ikoner
-    "wi-day-sunny": "\uf00d",
-    "wi-day-cloudy": "\uf002",
-    "wi-day-cloudy-gusts": "\uf000",
-    "wi-day-cloudy-windy": "\uf001",
-    "wi-day-fog": "\uf003",
-    "wi-day-hail": "\uf004",
-    "wi-day-haze": "\uf0b6",
-    "wi-day-lightning": "\uf005",
-    "wi-day-rain": "\uf008",
-    "wi-day-rain-mix": "\uf006",
-    "wi-day-rain-wind": "\uf007",
-    "wi-day-showers": "\uf009",
-    "wi-day-sleet": "\uf0b2",
-    "wi-day-sleet-storm": "\uf068",
-    "wi-day-snow": "\uf00a",
-    "wi-day-snow-thunderstorm": "\uf06b",
-    "wi-day-snow-wind": "\uf065",
-    "wi-day-sprinkle": "\uf00b",
-    "wi-day-storm-showers": "\uf00e",
-    "wi-day-sunny-overcast": "\uf00c",
-    "wi-day-thunderstorm": "\uf010",
-    "wi-day-windy": "\uf085",
-    "wi-day-cloudy-high": "\uf07d",
-    
-    # Natt-ikoner
-    "wi-night-clear": "\uf02e",
-    "wi-night-cloudy": "\uf031",
-    "wi-night-cloudy-gusts": "\uf02d",
-    "wi-night-cloudy-windy": "\uf02c",
-    "wi-night-fog": "\uf04a",
-    "wi-night-hail": "\uf026",
-    "wi-night-lightning": "\uf025",
-    "wi-night-partly-cloudy": "\uf083",
-    "wi-night-rain": "\uf036",
-    "wi-night-rain-mix": "\uf034",
-    "wi-night-rain-wind": "\uf035",
-    "wi-night-showers": "\uf037",
-    "wi-night-sleet": "\uf0b4",
-    "wi-night-sleet-storm": "\uf069",
-    "wi-night-snow": "\uf038",
-    "wi-night-snow-thunderstorm": "\uf06c",
-    "wi-night-snow-wind": "\uf066",
-    "wi-night-sprinkle": "\uf039",
-    "wi-night-storm-showers": "\uf03a",
-    "wi-night-thunderstorm": "\uf03b",
-    "wi-night-cloudy-high": "\uf07e",
-    "wi-night-alt-cloudy": "\uf086",
-    
-    # Allmänna ikoner
-    "wi-cloudy": "\uf013",
-    "wi-cloud": "\uf041",
-    "wi-fog": "\uf014",
-    "wi-rain": "\uf019",
-    "wi-rain-mix": "\uf017",
-    "wi-sleet": "\uf0b5",
-    "wi-snow": "\uf01b",
-    "wi-thunderstorm": "\uf01e",
-    "wi-windy": "\uf021",
-    
-    # Vind-ikoner
-    "wi-wind-default": "\uf0b1",
-    "wi-direction-up": "\uf058",
-    "wi-direction-down": "\uf044",
-    "wi-minus": "\uf056",
-    
-    # Fallback
-    "wi-na": "\uf07b"
-}
+WEATHER_ICONS_UNICODE = weather_symbols.WEATHER_ICONS_UNICODE
 
-# SMHI symbol mappningar (samma som tidigare men nu med Unicode-rendering)
+# SMHI symbol -> Weather Icons-klass
 SMHI_TO_WEATHER_ICONS = {
-    1: {"day": "wi-day-sunny", "night": "wi-night-clear"},                    # Klart
-    2: {"day": "wi-day-sunny-overcast", "night": "wi-night-partly-cloudy"},  # Nästan klart
-    3: {"day": "wi-day-cloudy", "night": "wi-night-alt-cloudy"},             # Växlande molnighet
-    4: {"day": "wi-day-cloudy-high", "night": "wi-night-cloudy-high"},       # Halvklart
-    5: {"day": "wi-cloudy", "night": "wi-cloudy"},                           # Molnigt
-    6: {"day": "wi-cloud", "night": "wi-cloud"},                             # Mulet
-    7: {"day": "wi-fog", "night": "wi-fog"},                                 # Dimma
-    8: {"day": "wi-day-showers", "night": "wi-night-showers"},               # Lätta regnskurar
-    9: {"day": "wi-day-rain", "night": "wi-night-rain"},                     # Måttliga regnskurar
-    10: {"day": "wi-rain", "night": "wi-rain"},                              # Kraftiga regnskurar
-    11: {"day": "wi-day-thunderstorm", "night": "wi-night-thunderstorm"},    # Åskväder
-    12: {"day": "wi-day-rain-mix", "night": "wi-night-rain-mix"},            # Lätta snöblandade regnskurar
-    13: {"day": "wi-rain-mix", "night": "wi-rain-mix"},                      # Måttliga snöblandade regnskurar
-    14: {"day": "wi-rain-mix", "night": "wi-rain-mix"},                      # Kraftiga snöblandade regnskurar
-    15: {"day": "wi-day-snow", "night": "wi-night-snow"},                    # Lätta snöbyar
-    16: {"day": "wi-snow", "night": "wi-snow"},                              # Måttliga snöbyar
-    17: {"day": "wi-snow", "night": "wi-snow"},                              # Kraftiga snöbyar
-    18: {"day": "wi-day-rain", "night": "wi-night-rain"},                    # Lätt regn
-    19: {"day": "wi-rain", "night": "wi-rain"},                              # Måttligt regn
-    20: {"day": "wi-rain", "night": "wi-rain"},                              # Kraftigt regn
-    21: {"day": "wi-thunderstorm", "night": "wi-thunderstorm"},              # Åska
-    22: {"day": "wi-day-sleet", "night": "wi-night-sleet"},                  # Lätt snöblandat regn
-    23: {"day": "wi-sleet", "night": "wi-sleet"},                            # Måttligt snöblandat regn
-    24: {"day": "wi-sleet", "night": "wi-sleet"},                            # Kraftigt snöblandat regn
-    25: {"day": "wi-day-snow", "night": "wi-night-snow"},                    # Lätt snöfall
-    26: {"day": "wi-snow", "night": "wi-snow"},                              # Måttligt snöfall
-    27: {"day": "wi-snow", "night": "wi-snow"}                               # Kraftigt snöfall
+    symbol: {"day": weather_symbols.ICON_DAY[symbol], "night": weather_symbols.ICON_NIGHT[symbol]}
+    for symbol in range(weather_symbols.SYMBOL_MIN, weather_symbols.SYMBOL_MAX + 1)
 }
 
-# amCharts SVG mappningar för animerade ikoner (bevarad för framtida användning)
+# amCharts SVG mappningar för animerade ikoner
 SMHI_TO_AMCHARTS_SVG = {
-    1: {"day": "day/sunny.svg", "night": "night/clear.svg"},                 # Klart
-    2: {"day": "day/partly-cloudy.svg", "night": "night/partly-cloudy.svg"}, # Nästan klart
-    3: {"day": "day/cloudy.svg", "night": "night/cloudy.svg"},               # Växlande molnighet
-    4: {"day": "day/overcast.svg", "night": "night/overcast.svg"},           # Halvklart
-    5: {"day": "day/cloudy.svg", "night": "night/cloudy.svg"},               # Molnigt
-    6: {"day": "day/overcast.svg", "night": "night/overcast.svg"},           # Mulet
-    7: {"day": "day/fog.svg", "night": "night/fog.svg"},                     # Dimma
-    8: {"day": "day/rain.svg", "night": "night/rain.svg"},                   # Lätta regnskurar
-    9: {"day": "day/rain.svg", "night": "night/rain.svg"},                   # Måttliga regnskurar
-    10: {"day": "day/rain.svg", "night": "night/rain.svg"},                  # Kraftiga regnskurar
-    11: {"day": "day/thunderstorm.svg", "night": "night/thunderstorm.svg"},  # Åskväder
-    12: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Lätta snöblandade regnskurar
-    13: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Måttliga snöblandade regnskurar
-    14: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Kraftiga snöblandade regnskurar
-    15: {"day": "day/snow.svg", "night": "night/snow.svg"},                  # Lätta snöbyar
-    16: {"day": "day/snow.svg", "night": "night/snow.svg"},                  # Måttliga snöbyar
-    17: {"day": "day/snow.svg", "night": "night/snow.svg"},                  # Kraftiga snöbyar
-    18: {"day": "day/rain.svg", "night": "night/rain.svg"},                  # Lätt regn
-    19: {"day": "day/rain.svg", "night": "night/rain.svg"},                  # Måttligt regn
-    20: {"day": "day/rain.svg", "night": "night/rain.svg"},                  # Kraftigt regn
-    21: {"day": "day/thunderstorm.svg", "night": "night/thunderstorm.svg"},  # Åska
-    22: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Lätt snöblandat regn
-    23: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Måttligt snöblandat regn
-    24: {"day": "day/sleet.svg", "night": "night/sleet.svg"},                # Kraftigt snöblandat regn
-    25: {"day": "day/snow.svg", "night": "night/snow.svg"},                  # Lätt snöfall
-    26: {"day": "day/snow.svg", "night": "night/snow.svg"},                  # Måttligt snöfall
-    27: {"day": "day/snow.svg", "night": "night/snow.svg"}                   # Kraftigt snöfall
+    symbol: {"day": weather_symbols.SVG_DAY[symbol], "night": weather_symbols.SVG_NIGHT[symbol]}
+    for symbol in range(weather_symbols.SYMBOL_MIN, weather_symbols.SYMBOL_MAX + 1)
 }
 
-# Beaufort-skala vindstyrka till Weather Icons (för när vindstyrka får ikoner)
-BEAUFORT_TO_WEATHER_ICONS = {
-    0: "wi-wind-beaufort-0",    # 0-0.5 m/s: Stiltje
-    1: "wi-wind-beaufort-1",    # 0.5-1.5 m/s: Lätt luftdrag
-    2: "wi-wind-beaufort-2",    # 1.5-3.3 m/s: Lätt bris
-    3: "wi-wind-beaufort-3",    # 3.3-5.5 m/s: Lätt bris
-    4: "wi-wind-beaufort-4",    # 5.5-7.9 m/s: Måttlig bris
-    5: "wi-wind-beaufort-5",    # 7.9-10.7 m/s: Frisk bris
-    6: "wi-wind-beaufort-6",    # 10.7-13.8 m/s: Stark bris
-    7: "wi-wind-beaufort-7",    # 13.8-17.1 m/s: Hård bris
-    8: "wi-wind-beaufort-8",    # 17.1-20.7 m/s: Kuling
-    9: "wi-wind-beaufort-9",    # 20.7-24.4 m/s: Hård kuling
-    10: "wi-wind-beaufort-10",  # 24.4-28.4 m/s: Storm
-    11: "wi-wind-beaufort-11",  # 28.4-32.6 m/s: Hård storm
-    12: "wi-wind-beaufort-12"   # 32.6+ m/s: Orkan
-}
+# Beaufort-skala vindstyrka till Weather Icons
+BEAUFORT_TO_WEATHER_ICONS = dict(enumerate(weather_symbols.BEAUFORT_ICON))
 
 
 class SunCalculator:
-    """Klass för beräkning av soluppgång och solnedgång."""
+    """
+    Soluppgång, solnedgång och skymning per plats och datum.
     
-    def __init__(self, api_key: Optional[str] = None):
+    Standard är lokal NOAA-beräkning (solar.py): ett helt års tabell
+    beräknas vid första uppslaget för en plats och hålls i minnet, så
+    uppslag i drift gör ingen fil- eller nätverks-I/O. ipgeolocation.io
+    används bara om use_api=True; API-svaren sparas lat i sun_cache.json
+    (läses en gång, skrivs bara när ett nytt svar tillkommit).
+    
+    Solens position (höjd, azimut, dygnsfas) slås upp i en minuttabell per
+    plats och UTC-dygn - används för dag/natt-ikoner i prognoserna.
+    """
+    
+    # Antal dygnstabeller med solposition som hålls i minnet (idag + 12h-prognosen, med marginal)
+    MAX_POSITION_DAYS = 4
+    
+    def __init__(self, api_key: Optional[str] = None, use_api: bool = False):
         """
         Initialisera solkalkylator.
         
         Args:
-            api_key: API-nyckel för ipgeolocation.io (None för fallback-beräkning)
+            api_key: API-nyckel för ipgeolocation.io (None = endast lokal beräkning)
+            use_api: True = Hämta från API:t, lokal beräkning används då bara vid fel
         """
         self.api_key = api_key
+        self.use_api = bool(api_key) and use_api
         self.api_base_url = "https://api.ipgeolocation.io/astronomy"
         self.cache_file = "sun_cache.json"
-        self.cache_duration_hours = 24  # Cache i 24 timmar
         
-        print(f"🌅 SunCalculator initierad. API: {'Ja' if api_key else 'Fallback-beräkning'}")
+        # (lat, lon, år) -> årstabell från solar.compute_year_table()
+        self._tables: Dict[Tuple[float, float, int], List[Dict]] = {}
+        # Cache-nyckel -> API-svar (None = filen inte inläst ännu)
+        self._api_results: Optional[Dict[str, Dict]] = None
+        # (lat, lon, dygnsstart UTC) -> (höjd, azimut) per minut
+        self._positions: Dict[Tuple[float, float, int], Tuple] = {}
+        self._lock = threading.Lock()
+        
+        logger.info(f"🌅 SunCalculator initierad. Källa: {'ipgeolocation.io' if self.use_api else 'lokal NOAA-beräkning'}")
     
     def get_sun_times(self, latitude: float, longitude: float, target_date: Optional[date] = None) -> Dict:
         """
@@ -196,111 +94,162 @@ class SunCalculator:
             
         Returns:
             Dict med 'sunrise', 'sunset', 'source', 'cached' nycklar
+            (lokal beräkning även 'solar_noon', 'civil_dawn', 'civil_dusk' m.fl.)
         """
         if target_date is None:
             target_date = date.today()
         
-        # Försök läsa från cache först
-        cached_data = self._get_from_cache(latitude, longitude, target_date)
-        if cached_data:
-            print(f"☀️ Använder cachad soldata för {target_date}")
-            cached_data['cached'] = True
-            return cached_data
-        
-        # Hämta ny data
-        if self.api_key:
+        if self.use_api:
+            with span('sun.cache_read'):
+                cached_data = self._get_api_result(latitude, longitude, target_date)
+            if cached_data:
+                logger.debug(f"☀️ Använder cachad soldata för {target_date}")
+                report_cache('sun', CACHE_HIT)
+                return dict(cached_data, cached=True)
+            
+            report_cache('sun', CACHE_MISS)
             sun_data = self._fetch_from_api(latitude, longitude, target_date)
-        else:
-            sun_data = self._calculate_fallback(latitude, longitude, target_date)
-        
-        # Cache resultatet
-        self._save_to_cache(latitude, longitude, target_date, sun_data)
-        sun_data['cached'] = False
+            if sun_data.get('source') == 'ipgeolocation.io':
+                with span('sun.cache_write'):
+                    self._save_api_result(latitude, longitude, target_date, sun_data)
+            return dict(sun_data, cached=False)
         
-        return sun_data
+        key = self._get_table_key(latitude, longitude, target_date.year)
+        cached = key in self._tables
+        report_cache('sun', CACHE_HIT if cached else CACHE_MISS)
+        return dict(self._calculate_local(latitude, longitude, target_date), cached=cached)
     
     def _get_cache_key(self, latitude: float, longitude: float, target_date: date) -> str:
         """Skapa cache-nyckel för plats och datum."""
         return f"{latitude:.3f}_{longitude:.3f}_{target_date.isoformat()}"
     
-    def _get_from_cache(self, latitude: float, longitude: float, target_date: date) -> Optional[Dict]:
-        """Försök hämta soldata från cache."""
-        if not os.path.exists(self.cache_file):
-            return None
+    def _get_table_key(self, latitude: float, longitude: float, year: int) -> Tuple[float, float, int]:
+        """Nyckel för årstabellen (samma avrundning som cache-nyckeln)."""
+        return (round(latitude, 3), round(longitude, 3), year)
+    
+    def get_year_table(self, latitude: float, longitude: float, year: int) -> List[Dict]:
+        """
+        Årstabell för en plats - beräknas vid första anrop och hålls i minnet.
         
-        try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            cache_key = self._get_cache_key(latitude, longitude, target_date)
-            
-            if cache_key in cache_data:
-                cached_entry = cache_data[cache_key]
-                
-                # Kontrollera cache-ålder
-                cache_timestamp = cached_entry.get('timestamp', 0)
-                cache_age_hours = (time.time() - cache_timestamp) / 3600
-                
-                if cache_age_hours < self.cache_duration_hours:
-                    # Ta bort timestamp innan retur (inte del av soldata)
-                    result = {k: v for k, v in cached_entry.items() if k != 'timestamp'}
-                    return result
-                else:
-                    print(f"🗑️ Cache för {target_date} är för gammal ({cache_age_hours:.1f}h)")
+        Args:
+            latitude: Latitud i decimal grader
+            longitude: Longitud i decimal grader
+            year: Årtal
             
-        except (json.JSONDecodeError, KeyError, FileNotFoundError) as e:
-            print(f"⚠️ Fel vid cache-läsning: {e}")
+        Returns:
+            list: En post per dag från solar.compute_year_table()
+        """
+        key = self._get_table_key(latitude, longitude, year)
+        table = self._tables.get(key)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(key)
+                if table is None:
+                    with span('sun.year_table'):
+                        table = solar.compute_year_table(key[0], key[1], year)
+                    # Behåll bara innevarande och nästa år per plats
+                    for old_key in [k for k in self._tables if k[:2] == key[:2] and k[2] < year - 1]:
+                        del self._tables[old_key]
+                    self._tables[key] = table
+                    logger.info(f"🧮 Soltabell för {year} beräknad ({len(table)} dagar, {key[0]}, {key[1]})")
+        return table
+    
+    def get_solar_position(self, latitude: float, longitude: float, when: Optional[float] = None) -> Dict:
+        """
+        Solens position vid en tidpunkt (uppslag i minuttabell).
         
-        return None
+        Args:
+            latitude: Latitud i decimal grader
+            longitude: Longitud i decimal grader
+            when: UTC epoch-sekunder (None = nu)
+            
+        Returns:
+            Dict med 'elevation', 'azimuth', 'phase' ('day'/'civil'/'nautical'/'night') och 'is_daytime'
+        """
+        if when is None:
+            when = time.time()
+        day_start = int(when // 86400) * 86400
+        key = (round(latitude, 3), round(longitude, 3), day_start)
+        
+        positions = self._positions.get(key)
+        if positions is None:
+            with self._lock:
+                positions = self._positions.get(key)
+                if positions is None:
+                    with span('sun.position_table'):
+                        positions = solar.compute_day_positions(key[0], key[1], day_start)
+                    while len(self._positions) >= self.MAX_POSITION_DAYS:
+                        del self._positions[next(iter(self._positions))]
+                    self._positions[key] = positions
+        
+        minute = min(int((when - day_start) // 60), solar.MINUTES_PER_DAY - 1)
+        elevations, azimuths = positions
+        return solar.describe_position(elevations[minute], azimuths[minute])
+    
+    def get_solar_noon_position(self, latitude: float, longitude: float, target_date: date) -> Dict:
+        """Solens position vid sann middag ett datum (för dagsprognosens dag/natt-ikon)."""
+        table = self.get_year_table(latitude, longitude, target_date.year)
+        noon = table[target_date.timetuple().tm_yday - 1]['solar_noon']
+        return solar.solar_position(latitude, longitude, noon)
+    
+    def _load_api_results(self) -> Dict[str, Dict]:
+        """Läs sun_cache.json en gång och rensa poster äldre än 7 dagar."""
+        results: Dict[str, Dict] = {}
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    results = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"⚠️ Fel vid cache-läsning: {e}")
+                results = {}
+        
+        cutoff_date = date.today() - timedelta(days=7)
+        for key in list(results):
+            try:
+                if date.fromisoformat(key.split('_')[2]) < cutoff_date:
+                    del results[key]
+            except (ValueError, IndexError):
+                # Ogiltig nyckel-format, ta bort
+                del results[key]
+        return results
+    
+    def _get_api_result(self, latitude: float, longitude: float, target_date: date) -> Optional[Dict]:
+        """Sparat API-svar för plats och datum (filen läses bara första gången)."""
+        if self._api_results is None:
+            with self._lock:
+                if self._api_results is None:
+                    self._api_results = self._load_api_results()
+        
+        cached_entry = self._api_results.get(self._get_cache_key(latitude, longitude, target_date))
+        if cached_entry is None:
+            return None
+        # Ta bort timestamp innan retur (inte del av soldata)
+        return {k: v for k, v in cached_entry.items() if k != 'timestamp'}
     
-    def _save_to_cache(self, latitude: float, longitude: float, target_date: date, sun_data: Dict):
-        """Spara soldata till cache."""
+    def _save_api_result(self, latitude: float, longitude: float, target_date: date, sun_data: Dict):
+        """Lägg till ett API-svar och skriv filen atomiskt (kompakt JSON)."""
+        cache_entry = dict(sun_data)
+        cache_entry['timestamp'] = time.time()
+        
+        with self._lock:
+            if self._api_results is None:
+                self._api_results = self._load_api_results()
+            self._api_results[self._get_cache_key(latitude, longitude, target_date)] = cache_entry
+            payload = json.dumps(self._api_results, ensure_ascii=False, separators=(',', ':'))
+        
+        tmp_path = f"{self.cache_file}.tmp"
         try:
-            # Läs befintlig cache
-            cache_data = {}
-            if os.path.exists(self.cache_file):
-                try:
-                    with open(self.cache_file, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError):
-                    cache_data = {}
-            
-            # Lägg till ny post
-            cache_key = self._get_cache_key(latitude, longitude, target_date)
-            cache_entry = sun_data.copy()
-            cache_entry['timestamp'] = time.time()
-            cache_data[cache_key] = cache_entry
-            
-            # Rensa gamla poster (äldre än 7 dagar)
-            cutoff_date = date.today() - timedelta(days=7)
-            keys_to_remove = []
-            for key in cache_data:
-                if '_' in key:
-                    try:
-                        date_part = key.split('_')[2]  # Extrahera datum-delen
-                        entry_date = date.fromisoformat(date_part)
-                        if entry_date < cutoff_date:
-                            keys_to_remove.append(key)
-                    except (ValueError, IndexError):
-                        # Ogiltig nyckel-format, ta bort
-                        keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del cache_data[key]
-            
-            # Spara uppdaterad cache
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 Soldata cachad för {target_date}")
-            
-        except Exception as e:
-            print(f"⚠️ Fel vid cache-sparning: {e}")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_file)
+            logger.info(f"💾 Soldata cachad för {target_date}")
+        except OSError as e:
+            logger.warning(f"⚠️ Fel vid cache-sparning: {e}")
     
     def _fetch_from_api(self, latitude: float, longitude: float, target_date: date) -> Dict:
         """Hämta soldata från ipgeolocation.io API."""
         try:
-            print(f"🌐 Hämtar soldata från API för {target_date}")
+            logger.debug(f"🌐 Hämtar soldata från API för {target_date}")
             
             params = {
                 'apiKey': self.api_key,
@@ -312,7 +261,7 @@ class SunCalculator:
             if target_date != date.today():
                 params['date'] = target_date.isoformat()
             
-            response = requests.get(self.api_base_url, params=params, timeout=10)
+            response = upstream.get('ipgeolocation', self.api_base_url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -338,15 +287,15 @@ class SunCalculator:
             if 'moonset' in data:
                 result['moonset'] = data['moonset']
             
-            print(f"✅ API-data: Soluppgång {data['sunrise']}, Solnedgång {data['sunset']}")
+            logger.info(f"✅ API-data: Soluppgång {data['sunrise']}, Solnedgång {data['sunset']}")
             return result
             
         except requests.RequestException as e:
-            print(f"❌ Nätverksfel vid API-anrop: {e}")
-            return self._calculate_fallback(latitude, longitude, target_date)
+            logger.error(f"❌ Nätverksfel vid API-anrop: {e}")
+            return self._calculate_local(latitude, longitude, target_date)
         except Exception as e:
-            print(f"❌ Fel vid API-anrop: {e}")
-            return self._calculate_fallback(latitude, longitude, target_date)
+            logger.error(f"❌ Fel vid API-anrop: {e}")
+            return self._calculate_local(latitude, longitude, target_date)
     
     def _parse_time_string(self, time_str: str, target_date: date) -> datetime:
         """
@@ -366,14 +315,17 @@ class SunCalculator:
             
             return datetime.combine(target_date, datetime.min.time().replace(hour=hour, minute=minute))
         except (ValueError, IndexError) as e:
-            print(f"⚠️ Fel vid parsning av tid '{time_str}': {e}")
+            logger.warning(f"⚠️ Fel vid parsning av tid '{time_str}': {e}")
             # Fallback till en rimlig tid
             return datetime.combine(target_date, datetime.min.time().replace(hour=6, minute=0))
     
-    def _calculate_fallback(self, latitude: float, longitude: float, target_date: date) -> Dict:
+    def _calculate_local(self, latitude: float, longitude: float, target_date: date) -> Dict:
         """
-        Förenklad beräkning av soluppgång/solnedgång utan API.
-        Baserad på astronomiska algoritmer (approximation).
+        Soltider från årstabellen (NOAA-algoritm, se solar.py).
+        
+        Tider returneras i lokal tid (systemets tidszon, inkl. sommartid).
+        Vid polarnatt sätts soluppgång = solnedgång = solens middag och vid
+        midnattssol 00:00/23:59, med 'polar' = 'night'/'day'.
         
         Args:
             latitude: Latitud i decimal grader
@@ -383,92 +335,39 @@ class SunCalculator:
         Returns:
             Dict med soldata
         """
-        print(f"🧮 Använder fallback-beräkning för {target_date}")
-        
-        # Beräkna solens deklination för datum
-        day_of_year = target_date.timetuple().tm_yday
-        solar_declination = 23.45 * math.sin(math.radians(360 * (284 + day_of_year) / 365))
-        
-        # Konvertera latitud till radianer
-        lat_rad = math.radians(latitude)
-        decl_rad = math.radians(solar_declination)
-        
-        # Beräkna timvinkel för soluppgång/solnedgång
-        try:
-            cos_hour_angle = -math.tan(lat_rad) * math.tan(decl_rad)
-            
-            # Kontrollera för polarnatt/midnattssol
-            if cos_hour_angle > 1:
-                # Polarnatt - solen går aldrig upp
-                sunrise_hour = 12.0
-                sunset_hour = 12.0
-                print("🌑 Polarnatt - solen går inte upp")
-            elif cos_hour_angle < -1:
-                # Midnattssol - solen går aldrig ner
-                sunrise_hour = 0.0
-                sunset_hour = 23.99
-                print("🌞 Midnattssol - solen går inte ner")
-            else:
-                hour_angle = math.degrees(math.acos(cos_hour_angle))
-                
-                # Beräkna lokala soltider
-                sunrise_hour = 12 - hour_angle / 15
-                sunset_hour = 12 + hour_angle / 15
-                
-                # Justera för longitud (grov korrektion för tidszon)
-                time_correction = longitude / 15  # 15 grader per timme
-                sunrise_hour -= time_correction
-                sunset_hour -= time_correction
-                
-                # Normalisera timmar
-                while sunrise_hour < 0:
-                    sunrise_hour += 24
-                while sunrise_hour >= 24:
-                    sunrise_hour -= 24
-                while sunset_hour < 0:
-                    sunset_hour += 24
-                while sunset_hour >= 24:
-                    sunset_hour -= 24
-        
-        except (ValueError, ZeroDivisionError):
-            # Fallback till säsongsbaserade tider för Sverige
-            if 3 <= target_date.month <= 9:  # Sommar
-                sunrise_hour = 5.0 + (60 - latitude) / 15
-                sunset_hour = 20.0 - (60 - latitude) / 15
-            else:  # Vinter
-                sunrise_hour = 8.0 + (60 - latitude) / 12  
-                sunset_hour = 16.0 - (60 - latitude) / 12
-            
-            # Begränsa värden
-            sunrise_hour = max(0, min(23.99, sunrise_hour))
-            sunset_hour = max(0, min(23.99, sunset_hour))
-        
-        # Konvertera till datetime-objekt
-        sunrise_dt = datetime.combine(
-            target_date, 
-            datetime.min.time().replace(
-                hour=int(sunrise_hour), 
-                minute=int((sunrise_hour % 1) * 60)
-            )
-        )
-        
-        sunset_dt = datetime.combine(
-            target_date,
-            datetime.min.time().replace(
-                hour=int(sunset_hour),
-                minute=int((sunset_hour % 1) * 60)
-            )
-        )
-        
-        result = {
-            'sunrise': sunrise_dt.isoformat(),
-            'sunset': sunset_dt.isoformat(), 
-            'source': 'fallback_calculation',
+        table = self.get_year_table(latitude, longitude, target_date.year)
+        day = table[target_date.timetuple().tm_yday - 1]
+        
+        def local(epoch: Optional[float]) -> Optional[str]:
+            if epoch is None:
+                return None
+            return datetime.fromtimestamp(round(epoch / 60) * 60).isoformat()
+        
+        polar = day['sun_polar']
+        if polar == solar.POLAR_NIGHT:
+            sunrise = sunset = local(day['solar_noon'])
+        elif polar == solar.POLAR_DAY:
+            sunrise = datetime.combine(target_date, datetime.min.time()).isoformat()
+            sunset = datetime.combine(target_date, datetime.min.time().replace(hour=23, minute=59)).isoformat()
+        else:
+            sunrise, sunset = local(day['sun_rise']), local(day['sun_set'])
+        
+        day_length = 0 if polar == solar.POLAR_NIGHT else 1440 if polar == solar.POLAR_DAY else \
+            round((day['sun_set'] - day['sun_rise']) / 60)
+        
+        return {
+            'sunrise': sunrise,
+            'sunset': sunset,
+            'solar_noon': local(day['solar_noon']),
+            'civil_dawn': local(day['civil_rise']),
+            'civil_dusk': local(day['civil_set']),
+            'nautical_dawn': local(day['nautical_rise']),
+            'nautical_dusk': local(day['nautical_set']),
+            'day_length_minutes': day_length,
+            'polar': polar,
+            'source': 'noaa_calculation',
             'date': target_date.isoformat()
         }
-        
-        print(f"🧮 Fallback-resultat: Soluppgång {sunrise_dt.strftime('%H:%M')}, Solnedgång {sunset_dt.strftime('%H:%M')}")
-        return result
 
 
 # === FAS 4: WEATHER ICONS FUNKTIONER MED FÖRBÄTTRADE EMOJI ===
@@ -484,41 +383,7 @@ def get_weather_icon_enhanced(weather_symbol: int, is_daytime: bool = True) -> s
     Returns:
         Förbättrad emoji för vädertypen
     """
-    if weather_symbol is None:
-        return "❓"
-    
-    # Förbättrade emoji-mappningar med bättre distinktion
-    enhanced_weather_map = {
-        1: "☀️" if is_daytime else "🌙",      # Klart
-        2: "🌤️" if is_daytime else "🌙",      # Nästan klart  
-        3: "⛅" if is_daytime else "☁️",       # Växlande molnighet
-        4: "🌥️" if is_daytime else "☁️",      # Halvklart
-        5: "☁️",                              # Molnigt
-        6: "☁️",                              # Mulet
-        7: "🌫️",                             # Dimma
-        8: "🌦️",                             # Lätta regnskurar
-        9: "🌧️",                             # Måttliga regnskurar
-        10: "🌧️",                            # Kraftiga regnskurar
-        11: "⛈️",                            # Åskväder
-        12: "🌨️",                            # Lätta snöblandade regnskurar
-        13: "🌨️",                            # Måttliga snöblandade regnskurar
-        14: "🌨️",                            # Kraftiga snöblandade regnskurar
-        15: "🌨️",                            # Lätta snöbyar
-        16: "❄️",                            # Måttliga snöbyar
-        17: "❄️",                            # Kraftiga snöbyar
-        18: "🌧️",                            # Lätt regn
-        19: "🌧️",                            # Måttligt regn
-        20: "🌧️",                            # Kraftigt regn
-        21: "⛈️",                            # Åska
-        22: "🌨️",                            # Lätt snöblandat regn
-        23: "🌨️",                            # Måttligt snöblandat regn
-        24: "🌨️",                            # Kraftigt snöblandat regn
-        25: "❄️",                            # Lätt snöfall
-        26: "❄️",                            # Måttligt snöfall
-        27: "❄️"                             # Kraftigt snöfall
-    }
-    
-    return enhanced_weather_map.get(weather_symbol, "❓")
+    return weather_symbols.emoji(weather_symbol, is_daytime)
 
 
 def get_weather_icon_unicode_char(weather_symbol: int, is_daytime: bool = True) -> str:
@@ -546,13 +411,7 @@ def get_weather_icon_class(weather_symbol: int, is_daytime: bool = True) -> str:
     Returns:
         CSS-klass för Weather Icons (t.ex. "wi wi-day-sunny")
     """
-    if weather_symbol is None or weather_symbol not in SMHI_TO_WEATHER_ICONS:
-        return "wi wi-na"  # Weather Icons fallback för okänt väder
-    
-    icon_mapping = SMHI_TO_WEATHER_ICONS[weather_symbol]
-    icon_class = icon_mapping["day"] if is_daytime else icon_mapping["night"]
-    
-    return f"wi {icon_class}"
+    return f"wi {weather_symbols.icon_class(weather_symbol, is_daytime)}"
 
 
 def get_wind_direction_icon_class(wind_direction_degrees: float) -> str:
@@ -588,35 +447,7 @@ def get_beaufort_icon_class(wind_speed_ms: float) -> str:
     if wind_speed_ms is None:
         return "wi wi-wind-beaufort-0"
     
-    # Konvertera m/s till Beaufort-skala
-    if wind_speed_ms < 0.5:
-        beaufort = 0
-    elif wind_speed_ms < 1.6:
-        beaufort = 1
-    elif wind_speed_ms < 3.4:
-        beaufort = 2
-    elif wind_speed_ms < 5.5:
-        beaufort = 3
-    elif wind_speed_ms < 8.0:
-        beaufort = 4
-    elif wind_speed_ms < 10.8:
-        beaufort = 5
-    elif wind_speed_ms < 13.9:
-        beaufort = 6
-    elif wind_speed_ms < 17.2:
-        beaufort = 7
-    elif wind_speed_ms < 20.8:
-        beaufort = 8
-    elif wind_speed_ms < 24.5:
-        beaufort = 9
-    elif wind_speed_ms < 28.5:
-        beaufort = 10
-    elif wind_speed_ms < 32.7:
-        beaufort = 11
-    else:
-        beaufort = 12
-    
-    return f"wi {BEAUFORT_TO_WEATHER_ICONS[beaufort]}"
+    return f"wi {weather_symbols.BEAUFORT_ICON[weather_symbols.beaufort(wind_speed_ms)]}"
 
 
 def get_pressure_trend_icon_class(trend: str) -> str:
@@ -668,13 +499,7 @@ def get_amcharts_svg_path(weather_symbol: int, is_daytime: bool = True) -> str:
     Returns:
         Relativ sökväg till SVG-fil från assets/icons/amcharts-svg/
     """
-    if weather_symbol is None or weather_symbol not in SMHI_TO_AMCHARTS_SVG:
-        return "day/na.svg" if is_daytime else "night/na.svg"
-    
-    svg_mapping = SMHI_TO_AMCHARTS_SVG[weather_symbol]
-    svg_path = svg_mapping["day"] if is_daytime else svg_mapping["night"]
-    
-    return svg_path
+    return weather_symbols.svg_path(weather_symbol, is_daytime)
 
 
 def get_beaufort_description(wind_speed_ms: float) -> str:
@@ -690,51 +515,7 @@ def get_beaufort_description(wind_speed_ms: float) -> str:
     if wind_speed_ms is None:
         return "Okänt"
     
-    beaufort_descriptions = {
-        0: "Stiltje",
-        1: "Lätt luftdrag", 
-        2: "Lätt bris",
-        3: "Lätt bris",
-        4: "Måttlig bris",
-        5: "Frisk bris",
-        6: "Stark bris",
-        7: "Hård bris",
-        8: "Kuling",
-        9: "Hård kuling",
-        10: "Storm",
-        11: "Hård storm",
-        12: "Orkan"
-    }
-    
-    # Använd samma logik som get_beaufort_icon_class för konsistens
-    if wind_speed_ms < 0.5:
-        beaufort = 0
-    elif wind_speed_ms < 1.6:
-        beaufort = 1
-    elif wind_speed_ms < 3.4:
-        beaufort = 2
-    elif wind_speed_ms < 5.5:
-        beaufort = 3
-    elif wind_speed_ms < 8.0:
-        beaufort = 4
-    elif wind_speed_ms < 10.8:
-        beaufort = 5
-    elif wind_speed_ms < 13.9:
-        beaufort = 6
-    elif wind_speed_ms < 17.2:
-        beaufort = 7
-    elif wind_speed_ms < 20.8:
-        beaufort = 8
-    elif wind_speed_ms < 24.5:
-        beaufort = 9
-    elif wind_speed_ms < 28.5:
-        beaufort = 10
-    elif wind_speed_ms < 32.7:
-        beaufort = 11
-    else:
-        beaufort = 12
-    
-    return beaufort_descriptions[beaufort]
+    return weather_symbols.BEAUFORT_DESCRIPTION[weather_symbols.beaufort(wind_speed_ms)]
 
 
 def get_weather_icons_font_path() -> str:
@@ -818,17 +599,7 @@ def get_wind_direction_text(degrees: float) -> str:
     if degrees is None:
         return "N/A"
     
-    # Svenska kompassriktningar
-    directions = [
-        "N", "NNO", "NO", "ONO", 
-        "O", "OSO", "SO", "SSO",
-        "S", "SSV", "SV", "VSV", 
-        "V", "VNV", "NV", "NNV"
-    ]
-    
-    # Beräkna index (16 riktningar, 22.5 grader per riktning)
-    index = round(degrees / 22.5) % 16
-    return directions[index]
+    return weather_symbols.compass_direction(degrees)
 
 
 def format_time_difference(timestamp: float) -> str:
@@ -904,41 +675,7 @@ def get_weather_icon_unicode(weather_symbol: int, is_daytime: bool = True) -> st
     Returns:
         Unicode emoji för vädertypen
     """
-    if weather_symbol is None:
-        return "❓"
-    
-    # Mappning SMHI symbol -> emoji (enkel version)
-    weather_map = {
-        1: "☀️" if is_daytime else "🌙",  # Klart
-        2: "🌤️" if is_daytime else "🌙",  # Nästan klart  
-        3: "⛅",  # Växlande molnighet
-        4: "🌥️",  # Halvklart
-        5: "☁️",  # Molnigt
-        6: "☁️",  # Mulet
-        7: "🌫️",  # Dimma
-        8: "🌦️",  # Lätta regnskurar
-        9: "🌧️",  # Måttliga regnskurar
-        10: "🌧️", # Kraftiga regnskurar
-        11: "⛈️", # Åskväder
-        12: "🌨️", # Lätta snöblandade regnskurar
-        13: "🌨️", # Måttliga snöblandade regnskurar
-        14: "🌨️", # Kraftiga snöblandade regnskurar
-        15: "🌨️", # Lätta snöbyar
-        16: "❄️", # Måttliga snöbyar
-        17: "❄️", # Kraftiga snöbyar
-        18: "🌧️", # Lätt regn
-        19: "🌧️", # Måttligt regn
-        20: "🌧️", # Kraftigt regn
-        21: "⛈️", # Åska
-        22: "🌨️", # Lätt snöblandat regn
-        23: "🌨️", # Måttligt snöblandat regn
-        24: "🌨️", # Kraftigt snöblandat regn
-        25: "❄️", # Lätt snöfall
-        26: "❄️", # Måttligt snöfall
-        27: "❄️"  # Kraftigt snöfall
-    }
-    
-    return weather_map.get(weather_symbol, "❓")
+    return weather_symbols.simple_emoji(weather_symbol, is_daytime)
 
 
 def get_weather_description_short(weather_symbol: int) -> str:
@@ -951,40 +688,7 @@ def get_weather_description_short(weather_symbol: int) -> str:
     Returns:
         Kort beskrivning på svenska
     """
-    if weather_symbol is None:
-        return "Okänt"
-    
-    descriptions = {
-        1: "Klart",
-        2: "Nästan klart", 
-        3: "Växlande",
-        4: "Halvklart",
-        5: "Molnigt",
-        6: "Mulet",
-        7: "Dimma",
-        8: "Regnskurar",
-        9: "Regnskurar",
-        10: "Regnskurar",
-        11: "Åska",
-        12: "Snöblandat",
-        13: "Snöblandat",
-        14: "Snöblandat", 
-        15: "Snöbyar",
-        16: "Snöbyar",
-        17: "Snöbyar",
-        18: "Regn",
-        19: "Regn",
-        20: "Regn",
-        21: "Åska",
-        22: "Snöblandat",
-        23: "Snöblandat",
-        24: "Snöblandat",
-        25: "Snöfall",
-        26: "Snöfall",
-        27: "Snöfall"
-    }
-    
-    return descriptions.get(weather_symbol, "Okänt")
+    return weather_symbols.description(weather_symbol)
 
 
 # Test-funktioner
@@ -1024,5 +728,6 @@ def test_weather_icons_unicode():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     test_sun_calculator()
     test_weather_icons_unicode()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Uppslagstabeller för SMHI:s vädersymboler (Wsymb2, 1-27) och vind.
+
+All klassning av en symbol - WeatherEffects-typ, intensitet, Weather
+Icons-klass, tecken i ikon-fonten, emoji, amCharts-SVG och beskrivning -
+finns i en enda radtabell nedan. Kolumnerna byggs en gång vid import till
+tupler indexerade med symbolnumret (index 0 = okänd symbol), så ett
+uppslag är en indexering i stället för if-kedjor eller listsökningar.
+
+Beaufort-skalan och kompassriktningar slås upp på samma sätt (bisect över
+tröskeltupel respektive index i 16-tupel). Bulk-funktionerna tar hela
+prognoslistor.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence
+
+SYMBOL_MIN = 1
+SYMBOL_MAX = 27
+
+EFFECT_CLEAR = 'clear'
+EFFECT_RAIN = 'rain'
+EFFECT_SNOW = 'snow'
+EFFECT_SLEET = 'sleet'
+EFFECT_THUNDER = 'thunder'
+
+# Weather Icons-fontens tecken per ikonklass
+WEATHER_ICONS_UNICODE = {
+    # Dag-ikoner
+    "wi-day-sunny": "\uf00d",
+    "wi-day-cloudy": "\uf002",
+    "wi-day-cloudy-gusts": "\uf000",
+    "wi-day-cloudy-windy": "\uf001",
+    "wi-day-fog": "\uf003",
+    "wi-day-hail": "\uf004",
+    "wi-day-haze": "\uf0b6",
+    "wi-day-lightning": "\uf005",
+    "wi-day-rain": "\uf008",
+    "wi-day-rain-mix": "\uf006",
+    "wi-day-rain-wind": "\uf007",
+    "wi-day-showers": "\uf009",
+    "wi-day-sleet": "\uf0b2",
+    "wi-day-sleet-storm": "\uf068",
+    "wi-day-snow": "\uf00a",
+    "wi-day-snow-thunderstorm": "\uf06b",
+    "wi-day-snow-wind": "\uf065",
+    "wi-day-sprinkle": "\uf00b",
+    "wi-day-storm-showers": "\uf00e",
+    "wi-day-sunny-overcast": "\uf00c",
+    "wi-day-thunderstorm": "\uf010",
+    "wi-day-windy": "\uf085",
+    "wi-day-cloudy-high": "\uf07d",
+    
+    # Natt-ikoner
+    "wi-night-clear": "\uf02e",
+    "wi-night-cloudy": "\uf031",
+    "wi-night-cloudy-gusts": "\uf02d",
+    "wi-night-cloudy-windy": "\uf02c",
+    "wi-night-fog": "\uf04a",
+    "wi-night-hail": "\uf026",
+    "wi-night-lightning": "\uf025",
+    "wi-night-partly-cloudy": "\uf083",
+    "wi-night-rain": "\uf036",
+    "wi-night-rain-mix": "\uf034",
+    "wi-night-rain-wind": "\uf035",
+    "wi-night-showers": "\uf037",
+    "wi-night-sleet": "\uf0b4",
+    "wi-night-sleet-storm": "\uf069",
+    "wi-night-snow": "\uf038",
+    "wi-night-snow-thunderstorm": "\uf06c",
+    "wi-night-snow-wind": "\uf066",
+    "wi-night-sprinkle": "\uf039",
+    "wi-night-storm-showers": "\uf03a",
+    "wi-night-thunderstorm": "\uf03b",
+    "wi-night-cloudy-high": "\uf07e",
+    "wi-night-alt-cloudy": "\uf086",
+    
+    # Allmänna ikoner
+    "wi-cloudy": "\uf013",
+    "wi-cloud": "\uf041",
+    "wi-fog": "\uf014",
+    "wi-rain": "\uf019",
+    "wi-rain-mix": "\uf017",
+    "wi-sleet": "\uf0b5",
+    "wi-snow": "\uf01b",
+    "wi-thunderstorm": "\uf01e",
+    "wi-windy": "\uf021",
+    
+    # Vind-ikoner
+    "wi-wind-default": "\uf0b1",
+    "wi-direction-up": "\uf058",
+    "wi-direction-down": "\uf044",
+    "wi-minus": "\uf056",
+    
+    # Fallback
+    "wi-na": "\uf07b"
+}
+
+# En rad per symbol:
+# (effekt, intensitet, wi dag, wi natt, emoji dag, emoji natt, enkel emoji dag, enkel emoji natt,
+#  svg dag, svg natt, kort beskrivning)
+# Intensitet None = bestäms av nederbörden.
+_UNKNOWN_ROW = (EFFECT_CLEAR, None, "wi-na", "wi-na", "❓", "❓", "❓", "❓",
+                "day/na.svg", "night/na.svg", "Okänt")
+_SYMBOL_ROWS = {
+    1: (EFFECT_CLEAR, None, "wi-day-sunny", "wi-night-clear", "☀️", "🌙", "☀️", "🌙",
+        "day/sunny.svg", "night/clear.svg", "Klart"),
+    2: (EFFECT_CLEAR, None, "wi-day-sunny-overcast", "wi-night-partly-cloudy", "🌤️", "🌙", "🌤️", "🌙",
+        "day/partly-cloudy.svg", "night/partly-cloudy.svg", "Nästan klart"),
+    3: (EFFECT_CLEAR, None, "wi-day-cloudy", "wi-night-alt-cloudy", "⛅", "☁️", "⛅", "⛅",
+        "day/cloudy.svg", "night/cloudy.svg", "Växlande"),
+    4: (EFFECT_CLEAR, None, "wi-day-cloudy-high", "wi-night-cloudy-high", "🌥️", "☁️", "🌥️", "🌥️",
+        "day/overcast.svg", "night/overcast.svg", "Halvklart"),
+    5: (EFFECT_CLEAR, None, "wi-cloudy", "wi-cloudy", "☁️", "☁️", "☁️", "☁️",
+        "day/cloudy.svg", "night/cloudy.svg", "Molnigt"),
+    6: (EFFECT_CLEAR, None, "wi-cloud", "wi-cloud", "☁️", "☁️", "☁️", "☁️",
+        "day/overcast.svg", "night/overcast.svg", "Mulet"),
+    7: (EFFECT_CLEAR, None, "wi-fog", "wi-fog", "🌫️", "🌫️", "🌫️", "🌫️",
+        "day/fog.svg", "night/fog.svg", "Dimma"),
+    8: (EFFECT_RAIN, None, "wi-day-showers", "wi-night-showers", "🌦️", "🌦️", "🌦️", "🌦️",
+        "day/rain.svg", "night/rain.svg", "Regnskurar"),
+    9: (EFFECT_RAIN, 'medium', "wi-day-rain", "wi-night-rain", "🌧️", "🌧️", "🌧️", "🌧️",
+        "day/rain.svg", "night/rain.svg", "Regnskurar"),
+    10: (EFFECT_RAIN, 'heavy', "wi-rain", "wi-rain", "🌧️", "🌧️", "🌧️", "🌧️",
+         "day/rain.svg", "night/rain.svg", "Regnskurar"),
+    11: (EFFECT_THUNDER, None, "wi-day-thunderstorm", "wi-night-thunderstorm", "⛈️", "⛈️", "⛈️", "⛈️",
+         "day/thunderstorm.svg", "night/thunderstorm.svg", "Åska"),
+    12: (EFFECT_SLEET, None, "wi-day-rain-mix", "wi-night-rain-mix", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    13: (EFFECT_SLEET, None, "wi-rain-mix", "wi-rain-mix", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    14: (EFFECT_SLEET, None, "wi-rain-mix", "wi-rain-mix", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    15: (EFFECT_SNOW, None, "wi-day-snow", "wi-night-snow", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/snow.svg", "night/snow.svg", "Snöbyar"),
+    16: (EFFECT_SNOW, None, "wi-snow", "wi-snow", "❄️", "❄️", "❄️", "❄️",
+         "day/snow.svg", "night/snow.svg", "Snöbyar"),
+    17: (EFFECT_SNOW, None, "wi-snow", "wi-snow", "❄️", "❄️", "❄️", "❄️",
+         "day/snow.svg", "night/snow.svg", "Snöbyar"),
+    18: (EFFECT_RAIN, None, "wi-day-rain", "wi-night-rain", "🌧️", "🌧️", "🌧️", "🌧️",
+         "day/rain.svg", "night/rain.svg", "Regn"),
+    19: (EFFECT_RAIN, 'medium', "wi-rain", "wi-rain", "🌧️", "🌧️", "🌧️", "🌧️",
+         "day/rain.svg", "night/rain.svg", "Regn"),
+    20: (EFFECT_RAIN, 'heavy', "wi-rain", "wi-rain", "🌧️", "🌧️", "🌧️", "🌧️",
+         "day/rain.svg", "night/rain.svg", "Regn"),
+    21: (EFFECT_THUNDER, None, "wi-thunderstorm", "wi-thunderstorm", "⛈️", "⛈️", "⛈️", "⛈️",
+         "day/thunderstorm.svg", "night/thunderstorm.svg", "Åska"),
+    22: (EFFECT_SLEET, None, "wi-day-sleet", "wi-night-sleet", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    23: (EFFECT_SLEET, None, "wi-sleet", "wi-sleet", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    24: (EFFECT_SLEET, None, "wi-sleet", "wi-sleet", "🌨️", "🌨️", "🌨️", "🌨️",
+         "day/sleet.svg", "night/sleet.svg", "Snöblandat"),
+    25: (EFFECT_SNOW, None, "wi-day-snow", "wi-night-snow", "❄️", "❄️", "❄️", "❄️",
+         "day/snow.svg", "night/snow.svg", "Snöfall"),
+    26: (EFFECT_SNOW, 'medium', "wi-snow", "wi-snow", "❄️", "❄️", "❄️", "❄️",
+         "day/snow.svg", "night/snow.svg", "Snöfall"),
+    27: (EFFECT_SNOW, 'heavy', "wi-snow", "wi-snow", "❄️", "❄️", "❄️", "❄️",
+         "day/snow.svg", "night/snow.svg", "Snöfall"),
+}
+
+_ROWS = [_UNKNOWN_ROW] + [_SYMBOL_ROWS[symbol] for symbol in range(SYMBOL_MIN, SYMBOL_MAX + 1)]
+
+# Kolumner indexerade med symbol (0 = okänd)
+(EFFECT_TYPE, SYMBOL_INTENSITY, ICON_DAY, ICON_NIGHT, EMOJI_DAY, EMOJI_NIGHT,
+ SIMPLE_EMOJI_DAY, SIMPLE_EMOJI_NIGHT, SVG_DAY, SVG_NIGHT, DESCRIPTION_SHORT) = (tuple(column) for column in zip(*_ROWS))
+
+GLYPH_DAY = tuple(WEATHER_ICONS_UNICODE.get(icon, WEATHER_ICONS_UNICODE['wi-na']) for icon in ICON_DAY)
+GLYPH_NIGHT = tuple(WEATHER_ICONS_UNICODE.get(icon, WEATHER_ICONS_UNICODE['wi-na']) for icon in ICON_NIGHT)
+
+# Symboler per effekttyp (t.ex. för debug-endpoints)
+EFFECT_SYMBOLS: Dict[str, List[int]] = {}
+for _symbol in range(SYMBOL_MIN, SYMBOL_MAX + 1):
+    EFFECT_SYMBOLS.setdefault(EFFECT_TYPE[_symbol], []).append(_symbol)
+
+# Nederbörd (mm/h) -> intensitet: över 1 medium, över 5 heavy (annars light)
+_PRECIPITATION_LIMITS = (1.0, 5.0)
+_PRECIPITATION_INTENSITY = ('light', 'medium', 'heavy')
+
+# Beaufort: övre gräns (m/s, exklusiv) för grad 0-11, resten = 12
+BEAUFORT_LIMITS = (0.5, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7)
+BEAUFORT_ICON = tuple(f"wi-wind-beaufort-{grade}" for grade in range(13))
+BEAUFORT_DESCRIPTION = (
+    "Stiltje", "Lätt luftdrag", "Lätt bris", "Lätt bris", "Måttlig bris", "Frisk bris",
+    "Stark bris", "Hård bris", "Kuling", "Hård kuling", "Storm", "Hård storm", "Orkan",
+)
+
+# Svenska kompassriktningar, 22.5° per steg
+COMPASS_16 = (
+    "N", "NNO", "NO", "ONO",
+    "O", "OSO", "SO", "SSO",
+    "S", "SSV", "SV", "VSV",
+    "V", "VNV", "NV", "NNV",
+)
+
+
+def symbol_index(weather_symbol) -> int:
+    """
+    Tabellindex för en symbol.
+
+    Args:
+        weather_symbol: SMHI vädersymbol (int, float eller None)
+
+    Returns:
+        int: 1-27, eller 0 för okänd/ogiltig symbol
+    """
+    if not isinstance(weather_symbol, (int, float)):
+        return 0
+    symbol = int(weather_symbol)
+    return symbol if SYMBOL_MIN <= symbol <= SYMBOL_MAX and symbol == weather_symbol else 0
+
+
+def effect_type(weather_symbol) -> str:
+    """WeatherEffects-typ ('rain', 'snow', 'sleet', 'thunder', 'clear')."""
+    return EFFECT_TYPE[symbol_index(weather_symbol)]
+
+
+def intensity(weather_symbol, precipitation: Optional[float] = 0) -> str:
+    """
+    Intensitet för animationer: symbolens egen (kraftigt/måttligt) går före nederbörden.
+
+    Args:
+        weather_symbol: SMHI vädersymbol
+        precipitation: Nederbörd i mm/h
+
+    Returns:
+        str: 'light', 'medium' eller 'heavy'
+    """
+    fixed = SYMBOL_INTENSITY[symbol_index(weather_symbol)]
+    if fixed:
+        return fixed
+    return _PRECIPITATION_INTENSITY[bisect_left(_PRECIPITATION_LIMITS, precipitation or 0)]
+
+
+def icon_class(weather_symbol, is_daytime: bool = True) -> str:
+    """Weather Icons-klass utan prefix, t.ex. 'wi-day-sunny'."""
+    return (ICON_DAY if is_daytime else ICON_NIGHT)[symbol_index(weather_symbol)]
+
+
+def icon_glyph(weather_symbol, is_daytime: bool = True) -> str:
+    """Tecken i Weather Icons-fonten."""
+    return (GLYPH_DAY if is_daytime else GLYPH_NIGHT)[symbol_index(weather_symbol)]
+
+
+def emoji(weather_symbol, is_daytime: bool = True) -> str:
+    """Emoji med dag/natt-varianter för molnighet."""
+    return (EMOJI_DAY if is_daytime else EMOJI_NIGHT)[symbol_index(weather_symbol)]
+
+
+def simple_emoji(weather_symbol, is_daytime: bool = True) -> str:
+    """Enkel emoji (äldre variant - natt skiljer bara för klart/nästan klart)."""
+    return (SIMPLE_EMOJI_DAY if is_daytime else SIMPLE_EMOJI_NIGHT)[symbol_index(weather_symbol)]
+
+
+def svg_path(weather_symbol, is_daytime: bool = True) -> str:
+    """amCharts SVG-sökväg relativt assets/icons/amcharts-svg/."""
+    return (SVG_DAY if is_daytime else SVG_NIGHT)[symbol_index(weather_symbol)]
+
+
+def description(weather_symbol) -> str:
+    """Kort väderbeskrivning på svenska."""
+    return DESCRIPTION_SHORT[symbol_index(weather_symbol)]
+
+
+def beaufort(wind_speed_ms: float) -> int:
+    """Beaufort-grad (0-12) för vindstyrka i m/s."""
+    return bisect_right(BEAUFORT_LIMITS, wind_speed_ms)
+
+
+def compass_direction(degrees: float) -> str:
+    """Svensk kompassriktning (16 streck) för vindriktning i grader."""
+    return COMPASS_16[round(degrees / 22.5) % 16]
+
+
+# === BULK-UPPSLAG FÖR HELA PROGNOSER ===
+
+def effect_types(symbols: Iterable) -> List[str]:
+    """WeatherEffects-typ för varje symbol."""
+    table = EFFECT_TYPE
+    return [table[symbol_index(symbol)] for symbol in symbols]
+
+
+def icon_classes(symbols: Sequence, daytime_flags: Optional[Sequence[bool]] = None) -> List[str]:
+    """
+    Weather Icons-klass för varje symbol.
+
+    Args:
+        symbols: Vädersymboler
+        daytime_flags: Dag/natt per symbol (None = dag för alla)
+    """
+    if daytime_flags is None:
+        daytime_flags = (True,) * len(symbols)
+    return [(ICON_DAY if day else ICON_NIGHT)[symbol_index(symbol)]
+            for symbol, day in zip(symbols, daytime_flags)]
+
+
+def svg_paths(symbols: Sequence, daytime_flags: Optional[Sequence[bool]] = None) -> List[str]:
+    """amCharts SVG-sökväg för varje symbol (se icon_classes)."""
+    if daytime_flags is None:
+        daytime_flags = (True,) * len(symbols)
+    return [(SVG_DAY if day else SVG_NIGHT)[symbol_index(symbol)]
+            for symbol, day in zip(symbols, daytime_flags)]
+
+
+def animation_trigger(weather_symbol, precipitation: Optional[float] = 0,
+                      wind_direction: Optional[float] = None) -> Dict:
+    """
+    Animation trigger för WeatherEffects (samma format som SMHIClient tidigare byggde).
+
+    Args:
+        weather_symbol: SMHI vädersymbol
+        precipitation: Nederbörd i mm/h (används för intensitet)
+        wind_direction: Vindriktning i grader
+
+    Returns:
+        dict: 'type', 'intensity', 'symbol', 'precipitation', 'wind_direction'
+    """
+    return {
+        'type': effect_type(weather_symbol),
+        'intensity': intensity(weather_symbol, precipitation),
+        'symbol': weather_symbol,
+        'precipitation': precipitation,
+        'wind_direction': wind_direction
+    }
+
+
+def animation_triggers(symbols: Sequence, precipitations: Optional[Sequence[Optional[float]]] = None,
+                       wind_directions: Optional[Sequence[Optional[float]]] = None) -> List[Dict]:
+    """
+    Animation trigger för varje symbol (se animation_trigger).
+
+    Args:
+        symbols: Vädersymboler
+        precipitations: Nederbörd per symbol (None = 0 för alla)
+        wind_directions: Vindriktning per symbol (None = okänd för alla)
+    """
+    if precipitations is None:
+        precipitations = (0,) * len(symbols)
+    if wind_directions is None:
+        wind_directions = (None,) * len(symbols)
+    return [{
+        'type': kind,
+        'intensity': intensity(symbol, precipitation),
+        'symbol': symbol,
+        'precipitation': precipitation,
+        'wind_direction': wind_direction
+    } for symbol, kind, precipitation, wind_direction
+        in zip(symbols, effect_types(symbols), precipitations, wind_directions)]
@@ -116,22 +116,24 @@ function updateClockDots(currentSeconds) {
 
 /**
  * Initiera cirkulär klocka
- * @param {object} dashboardState - Dashboard state objekt för att spara interval
- * @returns {number} Interval ID för klockan
+ * Klockan registreras i ClientScheduler och körs precis efter varje hel
+ * sekund; den pausas när sidan är dold.
+ * @param {object} dashboardState - Dashboard state objekt (sparar jobbnamnet)
+ * @returns {string} Jobbnamn i ClientScheduler
  */
 function initializeCircularClock(dashboardState) {
     console.log('🕐 Initialiserar cirkulär klocka...');
     createClockDots();
     updateCircularClock();
-    const clockInterval = setInterval(updateCircularClock, CLOCK_UPDATE_INTERVAL);
+    ClientScheduler.every('clock', CLOCK_UPDATE_INTERVAL, updateCircularClock, { alignToSecond: true });
     
-    // Spara interval i dashboard state om tillgängligt
+    // Spara jobbnamnet i dashboard state om tillgängligt
     if (dashboardState) {
-        dashboardState.clockInterval = clockInterval;
+        dashboardState.clockTask = 'clock';
     }
     
     console.log('✅ Cirkulär klocka initialiserad med sekundprickar');
-    return clockInterval;
+    return 'clock';
 }
 
 // === EXPORT CIRCULAR CLOCK SYSTEM ===
@@ -5,6 +5,7 @@
  * 
  * STEG 5: FontAwesome-funktionalitet flyttad till fontawesome-renderer.js
  * AMCHARTS: SVG-stöd tillagt för huvudväderikoner med minimal kodförändring
+ * SPRITES: amCharts-ikonerna hämtas som en hashad sprite (en request) och refereras med <use href="#id">
  */
 
 // === WEATHER ICONS SYSTEM - FONT AWESOME OPTIMERAD ===
@@ -19,6 +20,10 @@ class WeatherIconRenderer {
         baseUrl: '/static/assets/icons/amcharts-svg/'
     };
     
+    // SPRITES: Ikon-set -> hashad sprite-URL från core/assets.py (body data-icon-sprites)
+    static sprites = null;
+    static spriteLoads = {};
+    
     // AMCHARTS: SVG-mappning baserad på verkliga filer
     static amChartsMap = {
         1: {day: "day/day.svg", night: "night/night.svg"},                          // Klart (DIN HALVMÅNE!)
@@ -62,40 +67,126 @@ class WeatherIconRenderer {
     }
 
     /**
-     * AMCHARTS: Skapa SVG-element för amCharts ikoner
-     * @param {string} svgPath - Sökväg till SVG-fil
+     * SPRITES: Sprite-URL:er som servern lagt på <body> (tomt om buntning är avstängd)
+     * @returns {object} Ikon-set -> URL
+     */
+    static getSpriteUrls() {
+        if (this.sprites === null) {
+            try {
+                this.sprites = JSON.parse(document.body.dataset.iconSprites || '{}');
+            } catch (error) {
+                this.sprites = {};
+            }
+        }
+        return this.sprites;
+    }
+
+    /**
+     * SPRITES: Hämta och infoga en sprite i sidan en gång (cachas immutable av webbläsaren)
+     * @param {string} setName - Ikon-set, t.ex. 'amcharts'
+     * @returns {Promise<boolean>} true när spriten finns i DOM
+     */
+    static loadSprite(setName) {
+        if (!this.spriteLoads[setName]) {
+            this.spriteLoads[setName] = fetch(this.getSpriteUrls()[setName])
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.text();
+                })
+                .then(svgText => {
+                    const container = document.createElement('div');
+                    container.innerHTML = svgText;
+                    document.body.insertBefore(container.firstElementChild, document.body.firstChild);
+                    return true;
+                })
+                .catch(error => {
+                    console.warn(`🔧 Ikon-sprite '${setName}' kunde inte laddas: ${error.message}. Fallback till enskilda SVG-filer.`);
+                    delete this.sprites[setName];
+                    // Byt redan skapade sprite-ikoner mot fil-varianten
+                    document.querySelectorAll(`svg[data-sprite="${setName}"]`).forEach(icon => {
+                        const classes = icon.dataset.extraClasses ? icon.dataset.extraClasses.split(' ') : [];
+                        icon.replaceWith(this.createSVGIcon(icon.dataset.svgPath, classes));
+                    });
+                    return false;
+                });
+        }
+        return this.spriteLoads[setName];
+    }
+
+    /**
+     * AMCHARTS: Storlek som matchar font-ikonernas faktiska storlek
+     * @param {HTMLElement|SVGElement} element - Ikon-element
      * @param {array} extraClasses - CSS-klasser
-     * @returns {HTMLElement} IMG-element för SVG
      */
-    static createSVGIcon(svgPath, extraClasses = []) {
-        const img = document.createElement('img');
-        img.src = this.iconConfig.baseUrl + svgPath;
-        img.className = `amcharts-weather-icon ${extraClasses.join(' ')}`;
-        img.alt = 'Väderikon';
-        
-        // FÖRSTORING: Matcha font-ikonernas faktiska storlek
-        img.style.display = 'inline-block';
-        img.style.verticalAlign = 'middle';
+    static applyIconSize(element, extraClasses) {
+        element.style.display = 'inline-block';
+        element.style.verticalAlign = 'middle';
         
         // Anpassa storlek baserat på ikon-typ
         if (extraClasses.includes('weather-main-icon')) {
             // Huvudikon - stor som motsvarar font-ikonens CSS
-            img.style.width = 'clamp(48px, 5.5vw, 72px)';
-            img.style.height = 'clamp(48px, 5.5vw, 72px)';
+            element.style.width = 'clamp(48px, 5.5vw, 72px)';
+            element.style.height = 'clamp(48px, 5.5vw, 72px)';
         } else if (extraClasses.includes('forecast-weather-icon')) {
             // Prognos-ikoner - medium storlek
-            img.style.width = 'clamp(36px, 4.5vw, 48px)';
-            img.style.height = 'clamp(36px, 4.5vw, 48px)';
+            element.style.width = 'clamp(36px, 4.5vw, 48px)';
+            element.style.height = 'clamp(36px, 4.5vw, 48px)';
         } else if (extraClasses.includes('daily-weather-icon')) {
             // Dagliga prognoser - mindre storlek
-            img.style.width = 'clamp(18px, 2.3rem, 30px)';
-            img.style.height = 'clamp(18px, 2.3rem, 30px)';
+            element.style.width = 'clamp(18px, 2.3rem, 30px)';
+            element.style.height = 'clamp(18px, 2.3rem, 30px)';
         } else {
             // Standardstorlek för övriga ikoner
-            img.style.width = '1.2em';
-            img.style.height = '1.2em';
+            element.style.width = '1.2em';
+            element.style.height = '1.2em';
+        }
+    }
+
+    /**
+     * SPRITES: Ikon som <svg><use href="#symbol-id"></svg> ur spriten
+     * @param {string} svgPath - Sökväg relativt amcharts-svg/, t.ex. 'day/rainy-1.svg'
+     * @param {array} extraClasses - CSS-klasser
+     * @returns {SVGElement} SVG-element
+     */
+    static createSpriteIcon(svgPath, extraClasses = []) {
+        const svgNs = 'http://www.w3.org/2000/svg';
+        const svg = document.createElementNS(svgNs, 'svg');
+        svg.setAttribute('class', `amcharts-weather-icon ${extraClasses.join(' ')}`);
+        svg.setAttribute('role', 'img');
+        svg.setAttribute('aria-label', 'Väderikon');
+        svg.dataset.sprite = 'amcharts';
+        svg.dataset.svgPath = svgPath;
+        svg.dataset.extraClasses = extraClasses.join(' ');
+        this.applyIconSize(svg, extraClasses);
+        
+        // Symbol-id enligt core/icon_sprites.py: set + sökväg utan .svg
+        const use = document.createElementNS(svgNs, 'use');
+        use.setAttribute('href', '#amcharts-' + svgPath.replace(/\.svg$/, '').replace(/\//g, '-'));
+        svg.appendChild(use);
+        
+        this.loadSprite('amcharts');
+        return svg;
+    }
+
+    /**
+     * AMCHARTS: Skapa SVG-element för amCharts ikoner
+     * @param {string} svgPath - Sökväg till SVG-fil
+     * @param {array} extraClasses - CSS-klasser
+     * @returns {HTMLElement} SVG-element ur spriten, eller IMG-element för SVG-filen
+     */
+    static createSVGIcon(svgPath, extraClasses = []) {
+        if (this.getSpriteUrls().amcharts) {
+            return this.createSpriteIcon(svgPath, extraClasses);
         }
         
+        const img = document.createElement('img');
+        img.src = this.iconConfig.baseUrl + svgPath;
+        img.className = `amcharts-weather-icon ${extraClasses.join(' ')}`;
+        img.alt = 'Väderikon';
+        
+        // FÖRSTORING: Matcha font-ikonernas faktiska storlek
+        this.applyIconSize(img, extraClasses);
+        
         // Felhantering för SVG-laddning
         img.onerror = function() {
             console.warn(`🔧 amCharts SVG misslyckades att ladda: ${svgPath}. Fallback till font-ikon.`);
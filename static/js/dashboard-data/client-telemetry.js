@@ -0,0 +1,238 @@
+/**
+ * Client Telemetry - Renderingsmått från kiosken till /api/telemetry
+ * Samlar ramtider, long tasks, JS-heap, fetch-latens och effektpartiklar och
+ * skickar en kompakt sammanställning var data-telemetry-interval sekund.
+ *
+ * - Ramtider mäts i korta skurar (TELEMETRY_FRAME_SAMPLE_MS per minut) i
+ *   stället för en ständig requestAnimationFrame-loop
+ * - Båda jobben körs via ClientScheduler och pausas när sidan är dold
+ * - Kiosk-id sparas i localStorage så att varje skärm syns separat
+ */
+
+// === TELEMETRY CONSTANTS ===
+const TELEMETRY_URL = '/api/telemetry';
+const TELEMETRY_FRAME_SAMPLE_MS = 5000;      // Längd på en mätskur
+const TELEMETRY_FRAME_SAMPLE_EVERY = 60000;  // En mätskur per minut
+const TELEMETRY_SLOW_FRAME_MS = 50;
+const TELEMETRY_MAX_SAMPLES = 2000;          // Tak per rapport för ramtider och fetch-tider
+const TELEMETRY_KIOSK_KEY = 'weather-kiosk-id';
+
+let telemetryState = {
+    enabled: false,
+    kiosk: null,
+    periodStart: 0,
+    hiddenMsAtStart: 0,
+    frames: [],
+    slowFrames: 0,
+    longTasks: { n: 0, total: 0, max: 0 },
+    fetches: [],
+    fetchErrors: 0,
+    heap: null,
+    effects: []
+};
+
+/**
+ * Kiosk-id för den här skärmen (skapas första gången)
+ * @returns {string|null}
+ */
+function getKioskId() {
+    try {
+        let kiosk = localStorage.getItem(TELEMETRY_KIOSK_KEY);
+        if (!kiosk) {
+            kiosk = `kiosk-${Math.random().toString(36).slice(2, 8)}`;
+            localStorage.setItem(TELEMETRY_KIOSK_KEY, kiosk);
+        }
+        return kiosk;
+    } catch (error) {
+        return null;  // Servern använder då klientens adress
+    }
+}
+
+/**
+ * Starta insamlingen (om servern angett ett intervall)
+ */
+function startClientTelemetry() {
+    const intervalSeconds = Number(document.body.dataset.telemetryInterval);
+    if (!intervalSeconds) return;
+
+    telemetryState.enabled = true;
+    telemetryState.kiosk = getKioskId();
+    resetTelemetryPeriod();
+    observeLongTasks();
+
+    ClientScheduler.every('telemetry-frames', TELEMETRY_FRAME_SAMPLE_EVERY, sampleFrameTimes);
+    ClientScheduler.every('telemetry', intervalSeconds * 1000, sendTelemetryReport);
+    console.log(`📈 Telemetri startad (${telemetryState.kiosk || 'utan kiosk-id'}, var ${intervalSeconds / 60} min)`);
+}
+
+function resetTelemetryPeriod() {
+    telemetryState.periodStart = Date.now();
+    telemetryState.hiddenMsAtStart = ClientScheduler.getStatus().hidden_ms;
+    telemetryState.frames = [];
+    telemetryState.slowFrames = 0;
+    telemetryState.longTasks = { n: 0, total: 0, max: 0 };
+    telemetryState.fetches = [];
+    telemetryState.fetchErrors = 0;
+    telemetryState.heap = null;
+    telemetryState.effects = [];
+}
+
+/**
+ * Long tasks (>50 ms på huvudtråden) via PerformanceObserver där det stöds
+ */
+function observeLongTasks() {
+    if (typeof PerformanceObserver === 'undefined' ||
+        !(PerformanceObserver.supportedEntryTypes || []).includes('longtask')) {
+        return;
+    }
+    const observer = new PerformanceObserver(list => {
+        list.getEntries().forEach(entry => {
+            const longTasks = telemetryState.longTasks;
+            longTasks.n++;
+            longTasks.total += entry.duration;
+            longTasks.max = Math.max(longTasks.max, entry.duration);
+        });
+    });
+    observer.observe({ type: 'longtask' });
+}
+
+/**
+ * Registrera ett API-anrop (anropas från fetchWithTimeout)
+ * @param {number} durationMs - Tid till färdigt svar
+ * @param {boolean} ok - Lyckades anropet
+ */
+function noteFetchTiming(durationMs, ok) {
+    if (!telemetryState.enabled) return;
+    if (!ok) telemetryState.fetchErrors++;
+    if (telemetryState.fetches.length < TELEMETRY_MAX_SAMPLES) {
+        telemetryState.fetches.push(durationMs);
+    }
+}
+
+/**
+ * Mät ramtider under en kort skur; samplar även heap och effekter
+ * @returns {Promise} Klar när skuren är slut (ClientScheduler kör den inte överlappande)
+ */
+function sampleFrameTimes() {
+    return new Promise(resolve => {
+        const started = performance.now();
+        let previous = null;
+
+        const frame = now => {
+            if (previous !== null && telemetryState.frames.length < TELEMETRY_MAX_SAMPLES) {
+                const frameMs = now - previous;
+                telemetryState.frames.push(frameMs);
+                if (frameMs > TELEMETRY_SLOW_FRAME_MS) telemetryState.slowFrames++;
+            }
+            previous = now;
+
+            if (now - started < TELEMETRY_FRAME_SAMPLE_MS && !document.hidden) {
+                requestAnimationFrame(frame);
+            } else {
+                sampleHeapAndEffects();
+                resolve();
+            }
+        };
+        requestAnimationFrame(frame);
+    });
+}
+
+function sampleHeapAndEffects() {
+    // performance.memory finns bara i Chromium (kioskernas webbläsare)
+    if (performance.memory) {
+        const usedMb = performance.memory.usedJSHeapSize / 1048576;
+        telemetryState.heap = {
+            used_mb: Math.round(usedMb * 10) / 10,
+            limit_mb: Math.round(performance.memory.jsHeapSizeLimit / 1048576)
+        };
+    }
+
+    const stats = window.weatherEffectsManager ? weatherEffectsManager.getRenderStats() : null;
+    if (stats && stats.fps !== undefined) {
+        telemetryState.effects.push(stats);
+    }
+}
+
+/**
+ * Percentil ur osorterade värden
+ * @param {number[]} values
+ * @param {number} p - 0..1
+ * @returns {number|null}
+ */
+function telemetryPercentile(values, p) {
+    if (!values.length) return null;
+    const sorted = values.slice().sort((a, b) => a - b);
+    return Math.round(sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))] * 10) / 10;
+}
+
+/**
+ * Sammanställ perioden
+ * @returns {object|null} Rapport, eller null om inget mätts
+ */
+function buildTelemetryReport() {
+    const state = telemetryState;
+    if (!state.frames.length && !state.fetches.length) return null;
+
+    const periodMs = Date.now() - state.periodStart;
+    const hiddenMs = ClientScheduler.getStatus().hidden_ms - state.hiddenMsAtStart;
+
+    const effects = state.effects;
+    const lastEffect = effects[effects.length - 1];
+    return {
+        kiosk: state.kiosk,
+        release: document.body.dataset.release || null,
+        period_s: Math.round(periodMs / 1000),
+        visible_s: Math.round(Math.max(0, periodMs - hiddenMs) / 1000),
+        frames: {
+            n: state.frames.length,
+            p50: telemetryPercentile(state.frames, 0.5),
+            p95: telemetryPercentile(state.frames, 0.95),
+            max: telemetryPercentile(state.frames, 1),
+            slow: state.slowFrames
+        },
+        long_tasks: {
+            n: state.longTasks.n,
+            total: Math.round(state.longTasks.total),
+            max: Math.round(state.longTasks.max)
+        },
+        heap: state.heap,
+        fetch: {
+            n: state.fetches.length,
+            errors: state.fetchErrors,
+            p50: telemetryPercentile(state.fetches, 0.5),
+            p95: telemetryPercentile(state.fetches, 0.95)
+        },
+        effects: lastEffect ? {
+            mode: lastEffect.mode,
+            fps: Math.round(effects.reduce((sum, stats) => sum + stats.fps, 0) / effects.length * 10) / 10,
+            scale: Math.min(...effects.map(stats => stats.scale)),
+            particles: lastEffect.particles,
+            max_particles: lastEffect.max_particles
+        } : null
+    };
+}
+
+/**
+ * Skicka periodens sammanställning och börja en ny period
+ */
+async function sendTelemetryReport() {
+    const report = buildTelemetryReport();
+    resetTelemetryPeriod();
+    if (!report) return;
+
+    try {
+        const response = await fetch(TELEMETRY_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(report),
+            keepalive: true
+        });
+        if (!response.ok) {
+            console.warn(`⚠️ Telemetri avvisad: HTTP ${response.status}`);
+        }
+    } catch (error) {
+        console.warn('⚠️ Telemetri kunde inte skickas:', error.message || error);
+    }
+}
+
+console.log('✅ Client Telemetry laddat - ramtider, long tasks, heap, fetch-latens');
@@ -18,6 +18,7 @@ const API_TIMEOUT = 10000; // 10 sekunder
 async function fetchWithTimeout(url, timeout = API_TIMEOUT) {
     const controller = new AbortController();
     const timeoutId = setTimeout(() => controller.abort(), timeout);
+    const started = performance.now();
     
     try {
         const response = await fetch(url, {
@@ -31,58 +32,56 @@ async function fetchWithTimeout(url, timeout = API_TIMEOUT) {
             throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         }
         
-        return await response.json();
+        // Offline: svaret kan komma från service workerns cache (offline-cache.js)
+        noteResponseAge(response);
+        
+        const data = await response.json();
+        // Telemetri: latens per anrop (client-telemetry.js)
+        noteFetchTiming(performance.now() - started, true);
+        return data;
     } catch (error) {
         clearTimeout(timeoutId);
+        noteFetchTiming(performance.now() - started, false);
         throw error;
     }
 }
 
+/**
+ * Läs data som servern bäddat in i index.html (samma JSON som API:erna)
+ * Används bara en gång - därefter hämtas data via API:erna
+ * @returns {object|null} {current, forecast, daily, warnings} eller null
+ */
+function readInitialData() {
+    const element = document.getElementById('initial-data');
+    if (!element) return null;
+    
+    try {
+        const data = JSON.parse(element.textContent);
+        element.remove();
+        if (!data || !data.current || !data.current.smhi) return null;
+        
+        noteInitialDataAge(data.rendered_at);
+        return data;
+    } catch (error) {
+        console.warn('⚠️ Kunde inte läsa inbäddad data:', error);
+        return null;
+    }
+}
+
 /**
  * Uppdatera all väderdata från API:er
  * @returns {Promise<void>}
  */
 async function updateAllData() {
     try {
+        resetDataAge();
         const [currentData, forecastData, dailyData] = await Promise.all([
             fetchWithTimeout('/api/current'),
             fetchWithTimeout('/api/forecast'),
             fetchWithTimeout('/api/daily')
         ]);
         
-        // FAS 2: Uppdatera Netatmo-intelligence state
-        if (currentData.config) {
-            dashboardState.useNetatmo = currentData.config.use_netatmo || false;
-            dashboardState.config = currentData.config;
-            
-            if (currentData.config.wind_unit) {
-                dashboardState.windUnit = currentData.config.wind_unit;
-            }
-            
-            console.log(`🧠 FAS 2: Netatmo-läge: ${dashboardState.useNetatmo ? 'AKTIVT' : 'INAKTIVT'}`);
-        }
-        
-        // STEG 8: Använd Intelligent Data Source istället för lokal funktion
-        updateDataAvailability(currentData);
-        
-        // STEG 9: Använd UI Adaptation Engine istället för lokala funktioner
-        applyUIAdaptations();
-        
-        updateCurrentWeather(currentData);
-        updateHourlyForecast(forecastData.forecast);
-        updateDailyForecast(dailyData.daily_forecast);
-        updateStatus(currentData.status);
-        
-        if (currentData.theme !== dashboardState.currentTheme) {
-            updateTheme(currentData.theme);
-        }
-        
-        // JAVASCRIPT LOOP FIX: Tog bort adaptElementVisibility() som orsakade dubblering
-        // - applyUIAdaptations() hanterar redan alla UI-anpassningar
-        // - adaptElementVisibility() anropade samma funktioner igen → dubblering
-        // - Resultat: Halverat antal UI-uppdateringar per cykel
-        
-        dashboardState.lastUpdate = new Date().toISOString();
+        applyAllData(currentData, forecastData, dailyData);
         
     } catch (error) {
         console.error('❌ Fel vid datahämtning:', error);
@@ -90,6 +89,49 @@ async function updateAllData() {
     }
 }
 
+/**
+ * Visa väderdata från API:erna eller från inbäddad data
+ * @param {object} currentData - Svar från /api/current
+ * @param {object} forecastData - Svar från /api/forecast
+ * @param {object} dailyData - Svar från /api/daily
+ */
+function applyAllData(currentData, forecastData, dailyData) {
+    // FAS 2: Uppdatera Netatmo-intelligence state
+    if (currentData.config) {
+        dashboardState.useNetatmo = currentData.config.use_netatmo || false;
+        dashboardState.config = currentData.config;
+        
+        if (currentData.config.wind_unit) {
+            dashboardState.windUnit = currentData.config.wind_unit;
+        }
+        
+        console.log(`🧠 FAS 2: Netatmo-läge: ${dashboardState.useNetatmo ? 'AKTIVT' : 'INAKTIVT'}`);
+    }
+    
+    // STEG 8: Använd Intelligent Data Source istället för lokal funktion
+    updateDataAvailability(currentData);
+    
+    // STEG 9: Använd UI Adaptation Engine istället för lokala funktioner
+    applyUIAdaptations();
+    
+    updateCurrentWeather(currentData);
+    updateHourlyForecast(forecastData.forecast);
+    updateDailyForecast(dailyData.daily_forecast);
+    updateStatus(currentData.status);
+    
+    if (currentData.theme !== dashboardState.currentTheme) {
+        updateTheme(currentData.theme);
+    }
+    
+    // JAVASCRIPT LOOP FIX: Tog bort adaptElementVisibility() som orsakade dubblering
+    // - applyUIAdaptations() hanterar redan alla UI-anpassningar
+    // - adaptElementVisibility() anropade samma funktioner igen → dubblering
+    // - Resultat: Halverat antal UI-uppdateringar per cykel
+    
+    dashboardState.lastUpdate = new Date().toISOString();
+    renderDataAgeBadge();
+}
+
 /**
  * Kontrollera tema-uppdateringar från API
  * @returns {Promise<void>}
@@ -107,4 +149,4 @@ async function checkThemeUpdate() {
     }
 }
 
-console.log('✅ STEG 10: Fetch API Client laddat - 3 API-funktioner extraherade!');
\ No newline at end of file
+console.log('✅ STEG 10: Fetch API Client laddat - API-funktioner + inbäddad startdata laddat!');
\ No newline at end of file
@@ -0,0 +1,85 @@
+/**
+ * Offline Cache - Service worker-registrering och åldersbadge
+ * Service workern (static/js/service-worker.js) visar sparade API-svar när
+ * servern inte nås; de märks med X-SW-Cached-At. Badgen visar då hur gammal
+ * datan på skärmen är.
+ */
+
+// === OFFLINE CONSTANTS ===
+const CACHED_AT_HEADER = 'X-SW-Cached-At';
+const INITIAL_DATA_STALE_MS = 120000; // Inbäddad data äldre än så = sidan kom från cache
+
+// Äldsta sparade svar i pågående uppdatering (epoch ms), null = färsk data
+let offlineDataState = {
+    cachedAt: null
+};
+
+/**
+ * Registrera service workern (eller avregistrera om PWA stängts av i config)
+ */
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) return;
+
+    const workerUrl = document.body.dataset.serviceWorker;
+    if (!workerUrl) {
+        navigator.serviceWorker.getRegistrations()
+            .then(registrations => registrations.forEach(registration => registration.unregister()))
+            .catch(() => {});
+        return;
+    }
+
+    navigator.serviceWorker.register(workerUrl, { scope: '/' })
+        .then(registration => console.log(`📲 Service worker registrerad (${registration.scope})`))
+        .catch(error => console.warn('⚠️ Service worker kunde inte registreras:', error));
+}
+
+/**
+ * Börja en ny uppdatering - glöm föregående åldersuppgift
+ */
+function resetDataAge() {
+    offlineDataState.cachedAt = null;
+}
+
+/**
+ * Notera om ett API-svar kom från service workerns cache
+ * @param {Response} response - Svar från fetch
+ */
+function noteResponseAge(response) {
+    const cachedAt = Number(response.headers.get(CACHED_AT_HEADER));
+    if (cachedAt) {
+        offlineDataState.cachedAt = offlineDataState.cachedAt
+            ? Math.min(offlineDataState.cachedAt, cachedAt)
+            : cachedAt;
+    }
+}
+
+/**
+ * Notera åldern på inbäddad data (sidan kan ha visats från cache)
+ * @param {number} renderedAt - Serverns renderingstid i epoch-sekunder
+ */
+function noteInitialDataAge(renderedAt) {
+    if (renderedAt && Date.now() - renderedAt * 1000 > INITIAL_DATA_STALE_MS) {
+        offlineDataState.cachedAt = renderedAt * 1000;
+    }
+}
+
+/**
+ * Visa eller dölj åldersbadgen utifrån senaste uppdateringen
+ */
+function renderDataAgeBadge() {
+    const badge = document.getElementById('data-age-badge');
+    if (!badge) return;
+
+    if (!offlineDataState.cachedAt) {
+        badge.style.display = 'none';
+        return;
+    }
+
+    const savedAt = new Date(offlineDataState.cachedAt);
+    const minutes = Math.max(1, Math.round((Date.now() - savedAt.getTime()) / 60000));
+    const time = savedAt.toLocaleTimeString('sv-SE', {hour: '2-digit', minute: '2-digit'});
+    badge.textContent = `📡 Offline - data från ${time} (${minutes} min)`;
+    badge.style.display = '';
+}
+
+console.log('✅ Offline Cache laddat - service worker + åldersbadge');
@@ -61,7 +61,8 @@ function updateCurrentWeather(data) {
         // SMHI Väder-ikon
         if (smhi.weather_symbol) {
             const iconElement = document.getElementById('smhi-weather-icon');
-            const isDay = isDaytime();
+            // Solens höjd från servern (fallback: 06-20 om sol-kalkylator saknas)
+            const isDay = data.sun_position ? data.sun_position.is_daytime : isDaytime();
             
             // AMCHARTS: Uppdatera ikon-konfiguration från API
             WeatherIconRenderer.updateConfig(data.config);
@@ -46,7 +46,8 @@ function createForecastCard(forecast) {
     
     card.className = `forecast-card ${timeClass}`;
     
-    const isDay = hour >= 6 && hour <= 20;
+    // Dag/natt beräknad på servern utifrån solens höjd (fallback: 06-20)
+    const isDay = forecast.is_daytime !== undefined ? forecast.is_daytime : (hour >= 6 && hour <= 20);
     // STEG 4: Använd WeatherIconRenderer istället för WeatherIconManager
     const iconName = WeatherIconRenderer.getIconName(forecast.weather_symbol, isDay);
     
@@ -158,7 +159,7 @@ function createDailyForecastItem(day) {
     item.className = 'daily-forecast-item';
     
     // STEG 4: Använd WeatherIconRenderer istället för WeatherIconManager
-    const iconName = WeatherIconRenderer.getIconName(day.weather_symbol, true);
+    const iconName = WeatherIconRenderer.getIconName(day.weather_symbol, day.is_daytime !== false);
     
     const weekdays = {
         'Monday': 'Måndag', 'Tuesday': 'Tisdag', 'Wednesday': 'Onsdag',
@@ -15,17 +15,19 @@
  * - STEG 7: barometer-display.js (BarometerDisplay)
  * - STEG 8: intelligent-data-source.js (getDataSource, formatDataWithSource, etc.)
  * - STEG 9: ui-adaptation-engine.js (applyUIAdaptations, adaptHumiditySection, etc.)
- * - STEG 10: fetch-api-client.js (fetchWithTimeout, updateAllData, checkThemeUpdate)
+ * - STEG 10: fetch-api-client.js (fetchWithTimeout, readInitialData, updateAllData, applyAllData, checkThemeUpdate)
  * - STEG 11: current-weather-view.js (updateCurrentWeather, updateWindUnderFaktisk, etc.)
  * - STEG 12: forecast-view.js (updateHourlyForecast, createForecastCard, updateDailyForecast, createDailyForecastItem)
+ * - offline-cache.js (registerServiceWorker, noteResponseAge, renderDataAgeBadge)
+ * - client-scheduler.js (ClientScheduler - klocka, data och tema på en timer, pausas när sidan är dold)
+ * - client-telemetry.js (startClientTelemetry, noteFetchTiming - renderingsmått till /api/telemetry)
  */
 
 // === GLOBAL STATE ===
 let dashboardState = {
     lastUpdate: null,
     currentTheme: 'light',
-    updateInterval: null,
-    clockInterval: null,
+    clockTask: null,
     isLoading: true,
     windUnit: 'land',
     config: null,
@@ -51,9 +53,11 @@ const THEME_CHECK_INTERVAL = 60000; // 1 minut
 // === INITIALIZATION ===
 document.addEventListener('DOMContentLoaded', function() {
     console.log('🚀 Weather Dashboard FAS 3: Graciös UI-degradering aktiverad med HUMIDITY FIX');
+    registerServiceWorker();
     initializeDashboard();
     startDataUpdates();
     startThemeCheck();
+    startClientTelemetry();
 });
 
 // === MAIN ORCHESTRATION FUNCTIONS ===
@@ -71,8 +75,14 @@ async function initializeDashboard() {
         // STEG 11: Rensa vinddata från current-weather-view.js
         removeWindDetailItems();
         
-        // STEG 10: Uppdatera data från fetch-api-client.js
-        await updateAllData();
+        // STEG 10: Första renderingen från inbäddad data (inga anrop), annars från API:erna
+        const initialData = readInitialData();
+        if (initialData) {
+            applyAllData(initialData.current, initialData.forecast, initialData.daily);
+            console.log('⚡ Första renderingen från inbäddad data');
+        } else {
+            await updateAllData();
+        }
         
         hideLoadingOverlay();
         
@@ -91,27 +101,28 @@ async function initializeDashboard() {
 }
 
 function startDataUpdates() {
-    dashboardState.updateInterval = setInterval(async () => {
+    // Körs via ClientScheduler: pausas när sidan är dold, hämtar direkt när den visas igen
+    ClientScheduler.every('data', UPDATE_INTERVAL, async () => {
         try {
             // STEG 10: Använd updateAllData från fetch-api-client.js
             await updateAllData();
         } catch (error) {
             console.error('❌ Fel vid data-uppdatering:', error);
         }
-    }, UPDATE_INTERVAL);
+    });
     
     console.log(`🔄 Data-uppdateringar startade (var ${UPDATE_INTERVAL/1000}s)`);
 }
 
 function startThemeCheck() {
-    setInterval(async () => {
+    ClientScheduler.every('theme', THEME_CHECK_INTERVAL, async () => {
         try {
             // STEG 10: Använd checkThemeUpdate från fetch-api-client.js
             await checkThemeUpdate();
         } catch (error) {
             console.error('❌ Fel vid tema-kontroll:', error);
         }
-    }, THEME_CHECK_INTERVAL);
+    });
 }
 
 // === UTILITY FUNCTIONS ===
@@ -159,12 +170,7 @@ window.addEventListener('unhandledrejection', function(event) {
 // === CLEANUP ===
 
 window.addEventListener('beforeunload', function() {
-    if (dashboardState.updateInterval) {
-        clearInterval(dashboardState.updateInterval);
-    }
-    if (dashboardState.clockInterval) {
-        clearInterval(dashboardState.clockInterval);
-    }
+    ClientScheduler.stop();
 });
 
 // === 🎉 REFAKTORERING SLUTFÖRD ===
@@ -0,0 +1,247 @@
+/**
+ * Client Scheduler - En gemensam timer för dashboardens periodiska jobb
+ * Ersätter separata setInterval för klocka, data och tema.
+ *
+ * - En enda setTimeout väcker sidan; jobb som förfaller inom samma
+ *   COALESCE_MS körs i samma väckning
+ * - Klockan (alignToSecond) körs precis efter varje hel sekund, aldrig i förtid
+ * - Page Visibility API: när sidan är dold körs inget (ingen timer alls);
+ *   när den blir synlig igen körs alla försenade jobb en gång i samma pass
+ * - Asynkrona jobb (datahämtning) körs aldrig överlappande
+ */
+
+// === SCHEDULER CONSTANTS ===
+const SCHEDULER_COALESCE_MS = 250;      // Jobb som förfaller så nära varandra körs tillsammans
+const SCHEDULER_ALIGN_OFFSET_MS = 10;   // Marginal efter hel sekund så att Date visar den nya sekunden
+
+let clientSchedulerState = {
+    tasks: new Map(),
+    timerId: null,
+    hidden: typeof document !== 'undefined' && document.hidden,
+    hiddenSince: null,
+    hiddenMs: 0,
+    wakeups: 0,
+    listeners: []
+};
+
+/**
+ * Nästa förfallotid för ett jobb räknat från en tidpunkt
+ * @param {object} task
+ * @param {number} from - Epoch ms
+ * @returns {number} Epoch ms
+ */
+function nextDueTime(task, from) {
+    if (task.alignToSecond) {
+        return (Math.floor((from + task.interval) / 1000) * 1000) + SCHEDULER_ALIGN_OFFSET_MS;
+    }
+    return from + task.interval;
+}
+
+/**
+ * Registrera ett periodiskt jobb (ersätter befintligt med samma namn)
+ * @param {string} name - Jobbets namn
+ * @param {number} interval - Intervall i millisekunder
+ * @param {function} callback - Jobbet (får returnera ett Promise)
+ * @param {object} options - {alignToSecond, runWhenHidden, runNow}
+ */
+function scheduleEvery(name, interval, callback, options = {}) {
+    const now = Date.now();
+    const task = {
+        name: name,
+        interval: interval,
+        callback: callback,
+        alignToSecond: Boolean(options.alignToSecond),
+        runWhenHidden: Boolean(options.runWhenHidden),
+        nextDue: 0,
+        running: false,
+        runs: 0,
+        catchUps: 0,
+        lastRun: null,
+        lastDurationMs: null
+    };
+    task.nextDue = options.runNow ? now : nextDueTime(task, now);
+    clientSchedulerState.tasks.set(name, task);
+    armSchedulerTimer();
+}
+
+/**
+ * Ta bort ett jobb
+ * @param {string} name
+ */
+function cancelScheduled(name) {
+    clientSchedulerState.tasks.delete(name);
+    armSchedulerTimer();
+}
+
+/**
+ * Kör ett jobb nu (t.ex. efter att sidan blivit synlig)
+ * @param {object} task
+ * @param {number} now - Epoch ms
+ */
+function runScheduledTask(task, now) {
+    task.nextDue = nextDueTime(task, now);
+    if (task.running) return;  // Föregående körning pågår fortfarande
+
+    task.running = true;
+    task.runs++;
+    task.lastRun = now;
+    const started = performance.now();
+
+    const finish = () => {
+        task.running = false;
+        task.lastDurationMs = Math.round((performance.now() - started) * 10) / 10;
+    };
+
+    try {
+        const result = task.callback();
+        if (result && typeof result.then === 'function') {
+            result.then(finish, error => {
+                finish();
+                console.error(`❌ Schemalagt jobb '${task.name}' misslyckades:`, error);
+            });
+        } else {
+            finish();
+        }
+    } catch (error) {
+        finish();
+        console.error(`❌ Schemalagt jobb '${task.name}' misslyckades:`, error);
+    }
+}
+
+/**
+ * Väckning: kör alla jobb som förfallit (eller förfaller inom COALESCE_MS)
+ */
+function schedulerTick() {
+    clientSchedulerState.timerId = null;
+    clientSchedulerState.wakeups++;
+    const now = Date.now();
+
+    clientSchedulerState.tasks.forEach(task => {
+        if (clientSchedulerState.hidden && !task.runWhenHidden) return;
+        // Sekundjusterade jobb körs aldrig i förtid - klockan skulle visa föregående sekund
+        const early = task.alignToSecond ? 0 : SCHEDULER_COALESCE_MS;
+        if (task.nextDue <= now + early) {
+            runScheduledTask(task, now);
+        }
+    });
+
+    armSchedulerTimer();
+}
+
+/**
+ * Sätt en timer till nästa förfallotid bland de jobb som får köras
+ */
+function armSchedulerTimer() {
+    if (clientSchedulerState.timerId !== null) {
+        clearTimeout(clientSchedulerState.timerId);
+        clientSchedulerState.timerId = null;
+    }
+
+    let nextDue = Infinity;
+    clientSchedulerState.tasks.forEach(task => {
+        if (clientSchedulerState.hidden && !task.runWhenHidden) return;
+        nextDue = Math.min(nextDue, task.nextDue);
+    });
+    if (nextDue === Infinity) return;
+
+    clientSchedulerState.timerId = setTimeout(schedulerTick, Math.max(0, nextDue - Date.now()));
+}
+
+/**
+ * Page Visibility: pausa när sidan döljs, ta igen i ett pass när den visas
+ */
+function handleVisibilityChange() {
+    const hidden = document.hidden;
+    if (hidden === clientSchedulerState.hidden) return;
+    clientSchedulerState.hidden = hidden;
+
+    const now = Date.now();
+    if (hidden) {
+        clientSchedulerState.hiddenSince = now;
+        console.log('💤 Sidan dold - schemalagda jobb pausade');
+    } else {
+        const pausedMs = clientSchedulerState.hiddenSince ? now - clientSchedulerState.hiddenSince : 0;
+        clientSchedulerState.hiddenMs += pausedMs;
+        clientSchedulerState.hiddenSince = null;
+
+        // Ett pass: varje försenat jobb körs en gång, oavsett hur många intervall som missats
+        let caughtUp = 0;
+        clientSchedulerState.tasks.forEach(task => {
+            if (task.nextDue <= now) {
+                task.catchUps++;
+                caughtUp++;
+                runScheduledTask(task, now);
+            }
+        });
+        console.log(`👀 Sidan synlig efter ${Math.round(pausedMs / 1000)}s - ${caughtUp} jobb ikapp`);
+    }
+
+    clientSchedulerState.listeners.forEach(listener => {
+        try {
+            listener(hidden);
+        } catch (error) {
+            console.error('❌ Fel i visibility-lyssnare:', error);
+        }
+    });
+    armSchedulerTimer();
+}
+
+/**
+ * Lyssna på dold/synlig (t.ex. för att pausa animationer)
+ * @param {function} listener - Anropas med true när sidan döljs, false när den visas
+ * @returns {function} Avregistrering
+ */
+function onSchedulerVisibilityChange(listener) {
+    clientSchedulerState.listeners.push(listener);
+    return () => {
+        clientSchedulerState.listeners = clientSchedulerState.listeners.filter(l => l !== listener);
+    };
+}
+
+/**
+ * Stoppa alla jobb (vid avslut)
+ */
+function stopScheduler() {
+    clientSchedulerState.tasks.clear();
+    armSchedulerTimer();
+}
+
+/**
+ * Status för felsökning/telemetri
+ * @returns {object}
+ */
+function getSchedulerStatus() {
+    const tasks = {};
+    clientSchedulerState.tasks.forEach(task => {
+        tasks[task.name] = {
+            interval_ms: task.interval,
+            runs: task.runs,
+            catch_ups: task.catchUps,
+            running: task.running,
+            last_duration_ms: task.lastDurationMs
+        };
+    });
+    const hiddenNow = clientSchedulerState.hiddenSince ? Date.now() - clientSchedulerState.hiddenSince : 0;
+    return {
+        hidden: clientSchedulerState.hidden,
+        hidden_ms: clientSchedulerState.hiddenMs + hiddenNow,
+        wakeups: clientSchedulerState.wakeups,
+        tasks: tasks
+    };
+}
+
+if (typeof document !== 'undefined') {
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+}
+
+// === EXPORT CLIENT SCHEDULER ===
+window.ClientScheduler = {
+    every: scheduleEvery,
+    cancel: cancelScheduled,
+    onVisibilityChange: onSchedulerVisibilityChange,
+    isHidden: () => clientSchedulerState.hidden,
+    stop: stopScheduler,
+    getStatus: getSchedulerStatus
+};
+
+console.log('✅ Client Scheduler laddat - en timer för klocka, data och tema');
@@ -0,0 +1,149 @@
+/**
+ * Service Worker - Offline-skal för väder-dashboarden
+ * Serveras från /service-worker.js av core/pwa.py, som lägger till SW_CONFIG
+ * överst (cache-version, app-skalet att precacha, offline-API:er, timeout).
+ *
+ * - /dist/* (hashade buntar, sprites, typsnitt): cache först - ändras aldrig
+ * - Sidan och /static/*: nätverk först, cachad kopia om servern inte nås
+ * - /api/current, /forecast, /daily, /warnings: senaste svaret sparas. Svarar
+ *   servern inte inom timeouten visas det sparade svaret direkt (märkt med
+ *   X-SW-Cached-At för åldersbadgen) medan anropet fortsätter och uppdaterar
+ *   cachen i bakgrunden
+ */
+
+const SHELL_CACHE = `weather-shell-${SW_CONFIG.version}`;
+const SHELL_CACHE_PREFIX = 'weather-shell-';
+const DATA_CACHE = 'weather-api-data';
+const CACHED_AT_HEADER = 'X-SW-Cached-At';
+
+// === LIVSCYKEL ===
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => Promise.all(SW_CONFIG.precache.map(url =>
+                // En saknad fil får inte stoppa installationen av resten av skalet
+                cache.add(new Request(url, { cache: 'reload' })).catch(error => {
+                    console.warn(`⚠️ SW: Kunde inte precacha ${url}:`, error);
+                })
+            )))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => key.startsWith(SHELL_CACHE_PREFIX) && key !== SHELL_CACHE)
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// === ROUTING ===
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.mode === 'navigate') {
+        event.respondWith(networkFirst(request, '/'));
+    } else if (url.pathname.startsWith('/dist/')) {
+        event.respondWith(cacheFirst(request));
+    } else if (SW_CONFIG.apiPaths.includes(url.pathname)) {
+        event.respondWith(staleOnTimeout(event, request, url.pathname));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(networkFirst(request, url.pathname));
+    }
+});
+
+// === STRATEGIER ===
+
+/**
+ * Hashade filer: cache först, annars nätverk (och spara)
+ * @param {Request} request
+ * @returns {Promise<Response>}
+ */
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) return cached;
+
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(SHELL_CACHE);
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+/**
+ * Nätverk först - cachad kopia om servern inte nås eller svarar med fel
+ * @param {Request} request
+ * @param {string} cacheKey - Nyckel i skal-cachen (sidan sparas alltid som '/')
+ * @returns {Promise<Response>}
+ */
+async function networkFirst(request, cacheKey) {
+    const cache = await caches.open(SHELL_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(cacheKey, response.clone());
+            return response;
+        }
+        return (await cache.match(cacheKey)) || response;
+    } catch (error) {
+        const cached = await cache.match(cacheKey);
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+/**
+ * API-data: nätverket vinner om det svarar inom timeouten, annars sparat svar
+ * direkt (stale-while-revalidate) - anropet slutförs ändå och uppdaterar cachen
+ * @param {FetchEvent} event
+ * @param {Request} request
+ * @param {string} cacheKey - API-sökvägen utan query
+ * @returns {Promise<Response>}
+ */
+async function staleOnTimeout(event, request, cacheKey) {
+    const cache = await caches.open(DATA_CACHE);
+
+    const network = fetch(request).then(async response => {
+        if (response.ok) {
+            await cache.put(cacheKey, await stampResponse(response.clone()));
+        }
+        return response;
+    });
+    event.waitUntil(network.catch(() => {}));
+
+    const cached = await cache.match(cacheKey);
+    const cachedAt = cached ? Number(cached.headers.get(CACHED_AT_HEADER)) : 0;
+    if (!cached || Date.now() - cachedAt > SW_CONFIG.maxDataAgeMs) {
+        return network;
+    }
+
+    const fresh = network.then(response => response.ok ? response : cached, () => cached);
+    const timeout = new Promise(resolve => setTimeout(() => resolve(cached), SW_CONFIG.apiTimeoutMs));
+    return Promise.race([fresh, timeout]);
+}
+
+/**
+ * Kopia av svaret med tidpunkt för när det sparades
+ * @param {Response} response
+ * @returns {Promise<Response>}
+ */
+async function stampResponse(response) {
+    const headers = new Headers(response.headers);
+    headers.set(CACHED_AT_HEADER, String(Date.now()));
+    headers.delete('ETag');
+    return new Response(await response.blob(), {
+        status: response.status,
+        statusText: response.statusText,
+        headers: headers
+    });
+}
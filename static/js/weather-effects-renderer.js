@@ -0,0 +1,625 @@
+/**
+ * WeatherEffects Canvas Renderer
+ * Ritar regn och snö på en <canvas> med requestAnimationFrame i stället för
+ * ett DOM-element per partikel. Körs i en worker med OffscreenCanvas när
+ * webbläsaren stödjer det, annars på huvudtråden med samma kod.
+ *
+ * - Partiklarna ligger i förallokerade Float32Array-pooler (ingen GC per frame)
+ * - FrameGovernor håller lp156wh4_optimizations.target_fps och skalar ned
+ *   antalet aktiva partiklar när frame-tiden överskrider budgeten (och upp igen)
+ *
+ * Ritloopen pausas helt när sidan är dold (ClientScheduler.onVisibilityChange).
+ *
+ * Filen laddas både som vanligt script (före weather-effects.js) och som
+ * worker-script - worker-delen aktiveras bara i en WorkerGlobalScope.
+ */
+
+const IS_EFFECTS_WORKER = typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope;
+
+// === RENDERER CONSTANTS ===
+const EFFECTS_MAX_DPR = 2;              // Högre pixeltäthet ger ingen synlig skillnad för regn/snö
+const EFFECTS_MAX_STEP_S = 0.1;         // Längsta simuleringssteg (efter paus/hackig frame)
+const RAIN_ALPHA_LEVELS = [0.55, 0.75, 0.95];  // Ett stroke-anrop per nivå i stället för per droppe
+const RAIN_COLOR = 'rgb(0, 170, 255)';
+const SNOW_BASE_FONT_PX = 16;           // 1em i den gamla DOM-versionen
+const SNOW_SPRITE_PX = 48;
+const SNOW_SWAY_PX = 12;
+const SNOW_SWAY_SPEED = 1.2;            // Radianer per sekund
+
+// Frame-governor
+const GOVERNOR_WINDOW_MS = 1000;        // Utvärdering en gång per sekund
+const GOVERNOR_PAUSE_MS = 500;          // Längre uppehåll = pausad sida, inte en långsam frame
+const GOVERNOR_MIN_SCALE = 0.25;
+const GOVERNOR_STEP_DOWN = 0.8;
+const GOVERNOR_STEP_UP = 0.1;
+const GOVERNOR_CALM_WINDOWS = 3;        // Sekunder med marginal innan partiklar läggs tillbaka
+const FRAME_SLACK_MS = 1.5;             // Tolerans när frames hoppas över för lägre mål-fps
+
+// === PARTIKELSYSTEM ===
+
+class RainSystem {
+    /**
+     * @param {object} params - {count, speed, slant}
+     */
+    constructor(params) {
+        this.maxCount = Math.max(1, params.count | 0);
+        this.speed = params.speed || 2.0;
+        this.slant = params.slant || 0;     // vx/vy - vindens lutning
+        this.width = 0;
+        this.height = 0;
+
+        const n = this.maxCount;
+        this.x = new Float32Array(n);
+        this.y = new Float32Array(n);
+        this.vy = new Float32Array(n);
+        this.length = new Float32Array(n);
+        this.level = new Uint8Array(n);
+    }
+
+    resize(width, height) {
+        const first = this.width === 0;
+        this.width = width;
+        this.height = height;
+        if (first) {
+            for (let i = 0; i < this.maxCount; i++) this.spawn(i, true);
+        }
+    }
+
+    spawn(i, initial) {
+        // Med vind startar dropparna även utanför skärmen på lovartsidan
+        const drift = this.slant * this.height;
+        this.x[i] = Math.random() * (this.width + Math.abs(drift)) - Math.max(0, drift);
+        this.y[i] = initial ? -Math.random() * this.height : -20 - Math.random() * 40;
+        this.length[i] = 8 + Math.random() * 8;
+        this.level[i] = (Math.random() * RAIN_ALPHA_LEVELS.length) | 0;
+        this.vy[i] = (this.height + 40) / (this.speed + Math.random());
+    }
+
+    activate(from, to) {
+        for (let i = from; i < to; i++) this.spawn(i, false);
+    }
+
+    update(dt, count) {
+        const slant = this.slant;
+        const limit = this.height + 20;
+        for (let i = 0; i < count; i++) {
+            const dy = this.vy[i] * dt;
+            this.y[i] += dy;
+            this.x[i] += dy * slant;
+            if (this.y[i] - this.length[i] > limit) this.spawn(i, false);
+        }
+    }
+
+    draw(ctx, count) {
+        ctx.lineWidth = 2;
+        ctx.lineCap = 'round';
+        ctx.strokeStyle = RAIN_COLOR;
+        for (let level = 0; level < RAIN_ALPHA_LEVELS.length; level++) {
+            ctx.globalAlpha = RAIN_ALPHA_LEVELS[level];
+            ctx.beginPath();
+            for (let i = 0; i < count; i++) {
+                if (this.level[i] !== level) continue;
+                const length = this.length[i];
+                ctx.moveTo(this.x[i], this.y[i]);
+                ctx.lineTo(this.x[i] - this.slant * length, this.y[i] - length);
+            }
+            ctx.stroke();
+        }
+        ctx.globalAlpha = 1;
+    }
+}
+
+class SnowSystem {
+    /**
+     * @param {object} params - {count, speed, min_size, max_size, characters, sparkle}
+     * @param {function} spriteFactory - Tecken -> förrenderad bild
+     */
+    constructor(params, spriteFactory) {
+        this.maxCount = Math.max(1, params.count | 0);
+        this.speed = params.speed || 1.0;
+        this.minSize = (params.min_size || 0.8) * SNOW_BASE_FONT_PX;
+        this.maxSize = (params.max_size || 1.5) * SNOW_BASE_FONT_PX;
+        this.sparkle = Boolean(params.sparkle);
+        this.sprites = (params.characters && params.characters.length ? params.characters : ['*'])
+            .map(character => spriteFactory(character));
+        this.width = 0;
+        this.height = 0;
+
+        const n = this.maxCount;
+        this.x = new Float32Array(n);
+        this.y = new Float32Array(n);
+        this.vy = new Float32Array(n);
+        this.size = new Float32Array(n);
+        this.alpha = new Float32Array(n);
+        this.phase = new Float32Array(n);
+        this.sprite = new Uint8Array(n);
+    }
+
+    resize(width, height) {
+        const first = this.width === 0;
+        this.width = width;
+        this.height = height;
+        if (first) {
+            for (let i = 0; i < this.maxCount; i++) this.spawn(i, true);
+        }
+    }
+
+    spawn(i, initial) {
+        this.x[i] = Math.random() * this.width;
+        this.y[i] = initial ? -Math.random() * this.height : -30 - Math.random() * 40;
+        this.size[i] = this.minSize + Math.random() * (this.maxSize - this.minSize);
+        this.alpha[i] = 0.7 + Math.random() * 0.3;
+        this.vy[i] = (this.height + 40) / ((Math.random() * 2 + 3) / this.speed);
+        this.phase[i] = Math.random() * Math.PI * 2;
+        this.sprite[i] = (Math.random() * this.sprites.length) | 0;
+    }
+
+    activate(from, to) {
+        for (let i = from; i < to; i++) this.spawn(i, false);
+    }
+
+    update(dt, count) {
+        const limit = this.height + 20;
+        for (let i = 0; i < count; i++) {
+            this.y[i] += this.vy[i] * dt;
+            this.phase[i] += SNOW_SWAY_SPEED * dt;
+            if (this.y[i] - this.size[i] > limit) this.spawn(i, false);
+        }
+    }
+
+    draw(ctx, count) {
+        for (let i = 0; i < count; i++) {
+            const size = this.size[i];
+            const x = this.x[i] + Math.sin(this.phase[i]) * SNOW_SWAY_PX;
+            let alpha = this.alpha[i];
+            if (this.sparkle) {
+                alpha *= 0.75 + 0.25 * Math.sin(this.phase[i] * 3);
+            }
+            ctx.globalAlpha = alpha;
+            ctx.drawImage(this.sprites[this.sprite[i]], x - size / 2, this.y[i] - size / 2, size, size);
+        }
+        ctx.globalAlpha = 1;
+    }
+}
+
+/**
+ * Förrendera ett snötecken (fillText varje frame är dyrt)
+ * @param {string} character
+ * @returns {HTMLCanvasElement|OffscreenCanvas}
+ */
+function createGlyphSprite(character) {
+    let canvas;
+    if (typeof OffscreenCanvas !== 'undefined') {
+        canvas = new OffscreenCanvas(SNOW_SPRITE_PX, SNOW_SPRITE_PX);
+    } else {
+        canvas = document.createElement('canvas');
+        canvas.width = canvas.height = SNOW_SPRITE_PX;
+    }
+    const ctx = canvas.getContext('2d');
+    ctx.fillStyle = 'white';
+    ctx.font = `${SNOW_SPRITE_PX}px sans-serif`;
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    ctx.fillText(character, SNOW_SPRITE_PX / 2, SNOW_SPRITE_PX / 2);
+    return canvas;
+}
+
+function createParticleSystem(effect) {
+    switch (effect.type) {
+        case 'rain':
+            return new RainSystem(effect);
+        case 'snow':
+            return new SnowSystem(effect, createGlyphSprite);
+        default:
+            return null;
+    }
+}
+
+// === FRAME-GOVERNOR ===
+
+class FrameGovernor {
+    constructor(targetFps) {
+        this.scale = 1;
+        this.lastFrame = 0;
+        this.calmWindows = 0;
+        this.stats = { fps: 0, frame_ms: 0, slow_frames: 0, scale: 1 };
+        this.setTargetFps(targetFps);
+        this.resetWindow(0);
+    }
+
+    setTargetFps(targetFps) {
+        this.targetFps = Math.max(15, Math.min(60, Number(targetFps) || 60));
+        this.budgetMs = 1000 / this.targetFps;
+    }
+
+    resetWindow(now) {
+        this.windowStart = now;
+        this.frames = 0;
+        this.workMs = 0;
+        this.slowFrames = 0;
+    }
+
+    /**
+     * Ska denna frame ritas? (hoppar över frames när skärmen är snabbare än målet)
+     */
+    shouldRender(now) {
+        return now - this.lastFrame >= this.budgetMs - FRAME_SLACK_MS;
+    }
+
+    /**
+     * Registrera en ritad frame
+     * @param {number} now - Framens tidsstämpel (ms)
+     * @param {number} workMs - Tid för uppdatering + ritning
+     * @returns {boolean} True om fönstret utvärderades (ny statistik finns)
+     */
+    record(now, workMs) {
+        const interval = this.lastFrame ? now - this.lastFrame : 0;
+        this.lastFrame = now;
+
+        if (interval > GOVERNOR_PAUSE_MS || this.windowStart === 0) {
+            this.resetWindow(now);
+            return false;
+        }
+
+        this.frames++;
+        this.workMs += workMs;
+        if (interval > this.budgetMs * 1.5 || workMs > this.budgetMs * 0.5) {
+            this.slowFrames++;
+        }
+
+        if (now - this.windowStart < GOVERNOR_WINDOW_MS || this.frames === 0) {
+            return false;
+        }
+        this.evaluate(now);
+        return true;
+    }
+
+    evaluate(now) {
+        const fps = this.frames * 1000 / (now - this.windowStart);
+        const averageWork = this.workMs / this.frames;
+        const slowRatio = this.slowFrames / this.frames;
+
+        if (slowRatio > 0.2 || fps < this.targetFps * 0.8) {
+            this.scale = Math.max(GOVERNOR_MIN_SCALE, this.scale * GOVERNOR_STEP_DOWN);
+            this.calmWindows = 0;
+        } else if (slowRatio < 0.05 && averageWork < this.budgetMs * 0.25 && this.scale < 1) {
+            this.calmWindows++;
+            if (this.calmWindows >= GOVERNOR_CALM_WINDOWS) {
+                this.scale = Math.min(1, this.scale + GOVERNOR_STEP_UP);
+                this.calmWindows = 0;
+            }
+        }
+
+        this.stats = {
+            fps: Math.round(fps * 10) / 10,
+            frame_ms: Math.round(averageWork * 100) / 100,
+            slow_frames: this.slowFrames,
+            scale: Math.round(this.scale * 100) / 100
+        };
+        this.resetWindow(now);
+    }
+}
+
+// === RITLOOP (worker eller huvudtråd) ===
+
+function scheduleEffectsFrame(callback) {
+    if (typeof requestAnimationFrame === 'function') {
+        return requestAnimationFrame(callback);
+    }
+    return setTimeout(() => callback(performance.now()), 16);
+}
+
+function cancelEffectsFrame(frameId) {
+    if (typeof cancelAnimationFrame === 'function') {
+        cancelAnimationFrame(frameId);
+    } else {
+        clearTimeout(frameId);
+    }
+}
+
+class EffectsRenderLoop {
+    /**
+     * @param {HTMLCanvasElement|OffscreenCanvas} canvas
+     * @param {number} targetFps - lp156wh4_optimizations.target_fps
+     * @param {function} onStats - Anropas med statistik en gång per sekund
+     */
+    constructor(canvas, targetFps, onStats) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.governor = new FrameGovernor(targetFps);
+        this.onStats = onStats;
+        this.system = null;
+        this.activeCount = 0;
+        this.width = 0;
+        this.height = 0;
+        this.running = false;
+        this.paused = false;
+        this.frameId = null;
+        this.lastTime = 0;
+        this.tick = this.tick.bind(this);
+    }
+
+    resize(width, height, dpr) {
+        this.width = width;
+        this.height = height;
+        this.canvas.width = Math.round(width * dpr);
+        this.canvas.height = Math.round(height * dpr);
+        this.ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+        if (this.system) this.system.resize(width, height);
+    }
+
+    setEffect(effect) {
+        this.system = effect ? createParticleSystem(effect) : null;
+        if (!this.system) {
+            this.stop();
+            this.ctx.clearRect(0, 0, this.width, this.height);
+            return;
+        }
+        this.system.resize(this.width, this.height);
+        this.activeCount = this.targetCount();
+        if (!this.paused) this.start();
+    }
+
+    /**
+     * Pausa/återuppta ritningen (dold sida) - effekten behålls
+     * @param {boolean} paused
+     */
+    setPaused(paused) {
+        this.paused = paused;
+        if (paused) {
+            this.stop();
+        } else if (this.system) {
+            this.start();
+        }
+    }
+
+    setTargetFps(targetFps) {
+        this.governor.setTargetFps(targetFps);
+    }
+
+    targetCount() {
+        return Math.max(1, Math.round(this.system.maxCount * this.governor.scale));
+    }
+
+    start() {
+        if (this.running) return;
+        this.running = true;
+        this.lastTime = 0;
+        this.frameId = scheduleEffectsFrame(this.tick);
+    }
+
+    stop() {
+        this.running = false;
+        if (this.frameId !== null) {
+            cancelEffectsFrame(this.frameId);
+            this.frameId = null;
+        }
+    }
+
+    tick(now) {
+        if (!this.running || !this.system) return;
+        this.frameId = scheduleEffectsFrame(this.tick);
+        if (!this.governor.shouldRender(now)) return;
+
+        const dt = this.lastTime ? Math.min((now - this.lastTime) / 1000, EFFECTS_MAX_STEP_S) : 0;
+        this.lastTime = now;
+        const workStart = performance.now();
+
+        const count = this.targetCount();
+        if (count > this.activeCount) {
+            this.system.activate(this.activeCount, count);
+        }
+        this.activeCount = count;
+
+        this.system.update(dt, count);
+        this.ctx.clearRect(0, 0, this.width, this.height);
+        this.system.draw(this.ctx, count);
+
+        if (this.governor.record(now, performance.now() - workStart) && this.onStats) {
+            this.onStats(this.getStats());
+        }
+    }
+
+    getStats() {
+        return {
+            ...this.governor.stats,
+            target_fps: this.governor.targetFps,
+            particles: this.system ? this.activeCount : 0,
+            max_particles: this.system ? this.system.maxCount : 0
+        };
+    }
+}
+
+// === WORKER ===
+
+if (IS_EFFECTS_WORKER) {
+    let workerLoop = null;
+
+    self.onmessage = event => {
+        const message = event.data;
+        switch (message.type) {
+            case 'init':
+                workerLoop = new EffectsRenderLoop(message.canvas, message.targetFps,
+                    stats => self.postMessage({ type: 'stats', stats: stats }));
+                workerLoop.resize(message.width, message.height, message.dpr);
+                break;
+            case 'resize':
+                if (workerLoop) workerLoop.resize(message.width, message.height, message.dpr);
+                break;
+            case 'effect':
+                if (workerLoop) workerLoop.setEffect(message.effect);
+                break;
+            case 'target-fps':
+                if (workerLoop) workerLoop.setTargetFps(message.targetFps);
+                break;
+            case 'paused':
+                if (workerLoop) workerLoop.setPaused(message.paused);
+                break;
+        }
+    };
+}
+
+// === HUVUDTRÅD: CANVAS + WORKER-STYRNING ===
+
+class CanvasEffectsRenderer {
+    /**
+     * @param {HTMLElement} container - Effekt-containern (fixed, hela fönstret)
+     * @param {object} options - {targetFps, workerUrl}
+     */
+    constructor(container, options = {}) {
+        this.container = container;
+        this.targetFps = options.targetFps || 60;
+        this.workerUrl = options.workerUrl || null;
+        this.effect = null;
+        this.worker = null;
+        this.loop = null;
+        this.stats = null;
+        this.paused = false;
+
+        this.onResize = this.onResize.bind(this);
+        window.addEventListener('resize', this.onResize);
+
+        this.canvas = this.createCanvas();
+        if (!this.startWorker()) {
+            this.startMainThread();
+        }
+
+        // Ingen ritning när sidan är dold; samma källa som klockan och datan
+        if (typeof ClientScheduler !== 'undefined') {
+            this.unsubscribeVisibility = ClientScheduler.onVisibilityChange(hidden => this.setPaused(hidden));
+            this.setPaused(ClientScheduler.isHidden());
+        } else {
+            this.unsubscribeVisibility = null;
+        }
+    }
+
+    get mode() {
+        return this.worker ? 'worker' : 'main';
+    }
+
+    createCanvas() {
+        const canvas = document.createElement('canvas');
+        canvas.className = 'weather-effect-canvas';
+        canvas.style.cssText = 'position: absolute; top: 0; left: 0; width: 100%; height: 100%; pointer-events: none;';
+        this.container.appendChild(canvas);
+        return canvas;
+    }
+
+    viewport() {
+        return {
+            width: window.innerWidth,
+            height: window.innerHeight,
+            dpr: Math.min(window.devicePixelRatio || 1, EFFECTS_MAX_DPR)
+        };
+    }
+
+    startWorker() {
+        if (!this.workerUrl || typeof Worker === 'undefined' || !this.canvas.transferControlToOffscreen) {
+            return false;
+        }
+        try {
+            const offscreen = this.canvas.transferControlToOffscreen();
+            this.worker = new Worker(this.workerUrl);
+            this.worker.onmessage = event => {
+                if (event.data.type === 'stats') this.stats = event.data.stats;
+            };
+            this.worker.onerror = error => {
+                console.warn('[WeatherEffects] Worker-fel, ritar på huvudtråden:', error.message || error);
+                this.fallbackToMainThread();
+            };
+            this.worker.postMessage({ type: 'init', canvas: offscreen, targetFps: this.targetFps, ...this.viewport() },
+                [offscreen]);
+            return true;
+        } catch (error) {
+            console.warn('[WeatherEffects] OffscreenCanvas-worker kunde inte startas:', error);
+            if (this.worker) this.worker.terminate();
+            this.worker = null;
+            // Canvasen kan redan vara överlämnad - börja om med en ny
+            this.canvas.remove();
+            this.canvas = this.createCanvas();
+            return false;
+        }
+    }
+
+    startMainThread() {
+        this.loop = new EffectsRenderLoop(this.canvas, this.targetFps, stats => { this.stats = stats; });
+        const { width, height, dpr } = this.viewport();
+        this.loop.resize(width, height, dpr);
+        if (this.paused) this.loop.setPaused(true);
+        if (this.effect) this.loop.setEffect(this.effect);
+    }
+
+    fallbackToMainThread() {
+        if (!this.worker) return;
+        this.worker.terminate();
+        this.worker = null;
+        this.canvas.remove();
+        this.canvas = this.createCanvas();
+        this.startMainThread();
+    }
+
+    onResize() {
+        const { width, height, dpr } = this.viewport();
+        if (this.worker) {
+            this.worker.postMessage({ type: 'resize', width, height, dpr });
+        } else if (this.loop) {
+            this.loop.resize(width, height, dpr);
+        }
+    }
+
+    /**
+     * Byt effekt
+     * @param {object|null} effect - {type: 'rain'|'snow', count, ...} eller null för ingen
+     */
+    setEffect(effect) {
+        this.effect = effect;
+        if (!effect) this.stats = null;
+        if (this.worker) {
+            this.worker.postMessage({ type: 'effect', effect: effect });
+        } else if (this.loop) {
+            this.loop.setEffect(effect);
+        }
+    }
+
+    setTargetFps(targetFps) {
+        this.targetFps = targetFps;
+        if (this.worker) {
+            this.worker.postMessage({ type: 'target-fps', targetFps: targetFps });
+        } else if (this.loop) {
+            this.loop.setTargetFps(targetFps);
+        }
+    }
+
+    /**
+     * Pausa/återuppta ritloopen
+     * @param {boolean} paused
+     */
+    setPaused(paused) {
+        if (paused === this.paused) return;
+        this.paused = paused;
+        if (this.worker) {
+            this.worker.postMessage({ type: 'paused', paused: paused });
+        } else if (this.loop) {
+            this.loop.setPaused(paused);
+        }
+    }
+
+    /**
+     * Senaste statistik från ritloopen (fps, frame_ms, scale, particles)
+     * @returns {object|null}
+     */
+    getStats() {
+        if (!this.effect) return null;
+        return this.stats ? { ...this.stats, mode: this.mode } : { mode: this.mode };
+    }
+
+    destroy() {
+        window.removeEventListener('resize', this.onResize);
+        if (this.unsubscribeVisibility) this.unsubscribeVisibility();
+        if (this.worker) this.worker.terminate();
+        if (this.loop) this.loop.stop();
+        this.worker = null;
+        this.loop = null;
+        this.canvas.remove();
+    }
+}
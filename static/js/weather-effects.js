@@ -7,6 +7,8 @@
  * ARKITEKTUR: Modulär klass-baserad struktur med robust error handling
  * 
  * 🛠️ KRITISK FIX: clearEffects() metoden helt omskriven för att stoppa effekt-staplingar
+ * 🎨 CANVAS: Partiklarna ritas av weather-effects-renderer.js (en <canvas>, helst i
+ *    en OffscreenCanvas-worker) - inga DOM-element per droppe/flinga
  */
 
 // === SMHI WEATHER SYMBOL MAPPING ===
@@ -51,7 +53,13 @@ const DEFAULT_CONFIG = {
     
     // Error handling & logging
     debug_logging: false,        // För felsökning
-    fallback_enabled: true       // Graceful fallbacks
+    fallback_enabled: true,      // Graceful fallbacks
+    
+    // LP156WH4/Pi5: Målframerate för canvas-renderaren (partiklar skalas ned om den inte hålls)
+    lp156wh4_optimizations: {
+        enabled: true,
+        target_fps: 60
+    }
 };
 
 // === HUVUDKLASS: WEATHEREFFECTSMANAGER ===
@@ -60,6 +68,7 @@ class WeatherEffectsManager {
         this.config = { ...DEFAULT_CONFIG };
         this.currentEffect = null;
         this.effectContainer = null;
+        this.renderer = null;
         this.initialized = false;
         
         // 🛠️ FIX: Global timeout tracking för fullständig rensning
@@ -200,6 +209,10 @@ class WeatherEffectsManager {
      */
     createEffectContainer() {
         // Ta bort befintlig container om den finns
+        if (this.renderer) {
+            this.renderer.destroy();
+            this.renderer = null;
+        }
         if (this.effectContainer) {
             this.effectContainer.remove();
         }
@@ -220,7 +233,31 @@ class WeatherEffectsManager {
         `;
         
         document.body.appendChild(this.effectContainer);
-        this.log('Effect container skapad');
+        
+        // 🎨 CANVAS: En canvas för alla partiklar (worker-URL från index.html)
+        this.renderer = new CanvasEffectsRenderer(this.effectContainer, {
+            targetFps: this.getTargetFps(),
+            workerUrl: document.body.dataset.effectsWorker || null
+        });
+        this.log(`Effect container skapad (canvas-rendering: ${this.renderer.mode})`);
+    }
+    
+    /**
+     * Målframerate för canvas-renderaren från lp156wh4_optimizations
+     */
+    getTargetFps() {
+        const optimizations = this.config.lp156wh4_optimizations;
+        if (!optimizations || !optimizations.enabled) {
+            return 60;
+        }
+        return optimizations.target_fps || 60;
+    }
+    
+    /**
+     * Renderingsstatistik (fps, frame-tid, partiklar) - null när ingen effekt visas
+     */
+    getRenderStats() {
+        return this.renderer ? this.renderer.getStats() : null;
     }
     
     /**
@@ -311,12 +348,12 @@ class WeatherEffectsManager {
         switch (weatherType) {
             case 'rain':
             case 'thunder':
-                this.currentEffect = new RainEffect(this.effectContainer, this.config.rain_config, intensity, windDirection, this);
+                this.currentEffect = new RainEffect(this.renderer, this.config.rain_config, intensity, windDirection, this);
                 break;
                 
             case 'snow':
             case 'sleet':
-                this.currentEffect = new SnowEffect(this.effectContainer, this.config.snow_config, intensity, this);
+                this.currentEffect = new SnowEffect(this.renderer, this.config.snow_config, intensity, this);
                 break;
                 
             case 'clear':
@@ -392,70 +429,14 @@ class WeatherEffectsManager {
         });
         this.globalIntervals.clear();
         
-        // Steg 3: Aggressiv DOM-rensning med multiple selectors
-        if (this.effectContainer) {
-            const beforeCount = this.effectContainer.children.length;
-            
-            // Rensa alla weather-particle element
-            const particleSelectors = [
-                '.rain-particle',
-                '.snow-particle', 
-                '.weather-particle',
-                '[class*="particle"]',
-                '[class*="rain"]',
-                '[class*="snow"]'
-            ];
-            
-            particleSelectors.forEach(selector => {
-                const elements = this.effectContainer.querySelectorAll(selector);
-                elements.forEach(element => {
-                    try {
-                        // Stoppa alla animationer på elementet
-                        element.style.animation = 'none';
-                        element.style.transition = 'none';
-                        
-                        // Ta bort från DOM
-                        if (element.parentNode) {
-                            element.parentNode.removeChild(element);
-                        }
-                    } catch (error) {
-                        this.logError('Fel vid DOM-rensning:', error);
-                    }
-                });
-            });
-            
-            // Fallback: Rensa hela container-innehållet
-            try {
-                this.effectContainer.innerHTML = '';
-            } catch (error) {
-                this.logError('Fel vid innerHTML clear:', error);
-            }
-            
-            const afterCount = this.effectContainer.children.length;
-            this.log(`🧹 DOM rensad: ${beforeCount} → ${afterCount} element`);
+        // Steg 3: Töm canvasen (partiklarna finns bara i renderarens pooler)
+        if (this.renderer) {
+            this.renderer.setEffect(null);
         }
         
         // Steg 4: Dölj effect container
         this.hideEffectContainer();
         
-        // Steg 5: Verification med timeout
-        this.addTimeout(setTimeout(() => {
-            const remainingParticles = document.querySelectorAll('.rain-particle, .snow-particle, .weather-particle');
-            if (remainingParticles.length > 0) {
-                this.logError(`⚠️ ${remainingParticles.length} partiklar kvarstår efter clearEffects!`);
-                // Aggressiv sista rensning
-                remainingParticles.forEach(particle => {
-                    try {
-                        particle.remove();
-                    } catch (error) {
-                        // Ignorera fel här - element kan redan vara borttaget
-                    }
-                });
-            } else {
-                this.log('✅ clearEffects() verifierat - alla partiklar borttagna');
-            }
-        }, 500));
-        
         this.log('🧹 clearEffects() KOMPLETT');
     }
     
@@ -465,6 +446,11 @@ class WeatherEffectsManager {
     destroy() {
         this.clearEffects();
         
+        if (this.renderer) {
+            this.renderer.destroy();
+            this.renderer = null;
+        }
+        
         if (this.effectContainer) {
             this.effectContainer.remove();
             this.effectContainer = null;
@@ -491,17 +477,15 @@ class WeatherEffectsManager {
     }
 }
 
-// === REGNEFFEKT-KLASS (FÖRBÄTTRAD) ===
+// === REGNEFFEKT-KLASS (CANVAS) ===
 class RainEffect {
-    constructor(container, config, intensity, windDirection, manager) {
-        this.container = container;
+    constructor(renderer, config, intensity, windDirection, manager) {
+        this.renderer = renderer;
         this.config = config;
         this.intensity = intensity;
         this.windDirection = windDirection;
-        this.manager = manager; // 🛠️ FIX: Referens till manager för timeout tracking
-        this.particles = [];
-        this.animationId = null;
-        this.isActive = false; // 🛠️ FIX: Flag för att stoppa nya partiklar
+        this.manager = manager;
+        this.isActive = false;
         
         // LP156WH4 optimerade värden
         this.intensityMultipliers = {
@@ -513,121 +497,37 @@ class RainEffect {
     
     start() {
         this.isActive = true;
-        this.createRainParticles();
+        if (this.renderer) {
+            this.renderer.setEffect(this.getParticleParams());
+        }
     }
     
     stop() {
         this.manager.log('🛑 RainEffect.stop() kallas...');
-        this.isActive = false; // 🛠️ FIX: Stoppa nya partiklar
-        
-        if (this.animationId) {
-            cancelAnimationFrame(this.animationId);
-            this.animationId = null;
+        this.isActive = false;
+        if (this.renderer) {
+            this.renderer.setEffect(null);
         }
-        
-        // 🛠️ FIX: Rensa alla partiklar med robust error handling
-        this.particles.forEach((particle, index) => {
-            try {
-                if (particle.element && particle.element.parentNode) {
-                    particle.element.style.animation = 'none'; // Stoppa animationer
-                    particle.element.parentNode.removeChild(particle.element);
-                }
-                if (particle.timeoutId) {
-                    clearTimeout(particle.timeoutId);
-                }
-            } catch (error) {
-                this.manager.logError(`Fel vid rensning av rain particle ${index}:`, error);
-            }
-        });
-        
-        this.particles = [];
-        this.manager.log('🛑 RainEffect stoppat, alla partiklar rensade');
     }
     
     updateIntensity(newIntensity) {
         if (newIntensity !== this.intensity) {
             this.intensity = newIntensity;
-            this.stop();
             this.start();
         }
     }
     
-    createRainParticles() {
-        if (!this.isActive) return; // 🛠️ FIX: Kontrollera om fortfarande aktiv
-        
+    /**
+     * Parametrar till renderarens regnsystem (antal = maxantal, governorn kan skala ned)
+     */
+    getParticleParams() {
         const multiplier = this.intensityMultipliers[this.intensity] || 1.0;
-        const dropletCount = Math.floor(this.config.droplet_count * multiplier);
-        
-        for (let i = 0; i < dropletCount; i++) {
-            if (!this.isActive) break; // 🛠️ FIX: Avbryt om stoppat under loop
-            this.createRainDroplet();
-        }
-    }
-    
-    createRainDroplet() {
-        if (!this.isActive || !this.container) return; // 🛠️ FIX: Safety check
-        
-        const droplet = document.createElement('div');
-        droplet.className = 'rain-particle';
-        
-        // LP156WH4 optimerad styling
-        droplet.style.cssText = `
-            position: absolute !important;
-            width: 2px;
-            height: ${8 + Math.random() * 8}px;
-            background: linear-gradient(to bottom, rgba(0, 170, 255, 0.8), transparent);
-            opacity: ${0.6 + Math.random() * 0.4};
-            border-radius: 50%;
-            left: ${Math.random() * 100}%;
-            top: -20px;
-            pointer-events: none;
-        `;
-        
-        // Vind-påverkan
-        const windOffset = this.getWindOffset();
-        if (windOffset !== 0) {
-            droplet.style.transform = `skewX(${windOffset}deg)`;
-        }
-        
-        // Animation
-        const duration = (this.config.droplet_speed + Math.random()) * 1000;
-        droplet.style.animation = `rain-fall ${duration}ms linear infinite`;
-        
-        // Lägg till slumpmässig delay
-        droplet.style.animationDelay = `${Math.random() * 2000}ms`;
-        
-        this.container.appendChild(droplet);
-        
-        // 🛠️ FIX: Robust timeout-hantering med manager tracking
-        const timeoutId = this.manager.addTimeout(setTimeout(() => {
-            if (!this.isActive) return; // 🛠️ FIX: Kontrollera status
-            
-            // Ta bort droplet
-            if (droplet.parentNode) {
-                droplet.parentNode.removeChild(droplet);
-            }
-            
-            // Ta bort från particles array
-            const index = this.particles.findIndex(p => p.element === droplet);
-            if (index > -1) {
-                this.particles.splice(index, 1);
-            }
-            
-            // Rensa timeout från manager
-            this.manager.removeTimeout(timeoutId);
-            
-            // Skapa ny droplet för kontinuerlig effekt ENDAST om fortfarande aktiv
-            if (this.isActive && this.container) {
-                this.createRainDroplet();
-            }
-        }, duration + 2000));
-        
-        // Spara referens MED timeout ID
-        this.particles.push({
-            element: droplet,
-            duration: duration,
-            timeoutId: timeoutId // 🛠️ FIX: Spara timeout ID för rensning
-        });
+        return {
+            type: 'rain',
+            count: Math.floor(this.config.droplet_count * multiplier),
+            speed: this.config.droplet_speed,
+            slant: Math.tan(this.getWindOffset() * Math.PI / 180)
+        };
     }
     
     getWindOffset() {
@@ -642,15 +542,14 @@ class RainEffect {
     }
 }
 
-// === SNÖEFFEKT-KLASS (FÖRBÄTTRAD) ===
+// === SNÖEFFEKT-KLASS (CANVAS) ===
 class SnowEffect {
-    constructor(container, config, intensity, manager) {
-        this.container = container;
+    constructor(renderer, config, intensity, manager) {
+        this.renderer = renderer;
         this.config = config;
         this.intensity = intensity;
-        this.manager = manager; // 🛠️ FIX: Referens till manager
-        this.particles = [];
-        this.isActive = false; // 🛠️ FIX: Aktivitetsflag
+        this.manager = manager;
+        this.isActive = false;
         
         // LP156WH4 optimerade värden
         this.intensityMultipliers = {
@@ -662,119 +561,40 @@ class SnowEffect {
     
     start() {
         this.isActive = true;
-        this.createSnowParticles();
+        if (this.renderer) {
+            this.renderer.setEffect(this.getParticleParams());
+        }
     }
     
     stop() {
         this.manager.log('🛑 SnowEffect.stop() kallas...');
-        this.isActive = false; // 🛠️ FIX: Stoppa nya partiklar
-        
-        // 🛠️ FIX: Robust particle-rensning
-        this.particles.forEach((particle, index) => {
-            try {
-                if (particle.element && particle.element.parentNode) {
-                    particle.element.style.animation = 'none'; // Stoppa animationer
-                    particle.element.parentNode.removeChild(particle.element);
-                }
-                if (particle.timeoutId) {
-                    clearTimeout(particle.timeoutId);
-                }
-            } catch (error) {
-                this.manager.logError(`Fel vid rensning av snow particle ${index}:`, error);
-            }
-        });
-        
-        this.particles = [];
-        this.manager.log('🛑 SnowEffect stoppat, alla partiklar rensade');
+        this.isActive = false;
+        if (this.renderer) {
+            this.renderer.setEffect(null);
+        }
     }
     
     updateIntensity(newIntensity) {
         if (newIntensity !== this.intensity) {
             this.intensity = newIntensity;
-            this.stop();
             this.start();
         }
     }
     
-    createSnowParticles() {
-        if (!this.isActive) return; // 🛠️ FIX: Safety check
-        
+    /**
+     * Parametrar till renderarens snösystem
+     */
+    getParticleParams() {
         const multiplier = this.intensityMultipliers[this.intensity] || 1.0;
-        const flakeCount = Math.floor(this.config.flake_count * multiplier);
-        
-        for (let i = 0; i < flakeCount; i++) {
-            if (!this.isActive) break; // 🛠️ FIX: Avbryt om stoppat
-            this.createSnowFlake();
-        }
-    }
-    
-    createSnowFlake() {
-        if (!this.isActive || !this.container) return; // 🛠️ FIX: Safety check
-        
-        const flake = document.createElement('div');
-        flake.className = 'snow-particle';
-        
-        // Välj random tecken
-        const character = this.config.characters[Math.floor(Math.random() * this.config.characters.length)];
-        flake.textContent = character;
-        
-        // LP156WH4 optimerad styling
-        const size = this.config.min_size + Math.random() * (this.config.max_size - this.config.min_size);
-        flake.style.cssText = `
-            position: absolute !important;
-            color: white;
-            font-size: ${size}em;
-            opacity: ${0.7 + Math.random() * 0.3};
-            left: ${Math.random() * 100}%;
-            top: -20px;
-            pointer-events: none;
-            user-select: none;
-        `;
-        
-        // Sparkle-effekt
-        if (this.config.sparkle_enabled) {
-            flake.classList.add('sparkle');
-        }
-        
-        // Animation
-        const duration = ((Math.random() * 2 + 3) / this.config.speed) * 1000;
-        flake.style.animation = `snow-fall ${duration}ms linear infinite`;
-        
-        // Lägg till slumpmässig delay
-        flake.style.animationDelay = `${Math.random() * 3000}ms`;
-        
-        this.container.appendChild(flake);
-        
-        // 🛠️ FIX: Robust timeout med manager tracking
-        const timeoutId = this.manager.addTimeout(setTimeout(() => {
-            if (!this.isActive) return; // 🛠️ FIX: Kontrollera status
-            
-            // Ta bort flake
-            if (flake.parentNode) {
-                flake.parentNode.removeChild(flake);
-            }
-            
-            // Ta bort från particles array
-            const index = this.particles.findIndex(p => p.element === flake);
-            if (index > -1) {
-                this.particles.splice(index, 1);
-            }
-            
-            // Rensa timeout från manager
-            this.manager.removeTimeout(timeoutId);
-            
-            // Skapa ny flake ENDAST om fortfarande aktiv
-            if (this.isActive && this.container) {
-                this.createSnowFlake();
-            }
-        }, duration + 3000));
-        
-        // Spara referens MED timeout ID
-        this.particles.push({
-            element: flake,
-            duration: duration,
-            timeoutId: timeoutId // 🛠️ FIX: Spara timeout ID
-        });
+        return {
+            type: 'snow',
+            count: Math.floor(this.config.flake_count * multiplier),
+            speed: this.config.speed,
+            min_size: this.config.min_size,
+            max_size: this.config.max_size,
+            characters: this.config.characters,
+            sparkle: this.config.sparkle_enabled
+        };
     }
 }
 
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Flask Weather Dashboard - WSGI-ingång
+För drift under en WSGI-server med flera workers, t.ex:
+
+    gunicorn -w 4 -b 0.0.0.0:8036 wsgi:app
+
+Sätt deployment.multi_worker = True i reference/config.py så att endast en
+worker (ledaren) hämtar data. Använd INTE --preload: låset och bakgrunds-
+trådarna måste skapas i varje worker efter fork.
+"""
+
+import logging
+import sys
+
+from app import app, initialize_app
+
+if not initialize_app():
+    logging.getLogger("app").error("❌ Kunde inte initiera Flask-appen")
+    sys.exit(1)